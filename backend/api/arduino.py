@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict
+
+from backend.database.async_session import AsyncSessionLocal, get_async_db
+from backend.schemas.device import BulkIrrigationStart, BulkIrrigationStop, CommandStatusUpdate
+from backend.services.arduino_service import ArduinoService
+
+router = APIRouter(prefix="/arduino", tags=["Arduino"])
+
+# Controllers hold the command request open for up to this many seconds
+MAX_COMMAND_WAIT = 30
+
+# Zones per fan-out request
+MAX_BULK_ZONES = 1000
+
+arduino_service = ArduinoService()
+
+logger = logging.getLogger(__name__)
+_status_flush_task = None
+
+async def _flush_command_statuses():
+    """Write buffered command statuses even when controllers go quiet"""
+    while True:
+        await asyncio.sleep(arduino_service.status_flush_interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                await arduino_service.flush_status_updates(db)
+        except Exception as e:
+            logger.error(f"Error in command status flush: {e}")
+
+@router.on_event("startup")
+async def start_status_flush():
+    global _status_flush_task
+    _status_flush_task = asyncio.create_task(_flush_command_statuses())
+
+@router.on_event("shutdown")
+async def stop_status_flush():
+    if _status_flush_task is not None:
+        _status_flush_task.cancel()
+    async with AsyncSessionLocal() as db:
+        await arduino_service.flush_status_updates(db)
+
+@router.post("/{device_id}/data")
+async def receive_sensor_data(
+    device_id: str,
+    data: Dict[str, Any],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Receive a sensor report from a controller"""
+    if not await arduino_service.process_sensor_data(device_id, data, db):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not process sensor data"
+        )
+    return {"status": "ok"}
+
+@router.post("/{device_id}/telemetry")
+async def receive_telemetry(
+    device_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Receive a batch of readings in the binary telemetry format"""
+    try:
+        saved = await arduino_service.ingest_telemetry(device_id, await request.body(), db)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not store telemetry"
+        )
+    return {"status": "ok", "saved": saved}
+
+@router.get("/{device_id}/commands")
+async def get_commands(
+    device_id: str,
+    wait: float = Query(0, ge=0, le=MAX_COMMAND_WAIT),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Long-poll for commands; returns as soon as one is queued or after ``wait`` seconds"""
+    commands = await arduino_service.get_pending_commands(device_id, db, wait=wait)
+    return {"commands": commands}
+
+@router.post("/{device_id}/commands/{command_id}/status")
+async def update_command_status(
+    device_id: str,
+    command_id: int,
+    update: CommandStatusUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Record the execution result of a command"""
+    if not await arduino_service.update_command_status(
+        device_id, command_id, update.status, update.error_message, db
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Command not found"
+        )
+    return {"status": "ok"}
+
+@router.post("/irrigation/start")
+async def start_irrigation_bulk(
+    request: BulkIrrigationStart,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start irrigation in many zones in one transaction; reports an outcome per zone"""
+    durations = {zone.zone_id: zone.duration for zone in request.zones}
+    _check_bulk_size(len(durations))
+    return {"zones": await arduino_service.start_irrigation_many(durations, db, request.type)}
+
+@router.post("/irrigation/stop")
+async def stop_irrigation_bulk(
+    request: BulkIrrigationStop,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stop irrigation in many zones in one transaction; reports an outcome per zone"""
+    _check_bulk_size(len(set(request.zone_ids)))
+    return {"zones": await arduino_service.stop_irrigation_many(request.zone_ids, db)}
+
+def _check_bulk_size(count: int):
+    if not 0 < count <= MAX_BULK_ZONES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {MAX_BULK_ZONES} zones are required"
+        )
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import column, select, table
+from sqlalchemy.orm import Session
+
+from backend.database.session import get_db
+from backend.services.export_service import ExportService, EXPORT_DATASETS, EXPORT_MEDIA_TYPES
+
+router = APIRouter(prefix="/zones", tags=["Exports"])
+
+# Only the key is needed to check the zone exists
+zones = table("zones", column("zone_id"))
+
+@router.get("/{zone_id}/export")
+def export_zone_history(
+    zone_id: str,
+    dataset: str = "sensor_data",
+    format: str = "csv",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+):
+    """Stream sensor, irrigation or satellite history as CSV, NDJSON or Parquet"""
+    if dataset not in EXPORT_DATASETS or format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"dataset must be one of {list(EXPORT_DATASETS)} and format one of {list(EXPORT_MEDIA_TYPES)}"
+        )
+    if db.execute(select(zones.c.zone_id).where(zones.c.zone_id == zone_id)).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Zone not found"
+        )
+    try:
+        chunks = ExportService().stream(
+            db,
+            dataset,
+            zone_id,
+            start_date or (datetime.now() - timedelta(days=7)),
+            end_date or datetime.now(),
+            format
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    filename = f"{zone_id}_{dataset}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
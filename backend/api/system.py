@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict
+
+from backend.core.config import settings
+from backend.core.lazy_imports import registry
+from backend.database.session import engine, pool_monitor, query_profiler
+from backend.ml_models.model_registry import ModelNotFoundError, get_model_registry
+from backend.models.user import User
+from backend.services.auth_service import AuthService
+from backend.services.retention_service import RetentionService, default_policies
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+retention_service = RetentionService(engine, default_policies())
+
+logger = logging.getLogger(__name__)
+_retention_task = None
+_health_task = None
+
+@router.on_event("startup")
+async def start_retention():
+    global _retention_task
+    _retention_task = asyncio.create_task(retention_service.run_forever(settings.RETENTION_INTERVAL_SECONDS))
+
+@router.on_event("startup")
+async def start_health_checks():
+    global _health_task
+    _health_task = asyncio.create_task(pool_monitor.run_forever(settings.DB_HEALTH_CHECK_INTERVAL))
+
+@router.on_event("startup")
+async def start_warm_up():
+    if settings.LAZY_WARMUP:
+        asyncio.create_task(registry.warm_up(settings.LAZY_WARMUP))
+
+@router.on_event("shutdown")
+async def stop_background_tasks():
+    if _retention_task is not None:
+        _retention_task.cancel()
+    if _health_task is not None:
+        _health_task.cancel()
+
+@router.get("/database", response_model=Dict[str, Any])
+async def get_database_health(
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Result of the last background check, pool usage and slow queries"""
+    return {'pool': pool_monitor.stats(), 'queries': query_profiler.stats()}
+
+@router.get("/startup", response_model=Dict[str, Any])
+async def get_startup_profile(
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Heavy modules and backends: whether, when and how fast each was loaded"""
+    return registry.report()
+
+@router.get("/models", response_model=Dict[str, Any])
+async def get_models(
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Stored, active and loaded versions of each model"""
+    return get_model_registry().status()
+
+@router.post("/models/{kind}/activate/{version}", response_model=Dict[str, Any])
+async def activate_model(
+    kind: str,
+    version: str,
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Switch every worker to another stored model version"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    model_registry = get_model_registry()
+    try:
+        await asyncio.to_thread(model_registry.activate, kind, version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return model_registry.status()[kind]
+
+@router.get("/retention", response_model=Dict[str, Any])
+async def get_retention_status(
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Progress of the current or last retention run, per table"""
+    return retention_service.metrics
+
+@router.post("/retention/run", response_model=Dict[str, Any])
+async def run_retention(
+    current_user: User = Depends(AuthService.get_current_user)
+):
+    """Run retention now instead of waiting for the next interval"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    if retention_service.metrics['state'] == 'running':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Retention run already in progress")
+    try:
+        return await asyncio.to_thread(retention_service.run_once)
+    except Exception as e:
+        logger.error(f"Manual retention run failed: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
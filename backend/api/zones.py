@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
@@ -9,6 +9,7 @@ from backend.database.session import get_db
 from backend.models.user import User
 from backend.schemas.zone import ZoneCreate, Zone, ZoneUpdate, ZoneResponse, IrrigationSchedule
 from backend.services.zone_service import ZoneService
+from backend.services.sensor_query_service import SensorQueryService
 from backend.services.auth_service import AuthService
 from backend.middleware.security import limiter
 
@@ -123,10 +124,22 @@ async def get_zone_sensor_data(
     zone_id: str,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    columns: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    points: Optional[int] = Query(None, ge=3, le=10000),
+    method: str = "lttb",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Get sensor data for a specific zone"""
+    """Get sensor data for a specific zone.
+
+    Without ``points`` this returns one keyset-paginated page of raw readings;
+    pass ``next_cursor`` back as ``cursor`` for the next page. With ``points``
+    each requested column is downsampled server-side (LTTB or min/max per
+    bucket) to about that many samples. ``columns`` is a comma-separated
+    projection.
+    """
     zone_service = ZoneService(db)
     zone = zone_service.get_zone(zone_id, current_user.id)
     if not zone:
@@ -139,13 +152,23 @@ async def get_zone_sensor_data(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Not enough permissions"
         )
-    data = zone_service.get_sensor_data(
-        zone_id,
-        current_user.id,
-        start_date or (datetime.now() - timedelta(days=7)),
-        end_date or datetime.now()
-    )
-    if not data:
+    query_service = SensorQueryService()
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    start = start_date or (datetime.now() - timedelta(days=7))
+    end = end_date or datetime.now()
+    try:
+        if points:
+            data = query_service.get_downsampled(db, zone_id, start, end, points, selected, method)
+            has_data = data["downsample"]["source_rows"] > 0
+        else:
+            data = query_service.get_page(db, zone_id, start, end, selected, limit, cursor)
+            has_data = bool(data["data"]) or cursor is not None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not has_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Zone not found or no data available"
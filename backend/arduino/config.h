@@ -57,7 +57,9 @@
 // System Timings
 #define SENSOR_READ_INTERVAL 5000
 #define SERVER_UPDATE_INTERVAL 300000
-#define COMMAND_CHECK_INTERVAL 10000
+#define COMMAND_CHECK_INTERVAL 1000     // Re-arm the command long-poll
+#define COMMAND_LONG_POLL_SECONDS 20
+#define HTTP_RESPONSE_TIMEOUT 5000
 #define WATCHDOG_TIMEOUT 8000
 
 // Sensor Configuration
@@ -65,6 +67,13 @@
 #define BUFFER_SIZE 64
 #define MAX_RETRY_ATTEMPTS 3
 
+// Telemetry Upload
+// 1 = buffer readings and upload them in the binary format
+// (backend/services/telemetry_protocol.py), 0 = one JSON document per reading
+#define TELEMETRY_BINARY 1
+#define TELEMETRY_VERSION 1
+#define TELEMETRY_BATCH_RECORDS 12   // One upload per minute at a 5 s read interval
+
 // RS485 Configuration
 #define RS485_BAUD_RATE 9600
 
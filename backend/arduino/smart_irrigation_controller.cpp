@@ -45,6 +45,42 @@ struct SystemState {
     unsigned long lastCommandCheck;
 } state;
 
+// Binary telemetry, little-endian and packed to match TELEMETRY_SCHEMAS
+// in backend/services/telemetry_protocol.py (32-byte header, 61-byte record)
+struct __attribute__((packed)) TelemetryHeader {
+    char magic[2];
+    uint8_t version;
+    uint8_t flags;
+    uint16_t count;
+    char zoneId[16];
+    int8_t signalStrength;
+    uint8_t batteryLevel;
+    char firmwareVersion[8];
+};
+
+struct __attribute__((packed)) TelemetryRecord {
+    uint32_t age;          // seconds before upload; filled in when sending
+    float soilMoisture;
+    float soilTemp;
+    float soilPH;
+    float soilEC;
+    float soilN;
+    float soilP;
+    float soilK;
+    float airTemp;
+    float airHumidity;
+    float lightLevel;
+    float pressure;
+    float windSpeed;
+    float flowRate;
+    float totalWater;
+    uint8_t isRaining;
+};
+
+TelemetryRecord telemetryBuffer[TELEMETRY_BATCH_RECORDS];
+uint32_t telemetryReadAt[TELEMETRY_BATCH_RECORDS];
+uint8_t telemetryCount = 0;
+
 // DHT sensor
 DHT dht(DHT_PIN, DHT22);
 
@@ -54,19 +90,30 @@ uint32_t lastServerUpdate = 0;
 uint32_t lastCommandCheck = 0;
 uint32_t lastDisplayUpdate = 0;
 uint32_t lastWatchdogReset = 0;
+uint32_t lastFlowRead = 0;
 volatile uint32_t flowPulseCount = 0;
 
+// Command long-poll, held open across loop() iterations
+WiFiEspClient commandClient;
+bool commandPollActive = false;
+uint32_t commandPollStarted = 0;
+
 // Function prototypes
 void setupWiFi();
 void readSensors();
 void sendSensorData();
 void checkCommands();
+void pollCommandResponse();
+void handleCommands(const String& response);
 void updateCommandStatus(int commandId, const char* status, const char* errorMessage = nullptr);
 void handleIrrigation();
 void ICACHE_RAM_ATTR flowPulseCounter();
 void setupDisplay();
 void updateDisplay();
 void handleError(uint8_t errorFlag);
+bool waitForResponse(WiFiEspClient& client, unsigned long timeoutMs);
+void bufferTelemetry();
+bool sendTelemetryBatch();
 
 void setup() {
     // Initialize debug serial
@@ -142,12 +189,14 @@ void loop() {
             state.lastSensorUpdate = currentMillis;
         }
         
-        // Check for commands every COMMAND_CHECK_INTERVAL
-        if (currentMillis - state.lastCommandCheck >= COMMAND_CHECK_INTERVAL) {
+        // Re-arm the command long-poll COMMAND_CHECK_INTERVAL after the last one ended
+        if (!commandPollActive && currentMillis - state.lastCommandCheck >= COMMAND_CHECK_INTERVAL) {
             checkCommands();
-            state.lastCommandCheck = currentMillis;
         }
     }
+
+    // Handle the long-poll reply once it arrives; never waits for it
+    pollCommandResponse();
     
     // Always handle irrigation, even if offline
     handleIrrigation();
@@ -256,12 +305,19 @@ void readSensors() {
     // Read digital sensors
     state.isRaining = !digitalRead(RAIN_SENSOR_PIN);  // Active LOW
     
-    // Calculate flow rate (pulses to L/min)
+    // Calculate flow rate (pulses to L/min) over the time actually elapsed
+    // since the last read, which can be longer than SENSOR_READ_INTERVAL
     cli();  // Disable interrupts
-    state.flowRate = (flowPulseCount * FLOW_FACTOR) / (SENSOR_READ_INTERVAL / 1000.0);
-    state.totalWaterUsage += state.flowRate * (SENSOR_READ_INTERVAL / 60000.0);  // Add water used in last interval
+    uint32_t pulses = flowPulseCount;
     flowPulseCount = 0;
     sei();  // Enable interrupts
+    uint32_t now = millis();
+    uint32_t elapsed = now - lastFlowRead;
+    lastFlowRead = now;
+    if (elapsed > 0) {
+        state.flowRate = (pulses * FLOW_FACTOR) / (elapsed / 1000.0);
+        state.totalWaterUsage += state.flowRate * (elapsed / 60000.0);  // Add water used since the last read
+    }
     
     // Read wind speed (implement according to your sensor type)
     // This is a placeholder - implement based on your specific wind sensor
@@ -330,6 +386,13 @@ void handleError(uint8_t errorFlag) {
 }
 
 void sendSensorData() {
+#if TELEMETRY_BINARY
+    bufferTelemetry();
+    if (telemetryCount >= TELEMETRY_BATCH_RECORDS && WiFi.status() == WL_CONNECTED) {
+        sendTelemetryBatch();
+    }
+    return;
+#endif
     if (WiFi.status() != WL_CONNECTED) return;
 
     // Create JSON document
@@ -379,7 +442,7 @@ void sendSensorData() {
         client.println();
         client.println(jsonString);
         
-        delay(100); // Wait for server response
+        waitForResponse(client, HTTP_RESPONSE_TIMEOUT);
         
         // Read response
         while (client.available()) {
@@ -396,81 +459,186 @@ void sendSensorData() {
     }
 }
 
-void checkCommands() {
-    if (WiFi.status() != WL_CONNECTED) return;
+void bufferTelemetry() {
+    if (telemetryCount >= TELEMETRY_BATCH_RECORDS) {
+        // Upload is failing; drop the oldest reading to make room
+        memmove(&telemetryBuffer[0], &telemetryBuffer[1], sizeof(TelemetryRecord) * (TELEMETRY_BATCH_RECORDS - 1));
+        memmove(&telemetryReadAt[0], &telemetryReadAt[1], sizeof(uint32_t) * (TELEMETRY_BATCH_RECORDS - 1));
+        telemetryCount--;
+    }
+
+    TelemetryRecord& record = telemetryBuffer[telemetryCount];
+    record.age = 0;
+    record.soilMoisture = state.soilMoisture;
+    record.soilTemp = state.soilTemp;
+    record.soilPH = state.soilPH;
+    record.soilEC = state.soilEC;
+    record.soilN = state.soilNPK[0];
+    record.soilP = state.soilNPK[1];
+    record.soilK = state.soilNPK[2];
+    record.airTemp = state.airTemp;
+    record.airHumidity = state.airHumidity;
+    record.lightLevel = NAN;  // No light sensor fitted
+    record.pressure = state.pressure;
+    record.windSpeed = state.windSpeed;
+    record.flowRate = state.flowRate;
+    record.totalWater = state.totalWaterUsage;
+    record.isRaining = state.isRaining ? 1 : 0;
+    telemetryReadAt[telemetryCount] = millis();
+    telemetryCount++;
+}
+
+bool sendTelemetryBatch() {
+    TelemetryHeader header;
+    memset(&header, 0, sizeof(header));
+    header.magic[0] = 'S';
+    header.magic[1] = 'T';
+    header.version = TELEMETRY_VERSION;
+    header.count = telemetryCount;  // AVR is little-endian, as the format requires
+    header.signalStrength = (int8_t)constrain(WiFi.RSSI(), -128, 127);
+    header.batteryLevel = 100;  // Add actual battery monitoring if available
+    strncpy(header.firmwareVersion, FIRMWARE_VERSION, sizeof(header.firmwareVersion));
+    // zoneId left empty: the server uses the zone registered for this device
+
+    uint32_t now = millis();
+    for (uint8_t i = 0; i < telemetryCount; i++) {
+        telemetryBuffer[i].age = (now - telemetryReadAt[i]) / 1000;
+    }
 
     WiFiEspClient client;
-    
-    if (client.connect(server, port)) {
-        // Make HTTP GET request
-        client.println("GET /api/arduino/" + String(DEVICE_ID) + "/commands HTTP/1.1");
-        client.println("Host: " + String(server));
-        client.println("Connection: close");
-        client.println();
-        
-        delay(100); // Wait for server response
-        
-        String response = "";
-        bool headersDone = false;
-        
-        // Read response
-        while (client.available()) {
-            String line = client.readStringUntil('\n');
-            if (line == "\r") {
-                headersDone = true;
-                continue;
-            }
-            if (headersDone) {
-                response += line;
-            }
+    if (!client.connect(server, port)) {
+        state.serverConnected = false;
+        handleError(ERR_SERVER_CONN);
+        return false;
+    }
+
+    size_t bodyLength = sizeof(header) + sizeof(TelemetryRecord) * telemetryCount;
+    client.println("POST /api/arduino/" + String(DEVICE_ID) + "/telemetry HTTP/1.1");
+    client.println("Host: " + String(server));
+    client.println("Content-Type: application/vnd.sisri.telemetry");
+    client.print("Content-Length: ");
+    client.println(bodyLength);
+    client.println();
+    client.write((const uint8_t*)&header, sizeof(header));
+    client.write((const uint8_t*)telemetryBuffer, sizeof(TelemetryRecord) * telemetryCount);
+
+    bool answered = waitForResponse(client, HTTP_RESPONSE_TIMEOUT);
+    bool accepted = false;
+    if (answered) {
+        // "HTTP/1.1 200 OK"
+        String statusLine = client.readStringUntil('\r');
+        accepted = statusLine.indexOf(" 200") > 0;
+    }
+    client.stop();
+
+    state.serverConnected = answered;
+    if (accepted) {
+        telemetryCount = 0;
+        DEBUG_SERIAL.println("Telemetry batch sent");
+    }
+    return accepted;
+}
+
+void checkCommands() {
+    if (WiFi.status() != WL_CONNECTED || commandPollActive) return;
+
+    // Long-poll: the server answers as soon as a command is queued,
+    // or with an empty list after COMMAND_LONG_POLL_SECONDS. The request is
+    // only sent here; pollCommandResponse() reads the reply from loop()
+    if (commandClient.connect(server, port)) {
+        commandClient.println("GET /api/arduino/" + String(DEVICE_ID) + "/commands?wait=" + String(COMMAND_LONG_POLL_SECONDS) + " HTTP/1.1");
+        commandClient.println("Host: " + String(server));
+        commandClient.println("Connection: close");
+        commandClient.println();
+        commandPollActive = true;
+        commandPollStarted = millis();
+    } else {
+        state.lastCommandCheck = millis();
+    }
+}
+
+void pollCommandResponse() {
+    if (!commandPollActive) return;
+
+    if (!commandClient.available()) {
+        // Still waiting; give up if the server went away or overran the poll
+        if (!commandClient.connected() || millis() - commandPollStarted >= COMMAND_LONG_POLL_SECONDS * 1000UL + HTTP_RESPONSE_TIMEOUT) {
+            commandClient.stop();
+            commandPollActive = false;
+            state.lastCommandCheck = millis();
         }
-        
-        client.stop();
-        
-        // Parse commands
-        StaticJsonDocument<1024> doc;
-        DeserializationError error = deserializeJson(doc, response);
-        
-        if (!error) {
-            JsonArray commands = doc["commands"];
-            for (JsonObject command : commands) {
-                int commandId = command["command_id"];
-                const char* type = command["type"];
-                JsonObject params = command["parameters"];
-                
-                bool success = false;
-                String errorMessage;
+        return;
+    }
+
+    String response = "";
+    bool headersDone = false;
+    unsigned long readStart = millis();
+
+    // The reply has started; read it until the server closes the connection
+    while ((commandClient.connected() || commandClient.available()) && millis() - readStart < HTTP_RESPONSE_TIMEOUT) {
+        if (!commandClient.available()) {
+            continue;
+        }
+        String line = commandClient.readStringUntil('\n');
+        if (line == "\r") {
+            headersDone = true;
+            continue;
+        }
+        if (headersDone) {
+            response += line;
+        }
+    }
+
+    commandClient.stop();
+    commandPollActive = false;
+    state.lastCommandCheck = millis();
+    handleCommands(response);
+}
+
+void handleCommands(const String& response) {
+    // Parse commands
+    StaticJsonDocument<1024> doc;
+    DeserializationError error = deserializeJson(doc, response);
+    
+    if (!error) {
+        JsonArray commands = doc["commands"];
+        for (JsonObject command : commands) {
+            int commandId = command["command_id"];
+            const char* type = command["type"];
+            JsonObject params = command["parameters"];
+            
+            bool success = false;
+            String errorMessage;
+            
+            // Handle different command types
+            if (strcmp(type, "start_irrigation") == 0) {
+                uint8_t zoneIndex = params["zone_id"].as<int>() - 1;
+                uint32_t duration = params["duration"];
                 
-                // Handle different command types
-                if (strcmp(type, "start_irrigation") == 0) {
-                    uint8_t zoneIndex = params["zone_id"].as<int>() - 1;
-                    uint32_t duration = params["duration"];
-                    
-                    if (zoneIndex < MAX_ZONES) {
-                        state.zoneActive[zoneIndex] = true;
-                        state.zoneStartTime[zoneIndex] = millis();
-                        state.zoneDuration[zoneIndex] = duration;
-                        digitalWrite(RELAY_1_PIN + (zoneIndex * 2), HIGH);
-                        success = true;
-                    } else {
-                        errorMessage = "Invalid zone index";
-                    }
-                }
-                else if (strcmp(type, "stop_irrigation") == 0) {
-                    uint8_t zoneIndex = params["zone_id"].as<int>() - 1;
-                    
-                    if (zoneIndex < MAX_ZONES) {
-                        state.zoneActive[zoneIndex] = false;
-                        digitalWrite(RELAY_1_PIN + (zoneIndex * 2), LOW);
-                        success = true;
-                    } else {
-                        errorMessage = "Invalid zone index";
-                    }
+                if (zoneIndex < MAX_ZONES) {
+                    state.zoneActive[zoneIndex] = true;
+                    state.zoneStartTime[zoneIndex] = millis();
+                    state.zoneDuration[zoneIndex] = duration;
+                    digitalWrite(RELAY_1_PIN + (zoneIndex * 2), HIGH);
+                    success = true;
+                } else {
+                    errorMessage = "Invalid zone index";
                 }
+            }
+            else if (strcmp(type, "stop_irrigation") == 0) {
+                uint8_t zoneIndex = params["zone_id"].as<int>() - 1;
                 
-                // Update command status
-                updateCommandStatus(commandId, success ? "executed" : "failed", errorMessage.c_str());
+                if (zoneIndex < MAX_ZONES) {
+                    state.zoneActive[zoneIndex] = false;
+                    digitalWrite(RELAY_1_PIN + (zoneIndex * 2), LOW);
+                    success = true;
+                } else {
+                    errorMessage = "Invalid zone index";
+                }
             }
+            
+            // Update command status
+            updateCommandStatus(commandId, success ? "executed" : "failed", errorMessage.c_str());
         }
     }
 }
@@ -500,7 +668,7 @@ void updateCommandStatus(int commandId, const char* status, const char* errorMes
         client.println();
         client.println(jsonString);
         
-        delay(100); // Wait for server response
+        waitForResponse(client, HTTP_RESPONSE_TIMEOUT);
         
         // Read response (optional)
         while (client.available()) {
@@ -543,3 +711,17 @@ void handleIrrigation() {
         }
     }
 }
+
+// Wait for the server to start answering instead of sleeping a fixed time.
+// Irrigation timing keeps being serviced while waiting.
+bool waitForResponse(WiFiEspClient& client, unsigned long timeoutMs) {
+    unsigned long start = millis();
+    while (!client.available()) {
+        if (!client.connected() || millis() - start >= timeoutMs) {
+            return false;
+        }
+        handleIrrigation();
+        delay(1);
+    }
+    return true;
+}
@@ -6,34 +6,43 @@ from datetime import datetime
 import logging
 from typing import Dict, List
 import threading
-import requests
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sensor ranges
+SENSOR_RANGES = {
+    "soil_moisture": (20, 80),  # percentage
+    "soil_temp": (15, 30),      # Celsius
+    "soil_ph": (6.0, 7.5),
+    "soil_ec": (1.0, 2.0),      # mS/cm
+    "soil_n": (40, 60),         # mg/kg
+    "soil_p": (20, 40),         # mg/kg
+    "soil_k": (150, 250),       # mg/kg
+    "air_temp": (18, 35),       # Celsius
+    "air_humidity": (40, 80),   # percentage
+    "light_level": (1000, 10000) # lux
+}
+
 class ArduinoSimulator:
-    def __init__(self, device_id: str = "SIM001"):
+    def __init__(self, device_id: str = "SIM001", db_path: str = "smart_irrigation.db"):
         self.device_id = device_id
         self.zones: Dict[str, dict] = {}  # zone_id: {is_active: bool, arduino_id: str}
         self.running = True
-        self.db_path = "smart_irrigation.db"
+        self.db_path = db_path
+        # One connection shared by the run loop and zone tests
+        self._conn = None
+        self._db_lock = threading.Lock()
         
         # Initialize zones from database
         self._init_zones()
         
-        # Sensor ranges
-        self.sensor_ranges = {
-            "soil_moisture": (20, 80),  # percentage
-            "soil_temp": (15, 30),      # Celsius
-            "soil_ph": (6.0, 7.5),
-            "soil_ec": (1.0, 2.0),      # mS/cm
-            "soil_n": (40, 60),         # mg/kg
-            "soil_p": (20, 40),         # mg/kg
-            "soil_k": (150, 250),       # mg/kg
-            "air_temp": (18, 35),       # Celsius
-            "air_humidity": (40, 80),   # percentage
-            "light_level": (1000, 10000) # lux
-        }
+        self.sensor_ranges = dict(SENSOR_RANGES)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
 
     def _create_tables_if_not_exist(self):
         """Create necessary tables if they don't exist"""
@@ -53,17 +62,6 @@ class ArduinoSimulator:
                 )
             """)
             
-            # Create sensor_data table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sensor_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    zone_id VARCHAR(255) NOT NULL,
-                    sensor_type VARCHAR(50) NOT NULL,
-                    value FLOAT NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
             # Create arduino_status table if it doesn't exist
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS arduino_status (
@@ -81,11 +79,68 @@ class ArduinoSimulator:
                 )
             """)
             
+            conn.commit()
+
+            # Older databases keep one row per sensor value; convert them
+            # before creating the wide table's indexes
+            cursor.execute("PRAGMA table_info(sensor_data)")
+            if 'sensor_type' in {row[1] for row in cursor.fetchall()}:
+                conn.close()
+                self._migrate_sensor_data()
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+
+            # Create sensor_data table if it doesn't exist; one wide row per
+            # report, as in models/sensor_data.py
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sensor_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    zone_id VARCHAR(255) NOT NULL,
+                    device_id VARCHAR(50),
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    soil_moisture FLOAT,
+                    soil_temp FLOAT,
+                    soil_ph FLOAT,
+                    soil_ec FLOAT,
+                    soil_n FLOAT,
+                    soil_p FLOAT,
+                    soil_k FLOAT,
+                    air_temp FLOAT,
+                    air_humidity FLOAT,
+                    light_level FLOAT,
+                    pressure FLOAT,
+                    wind_speed FLOAT,
+                    is_raining BOOLEAN,
+                    flow_rate FLOAT,
+                    total_water FLOAT
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sensor_data_zone_time ON sensor_data (zone_id, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sensor_data_device_time ON sensor_data (device_id, timestamp)")
+            
             conn.commit()
             conn.close()
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
 
+    def _migrate_sensor_data(self):
+        """Run database/migrate_sensor_data.py on this simulator's database"""
+        logger.info(f"Migrating {self.db_path} to the wide sensor_data layout")
+        try:
+            from sqlalchemy import create_engine
+            from backend.database.migrate_sensor_data import migrate
+            engine = create_engine(f"sqlite:///{self.db_path}")
+            try:
+                stats = migrate(engine)
+            finally:
+                engine.dispose()
+        except Exception as e:
+            raise RuntimeError(
+                f"sensor_data in {self.db_path} uses the old one-row-per-sensor layout and could not be "
+                f"migrated ({e}); run python -m backend.database.migrate_sensor_data against it"
+            ) from e
+        logger.info(f"Sensor data migration finished: {stats}")
+
     def _init_zones(self):
         """Initialize zones from the database"""
         self._create_tables_if_not_exist()
@@ -173,50 +228,40 @@ class ArduinoSimulator:
     def save_sensor_data(self, data: dict):
         """Save sensor data to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Save each sensor type separately
-            sensor_types = [
-                ("soil_moisture", data["soil_moisture"]),
-                ("soil_temperature", data["soil_temp"]),
-                ("soil_ph", data["soil_ph"]),
-                ("soil_ec", data["soil_ec"]),
-                ("nitrogen", data["soil_n"]),
-                ("phosphorus", data["soil_p"]),
-                ("potassium", data["soil_k"]),
-                ("air_temperature", data["air_temp"]),
-                ("air_humidity", data["air_humidity"]),
-                ("light_level", data["light_level"])
-            ]
-            
-            for sensor_type, value in sensor_types:
-                cursor.execute("""
-                    INSERT INTO sensor_data (zone_id, sensor_type, value, timestamp)
-                    VALUES (?, ?, ?, ?)
-                """, (data["zone_id"], sensor_type, value, data["timestamp"]))
-            
-            # Update arduino_status
-            cursor.execute("""
-                UPDATE arduino_status 
-                SET last_seen = ?,
-                    is_online = ?,
-                    battery_level = ?,
-                    signal_strength = ?
-                WHERE device_id = ?
-            """, (
-                datetime.now().isoformat(),
-                True,
-                random.uniform(80, 100),  # Battery level between 80-100%
-                random.uniform(-70, -50),  # WiFi signal strength in dBm
-                data["device_id"]
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                self._write_sensor_data(data)
         except Exception as e:
             logger.error(f"Error saving sensor data: {e}")
 
+    def _write_sensor_data(self, data: dict):
+        conn = self._connection()
+        cursor = conn.cursor()
+        
+        # One wide row per report
+        columns = ["zone_id", "device_id", "timestamp", *SENSOR_RANGES]
+        cursor.execute(
+            f"INSERT INTO sensor_data ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [data[column] for column in columns]
+        )
+        
+        # Update arduino_status
+        cursor.execute("""
+            UPDATE arduino_status 
+            SET last_seen = ?,
+                is_online = ?,
+                battery_level = ?,
+                signal_strength = ?
+            WHERE device_id = ?
+        """, (
+            datetime.now().isoformat(),
+            True,
+            random.uniform(80, 100),  # Battery level between 80-100%
+            random.uniform(-70, -50),  # WiFi signal strength in dBm
+            data["device_id"]
+        ))
+        
+        conn.commit()
+
     def handle_irrigation(self, zone_id: str, action: str):
         """Handle irrigation commands"""
         if zone_id in self.zones:
@@ -292,6 +337,10 @@ class ArduinoSimulator:
     def stop(self):
         """Stop the simulator"""
         self.running = False
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 def main():
     simulator = ArduinoSimulator()
@@ -0,0 +1,118 @@
+"""Prediction throughput: per-zone calls vs. vectorized batches vs. the micro-batching server.
+
+Run from the repository root (needs scikit-learn):
+
+    python -m backend.benchmarks.batch_inference [--zones 4096] [--model irrigation|disease]
+
+The model is fitted on synthetic rows first. Then, for batch sizes 1, 32
+and 256, the same zones are predicted:
+
+    direct   predict_many() called on consecutive chunks of that size
+    server   every zone submitted concurrently to a BatchInferenceServer
+             with that max_batch, the way concurrent requests arrive
+
+Batch size 1 is the old per-zone path: one model call per row.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from backend.ml_models.batch_inference import BatchInferenceServer
+from backend.ml_models.crop_analyzer import DISEASE_FEATURES, CropHealthAnalyzer
+from backend.ml_models.irrigation_predictor import IRRIGATION_FEATURES, IrrigationPredictor
+
+BATCH_SIZES = (1, 32, 256)
+
+
+def irrigation_zones(count: int, rng: np.random.Generator) -> List[Dict]:
+    now = datetime.now()
+    zones = []
+    for _ in range(count):
+        zones.append({
+            'current_conditions': {
+                'temperature': rng.uniform(10, 40),
+                'humidity': rng.uniform(20, 90),
+                'soil_moisture': rng.uniform(5, 60),
+                'solar_radiation': rng.uniform(0, 1000),
+                'wind_speed': rng.uniform(0, 15),
+                'evapotranspiration': rng.uniform(1, 8),
+            },
+            'weather_forecast': [
+                {'precipitation_forecast': rng.uniform(0, 1), 'time': now + timedelta(hours=hour)}
+                for hour in range(0, 72, 24)
+            ],
+            'soil_data': {
+                'soil_type': 'loamy',
+                'current_moisture': rng.uniform(5, 60),
+                'field_capacity': 60.0,
+            },
+            'crop_data': {'growth_stage': int(rng.integers(1, 6))},
+        })
+    return zones
+
+
+def fitted_irrigation(rng: np.random.Generator) -> IrrigationPredictor:
+    predictor = IrrigationPredictor()
+    features = rng.uniform(0, 1, (2000, len(IRRIGATION_FEATURES)))
+    targets = features @ rng.uniform(0, 20, len(IRRIGATION_FEATURES))
+    predictor.model.fit(predictor.scaler.fit_transform(features), targets)
+    return predictor
+
+
+def disease_zones(count: int, rng: np.random.Generator) -> List[Dict]:
+    return [{name: rng.uniform(0, 80) for name in DISEASE_FEATURES} for _ in range(count)]
+
+
+def fitted_disease(rng: np.random.Generator) -> CropHealthAnalyzer:
+    analyzer = CropHealthAnalyzer()
+    features = rng.uniform(0, 80, (2000, len(DISEASE_FEATURES)))
+    labels = (features[:, 1] > 60).astype(int)
+    analyzer.disease_classifier.fit(analyzer.scaler.fit_transform(features), labels)
+    return analyzer
+
+
+def run_direct(predict_many: Callable, zones: List[Dict], batch: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(zones), batch):
+        predict_many(zones[start:start + batch])
+    return time.perf_counter() - started
+
+
+async def run_server(predict_many: Callable, zones: List[Dict], batch: int) -> Dict:
+    server = BatchInferenceServer(predict_many, max_batch=batch, max_wait_ms=2.0)
+    started = time.perf_counter()
+    await server.predict_many(zones)
+    elapsed = time.perf_counter() - started
+    await server.stop()
+    return {'seconds': elapsed, 'avg_batch': server.stats()['avg_batch']}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare per-zone and batched model predictions")
+    parser.add_argument('--zones', type=int, default=4096)
+    parser.add_argument('--model', choices=('irrigation', 'disease'), default='irrigation')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    if args.model == 'irrigation':
+        predict_many = fitted_irrigation(rng).predict_many
+        zones = irrigation_zones(args.zones, rng)
+    else:
+        predict_many = fitted_disease(rng).predict_disease_probability_many
+        zones = disease_zones(args.zones, rng)
+
+    results = {}
+    print(f"{args.model}: {args.zones} zones")
+    print(f"  {'batch':>5} {'direct zones/s':>15} {'server zones/s':>15} {'avg batch':>10}")
+    for batch in BATCH_SIZES:
+        direct = run_direct(predict_many, zones, batch)
+        server = asyncio.run(run_server(predict_many, zones, batch))
+        results[batch] = {'direct_seconds': direct, 'server_seconds': server['seconds'], 'avg_batch': server['avg_batch']}
+        print(f"  {batch:>5} {args.zones / direct:>15.0f} {args.zones / server['seconds']:>15.0f} {server['avg_batch']:>10.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
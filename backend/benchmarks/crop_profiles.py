@@ -0,0 +1,61 @@
+"""Zones/second for crop-profile lookups.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.crop_profiles [zones]
+
+Times analyzer construction (profiles are compiled once per process),
+analyze_growth_stage for zones at random days since planting, the same
+zones through one analyze_growth_stages call, and companion
+recommendations, each over the given number of zones.
+"""
+import random
+import sys
+import time
+import numpy as np
+from backend.ml_models.crop_patterns import CropPatternAnalyzer
+
+CROPS = [('tomato', 'determinate'), ('lettuce', 'butterhead')]
+
+
+def main(zones: int = 20000):
+    rng = random.Random(0)
+    sample = [
+        (*rng.choice(CROPS), rng.randint(0, 130), {'temperature': rng.uniform(10, 35), 'humidity': rng.uniform(40, 90)})
+        for _ in range(zones)
+    ]
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        CropPatternAnalyzer()
+    construct = (time.perf_counter() - started) / 1000
+
+    analyzer = CropPatternAnalyzer()
+    started = time.perf_counter()
+    for crop, variety, days, conditions in sample:
+        analyzer.analyze_growth_stage(crop, variety, days, conditions)
+    stages = time.perf_counter() - started
+
+    crops, varieties, days, conditions = map(np.array, zip(*sample))
+    temperature = np.array([c['temperature'] for c in conditions])
+    humidity = np.array([c['humidity'] for c in conditions])
+    started = time.perf_counter()
+    analyzer.analyze_growth_stages(crops, varieties, days, temperature, humidity)
+    bulk = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for crop, variety, _, _ in sample:
+        analyzer.recommend_companion_planting(crop, variety, 5.0, ['onions'])
+    companions = time.perf_counter() - started
+
+    print(f"analyzer construction  {construct * 1e6:>10.1f} us")
+    print(f"analyze_growth_stage   {zones / stages:>10.0f} zones/s")
+    print(f"analyze_growth_stages  {zones / bulk:>10.0f} zones/s")
+    print(f"companion planting     {zones / companions:>10.0f} zones/s")
+    return {'construct_seconds': construct, 'stage_zones_per_second': zones / stages,
+            'bulk_stage_zones_per_second': zones / bulk,
+            'companion_zones_per_second': zones / companions}
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,119 @@
+"""Request latency under mixed load: sync Session vs. AsyncSession.
+
+Run from the repository root (needs aiosqlite, or aiomysql for MySQL):
+
+    python -m backend.benchmarks.db_concurrency [--rate 200] [--duration 10] [--slow-share 0.05]
+
+Requests arrive at a fixed rate, whether or not earlier ones have
+finished, and each runs one query the way a FastAPI handler would:
+
+    fast   latest reading of one zone (index lookup)
+    slow   farm-wide averages per zone (reads all of sensor_data)
+
+In ``sync`` mode the handler uses a regular Session inside ``async def``,
+as the routers did, so every query blocks the event loop. In ``async``
+mode it awaits an AsyncSession. Latency is measured from each request's
+scheduled arrival, so time spent waiting for a blocked loop counts.
+
+Both modes run against the same database: a seeded SQLite file by
+default, or --url (seeded first with --seed).
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from backend.database.async_session import async_database_url
+from backend.database.query_plans import seed
+from backend.fleet_simulator import LoadStats
+from backend.models.sensor_data import SensorData
+
+MODES = ('sync', 'async')
+
+
+def fast_query(zone_id: str):
+    table = SensorData.__table__
+    return select(table).where(table.c.zone_id == zone_id).order_by(table.c.timestamp.desc()).limit(1)
+
+
+def slow_query():
+    table = SensorData.__table__
+    return select(
+        table.c.zone_id, func.avg(table.c.soil_moisture), func.max(table.c.air_temp)
+    ).group_by(table.c.zone_id)
+
+
+async def handle(mode: str, sessions, statement, arrival: float, stats: LoadStats):
+    if mode == 'sync':
+        with sessions() as db:
+            db.execute(statement).all()
+    else:
+        async with sessions() as db:
+            (await db.execute(statement)).all()
+    stats.record(time.perf_counter() - arrival, 1, 0)
+
+
+async def run(mode: str, sessions, rate: float, duration: float, slow_share: float, zones: int) -> Dict:
+    rng = random.Random(0)  # Same request mix for both modes
+    stats = {'fast': LoadStats(), 'slow': LoadStats()}
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * duration)):
+        arrival = start + i / rate
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        kind = 'slow' if rng.random() < slow_share else 'fast'
+        statement = slow_query() if kind == 'slow' else fast_query(f"ZONE{rng.randint(1, zones)}")
+        tasks.append(asyncio.create_task(handle(mode, sessions, statement, arrival, stats[kind])))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {kind: kind_stats.summary(elapsed) for kind, kind_stats in stats.items()}
+
+
+async def run_async(url: str, *args) -> Dict:
+    engine = create_async_engine(async_database_url(url), pool_size=10, max_overflow=20)
+    try:
+        return await run('async', async_sessionmaker(engine), *args)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare sync and async sessions under mixed load")
+    parser.add_argument('--url', help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument('--seed', action='store_true', help="seed --url before running")
+    parser.add_argument('--zones', type=int, default=200)
+    parser.add_argument('--days', type=int, default=14, help="days of readings seeded per zone")
+    parser.add_argument('--rate', type=float, default=200.0, help="requests per second")
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--slow-share', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'concurrency.db')}"
+        engine = create_engine(url, pool_size=10, max_overflow=20)
+        if args.seed or not args.url:
+            seed(engine, zones=args.zones, days=args.days)
+
+        load = (args.rate, args.duration, args.slow_share, args.zones)
+        results = {
+            'sync': asyncio.run(run('sync', sessionmaker(engine), *load)),
+            'async': asyncio.run(run_async(url, *load)),
+        }
+        engine.dispose()
+
+    print(f"{args.rate:.0f} req/s for {args.duration:.0f}s, {args.slow_share:.0%} slow")
+    print(f"  {'mode':<6} {'kind':<5} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in MODES:
+        for kind, summary in results[mode].items():
+            print(f"  {mode:<6} {kind:<5} {summary['requests']:>8} {summary['p50_ms']:>8.1f} "
+                  f"{summary['p99_ms']:>8.1f} {summary['max_ms']:>8.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
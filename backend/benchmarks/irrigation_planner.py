@@ -0,0 +1,60 @@
+"""Zones/second of the farm-wide irrigation planner.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.irrigation_planner [--zones 1000 5000 20000] [--sources 10]
+
+Each farm has zones with random water deficits, valve flows and
+priorities spread over shared sources, all allowed a morning and an
+evening window. Reports planning time, runs, water left unmet and the
+peak draw of the busiest source relative to its capacity (never above
+100%).
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from backend.services.irrigation_planner import ZoneDemand, plan_farm_irrigation
+
+START = datetime(2024, 6, 1)
+WINDOWS = [
+    (START + timedelta(hours=4), START + timedelta(hours=9)),
+    (START + timedelta(hours=18), START + timedelta(hours=21)),
+]
+
+
+def farm(zones: int, sources: int, rng: random.Random):
+    capacity = {f'source_{i}': rng.uniform(40, 80) for i in range(sources)}
+    names = list(capacity)
+    demands = [
+        ZoneDemand(f'zone_{i}', rng.uniform(10, 200), rng.uniform(2, 15), rng.choice(names), WINDOWS, rng.random())
+        for i in range(zones)
+    ]
+    return demands, capacity
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[int, Dict]:
+    parser = argparse.ArgumentParser(description="Benchmark the farm irrigation planner")
+    parser.add_argument('--zones', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--sources', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    results = {}
+    print(f"  {'zones':>6} {'ms':>8} {'zones/s':>9} {'runs':>6} {'unmet %':>8} {'peak %':>7}")
+    for zones in args.zones:
+        demands, capacity = farm(zones, args.sources, rng)
+        started = time.perf_counter()
+        plan = plan_farm_irrigation(demands, capacity, START)
+        elapsed = time.perf_counter() - started
+
+        unmet = sum(plan.unmet.values()) / sum(demand.amount for demand in demands) * 100
+        peak = max(plan.peak_flow(source) / limit for source, limit in capacity.items()) * 100
+        results[zones] = {'seconds': elapsed, 'runs': len(plan.runs), 'unmet_percent': unmet, 'peak_percent': peak}
+        print(f"  {zones:>6} {elapsed * 1000:>8.1f} {zones / elapsed:>9.0f} {len(plan.runs):>6} {unmet:>8.1f} {peak:>7.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
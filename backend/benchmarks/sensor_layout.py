@@ -0,0 +1,148 @@
+"""Write amplification and range-scan cost: EAV vs. wide sensor rows.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.sensor_layout [zones] [days]
+
+Each layout gets its own SQLite file, so the file size is the table plus
+its indexes. Three layouts are compared:
+
+    eav        one row per (zone, sensor_type) value, primary key only
+               (the old schema.sql)
+    eav+index  the same with an index on (zone_id, timestamp)
+    wide       one row per report with the composite indexes of SensorData
+
+The range scan reads one zone-day of all sensor columns, pivoted into
+rows for the EAV layouts with the query the dual-read path uses.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Index, MetaData, Table, and_, create_engine, select
+from backend.models.sensor_data import SensorData
+from backend.services.sensor_storage import EAV_SENSOR_TYPES, legacy_sensor_data, pivot_legacy_rows
+
+REPORT_INTERVAL = timedelta(minutes=5)
+COLUMNS = ['soil_moisture', 'soil_temp', 'soil_ph', 'soil_ec', 'soil_n', 'soil_p', 'soil_k',
+           'air_temp', 'air_humidity', 'light_level']
+# One EAV name per column, as ArduinoSimulator used to write them
+EAV_NAMES = {}
+for _name, _column in EAV_SENSOR_TYPES.items():
+    EAV_NAMES.setdefault(_column, _name)
+
+
+def reports(zones: int, days: int):
+    start = datetime(2024, 1, 1)
+    rng = random.Random(0)
+    steps = int(timedelta(days=days) / REPORT_INTERVAL)
+    for step in range(steps):
+        timestamp = start + step * REPORT_INTERVAL
+        for zone in range(zones):
+            yield f"ZONE{zone}", timestamp, {column: rng.uniform(0, 100) for column in COLUMNS}
+
+
+def build_eav(engine, zones, days, indexed):
+    legacy_sensor_data.create(engine)
+    if indexed:
+        Index('idx_eav_zone_time', legacy_sensor_data.c.zone_id, legacy_sensor_data.c.timestamp).create(engine)
+    rows = 0
+    start = time.perf_counter()
+    batch = []
+    with engine.begin() as conn:
+        for zone_id, timestamp, values in reports(zones, days):
+            for column, value in values.items():
+                batch.append({'zone_id': zone_id, 'sensor_type': EAV_NAMES[column], 'value': value, 'timestamp': timestamp})
+            if len(batch) >= 10000:
+                conn.execute(legacy_sensor_data.insert(), batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            conn.execute(legacy_sensor_data.insert(), batch)
+            rows += len(batch)
+    return rows, time.perf_counter() - start
+
+
+def build_wide(engine, zones, days):
+    # Recreate without the zones foreign key; the benchmark has no zones table
+    metadata = MetaData()
+    table = Table(
+        'sensor_data', metadata,
+        *[Column(c.name, c.type, primary_key=c.primary_key) for c in SensorData.__table__.columns]
+    )
+    for index in SensorData.__table__.indexes:
+        Index(index.name, *[table.c[c.name] for c in index.columns])
+    metadata.create_all(engine)
+
+    rows = 0
+    start = time.perf_counter()
+    batch = []
+    with engine.begin() as conn:
+        for zone_id, timestamp, values in reports(zones, days):
+            batch.append({'zone_id': zone_id, 'device_id': f"ARD_{zone_id}", 'timestamp': timestamp, **values})
+            if len(batch) >= 10000:
+                conn.execute(table.insert(), batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+            rows += len(batch)
+    return table, rows, time.perf_counter() - start
+
+
+def time_scans(engine, make_query, zones, days, repeat=20):
+    rng = random.Random(1)
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            zone_id = f"ZONE{rng.randrange(zones)}"
+            day = datetime(2024, 1, 1) + timedelta(days=rng.randrange(days))
+            started = time.perf_counter()
+            result = conn.execute(make_query(zone_id, day, day + timedelta(days=1))).all()
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, len(result)
+
+
+def main(zones: int = 50, days: int = 14):
+    reports_written = zones * int(timedelta(days=days) / REPORT_INTERVAL)
+    print(f"{zones} zones, {days} days, {reports_written} reports of {len(COLUMNS)} values")
+    print(f"  {'layout':<10} {'rows':>10} {'rows/report':>12} {'write s':>8} {'file MB':>8} {'zone-day scan ms':>17}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = legacy_sensor_data.c
+
+        def eav_query(zone_id, start, end):
+            return pivot_legacy_rows(
+                COLUMNS, and_(legacy.zone_id == zone_id, legacy.timestamp >= start, legacy.timestamp < end)
+            ).order_by(legacy.timestamp)
+
+        for name, indexed in (('eav', False), ('eav+index', True)):
+            path = os.path.join(tmp, f"{name}.db")
+            engine = create_engine(f"sqlite:///{path}")
+            rows, elapsed = build_eav(engine, zones, days, indexed)
+            scan_ms, _ = time_scans(engine, eav_query, zones, days)
+            print(f"  {name:<10} {rows:>10} {rows / reports_written:>12.1f} {elapsed:>8.2f} "
+                  f"{os.path.getsize(path) / 1e6:>8.1f} {scan_ms:>17.2f}")
+            engine.dispose()
+
+        path = os.path.join(tmp, "wide.db")
+        engine = create_engine(f"sqlite:///{path}")
+        table, rows, elapsed = build_wide(engine, zones, days)
+
+        def wide_query(zone_id, start, end):
+            return select(table.c.timestamp, *[table.c[c] for c in COLUMNS]).where(
+                and_(table.c.zone_id == zone_id, table.c.timestamp >= start, table.c.timestamp < end)
+            ).order_by(table.c.timestamp)
+
+        scan_ms, _ = time_scans(engine, wide_query, zones, days)
+        print(f"  {'wide':<10} {rows:>10} {rows / reports_written:>12.1f} {elapsed:>8.2f} "
+              f"{os.path.getsize(path) / 1e6:>8.1f} {scan_ms:>17.2f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,110 @@
+"""Import-time profile of API and ML modules, and first-use cost of heavy frameworks.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.startup_imports [--top 8] [module ...]
+
+Each module is imported in a fresh interpreter under ``-X importtime``
+so nothing is cached between measurements. The report lists the import
+time, which heavy frameworks ended up in sys.modules (with lazy imports
+there should be none), and the slowest individual imports.
+
+The second table is the deferred cost: how long the lazy registry takes
+to load each heavy framework on first use or warm-up, where installed.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Modules an API worker or ML job imports at startup
+DEFAULT_MODULES = [
+    'backend.services.satellite_service',
+    'backend.services.fallback_service',
+    'backend.ml_models.crop_analyzer',
+    'backend.ml_models.crop_patterns',
+    'backend.ml_models.irrigation_predictor',
+]
+
+HEAVY_MODULES = ['tensorflow', 'cv2', 'sklearn', 'ee', 'joblib', 'pandas']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': seconds, 'heavy': heavy}}))
+"""
+
+FIRST_USE_SCRIPT = """
+import json
+from backend.core.lazy_imports import registry
+errors = registry.warm_up_sync([{module!r}])
+print(json.dumps({{'seconds': registry.report()[{module!r}]['seconds'], 'error': errors[{module!r}]}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of ``-X importtime`` output as self/cumulative microseconds"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return rows
+
+
+def profile_import(module: str, top: int) -> Dict:
+    script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if line.strip() and not line.startswith('import time:')]
+        error = lines[-1] if lines else f"exit {proc.returncode}"
+        return {'module': module, 'error': error}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(proc.stderr)
+    result.update(module=module, slowest=sorted(rows, key=lambda row: row['self_us'], reverse=True)[:top])
+    return result
+
+
+def profile_first_use(module: str) -> Dict:
+    proc = subprocess.run([sys.executable, '-c', FIRST_USE_SCRIPT.format(module=module)], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'module': module, 'seconds': None, 'error': f"exit {proc.returncode}"}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['module'] = module
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Profile module import time and deferred framework loads")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--top', type=int, default=5, help="slowest imports listed per module")
+    args = parser.parse_args(argv)
+
+    imports = [profile_import(module, args.top) for module in args.modules]
+    print(f"{'module':<42} {'import ms':>10}  heavy frameworks loaded")
+    for result in imports:
+        if 'error' in result:
+            print(f"{result['module']:<42} {'-':>10}  failed: {result['error']}")
+            continue
+        print(f"{result['module']:<42} {result['seconds'] * 1000:>10.1f}  {', '.join(result['heavy']) or 'none'}")
+        for row in result['slowest']:
+            print(f"    {row['module']:<38} {row['self_us'] / 1000:>10.1f}")
+
+    first_use = [profile_first_use(module) for module in HEAVY_MODULES]
+    print()
+    print(f"{'deferred framework':<20} {'first use ms':>12}")
+    for result in first_use:
+        if result['error']:
+            print(f"{result['module']:<20} {'-':>12}  {result['error']}")
+        else:
+            print(f"{result['module']:<20} {result['seconds'] * 1000:>12.1f}")
+    return {'imports': imports, 'first_use': first_use}
+
+
+if __name__ == '__main__':
+    main()
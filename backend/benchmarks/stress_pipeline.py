@@ -0,0 +1,72 @@
+"""Images/second of the batch stress-detection pipeline.
+
+Run from the repository root (needs OpenCV):
+
+    python -m backend.benchmarks.stress_pipeline [--images DIR] [--count 200] [--size 1024]
+
+Without --images, a benchmark set of synthetic field photos (green
+canopy with yellowed patches and leaf outlines) is written as PNG to a
+temporary directory. Each run decodes and analyzes every image and
+writes NDJSON results, for two tomato stages:
+
+    Seedling     leaf_yellowing only (one HSV conversion per image)
+    Vegetative   leaf_curling only (grayscale, Canny, contours)
+
+with one process and with one process per core.
+"""
+import argparse
+import os
+import tempfile
+from typing import List, Optional
+import numpy as np
+from backend.ml_models.crop_patterns import cv2
+from backend.ml_models.stress_pipeline import iter_image_paths, run_stress_pipeline
+
+STAGES = ('Seedling', 'Vegetative')
+
+
+def write_benchmark_set(directory: str, count: int, size: int) -> List[str]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        image = np.empty((size, size, 3), dtype=np.uint8)
+        image[...] = (40, 140, 50)  # BGR canopy green
+        image += rng.integers(0, 30, image.shape, dtype=np.uint8)
+        for _ in range(20):
+            x, y = rng.integers(0, size, 2)
+            cv2.circle(image, (int(x), int(y)), int(rng.integers(size // 50, size // 10)), (40, 200, 220), -1)
+            cv2.ellipse(image, (int(y), int(x)), (size // 20, size // 40), int(rng.integers(0, 180)), 0, 360, (20, 90, 30), 2)
+        path = os.path.join(directory, f'field_{i:04d}.png')
+        cv2.imwrite(path, image)
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark batch stress detection")
+    parser.add_argument('--images', help="directory of field images (default: synthetic set)")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--size', type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        images = args.images or tmp
+        if not args.images:
+            write_benchmark_set(tmp, args.count, args.size)
+        paths = list(iter_image_paths(images))
+
+        print(f"{len(paths)} images from {args.images or 'synthetic set'}")
+        print(f"  {'stage':<11} {'workers':>7} {'images/s':>9} {'failed':>6}")
+        for stage in STAGES:
+            for workers in sorted({1, cores}):
+                output = os.path.join(tmp, f'{stage}-{workers}.ndjson')
+                summary = run_stress_pipeline(paths, 'tomato', 'determinate', stage, output=output, workers=workers)
+                results[(stage, workers)] = summary
+                print(f"  {stage:<11} {workers:>7} {summary['images_per_second']:>9.1f} {summary['failed']:>6}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Decoder throughput: binary telemetry batches vs. the per-reading JSON path.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.telemetry_decode [readings]
+
+Both paths end at the same place, a list of SensorData insert rows, so
+the comparison covers parsing plus row construction. Database time is
+left out since both paths share the same executemany insert.
+"""
+import json
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from backend.services.telemetry_protocol import JSON_SENSOR_FIELDS, TELEMETRY_SCHEMAS, decode_telemetry, encode_telemetry
+
+
+def make_records(count: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    records = np.zeros(count, dtype=TELEMETRY_SCHEMAS[1])
+    records['age'] = np.arange(count)[::-1] * 5
+    for name in records.dtype.names:
+        if records.dtype[name].kind == 'f':
+            records[name] = rng.uniform(0, 100, count)
+    records['is_raining'] = rng.integers(0, 2, count)
+    return records
+
+
+def make_json_documents(records: np.ndarray):
+    documents = []
+    for record in records:
+        documents.append(json.dumps({
+            'device_id': 'DEVICE_1',
+            'zone_id': 'zone_001',
+            'battery_level': 100,
+            'firmware_version': '1.0.0',
+            'signal_strength': -60,
+            'sensor_data': {
+                key: (bool(record[column]) if column == 'is_raining' else float(record[column]))
+                for key, column in JSON_SENSOR_FIELDS.items()
+            }
+        }).encode('utf-8'))
+    return documents
+
+
+def json_path(documents):
+    rows = []
+    received = datetime.utcnow()
+    for raw in documents:
+        data = json.loads(raw)
+        readings = data['sensor_data']
+        row = {column: readings.get(key) for key, column in JSON_SENSOR_FIELDS.items()}
+        row.update(zone_id=data['zone_id'], device_id='DEVICE_1', timestamp=received)
+        rows.append(row)
+    return rows
+
+
+def binary_path(payload):
+    return decode_telemetry(payload).to_rows('DEVICE_1', 'zone_001', datetime.utcnow())
+
+
+def best_of(fn, arg, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(count: int = 10000):
+    records = make_records(count)
+    documents = make_json_documents(records)
+    payload = encode_telemetry(records, zone_id='zone_001', firmware_version='1.0.0')
+
+    json_bytes = sum(len(d) for d in documents)
+    json_time = best_of(json_path, documents)
+    binary_time = best_of(binary_path, payload)
+    decode_time = best_of(decode_telemetry, payload)
+
+    print(f"{count} readings")
+    print(f"  json:   {json_bytes:>10} bytes  {json_time * 1000:8.2f} ms  {count / json_time:12.0f} readings/s")
+    print(f"  binary: {len(payload):>10} bytes  {binary_time * 1000:8.2f} ms  {count / binary_time:12.0f} readings/s")
+    print(f"  binary decode only:           {decode_time * 1000:8.4f} ms")
+    print(f"  size {json_bytes / len(payload):.1f}x smaller, rows {json_time / binary_time:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
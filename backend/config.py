@@ -30,6 +30,12 @@ class Settings:
     SQLALCHEMY_MAX_OVERFLOW: int = int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 10))
     SQLALCHEMY_POOL_TIMEOUT: int = int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30))
     SQLALCHEMY_POOL_RECYCLE: int = int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800))
+
+    # Connection health: background liveness check interval (seconds),
+    # slow-query threshold (ms) and share of other statements logged
+    DB_HEALTH_CHECK_INTERVAL: int = int(os.getenv('DB_HEALTH_CHECK_INTERVAL', 30))
+    SQL_SLOW_QUERY_MS: float = float(os.getenv('SQL_SLOW_QUERY_MS', 500))
+    SQL_LOG_SAMPLE_RATE: float = float(os.getenv('SQL_LOG_SAMPLE_RATE', 0))
     
     # API settings
     API_V1_STR: str = "/api"
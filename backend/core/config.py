@@ -11,4 +11,25 @@ class Settings(BaseSettings):
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     ALGORITHM: str = "HS256"
 
+    # Retention: raw rows older than this many days are removed (sensor
+    # data is rolled up hourly first); the job runs every interval seconds
+    SENSOR_DATA_RETENTION_DAYS: int = 90
+    SYSTEM_LOG_RETENTION_DAYS: int = 30
+    NOTIFICATION_RETENTION_DAYS: int = 180
+    WEATHER_DATA_RETENTION_DAYS: int = 365
+    RETENTION_INTERVAL_SECONDS: int = 6 * 3600
+
+    # Connection health: background liveness check interval (seconds),
+    # slow-query threshold (ms) and share of other statements logged
+    DB_HEALTH_CHECK_INTERVAL: int = 30
+    SQL_SLOW_QUERY_MS: float = 500.0
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+
+    # Heavy frameworks and backends loaded in the background at startup
+    # instead of on first use, e.g. ["earth_engine", "tensorflow"]
+    LAZY_WARMUP: List[str] = []
+
+    # Versioned model artifacts (see ml_models/model_registry.py)
+    MODEL_REGISTRY_PATH: str = "./model_registry"
+
 settings = Settings()
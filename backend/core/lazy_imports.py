@@ -0,0 +1,154 @@
+"""Deferred imports for heavy frameworks and the objects built from them.
+
+TensorFlow, OpenCV, scikit-learn and Earth Engine take from hundreds of
+milliseconds to several seconds to import, and most API workers never
+use them. Modules that need them bind a proxy at import time instead:
+
+    cv2 = lazy_import('cv2')
+
+The real import happens on first attribute access, at most once per
+process. Expensive objects built from these frameworks (a compiled
+model, an initialized Earth Engine session) are registered as factories
+with ``registry.register`` and built on first ``registry.get``.
+
+``registry.warm_up`` does either ahead of time in worker threads, and
+``registry.report()`` is the startup profile: what was loaded, when,
+what triggered it and how long it took.
+"""
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyEntry:
+    """One module or factory and its load timing"""
+
+    def __init__(self, name: str, kind: str, loader: Callable[[], Any]):
+        self.name = name
+        self.kind = kind
+        self.loader = loader
+        self.value = None
+        self.loaded = False
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.loaded_at: Optional[datetime] = None
+        self.trigger: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def load(self, trigger: str) -> Any:
+        if self.loaded:
+            return self.value
+        with self.lock:
+            if not self.loaded:
+                started = time.perf_counter()
+                try:
+                    self.value = self.loader()
+                except Exception as e:
+                    self.error = str(e)
+                    raise
+                finally:
+                    self.seconds = time.perf_counter() - started
+                self.loaded, self.error = True, None
+                self.loaded_at, self.trigger = datetime.utcnow(), trigger
+                logger.info(f"Loaded {self.kind} {self.name} in {self.seconds:.2f}s ({trigger})")
+        return self.value
+
+    def summary(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'loaded': self.loaded,
+            'seconds': round(self.seconds, 4) if self.seconds is not None else None,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'trigger': self.trigger,
+            'error': self.error,
+        }
+
+
+class LazyModule:
+    """Stands in for a module until an attribute is first read"""
+
+    def __init__(self, entry: LazyEntry):
+        object.__setattr__(self, '_entry', entry)
+
+    def __getattr__(self, attr: str):
+        return getattr(self._entry.load(f"first use: {attr}"), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._entry.load(f"first use: {attr}"), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self._entry.loaded else 'not loaded'
+        return f"<lazy module {self._entry.name!r} ({state})>"
+
+
+class LazyRegistry:
+    """Heavy modules and model/backend factories, loaded on first use"""
+
+    def __init__(self):
+        self._entries: Dict[str, LazyEntry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name: str, kind: str, loader: Callable[[], Any]) -> LazyEntry:
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = LazyEntry(name, kind, loader)
+            return self._entries[name]
+
+    def module(self, name: str) -> LazyModule:
+        """Proxy for ``import name``; the same entry is shared by every caller"""
+        return LazyModule(self._entry(name, 'module', lambda: importlib.import_module(name)))
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register a factory; the first registration of a name wins"""
+        self._entry(name, 'factory', factory)
+
+    def get(self, name: str) -> Any:
+        """Built object (or imported module) for ``name``"""
+        if name not in self._entries:
+            raise KeyError(f"Nothing registered as {name}")
+        return self._entries[name].load('get')
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry.loaded)
+
+    def warm_up_sync(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """Load entries now; returns the error per name, None when it loaded.
+
+        Names that were never registered are imported as modules.
+        """
+        errors = {}
+        for name in names if names is not None else list(self._entries):
+            if name not in self._entries:
+                self.module(name)
+            try:
+                self._entries[name].load('warm-up')
+                errors[name] = None
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} failed: {e}")
+                errors[name] = str(e)
+        return errors
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """warm_up_sync in a worker thread, off the event loop"""
+        return await asyncio.to_thread(self.warm_up_sync, list(names) if names is not None else None)
+
+    def report(self) -> Dict[str, Dict]:
+        return {name: entry.summary() for name, entry in sorted(self._entries.items())}
+
+    def names(self) -> List[str]:
+        return sorted(self._entries)
+
+
+registry = LazyRegistry()
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Module proxy from the process-wide registry"""
+    return registry.module(name)
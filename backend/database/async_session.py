@@ -0,0 +1,42 @@
+from typing import Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+# Async driver used for each backend the app can be configured with
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'mysql': 'aiomysql',
+}
+
+def async_database_url(url: str) -> str:
+    """Same database as ``url``, through its asyncio driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+def get_async_engine() -> AsyncEngine:
+    """Process-wide async engine for settings.DATABASE_URL, built on first use"""
+    global _async_engine
+    if _async_engine is None:
+        from backend.core.config import settings
+        _async_engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New session on the process-wide async engine"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # Objects stay readable after commit; lazy refreshes are not possible
+        # outside the awaited calls anyway
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker()
+
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
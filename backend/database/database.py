@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings
+from database.health import PoolMonitor, QueryProfiler, pool_options
 import time
 import mysql.connector
 
@@ -50,8 +51,17 @@ engine = create_engine(
     max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
     pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
     pool_recycle=settings.SQLALCHEMY_POOL_RECYCLE,
-    echo=True,
-    pool_pre_ping=True  # Enable automatic reconnection
+    pool_pre_ping=True,  # Enable automatic reconnection
+    **pool_options(settings.SQLALCHEMY_DATABASE_URL)
+)
+
+# Liveness is checked in the background (see main.py startup) and
+# statements are logged when slow or sampled, instead of echo=True
+pool_monitor = PoolMonitor(engine)
+query_profiler = QueryProfiler(
+    engine,
+    slow_ms=settings.SQL_SLOW_QUERY_MS,
+    sample_rate=settings.SQL_LOG_SAMPLE_RATE
 )
 
 # Create session factory
@@ -78,8 +88,6 @@ def verify_db_connection():
 def get_db():
     db = SessionLocal()
     try:
-        # Verify connection is active
-        db.execute(text("SELECT 1"))
         yield db
     except Exception as e:
         logger.error(f"Error in database session: {str(e)}")
@@ -0,0 +1,209 @@
+"""Connection health, pool statistics and query profiling for an engine.
+
+Liveness is checked by PoolMonitor on an interval in the background
+instead of with a ``SELECT 1`` on every request; ``pool_pre_ping`` still
+guards each checkout against connections the server already closed.
+When a check fails the pool is disposed, so the next checkouts reconnect
+instead of handing out dead connections one at a time.
+
+QueryProfiler replaces ``echo=True``: statements slower than a threshold
+are always logged and kept for the stats endpoint, and other statements
+are logged only for a sampled fraction. With sampling off and nothing
+slow, each statement costs two clock reads.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text kept in logs and stats
+MAX_STATEMENT_LENGTH = 500
+
+
+class CheckoutStats:
+    """Time spent waiting for a connection from the pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if timed_out:
+                self.timeouts += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            self.checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep the history
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+
+def pool_options(url: str) -> Dict:
+    """create_engine() arguments that enable checkout timing where a QueuePool is used"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        return {}  # In-memory SQLite needs its single shared connection
+    return {'poolclass': MonitoredQueuePool}
+
+
+class PoolMonitor:
+    """Background liveness check and pool statistics for one engine"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy: Optional[bool] = None
+        self.last_check: Optional[datetime] = None
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.failures = 0
+
+    def check(self) -> bool:
+        """One round trip on a pooled connection; disposes the pool on failure"""
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            healthy, error = True, None
+        except Exception as e:
+            healthy, error = False, str(e)
+            self.failures += 1
+            self.engine.dispose()
+            if self.healthy is not False:
+                logger.error(f"Database health check failed: {e}")
+        else:
+            if self.healthy is False:
+                logger.info("Database connection restored")
+        self.last_latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_check = datetime.utcnow()
+        self.healthy, self.last_error = healthy, error
+        return healthy
+
+    async def run_forever(self, interval: float):
+        """Check every ``interval`` seconds; the check runs in a worker thread"""
+        while True:
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict:
+        pool = self.engine.pool
+        stats = {
+            'healthy': self.healthy,
+            'last_check': self.last_check.isoformat() if self.last_check else None,
+            'check_latency_ms': self.last_latency_ms,
+            'last_error': self.last_error,
+            'failures': self.failures,
+            'pool': type(pool).__name__,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                # Counts up from -size until the base connections exist
+                overflow=max(pool.overflow(), 0),
+            )
+        if isinstance(pool, MonitoredQueuePool):
+            stats.update(pool.checkout_stats.summary())
+        return stats
+
+
+class QueryProfiler:
+    """Threshold-based slow-query logging with sampled statement logging"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        slow_ms: float = 500.0,
+        sample_rate: float = 0.0,
+        keep: int = 50,
+        rng: Optional[random.Random] = None
+    ):
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.statements = 0
+        self.slow = 0
+        self.sampled = 0
+        self.recent_slow = deque(maxlen=keep)
+        self._rng = rng or random.Random()
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context rather than the connection, so a
+        # statement that fails (no after_cursor_execute) leaves nothing behind
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+        self.statements += 1
+        if elapsed_ms >= self.slow_ms:
+            self.slow += 1
+            text = statement[:MAX_STATEMENT_LENGTH]
+            self.recent_slow.append({
+                'at': datetime.utcnow().isoformat(),
+                'ms': round(elapsed_ms, 3),
+                'executemany': executemany,
+                'statement': text,
+            })
+            logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {text}")
+        elif self.sample_rate and self._rng.random() < self.sample_rate:
+            self.sampled += 1
+            logger.info(f"Sampled query ({elapsed_ms:.1f} ms): {statement[:MAX_STATEMENT_LENGTH]}")
+
+    def stats(self) -> Dict:
+        return {
+            'slow_ms': self.slow_ms,
+            'sample_rate': self.sample_rate,
+            'statements': self.statements,
+            'slow': self.slow,
+            'sampled': self.sampled,
+            'recent_slow': list(self.recent_slow),
+        }
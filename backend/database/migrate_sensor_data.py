@@ -0,0 +1,145 @@
+"""Move sensor readings from the EAV layout to one wide row per report.
+
+The old ``sensor_data`` table stores one (zone_id, sensor_type, value) row
+per measurement. This migration:
+
+1. renames it to ``sensor_data_eav`` and creates the wide ``sensor_data``
+   table from the SensorData model, with its (zone_id, timestamp) and
+   (device_id, timestamp) indexes
+2. copies the readings over one time window at a time, pivoting every
+   (zone_id, timestamp) group into a single row, and commits per window
+3. optionally drops ``sensor_data_eav`` once everything is copied
+
+Re-running is safe: windows skip (zone, timestamp) pairs that already have
+a wide row, and an existing wide table only gets any missing indexes.
+Readers go through SensorStorage, which merges both tables until step 3.
+
+    python -m backend.database.migrate_sensor_data --window-hours 24 [--drop-legacy]
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy import MetaData, Table, and_, exists, func, inspect, literal_column, select, text
+from sqlalchemy.engine import Connection, Engine
+from backend.models.sensor_data import ArduinoStatus, SensorData
+from backend.services.sensor_storage import (
+    EAV_SENSOR_TYPES, LEGACY_SENSOR_TABLE, legacy_sensor_data, pivot_legacy_rows, sensor_storage
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Wide columns an EAV row can populate, in table order
+PIVOT_COLUMNS = [c.name for c in SensorData.__table__.columns if c.name in set(EAV_SENSOR_TYPES.values())]
+
+
+def prepare_tables(conn: Connection) -> bool:
+    """Move an EAV sensor_data aside and create the wide table; returns True if legacy rows exist"""
+    inspector = inspect(conn)
+    if inspector.has_table('sensor_data'):
+        columns = {c['name'] for c in inspector.get_columns('sensor_data')}
+        if 'sensor_type' in columns:
+            if inspector.has_table(LEGACY_SENSOR_TABLE):
+                raise RuntimeError(f"Both an EAV sensor_data and {LEGACY_SENSOR_TABLE} exist; resolve manually")
+            logger.info(f"Renaming EAV sensor_data to {LEGACY_SENSOR_TABLE}")
+            conn.execute(text(f"ALTER TABLE sensor_data RENAME TO {LEGACY_SENSOR_TABLE}"))
+            inspector = inspect(conn)
+
+    if not inspector.has_table('sensor_data'):
+        logger.info("Creating wide sensor_data table")
+        # Private metadata so reflecting the zones table for the foreign key
+        # does not leak into the ORM's registry
+        metadata = MetaData()
+        Table('zones', metadata, autoload_with=conn)
+        SensorData.__table__.to_metadata(metadata).create(conn)
+    else:
+        existing = {index['name'] for index in inspector.get_indexes('sensor_data')}
+        for index in SensorData.__table__.indexes:
+            if index.name not in existing:
+                logger.info(f"Creating index {index.name}")
+                index.create(conn)
+
+    return inspect(conn).has_table(LEGACY_SENSOR_TABLE)
+
+
+def copy_window(conn: Connection, start: datetime, end: datetime, with_devices: bool) -> int:
+    """Pivot legacy rows with start <= timestamp < end into sensor_data"""
+    legacy = legacy_sensor_data.c
+    wide = SensorData.__table__
+    pivot = pivot_legacy_rows(
+        PIVOT_COLUMNS,
+        and_(legacy.timestamp >= start, legacy.timestamp < end)
+    ).subquery('pivot')
+
+    if with_devices:
+        # EAV rows never recorded the device; use the zone's controller
+        devices = ArduinoStatus.__table__
+        device_id = select(func.min(devices.c.device_id))\
+            .where(devices.c.zone_id == pivot.c.zone_id)\
+            .scalar_subquery()
+    else:
+        device_id = literal_column('NULL')
+
+    already_copied = exists().where(
+        and_(wide.c.zone_id == pivot.c.zone_id, wide.c.timestamp == pivot.c.timestamp)
+    )
+    source = select(
+        pivot.c.zone_id, device_id, pivot.c.timestamp, *[pivot.c[c] for c in PIVOT_COLUMNS]
+    ).where(~already_copied)
+    result = conn.execute(
+        wide.insert().from_select(['zone_id', 'device_id', 'timestamp', *PIVOT_COLUMNS], source)
+    )
+    return result.rowcount
+
+
+def migrate(engine: Engine, window: timedelta = timedelta(days=1), drop_legacy: bool = False) -> Dict:
+    """Run the migration; returns counts for reporting"""
+    with engine.begin() as conn:
+        has_legacy = prepare_tables(conn)
+        with_devices = inspect(conn).has_table('arduino_status')
+
+    stats = {'windows': 0, 'rows_copied': 0, 'legacy_rows': 0, 'legacy_dropped': False}
+    if has_legacy:
+        legacy = legacy_sensor_data.c
+        with engine.connect() as conn:
+            first, last, count = conn.execute(
+                select(func.min(legacy.timestamp), func.max(legacy.timestamp), func.count())
+            ).one()
+        stats['legacy_rows'] = count
+
+        if count:
+            start = first
+            while start <= last:
+                end = start + window
+                with engine.begin() as conn:
+                    copied = copy_window(conn, start, end, with_devices)
+                stats['windows'] += 1
+                stats['rows_copied'] += max(copied, 0)
+                done = min(1.0, (end - first) / (last - first)) if last > first else 1.0
+                logger.info(f"Copied {copied} rows up to {end.isoformat()} ({done:.0%})")
+                start = end
+
+        if drop_legacy:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE {LEGACY_SENSOR_TABLE}"))
+            stats['legacy_dropped'] = True
+            logger.info(f"Dropped {LEGACY_SENSOR_TABLE}")
+
+    sensor_storage.forget()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate EAV sensor rows to the wide sensor_data table")
+    parser.add_argument('--window-hours', type=float, default=24.0, help="time window copied per transaction")
+    parser.add_argument('--drop-legacy', action='store_true', help=f"drop {LEGACY_SENSOR_TABLE} when done")
+    args = parser.parse_args()
+
+    from backend.database.session import engine
+    stats = migrate(engine, timedelta(hours=args.window_hours), args.drop_legacy)
+    logger.info(f"Migration finished: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -63,38 +63,19 @@ CREATE TABLE IF NOT EXISTS irrigation_history (
     FOREIGN KEY (zone_id) REFERENCES zones(zone_id) ON DELETE CASCADE
 );
 
--- Create sensor_data table if it doesn't exist
-CREATE TABLE IF NOT EXISTS sensor_data (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    zone_id VARCHAR(255) NOT NULL,
-    sensor_type VARCHAR(50) NOT NULL,
-    value FLOAT NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (zone_id) REFERENCES zones(zone_id) ON DELETE CASCADE
-);
-
--- Arduino Status
-CREATE TABLE arduino_status (
-    id INT PRIMARY KEY AUTO_INCREMENT,
-    device_id VARCHAR(50) UNIQUE NOT NULL,
-    last_seen TIMESTAMP NULL,
-    battery_level FLOAT,
-    firmware_version VARCHAR(20),
-    signal_strength FLOAT,      -- WiFi signal strength in dBm
-    is_online BOOLEAN DEFAULT FALSE,
-    error_count INT DEFAULT 0,
-    last_error TEXT,
-    last_offline TIMESTAMP NULL,
-    zone_id VARCHAR(255),
-    FOREIGN KEY (zone_id) REFERENCES zones(zone_id)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+-- Time-series tables below are RANGE-partitioned by month. Only the pmax
+-- catch-all is created here; RetentionService splits monthly partitions
+-- off it ahead of time and drops them once they pass retention. MySQL
+-- requires the partition column in every unique key and does not allow
+-- foreign keys on partitioned tables, so these tables use (id, timestamp)
+-- as primary key and zone/user references are not enforced.
 
--- Sensor Data
-CREATE TABLE sensor_data_old (
-    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+-- Sensor readings, one row per report
+CREATE TABLE IF NOT EXISTS sensor_data (
+    id BIGINT NOT NULL AUTO_INCREMENT,
     zone_id VARCHAR(50) NOT NULL,
-    device_id VARCHAR(50) NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    device_id VARCHAR(50),             -- NULL for rows migrated from the EAV layout
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     soil_moisture FLOAT,        -- Percentage
     soil_temp FLOAT,           -- Celsius
     soil_ph FLOAT,
@@ -109,7 +90,50 @@ CREATE TABLE sensor_data_old (
     wind_speed FLOAT,          -- m/s
     is_raining BOOLEAN,
     flow_rate FLOAT,           -- L/min
-    total_water FLOAT,         -- Total water used in L
+    total_water FLOAT,
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- Hourly aggregates of sensor_data, kept after raw rows expire
+CREATE TABLE IF NOT EXISTS sensor_data_rollups (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    zone_id VARCHAR(50) NOT NULL,
+    bucket DATETIME NOT NULL,  -- Start of the hour
+    samples INT NOT NULL,      -- Raw readings aggregated
+    soil_moisture FLOAT,       -- Hourly averages from here on
+    soil_temp FLOAT,
+    soil_ph FLOAT,
+    soil_ec FLOAT,
+    soil_n FLOAT,
+    soil_p FLOAT,
+    soil_k FLOAT,
+    air_temp FLOAT,
+    air_humidity FLOAT,
+    light_level FLOAT,
+    pressure FLOAT,
+    wind_speed FLOAT,
+    is_raining FLOAT,          -- Fraction of readings reporting rain
+    flow_rate FLOAT,
+    total_water FLOAT,         -- Hourly maximum of the running total
+    UNIQUE KEY idx_sensor_rollups_zone_bucket (zone_id, bucket)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Arduino Status
+CREATE TABLE arduino_status (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    device_id VARCHAR(50) UNIQUE NOT NULL,
+    last_seen TIMESTAMP NULL,
+    battery_level FLOAT,
+    firmware_version VARCHAR(20),
+    signal_strength FLOAT,      -- WiFi signal strength in dBm
+    is_online BOOLEAN DEFAULT FALSE,
+    error_count INT DEFAULT 0,
+    last_error TEXT,
+    last_offline TIMESTAMP NULL,
+    zone_id VARCHAR(255),
     FOREIGN KEY (zone_id) REFERENCES zones(zone_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
@@ -144,19 +168,22 @@ CREATE TABLE commands (
 
 -- Notifications
 CREATE TABLE notifications (
-    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    id BIGINT NOT NULL AUTO_INCREMENT,
     title VARCHAR(200) NOT NULL,
     message TEXT NOT NULL,
     severity VARCHAR(50) NOT NULL,  -- 'low', 'medium', 'high'
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     is_read BOOLEAN DEFAULT FALSE,
     user_id INT,
-    FOREIGN KEY (user_id) REFERENCES users(id)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 -- Weather Data
 CREATE TABLE weather_data (
-    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    id BIGINT NOT NULL AUTO_INCREMENT,
     zone_id VARCHAR(50) NOT NULL,
     timestamp TIMESTAMP NOT NULL,
     temperature FLOAT,
@@ -167,8 +194,11 @@ CREATE TABLE weather_data (
     precipitation FLOAT,
     forecast_type VARCHAR(50),  -- 'current', 'hourly', 'daily'
     raw_data JSON,
-    FOREIGN KEY (zone_id) REFERENCES zones(zone_id)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 -- Satellite Data
 CREATE TABLE satellite_data (
@@ -184,21 +214,27 @@ CREATE TABLE satellite_data (
 
 -- System Logs
 CREATE TABLE system_logs (
-    id BIGINT PRIMARY KEY AUTO_INCREMENT,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     log_level VARCHAR(20) NOT NULL,  -- 'INFO', 'WARNING', 'ERROR', 'CRITICAL'
     component VARCHAR(50) NOT NULL,   -- 'arduino', 'server', 'database', etc.
     message TEXT NOT NULL,
-    details JSON
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    details JSON,
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 -- Create indexes for better query performance
-CREATE INDEX idx_sensor_data_timestamp ON sensor_data_old(timestamp);
-CREATE INDEX idx_sensor_data_zone ON sensor_data_old(zone_id);
-CREATE INDEX idx_irrigation_logs_zone ON irrigation_logs(zone_id);
+CREATE INDEX idx_sensor_data_zone_time ON sensor_data(zone_id, timestamp);
+CREATE INDEX idx_sensor_data_device_time ON sensor_data(device_id, timestamp);
+CREATE INDEX idx_arduino_status_zone ON arduino_status(zone_id);
+CREATE INDEX idx_irrigation_logs_zone_time ON irrigation_logs(zone_id, start_time);
 CREATE INDEX idx_irrigation_logs_time ON irrigation_logs(start_time);
-CREATE INDEX idx_commands_status ON commands(status, device_id);
+CREATE INDEX idx_commands_device_status ON commands(device_id, status);
 CREATE INDEX idx_notifications_timestamp ON notifications(timestamp);
+CREATE INDEX idx_notifications_severity_time ON notifications(severity, timestamp);
 CREATE INDEX idx_weather_data_zone_time ON weather_data(zone_id, timestamp);
 CREATE INDEX idx_satellite_data_zone_time ON satellite_data(zone_id, timestamp);
 CREATE INDEX idx_system_logs_level_time ON system_logs(log_level, timestamp);
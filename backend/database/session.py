@@ -1,11 +1,14 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.core.config import settings
+from backend.database.health import PoolMonitor, QueryProfiler, pool_options
 
 # Use SQLite for development
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, **pool_options(SQLALCHEMY_DATABASE_URL))
+pool_monitor = PoolMonitor(engine)
+query_profiler = QueryProfiler(engine, slow_ms=settings.SQL_SLOW_QUERY_MS, sample_rate=settings.SQL_LOG_SAMPLE_RATE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
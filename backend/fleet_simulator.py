@@ -0,0 +1,326 @@
+"""Load generator: thousands of virtual controllers reporting concurrently.
+
+Each virtual device is an asyncio task that reports every ``interval``
+seconds (with jitter, so the fleet does not fire in lockstep) using the
+same payloads the firmware sends:
+
+    json    one document per reading to POST /api/arduino/{id}/data
+    binary  batches of ``batch`` readings to POST /api/arduino/{id}/telemetry
+
+The target is either an HTTP(S) base URL, where every device keeps its own
+keep-alive connection, or a SQLAlchemy database URL (sqlite:///..., or
+mysql+pymysql://...), where rows go straight into ``sensor_data`` through a
+thread pool. The run ends with achieved throughput and latency
+percentiles.
+
+    python -m backend.fleet_simulator --devices 2000 --interval 5 --duration 60 \\
+        --target http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import numpy as np
+from backend.arduino_simulator import SENSOR_RANGES
+from backend.services.telemetry_protocol import JSON_SENSOR_FIELDS, TELEMETRY_SCHEMAS, decode_telemetry, encode_telemetry
+
+PAYLOAD_SHAPES = ('json', 'binary')
+
+# SensorData column -> firmware JSON key
+_JSON_KEYS = {column: key for key, column in JSON_SENSOR_FIELDS.items()}
+
+
+class LoadStats:
+    """Latency samples and counters for one run"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.requests = 0
+        self.readings = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+    def record(self, latency: float, readings: int, size: int):
+        self.latencies.append(latency)
+        self.requests += 1
+        self.readings += readings
+        self.bytes_sent += size
+
+    def summary(self, elapsed: float) -> Dict:
+        latencies = np.asarray(self.latencies) * 1000.0
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': self.requests,
+            'readings': self.readings,
+            'errors': self.errors,
+            'requests_per_s': round(self.requests / elapsed, 1) if elapsed else 0.0,
+            'readings_per_s': round(self.readings / elapsed, 1) if elapsed else 0.0,
+            'kb_sent': round(self.bytes_sent / 1024, 1),
+            'p50_ms': round(float(p50), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(latencies.max()), 2) if len(latencies) else 0.0,
+        }
+
+
+class VirtualDevice:
+    """Sensor state for one simulated controller"""
+
+    def __init__(self, device_id: str, zone_id: str, rng: random.Random):
+        self.device_id = device_id
+        self.zone_id = zone_id
+        self.rng = rng
+        self.total_water = 0.0
+
+    def reading(self) -> Dict:
+        """One set of values keyed by SensorData column"""
+        values = {name: self.rng.uniform(lo, hi) for name, (lo, hi) in SENSOR_RANGES.items()}
+        flow_rate = self.rng.uniform(0, 5) if self.rng.random() < 0.2 else 0.0
+        self.total_water += flow_rate / 12
+        values.update(
+            pressure=self.rng.uniform(90, 110),
+            wind_speed=self.rng.uniform(0, 10),
+            is_raining=self.rng.random() < 0.1,
+            flow_rate=flow_rate,
+            total_water=self.total_water
+        )
+        return values
+
+    def json_payload(self) -> bytes:
+        reading = self.reading()
+        return json.dumps({
+            'device_id': self.device_id,
+            'zone_id': self.zone_id,
+            'battery_level': 100,
+            'firmware_version': '1.0.0',
+            'signal_strength': self.rng.randint(-80, -50),
+            'sensor_data': {_JSON_KEYS[column]: value for column, value in reading.items() if column in _JSON_KEYS}
+        }).encode('utf-8')
+
+    def binary_payload(self, batch: int, interval: float) -> bytes:
+        records = np.zeros(batch, dtype=TELEMETRY_SCHEMAS[1])
+        records['age'] = (np.arange(batch)[::-1] * interval).astype(np.uint32)
+        for i in range(batch):
+            for column, value in self.reading().items():
+                records[column][i] = value
+        return encode_telemetry(
+            records,
+            zone_id=self.zone_id,
+            signal_strength=self.rng.randint(-80, -50),
+            firmware_version='1.0.0'
+        )
+
+
+class HttpTarget:
+    """Minimal keep-alive HTTP/1.1 client, one connection per device (TLS for https://)"""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        url = urlsplit(base_url)
+        if url.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported target scheme: {url.scheme}")
+        self.host = url.hostname
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.port = url.port or (443 if self.ssl else 80)
+        self.prefix = url.path.rstrip('/') + '/api/arduino'
+        self.timeout = timeout
+        self._connections: Dict[str, tuple] = {}
+
+    async def send(self, device: VirtualDevice, shape: str, body: bytes, readings: int):
+        endpoint = 'data' if shape == 'json' else 'telemetry'
+        content_type = 'application/json' if shape == 'json' else 'application/vnd.sisri.telemetry'
+        request = (
+            f"POST {self.prefix}/{device.device_id}/{endpoint} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode('ascii') + body
+        try:
+            await asyncio.wait_for(self._round_trip(device.device_id, request), self.timeout)
+        except Exception:
+            await self._drop(device.device_id)
+            raise
+
+    async def _round_trip(self, device_id: str, request: bytes):
+        connection = self._connections.get(device_id)
+        if connection is None:
+            connection = self._connections[device_id] = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl
+            )
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        length = 0
+        close = False
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value.strip())
+            elif name == 'connection' and value.strip().lower() == 'close':
+                close = True
+        if length:
+            await reader.readexactly(length)
+        if close:
+            await self._drop(device_id)
+
+        status = int(status_line.split()[1])
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}")
+
+    async def _drop(self, device_id: str):
+        connection = self._connections.pop(device_id, None)
+        if connection is not None:
+            connection[1].close()
+
+    async def close(self):
+        for device_id in list(self._connections):
+            await self._drop(device_id)
+
+
+class DatabaseTarget:
+    """Write readings straight into ``sensor_data``, bypassing the API"""
+
+    def __init__(self, url: str, workers: int = 8):
+        from sqlalchemy import create_engine
+        from backend.models.sensor_data import SensorData
+        self.engine = create_engine(url, pool_size=workers, max_overflow=0)
+        self.table = SensorData.__table__
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def send(self, device: VirtualDevice, shape: str, body: bytes, readings: int):
+        # The payload was built for realism; the rows are what gets stored
+        if shape == 'json':
+            data = json.loads(body)
+            rows = [{column: data['sensor_data'].get(key) for key, column in JSON_SENSOR_FIELDS.items()}]
+        else:
+            rows = decode_telemetry(body).to_rows(device.device_id, device.zone_id, datetime.utcnow())
+        for row in rows:
+            row.update(zone_id=device.zone_id, device_id=device.device_id)
+            row.setdefault('timestamp', datetime.utcnow())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._insert, rows)
+
+    def _insert(self, rows: List[Dict]):
+        with self.engine.begin() as conn:
+            conn.execute(self.table.insert(), rows)
+
+    async def close(self):
+        self.executor.shutdown(wait=True)
+        self.engine.dispose()
+
+
+class FleetSimulator:
+    """Drive ``devices`` virtual controllers against a target for ``duration`` seconds"""
+
+    def __init__(
+        self,
+        target,
+        devices: int = 100,
+        zones: int = 0,
+        interval: float = 5.0,
+        duration: float = 30.0,
+        shape: str = 'json',
+        batch: int = 12,
+        max_in_flight: int = 500,
+        seed: int = 0
+    ):
+        if shape not in PAYLOAD_SHAPES:
+            raise ValueError(f"shape must be one of {list(PAYLOAD_SHAPES)}")
+        self.target = target
+        self.interval = interval
+        self.duration = duration
+        self.shape = shape
+        self.batch = batch
+        self.stats = LoadStats()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        rng = random.Random(seed)
+        zones = zones or devices
+        self.devices = [
+            VirtualDevice(f"SIM_{i:05d}", f"ZONE{i % zones + 1}", random.Random(rng.random()))
+            for i in range(devices)
+        ]
+
+    async def run(self) -> Dict:
+        start = time.perf_counter()
+        deadline = start + self.duration
+        await asyncio.gather(*(self._device_loop(device, deadline) for device in self.devices))
+        elapsed = time.perf_counter() - start
+        await self.target.close()
+        return self.stats.summary(elapsed)
+
+    async def _device_loop(self, device: VirtualDevice, deadline: float):
+        # A binary device reports once per batch of readings
+        period = self.interval * (self.batch if self.shape == 'binary' else 1)
+        # Spread first reports over one period, then keep a fixed cadence so
+        # slow responses show up as latency rather than a lower request rate
+        next_report = time.perf_counter() + device.rng.uniform(0, period)
+        while True:
+            await asyncio.sleep(max(0.0, next_report - time.perf_counter()))
+            if time.perf_counter() >= deadline:
+                break
+            if self.shape == 'json':
+                body, readings = device.json_payload(), 1
+            else:
+                body, readings = device.binary_payload(self.batch, self.interval), self.batch
+
+            async with self._in_flight:
+                sent = time.perf_counter()
+                try:
+                    await self.target.send(device, self.shape, body, readings)
+                    self.stats.record(time.perf_counter() - sent, readings, len(body))
+                except Exception:
+                    self.stats.errors += 1
+            next_report += period * device.rng.uniform(0.95, 1.05)
+
+
+def make_target(url: str, workers: int = 8):
+    if url.startswith(('http://', 'https://')):
+        return HttpTarget(url)
+    return DatabaseTarget(url, workers=workers)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Simulate a fleet of irrigation controllers")
+    parser.add_argument('--target', default='http://localhost:8000',
+                        help="API base URL or SQLAlchemy database URL")
+    parser.add_argument('--devices', type=int, default=100)
+    parser.add_argument('--zones', type=int, default=0, help="distinct zones (default: one per device)")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between readings per device")
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--payload', choices=PAYLOAD_SHAPES, default='json')
+    parser.add_argument('--batch', type=int, default=12, help="readings per binary upload")
+    parser.add_argument('--max-in-flight', type=int, default=500)
+    parser.add_argument('--db-workers', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    simulator = FleetSimulator(
+        make_target(args.target, workers=args.db_workers),
+        devices=args.devices,
+        zones=args.zones,
+        interval=args.interval,
+        duration=args.duration,
+        shape=args.payload,
+        batch=args.batch,
+        max_in_flight=args.max_in_flight
+    )
+    summary = asyncio.run(simulator.run())
+    for key, value in summary.items():
+        print(f"{key:>16}: {value}")
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from database.database import SessionLocal, engine, Base, init_db
+from database.database import SessionLocal, engine, Base, init_db, pool_monitor, query_profiler
 from models.zone import Zone
 import logging
 from datetime import datetime
@@ -9,6 +9,14 @@ from typing import List, Optional
 from pydantic import BaseModel
 from config import settings
 import random
+import asyncio
+import os
+import sys
+
+# Routers under backend/api import the backend package by name
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.api import exports
+from backend.database import session as backend_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +53,10 @@ def get_db():
     finally:
         db.close()
 
+# Exports stream through this app's own sessions
+app.include_router(exports.router, prefix="/api")
+app.dependency_overrides[backend_session.get_db] = get_db
+
 # Pydantic models
 class ZoneBase(BaseModel):
     name: str
@@ -74,11 +86,28 @@ class DashboardData(BaseModel):
     recent_alerts: List[str]
     zone_summaries: List[dict]
 
+_health_task = None
+
+@app.on_event("startup")
+async def start_health_checks():
+    global _health_task
+    _health_task = asyncio.create_task(pool_monitor.run_forever(settings.DB_HEALTH_CHECK_INTERVAL))
+
+@app.on_event("shutdown")
+async def stop_health_checks():
+    if _health_task is not None:
+        _health_task.cancel()
+
 # API Routes
 @app.get("/")
 def root():
     return {"message": settings.PROJECT_NAME}
 
+@app.get("/api/health/db")
+def database_health():
+    """Result of the last background check, pool usage and slow queries"""
+    return {"pool": pool_monitor.stats(), "queries": query_profiler.stats()}
+
 @app.get("/api/zones", response_model=List[ZoneResponse])
 def get_zones(db: Session = Depends(get_db)):
     try:
@@ -0,0 +1,163 @@
+"""In-process micro-batching for model predictions.
+
+scikit-learn and Keras have a fixed cost per ``predict`` call (input
+validation, thread-pool dispatch, graph execution) that dwarfs the cost
+of a single row. BatchInferenceServer collects requests that arrive
+within ``max_wait_ms`` of each other, up to ``max_batch`` rows, and
+answers them all from one call to a vectorized ``predict_many``:
+
+    server = BatchInferenceServer(predictor.predict_many)
+    result = await server.predict(zone)
+
+The batch runs in a worker thread so the event loop keeps accepting
+requests meanwhile. If a batch raises, its rows are retried one at a
+time so only the bad requests see the error.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInferenceServer:
+    """Coalesces concurrent predict() calls into predict_many() batches"""
+
+    def __init__(
+        self,
+        predict_many: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 256,
+        max_wait_ms: float = 5.0,
+        name: str = 'model'
+    ):
+        self.predict_many_fn = predict_many
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Requests taken off the queue and not yet answered
+        self._current: List = []
+        self.metrics = {
+            'requests': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'largest_batch': 0,
+            'predict_seconds': 0.0,
+        }
+
+    async def start(self):
+        # Also restarts a worker that died; requests already queued are kept
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker; requests still queued or in the running batch fail with CancelledError"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._worker = self._queue = None
+
+    async def predict(self, item: Any) -> Any:
+        """Prediction for one item, answered from the next batch"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def predict_many(self, items: Sequence[Any]) -> List[Any]:
+        """Predictions for many items; they share batches with other callers"""
+        return list(await asyncio.gather(*(self.predict(item) for item in items)))
+
+    def stats(self) -> Dict:
+        batches = self.metrics['batches']
+        return {
+            **self.metrics,
+            'name': self.name,
+            'queued': self._queue.qsize() if self._queue else 0,
+            'avg_batch': round(self.metrics['requests'] / batches, 2) if batches else 0.0,
+        }
+
+    async def _next_batch(self) -> List:
+        # Collected in self._current so a cancelled worker can fail them
+        batch = self._current
+        batch.append(await self._queue.get())
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _run(self):
+        try:
+            while True:
+                batch = await self._next_batch()
+                if batch:
+                    try:
+                        await self._run_batch(batch)
+                    except Exception as e:
+                        # Fail this batch only; the worker keeps serving
+                        logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+                        for _, future in batch:
+                            if not future.done():
+                                future.set_exception(e)
+                self._current = []
+        finally:
+            for _, future in self._current:
+                future.cancel()
+            self._current = []
+
+    async def _run_batch(self, batch: List):
+        items = [item for item, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(self.predict_many_fn, items)
+            _check_count(results, len(items))
+        except Exception as e:
+            self.metrics['failed_batches'] += 1
+            logger.warning(f"{self.name} batch of {len(items)} failed, retrying rows singly: {e}")
+            results = None
+        self.metrics['predict_seconds'] += time.perf_counter() - started
+        self.metrics['batches'] += 1
+        self.metrics['requests'] += len(items)
+        self.metrics['largest_batch'] = max(self.metrics['largest_batch'], len(items))
+
+        for index, (item, future) in enumerate(batch):
+            if future.done():
+                continue
+            if results is not None:
+                future.set_result(results[index])
+                continue
+            try:
+                single = await asyncio.to_thread(self.predict_many_fn, [item])
+                _check_count(single, 1)
+                result = single[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+
+def _check_count(results: Sequence[Any], expected: int):
+    if len(results) != expected:
+        raise ValueError(f"predict_many returned {len(results)} results for {expected} items")
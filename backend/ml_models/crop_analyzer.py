@@ -1,91 +1,148 @@
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, IsolationForest
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-import joblib
-import cv2
-import tensorflow as tf
 from datetime import datetime, timedelta
+from functools import cached_property
+from backend.core.lazy_imports import lazy_import
+from backend.ml_models.ndvi_tiles import analyze_ndvi_raster
+from backend.ml_models.sequence_features import (
+    GROWTH_FEATURES,
+    GROWTH_RATE_DAYS,
+    SEQUENCE_LENGTH,
+    ZoneSequenceWindow,
+    growth_rate,
+    latest_windows,
+    sequence_matrix
+)
+
+# Frameworks are imported on first use, not when this module is imported
+tf = lazy_import('tensorflow')
+joblib = lazy_import('joblib')
+sklearn_ensemble = lazy_import('sklearn.ensemble')
+sklearn_preprocessing = lazy_import('sklearn.preprocessing')
+
+# Disease classifier input columns, in order
+DISEASE_FEATURES = (
+    'temperature',
+    'humidity',
+    'soil_moisture',
+    'soil_ph',
+    'nitrogen',
+    'phosphorus',
+    'potassium'
+)
 
 class CropHealthAnalyzer:
-    def __init__(self):
-        self.disease_classifier = RandomForestClassifier(n_estimators=100)
-        self.anomaly_detector = IsolationForest(contamination=0.1)
-        self.growth_predictor = self._build_lstm_model()
-        self.scaler = StandardScaler()
+    """Models are created on first use; load_models replaces them"""
+
+    @cached_property
+    def disease_classifier(self):
+        return sklearn_ensemble.RandomForestClassifier(n_estimators=100)
+
+    @cached_property
+    def anomaly_detector(self):
+        return sklearn_ensemble.IsolationForest(contamination=0.1)
+
+    @cached_property
+    def growth_predictor(self):
+        return self._build_lstm_model()
+
+    @cached_property
+    def scaler(self):
+        return sklearn_preprocessing.StandardScaler()
+
+    @cached_property
+    def sequence_windows(self):
+        """Current LSTM window per zone for incremental updates"""
+        return {}
         
     def _build_lstm_model(self):
-        model = Sequential([
-            LSTM(64, return_sequences=True, input_shape=(30, 8)),
-            Dropout(0.2),
-            LSTM(32),
-            Dropout(0.2),
-            Dense(16, activation='relu'),
-            Dense(1, activation='sigmoid')
+        layers = tf.keras.layers
+        model = tf.keras.models.Sequential([
+            layers.LSTM(64, return_sequences=True, input_shape=(SEQUENCE_LENGTH, len(GROWTH_FEATURES))),
+            layers.Dropout(0.2),
+            layers.LSTM(32),
+            layers.Dropout(0.2),
+            layers.Dense(16, activation='relu'),
+            layers.Dense(1, activation='sigmoid')
         ])
         model.compile(optimizer='adam', loss='mse')
         return model
 
-    def analyze_ndvi_image(self, image_path):
-        """Analyze NDVI (Normalized Difference Vegetation Index) from satellite/drone imagery"""
-        img = cv2.imread(image_path)
-        nir = img[:,:,0].astype(float)
-        red = img[:,:,2].astype(float)
-        
-        # Avoid division by zero
-        denominator = nir + red
-        denominator[denominator == 0] = 0.01
-        
-        ndvi = (nir - red) / denominator
-        
-        return {
-            'mean_ndvi': np.mean(ndvi),
-            'min_ndvi': np.min(ndvi),
-            'max_ndvi': np.max(ndvi),
-            'stress_areas': np.sum(ndvi < 0.2) / ndvi.size * 100
-        }
+    def analyze_ndvi_image(self, image_path, workers=None):
+        """Analyze NDVI (Normalized Difference Vegetation Index) from satellite/drone imagery.
+
+        The image is processed in tiles (see ndvi_tiles), across ``workers``
+        processes; the result also carries the NDVI histogram.
+        """
+        return analyze_ndvi_raster(image_path, workers=workers).summary()
 
     def predict_disease_probability(self, sensor_data):
         """Predict probability of crop diseases based on environmental conditions"""
-        features = np.array([
-            sensor_data['temperature'],
-            sensor_data['humidity'],
-            sensor_data['soil_moisture'],
-            sensor_data['soil_ph'],
-            sensor_data['nitrogen'],
-            sensor_data['phosphorus'],
-            sensor_data['potassium']
-        ]).reshape(1, -1)
+        return self.predict_disease_probability_many([sensor_data])[0]
+
+    def predict_disease_probability_many(self, sensor_data):
+        """predict_disease_probability for many zones with one classifier call"""
+        if not sensor_data:
+            return []
+        features = np.array([[data[name] for name in DISEASE_FEATURES] for data in sensor_data], dtype=float)
         
         # Scale features
         features_scaled = self.scaler.transform(features)
         
-        # Get disease probability
-        disease_prob = self.disease_classifier.predict_proba(features_scaled)
+        # Get disease probabilities
+        disease_probs = self.disease_classifier.predict_proba(features_scaled)[:, 1]
         
-        return {
-            'disease_probability': disease_prob[0][1],
-            'risk_level': 'High' if disease_prob[0][1] > 0.7 else 'Medium' if disease_prob[0][1] > 0.3 else 'Low',
-            'contributing_factors': self._identify_risk_factors(features[0])
-        }
+        return [{
+            'disease_probability': disease_prob,
+            'risk_level': 'High' if disease_prob > 0.7 else 'Medium' if disease_prob > 0.3 else 'Low',
+            'contributing_factors': self._identify_risk_factors(row)
+        } for row, disease_prob in zip(features, disease_probs)]
 
     def predict_growth_stage(self, historical_data):
         """Predict crop growth stage and future development"""
-        sequence_length = 30
-        features = self._prepare_sequence(historical_data, sequence_length)
+        features = self._prepare_sequence(historical_data, SEQUENCE_LENGTH)
         
         if features is None:
             return None
             
-        prediction = self.growth_predictor.predict(features)
+        progress = self._predict_growth_progress(features)[0]
+        
+        return self._growth_stage_result(progress, self._calculate_growth_rate(historical_data))
+
+    def update_growth_stage(self, zone_id, daily_data):
+        """Add one day of a zone's data and predict from its current window.
+
+        Returns None until the zone has SEQUENCE_LENGTH days. Seed a zone
+        from history with seed_growth_window instead of replaying it.
+        """
+        window = self.sequence_windows.get(zone_id)
+        if window is None:
+            window = self.sequence_windows[zone_id] = ZoneSequenceWindow()
+        window.append(sequence_matrix([daily_data])[0], daily_data.get('height'))
         
+        if not window.ready:
+            return None
+            
+        progress = self._predict_growth_progress(window.window()[np.newaxis])[0]
+        
+        return self._growth_stage_result(progress, growth_rate(window.heights))
+
+    def seed_growth_window(self, zone_id, historical_data):
+        """Start a zone's incremental window from its history"""
+        window = self.sequence_windows[zone_id] = ZoneSequenceWindow()
+        window.extend(historical_data)
+        return window
+
+    def _predict_growth_progress(self, windows):
+        """Progress in [0, 1] for each (length, features) window"""
+        # Calling the model directly avoids predict()'s per-call dataset setup
+        batch = np.ascontiguousarray(windows, dtype=np.float32)
+        return np.asarray(self.growth_predictor(batch, training=False))[:, 0]
+
+    def _growth_stage_result(self, progress, rate):
         return {
-            'current_stage': self._map_growth_stage(prediction[0][0]),
-            'days_to_next_stage': self._estimate_days_to_next_stage(prediction[0][0]),
-            'growth_rate': self._calculate_growth_rate(historical_data)
+            'current_stage': self._map_growth_stage(progress),
+            'days_to_next_stage': self._estimate_days_to_next_stage(progress),
+            'growth_rate': rate
         }
 
     def detect_stress_conditions(self, sensor_data, weather_forecast):
@@ -151,16 +208,9 @@ class CropHealthAnalyzer:
                 
         return risk_factors
 
-    def _prepare_sequence(self, historical_data, sequence_length):
-        """Prepare time series data for LSTM model"""
-        if len(historical_data) < sequence_length:
-            return None
-            
-        sequences = []
-        for i in range(len(historical_data) - sequence_length):
-            sequences.append(historical_data[i:i+sequence_length])
-            
-        return np.array(sequences)
+    def _prepare_sequence(self, historical_data, sequence_length, count=1):
+        """Latest ``count`` windows for the LSTM, as a view over the history"""
+        return latest_windows(sequence_matrix(historical_data), sequence_length, count)
 
     def _map_growth_stage(self, prediction):
         """Map numerical prediction to growth stage"""
@@ -184,14 +234,10 @@ class CropHealthAnalyzer:
 
     def _calculate_growth_rate(self, historical_data):
         """Calculate current growth rate based on historical data"""
-        recent_data = historical_data[-7:]  # Last week
-        growth_indicators = [d['height'] for d in recent_data if 'height' in d]
-        
-        if len(growth_indicators) < 2:
-            return None
-            
-        daily_growth = np.diff(growth_indicators).mean()
-        return daily_growth
+        if isinstance(historical_data, np.ndarray):
+            return None  # Height is not one of the model features
+        recent_data = historical_data[-GROWTH_RATE_DAYS:]  # Last week
+        return growth_rate([d['height'] for d in recent_data if 'height' in d])
 
     def _calculate_stress_probability(self, conditions):
         """Calculate probability of plant stress based on current conditions"""
@@ -226,9 +272,9 @@ class CropHealthAnalyzer:
         self.growth_predictor.save(f'{path}/growth_predictor.h5')
         joblib.dump(self.scaler, f'{path}/scaler.joblib')
 
-    def load_models(self, path):
-        """Load trained models"""
-        self.disease_classifier = joblib.load(f'{path}/disease_classifier.joblib')
-        self.anomaly_detector = joblib.load(f'{path}/anomaly_detector.joblib')
+    def load_models(self, path, mmap_mode=None):
+        """Load trained models; mmap_mode='r' maps scikit-learn arrays instead of copying them"""
+        self.disease_classifier = joblib.load(f'{path}/disease_classifier.joblib', mmap_mode=mmap_mode)
+        self.anomaly_detector = joblib.load(f'{path}/anomaly_detector.joblib', mmap_mode=mmap_mode)
         self.growth_predictor = tf.keras.models.load_model(f'{path}/growth_predictor.h5')
-        self.scaler = joblib.load(f'{path}/scaler.joblib')
+        self.scaler = joblib.load(f'{path}/scaler.joblib', mmap_mode=mmap_mode)
@@ -1,234 +1,117 @@
-from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-import cv2
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import cached_property
+from backend.core.lazy_imports import lazy_import
+from backend.ml_models.crop_profiles import (
+    CompiledProfile, CropGrowthStage, CropProfile, CropProfileTable, crop_profile_table
+)
 
-@dataclass
-class CropGrowthStage:
-    name: str
-    duration_days: Tuple[int, int]  # min, max days
-    optimal_conditions: Dict[str, Tuple[float, float]]  # min, max values
-    water_needs: float  # relative to base need (1.0)
-    nutrient_needs: Dict[str, float]  # relative amounts
-    stress_indicators: List[str]
+# Frameworks are imported on first use, not when this module is imported
+cv2 = lazy_import('cv2')
+sklearn_ensemble = lazy_import('sklearn.ensemble')
+
+class ImageViews:
+    """Colorspace conversions of one BGR image, each computed at most once"""
+
+    def __init__(self, image: np.ndarray):
+        self.image = image
+
+    @cached_property
+    def hsv(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+
+    @cached_property
+    def edges(self) -> np.ndarray:
+        return cv2.Canny(self.gray, 50, 150)
+
+    @property
+    def pixels(self) -> int:
+        return self.image.shape[0] * self.image.shape[1]
+
+def _leaf_yellowing(views: ImageViews) -> float:
+    # Detect yellow colors
+    yellow_lower = np.array([20, 100, 100])
+    yellow_upper = np.array([30, 255, 255])
+    yellow_mask = cv2.inRange(views.hsv, yellow_lower, yellow_upper)
+    return np.sum(yellow_mask) / views.pixels
+
+def _leaf_curling(views: ImageViews) -> Optional[float]:
+    # Use contour analysis for leaf shape
+    contours, _ = cv2.findContours(views.edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    # Analyze contour complexity
+    if len(contours) == 0:
+        return None
+    complexity = sum(len(contour) for contour in contours) / len(contours)
+    return min(1.0, complexity / 100)
+
+# Indicators that can be measured from images; the rest need field checks
+IMAGE_STRESS_DETECTORS = {
+    'leaf_yellowing': _leaf_yellowing,
+    'leaf_curling': _leaf_curling,
+}
+
+def detect_indicators(image: np.ndarray, indicators: List[str]) -> Dict[str, float]:
+    """Measure each image-detectable indicator; conversions are shared between them"""
+    views = ImageViews(image)
+    stress_analysis = {}
+    for indicator in indicators:
+        detector = IMAGE_STRESS_DETECTORS.get(indicator)
+        if detector is None:
+            continue
+        value = detector(views)
+        if value is not None:
+            stress_analysis[indicator] = value
+    return stress_analysis
 
 @dataclass
-class CropProfile:
-    name: str
-    variety: str
-    growth_stages: List[CropGrowthStage]
-    disease_susceptibility: Dict[str, float]
-    climate_preferences: Dict[str, Tuple[float, float]]
-    companion_plants: List[str]
-    soil_preferences: Dict[str, Tuple[float, float]]
+class GrowthStageBatch:
+    """Growth stages of many zones; every array is aligned with the input zones.
+
+    ``stage_index`` is -1 for unknown crops or varieties, days before
+    planting and plants past their last stage; the other arrays are NaN
+    there. ``deviation`` holds, per condition, how far the reading lies
+    outside the stage's optimal range: negative below it, positive above,
+    0 inside, NaN when the stage has no range or the reading is missing.
+    """
+    profile_index: np.ndarray
+    stage_index: np.ndarray
+    days_in_stage: np.ndarray
+    days_remaining: np.ndarray
+    water_needs: np.ndarray
+    deviation: Dict[str, np.ndarray]
+    table: CropProfileTable = field(repr=False)
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self.stage_index >= 0
+
+    def stage_names(self) -> np.ndarray:
+        """Stage name per zone, None where ``stage_index`` is -1"""
+        names = np.full(self.stage_index.shape, None, dtype=object)
+        for entry in self.table.compiled:
+            for i, stage in enumerate(entry.profile.growth_stages):
+                names[(self.profile_index == entry.index) & (self.stage_index == i)] = stage.name
+        return names
 
 class CropPatternAnalyzer:
     def __init__(self):
         self._load_crop_profiles()
-        self.disease_classifier = RandomForestClassifier(n_estimators=100)
+
+    @cached_property
+    def disease_classifier(self):
+        return sklearn_ensemble.RandomForestClassifier(n_estimators=100)
         
     def _load_crop_profiles(self):
-        """Load predefined crop profiles"""
-        self.crop_profiles = {
-            'tomato': {
-                'determinate': CropProfile(
-                    name='Tomato',
-                    variety='Determinate',
-                    growth_stages=[
-                        CropGrowthStage(
-                            name='Seedling',
-                            duration_days=(14, 21),
-                            optimal_conditions={
-                                'temperature': (20, 25),
-                                'humidity': (60, 70),
-                                'soil_moisture': (65, 75)
-                            },
-                            water_needs=0.7,
-                            nutrient_needs={
-                                'nitrogen': 0.5,
-                                'phosphorus': 0.8,
-                                'potassium': 0.5
-                            },
-                            stress_indicators=[
-                                'leaf_yellowing',
-                                'stunted_growth'
-                            ]
-                        ),
-                        CropGrowthStage(
-                            name='Vegetative',
-                            duration_days=(20, 30),
-                            optimal_conditions={
-                                'temperature': (21, 27),
-                                'humidity': (65, 75),
-                                'soil_moisture': (70, 80)
-                            },
-                            water_needs=1.0,
-                            nutrient_needs={
-                                'nitrogen': 1.0,
-                                'phosphorus': 0.7,
-                                'potassium': 0.8
-                            },
-                            stress_indicators=[
-                                'leaf_curling',
-                                'purple_stems'
-                            ]
-                        ),
-                        CropGrowthStage(
-                            name='Flowering',
-                            duration_days=(20, 30),
-                            optimal_conditions={
-                                'temperature': (20, 24),
-                                'humidity': (65, 80),
-                                'soil_moisture': (65, 75)
-                            },
-                            water_needs=1.2,
-                            nutrient_needs={
-                                'nitrogen': 0.7,
-                                'phosphorus': 1.0,
-                                'potassium': 1.0
-                            },
-                            stress_indicators=[
-                                'flower_drop',
-                                'blossom_end_rot'
-                            ]
-                        ),
-                        CropGrowthStage(
-                            name='Fruiting',
-                            duration_days=(20, 40),
-                            optimal_conditions={
-                                'temperature': (20, 25),
-                                'humidity': (65, 75),
-                                'soil_moisture': (70, 80)
-                            },
-                            water_needs=1.5,
-                            nutrient_needs={
-                                'nitrogen': 0.6,
-                                'phosphorus': 0.8,
-                                'potassium': 1.2
-                            },
-                            stress_indicators=[
-                                'fruit_cracking',
-                                'uneven_ripening'
-                            ]
-                        )
-                    ],
-                    disease_susceptibility={
-                        'early_blight': 0.7,
-                        'late_blight': 0.8,
-                        'fusarium_wilt': 0.6,
-                        'septoria_leaf_spot': 0.7
-                    },
-                    climate_preferences={
-                        'temperature': (18, 28),
-                        'humidity': (60, 80),
-                        'light_hours': (6, 8)
-                    },
-                    companion_plants=[
-                        'basil',
-                        'marigold',
-                        'carrots',
-                        'onions'
-                    ],
-                    soil_preferences={
-                        'ph': (6.0, 6.8),
-                        'organic_matter': (3.0, 5.0),
-                        'nitrogen': (50, 100),
-                        'phosphorus': (50, 100),
-                        'potassium': (50, 100)
-                    }
-                )
-            },
-            'lettuce': {
-                'butterhead': CropProfile(
-                    name='Lettuce',
-                    variety='Butterhead',
-                    growth_stages=[
-                        CropGrowthStage(
-                            name='Germination',
-                            duration_days=(4, 7),
-                            optimal_conditions={
-                                'temperature': (15, 20),
-                                'humidity': (65, 75),
-                                'soil_moisture': (70, 80)
-                            },
-                            water_needs=0.8,
-                            nutrient_needs={
-                                'nitrogen': 0.6,
-                                'phosphorus': 0.7,
-                                'potassium': 0.5
-                            },
-                            stress_indicators=[
-                                'poor_germination',
-                                'damping_off'
-                            ]
-                        ),
-                        CropGrowthStage(
-                            name='Leaf Development',
-                            duration_days=(21, 30),
-                            optimal_conditions={
-                                'temperature': (15, 22),
-                                'humidity': (60, 70),
-                                'soil_moisture': (65, 75)
-                            },
-                            water_needs=1.0,
-                            nutrient_needs={
-                                'nitrogen': 1.0,
-                                'phosphorus': 0.6,
-                                'potassium': 0.8
-                            },
-                            stress_indicators=[
-                                'leaf_yellowing',
-                                'tipburn'
-                            ]
-                        ),
-                        CropGrowthStage(
-                            name='Head Formation',
-                            duration_days=(14, 21),
-                            optimal_conditions={
-                                'temperature': (15, 20),
-                                'humidity': (60, 70),
-                                'soil_moisture': (65, 75)
-                            },
-                            water_needs=1.2,
-                            nutrient_needs={
-                                'nitrogen': 0.8,
-                                'phosphorus': 0.6,
-                                'potassium': 1.0
-                            },
-                            stress_indicators=[
-                                'bolting',
-                                'loose_heads'
-                            ]
-                        )
-                    ],
-                    disease_susceptibility={
-                        'downy_mildew': 0.8,
-                        'bottom_rot': 0.6,
-                        'lettuce_mosaic_virus': 0.7
-                    },
-                    climate_preferences={
-                        'temperature': (15, 22),
-                        'humidity': (60, 70),
-                        'light_hours': (4, 6)
-                    },
-                    companion_plants=[
-                        'carrots',
-                        'radishes',
-                        'cucumbers',
-                        'onions'
-                    ],
-                    soil_preferences={
-                        'ph': (6.0, 7.0),
-                        'organic_matter': (2.0, 4.0),
-                        'nitrogen': (40, 80),
-                        'phosphorus': (30, 70),
-                        'potassium': (40, 80)
-                    }
-                )
-            }
-        }
+        """Use the crop profiles compiled once per process"""
+        self.profile_table = crop_profile_table()
+        self.crop_profiles = self.profile_table.by_crop
         
     def analyze_growth_stage(
         self,
@@ -238,20 +121,17 @@ class CropPatternAnalyzer:
         current_conditions: Dict[str, float]
     ) -> Dict:
         """Analyze current growth stage and provide recommendations"""
-        profile = self.crop_profiles[crop_name][variety]
-        current_stage = None
-        days_elapsed = 0
+        compiled = self.profile_table.get(crop_name, variety)
         
         # Find current growth stage
-        for stage in profile.growth_stages:
-            if days_elapsed <= days_since_planting <= (days_elapsed + stage.duration_days[1]):
-                current_stage = stage
-                break
-            days_elapsed += stage.duration_days[1]
+        stage_index = compiled.stage_index(days_since_planting)
             
-        if not current_stage:
+        if stage_index is None:
             return {'error': 'Plant has exceeded expected growth duration'}
             
+        current_stage = compiled.profile.growth_stages[stage_index]
+        days_elapsed = compiled.stage_start(stage_index)
+            
         # Analyze conditions
         condition_analysis = {}
         for condition, (min_val, max_val) in current_stage.optimal_conditions.items():
@@ -270,9 +150,59 @@ class CropPatternAnalyzer:
             'days_remaining': current_stage.duration_days[1] - (days_since_planting - days_elapsed),
             'condition_analysis': condition_analysis,
             'water_needs': current_stage.water_needs,
-            'nutrient_needs': current_stage.nutrient_needs,
-            'stress_indicators': current_stage.stress_indicators
+            'nutrient_needs': dict(current_stage.nutrient_needs),
+            'stress_indicators': list(current_stage.stress_indicators)
         }
+
+    def analyze_growth_stages(
+        self,
+        crop_names,
+        varieties,
+        days_since_planting,
+        temperature=None,
+        humidity=None,
+        soil_moisture=None
+    ) -> GrowthStageBatch:
+        """analyze_growth_stage for every zone at once.
+
+        Takes one array (or sequence) entry per zone; omitted or NaN
+        readings are not analyzed. Unlike the single-zone call, unknown
+        crops do not raise, so one bad zone cannot stop a fleet-wide run.
+        """
+        table = self.profile_table
+        days = np.asarray(days_since_planting, dtype=np.float64)
+        profile = table.profile_indices(crop_names, varieties)
+        rows = np.where(profile >= 0, profile, 0)
+        zones = np.arange(len(days))
+
+        # bisect_left per zone: number of stage ends before the day
+        ends = table.stage_ends[rows]
+        stage = np.count_nonzero(ends < days[:, None], axis=1)
+        valid = (profile >= 0) & (days >= 0) & (stage < table.stage_counts[rows])
+        stage = np.where(valid, stage, -1)
+        safe = np.where(valid, stage, 0)
+        start = np.where(safe > 0, ends[zones, safe - 1], 0)
+        end = ends[zones, safe]
+
+        readings = {'temperature': temperature, 'humidity': humidity, 'soil_moisture': soil_moisture}
+        low = np.where(valid[:, None], table.optimal_min[rows, safe], np.nan)
+        high = np.where(valid[:, None], table.optimal_max[rows, safe], np.nan)
+        deviation = {}
+        for i, condition in enumerate(table.conditions):
+            value = readings.get(condition)
+            value = np.full(len(days), np.nan) if value is None else np.asarray(value, dtype=np.float64)
+            # At most one term is non-zero; NaN ranges and readings propagate
+            deviation[condition] = np.minimum(value - low[:, i], 0) + np.maximum(value - high[:, i], 0)
+
+        return GrowthStageBatch(
+            profile_index=profile,
+            stage_index=stage,
+            days_in_stage=np.where(valid, days - start, np.nan),
+            days_remaining=np.where(valid, end - days, np.nan),
+            water_needs=np.where(valid, table.water_needs[rows, safe], np.nan),
+            deviation=deviation,
+            table=table
+        )
         
     def detect_stress_indicators(
         self,
@@ -282,41 +212,22 @@ class CropPatternAnalyzer:
         growth_stage: str
     ) -> Dict[str, float]:
         """Detect stress indicators from plant images"""
-        # Convert to HSV color space for better color analysis
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        indicators = self.stage_stress_indicators(crop_name, variety, growth_stage)
         
-        # Get relevant stress indicators for the current stage
-        profile = self.crop_profiles[crop_name][variety]
-        current_stage = next(
-            (stage for stage in profile.growth_stages if stage.name == growth_stage),
-            None
-        )
-        
-        if not current_stage:
+        if indicators is None:
             return {'error': 'Invalid growth stage'}
             
-        stress_analysis = {}
-        
-        for indicator in current_stage.stress_indicators:
-            if indicator == 'leaf_yellowing':
-                # Detect yellow colors
-                yellow_lower = np.array([20, 100, 100])
-                yellow_upper = np.array([30, 255, 255])
-                yellow_mask = cv2.inRange(hsv, yellow_lower, yellow_upper)
-                stress_analysis['leaf_yellowing'] = np.sum(yellow_mask) / (image.shape[0] * image.shape[1])
-                
-            elif indicator == 'leaf_curling':
-                # Use contour analysis for leaf shape
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-                edges = cv2.Canny(gray, 50, 150)
-                contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                
-                # Analyze contour complexity
-                if len(contours) > 0:
-                    complexity = sum(len(contour) for contour in contours) / len(contours)
-                    stress_analysis['leaf_curling'] = min(1.0, complexity / 100)
-                    
-        return stress_analysis
+        return detect_indicators(image, indicators)
+
+    def stage_stress_indicators(
+        self,
+        crop_name: str,
+        variety: str,
+        growth_stage: str
+    ) -> Optional[List[str]]:
+        """Stress indicators relevant to a growth stage, None if the stage is unknown"""
+        current_stage = self.profile_table.get(crop_name, variety).stages_by_name.get(growth_stage)
+        return list(current_stage.stress_indicators) if current_stage else None
         
     def recommend_companion_planting(
         self,
@@ -326,15 +237,12 @@ class CropPatternAnalyzer:
         existing_plants: List[str]
     ) -> List[Dict]:
         """Recommend companion plants based on available space and existing plants"""
-        profile = self.crop_profiles[crop_name][variety]
+        compiled = self.profile_table.get(crop_name, variety)
         recommendations = []
         
-        for companion in profile.companion_plants:
+        for companion in compiled.profile.companion_plants:
             if companion not in existing_plants:
-                companion_profile = next(
-                    (p for p in self.crop_profiles.values() for v in p.values() if v.name.lower() == companion),
-                    None
-                )
+                companion_profile = self.profile_table.by_name.get(companion)
                 
                 if companion_profile:
                     recommendations.append({
@@ -342,7 +250,7 @@ class CropPatternAnalyzer:
                         'benefits': self._get_companion_benefits(crop_name, companion),
                         'space_required': self._estimate_space_requirement(companion),
                         'compatibility_score': self._calculate_compatibility_score(
-                            profile, companion_profile, existing_plants
+                            compiled, companion_profile, existing_plants
                         )
                     })
                     
@@ -385,41 +293,20 @@ class CropPatternAnalyzer:
         
     def _calculate_compatibility_score(
         self,
-        main_profile: CropProfile,
-        companion_profile: CropProfile,
+        main_profile: CompiledProfile,
+        companion_profile: CompiledProfile,
         existing_plants: List[str]
     ) -> float:
         """Calculate compatibility score between plants"""
-        score = 0.0
-        
-        # Climate compatibility
-        climate_score = 0
-        for condition, (min1, max1) in main_profile.climate_preferences.items():
-            if condition in companion_profile.climate_preferences:
-                min2, max2 = companion_profile.climate_preferences[condition]
-                overlap = min(max1, max2) - max(min1, min2)
-                if overlap > 0:
-                    climate_score += overlap / (max(max1, max2) - min(min1, min2))
-                    
-        score += climate_score / len(main_profile.climate_preferences)
-        
-        # Soil compatibility
-        soil_score = 0
-        for condition, (min1, max1) in main_profile.soil_preferences.items():
-            if condition in companion_profile.soil_preferences:
-                min2, max2 = companion_profile.soil_preferences[condition]
-                overlap = min(max1, max2) - max(min1, min2)
-                if overlap > 0:
-                    soil_score += overlap / (max(max1, max2) - min(min1, min2))
-                    
-        score += soil_score / len(main_profile.soil_preferences)
+        # Climate and soil compatibility, precomputed per profile pair
+        score = self.profile_table.compatibility[main_profile.index, companion_profile.index]
         
         # Existing plants compatibility
         existing_score = 1.0
         for plant in existing_plants:
-            if plant in companion_profile.companion_plants:
+            if plant in companion_profile.companions:
                 existing_score *= 0.9  # Slight penalty for each existing companion
                 
         score *= existing_score
         
-        return score
+        return float(score)
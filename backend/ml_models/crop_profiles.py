@@ -0,0 +1,400 @@
+"""Crop profiles, compiled once per process into read-only lookup tables.
+
+Profiles are frozen, slotted dataclasses; their mappings are read-only
+views and their lists are tuples, so one compiled table is safely shared
+by every CropPatternAnalyzer in the process. ``crop_profile_table()``
+builds it on first use:
+
+    stage_ends      cumulative end day of each stage, for bisect
+                    (also as a numpy array for vectorized lookups)
+    by_name         companion plant name -> profile
+    compatibility   climate and soil overlap score of every profile pair
+
+For fleet-wide analysis the per-stage data of all profiles is also laid
+out as arrays indexed [profile, stage], padded to the longest profile:
+stage ends (padded with STAGE_END_PADDING), optimal condition ranges
+(NaN where a stage has no range) and water needs.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+import numpy as np
+
+# Larger than any day count, so padded stages are never reached
+STAGE_END_PADDING = np.iinfo(np.int64).max
+
+
+def _read_only(mapping: Mapping) -> Mapping:
+    return mapping if isinstance(mapping, MappingProxyType) else MappingProxyType(dict(mapping))
+
+
+@dataclass(frozen=True, slots=True)
+class CropGrowthStage:
+    name: str
+    duration_days: Tuple[int, int]  # min, max days
+    optimal_conditions: Mapping[str, Tuple[float, float]]  # min, max values
+    water_needs: float  # relative to base need (1.0)
+    nutrient_needs: Mapping[str, float]  # relative amounts
+    stress_indicators: Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, 'duration_days', tuple(self.duration_days))
+        object.__setattr__(self, 'optimal_conditions', _read_only(self.optimal_conditions))
+        object.__setattr__(self, 'nutrient_needs', _read_only(self.nutrient_needs))
+        object.__setattr__(self, 'stress_indicators', tuple(self.stress_indicators))
+
+
+@dataclass(frozen=True, slots=True)
+class CropProfile:
+    name: str
+    variety: str
+    growth_stages: Tuple[CropGrowthStage, ...]
+    disease_susceptibility: Mapping[str, float]
+    climate_preferences: Mapping[str, Tuple[float, float]]
+    companion_plants: Tuple[str, ...]
+    soil_preferences: Mapping[str, Tuple[float, float]]
+
+    def __post_init__(self):
+        object.__setattr__(self, 'growth_stages', tuple(self.growth_stages))
+        object.__setattr__(self, 'disease_susceptibility', _read_only(self.disease_susceptibility))
+        object.__setattr__(self, 'climate_preferences', _read_only(self.climate_preferences))
+        object.__setattr__(self, 'companion_plants', tuple(self.companion_plants))
+        object.__setattr__(self, 'soil_preferences', _read_only(self.soil_preferences))
+
+
+def _define_crop_profiles() -> Dict[str, Dict[str, CropProfile]]:
+    """Predefined crop profiles by crop and variety"""
+    return {
+        'tomato': {
+            'determinate': CropProfile(
+                name='Tomato',
+                variety='Determinate',
+                growth_stages=[
+                    CropGrowthStage(
+                        name='Seedling',
+                        duration_days=(14, 21),
+                        optimal_conditions={
+                            'temperature': (20, 25),
+                            'humidity': (60, 70),
+                            'soil_moisture': (65, 75)
+                        },
+                        water_needs=0.7,
+                        nutrient_needs={
+                            'nitrogen': 0.5,
+                            'phosphorus': 0.8,
+                            'potassium': 0.5
+                        },
+                        stress_indicators=[
+                            'leaf_yellowing',
+                            'stunted_growth'
+                        ]
+                    ),
+                    CropGrowthStage(
+                        name='Vegetative',
+                        duration_days=(20, 30),
+                        optimal_conditions={
+                            'temperature': (21, 27),
+                            'humidity': (65, 75),
+                            'soil_moisture': (70, 80)
+                        },
+                        water_needs=1.0,
+                        nutrient_needs={
+                            'nitrogen': 1.0,
+                            'phosphorus': 0.7,
+                            'potassium': 0.8
+                        },
+                        stress_indicators=[
+                            'leaf_curling',
+                            'purple_stems'
+                        ]
+                    ),
+                    CropGrowthStage(
+                        name='Flowering',
+                        duration_days=(20, 30),
+                        optimal_conditions={
+                            'temperature': (20, 24),
+                            'humidity': (65, 80),
+                            'soil_moisture': (65, 75)
+                        },
+                        water_needs=1.2,
+                        nutrient_needs={
+                            'nitrogen': 0.7,
+                            'phosphorus': 1.0,
+                            'potassium': 1.0
+                        },
+                        stress_indicators=[
+                            'flower_drop',
+                            'blossom_end_rot'
+                        ]
+                    ),
+                    CropGrowthStage(
+                        name='Fruiting',
+                        duration_days=(20, 40),
+                        optimal_conditions={
+                            'temperature': (20, 25),
+                            'humidity': (65, 75),
+                            'soil_moisture': (70, 80)
+                        },
+                        water_needs=1.5,
+                        nutrient_needs={
+                            'nitrogen': 0.6,
+                            'phosphorus': 0.8,
+                            'potassium': 1.2
+                        },
+                        stress_indicators=[
+                            'fruit_cracking',
+                            'uneven_ripening'
+                        ]
+                    )
+                ],
+                disease_susceptibility={
+                    'early_blight': 0.7,
+                    'late_blight': 0.8,
+                    'fusarium_wilt': 0.6,
+                    'septoria_leaf_spot': 0.7
+                },
+                climate_preferences={
+                    'temperature': (18, 28),
+                    'humidity': (60, 80),
+                    'light_hours': (6, 8)
+                },
+                companion_plants=[
+                    'basil',
+                    'marigold',
+                    'carrots',
+                    'onions'
+                ],
+                soil_preferences={
+                    'ph': (6.0, 6.8),
+                    'organic_matter': (3.0, 5.0),
+                    'nitrogen': (50, 100),
+                    'phosphorus': (50, 100),
+                    'potassium': (50, 100)
+                }
+            )
+        },
+        'lettuce': {
+            'butterhead': CropProfile(
+                name='Lettuce',
+                variety='Butterhead',
+                growth_stages=[
+                    CropGrowthStage(
+                        name='Germination',
+                        duration_days=(4, 7),
+                        optimal_conditions={
+                            'temperature': (15, 20),
+                            'humidity': (65, 75),
+                            'soil_moisture': (70, 80)
+                        },
+                        water_needs=0.8,
+                        nutrient_needs={
+                            'nitrogen': 0.6,
+                            'phosphorus': 0.7,
+                            'potassium': 0.5
+                        },
+                        stress_indicators=[
+                            'poor_germination',
+                            'damping_off'
+                        ]
+                    ),
+                    CropGrowthStage(
+                        name='Leaf Development',
+                        duration_days=(21, 30),
+                        optimal_conditions={
+                            'temperature': (15, 22),
+                            'humidity': (60, 70),
+                            'soil_moisture': (65, 75)
+                        },
+                        water_needs=1.0,
+                        nutrient_needs={
+                            'nitrogen': 1.0,
+                            'phosphorus': 0.6,
+                            'potassium': 0.8
+                        },
+                        stress_indicators=[
+                            'leaf_yellowing',
+                            'tipburn'
+                        ]
+                    ),
+                    CropGrowthStage(
+                        name='Head Formation',
+                        duration_days=(14, 21),
+                        optimal_conditions={
+                            'temperature': (15, 20),
+                            'humidity': (60, 70),
+                            'soil_moisture': (65, 75)
+                        },
+                        water_needs=1.2,
+                        nutrient_needs={
+                            'nitrogen': 0.8,
+                            'phosphorus': 0.6,
+                            'potassium': 1.0
+                        },
+                        stress_indicators=[
+                            'bolting',
+                            'loose_heads'
+                        ]
+                    )
+                ],
+                disease_susceptibility={
+                    'downy_mildew': 0.8,
+                    'bottom_rot': 0.6,
+                    'lettuce_mosaic_virus': 0.7
+                },
+                climate_preferences={
+                    'temperature': (15, 22),
+                    'humidity': (60, 70),
+                    'light_hours': (4, 6)
+                },
+                companion_plants=[
+                    'carrots',
+                    'radishes',
+                    'cucumbers',
+                    'onions'
+                ],
+                soil_preferences={
+                    'ph': (6.0, 7.0),
+                    'organic_matter': (2.0, 4.0),
+                    'nitrogen': (40, 80),
+                    'phosphorus': (30, 70),
+                    'potassium': (40, 80)
+                }
+            )
+        }
+    }
+
+
+def _range_overlap(main: Mapping[str, Tuple[float, float]], other: Mapping[str, Tuple[float, float]]) -> float:
+    """Mean overlap of shared ranges, relative to their combined span"""
+    total = 0
+    for condition, (min1, max1) in main.items():
+        if condition in other:
+            min2, max2 = other[condition]
+            overlap = min(max1, max2) - max(min1, min2)
+            if overlap > 0:
+                total += overlap / (max(max1, max2) - min(min1, min2))
+    return total / len(main)
+
+
+def base_compatibility(main: CropProfile, companion: CropProfile) -> float:
+    """Climate plus soil overlap, before the existing-plants penalty"""
+    score = 0.0
+    score += _range_overlap(main.climate_preferences, companion.climate_preferences)
+    score += _range_overlap(main.soil_preferences, companion.soil_preferences)
+    return score
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledProfile:
+    """One crop variety with its lookup tables"""
+    index: int  # Row and column in CropProfileTable.compatibility
+    crop: str
+    profile: CropProfile
+    stage_ends: Tuple[int, ...]  # Cumulative maximum days at the end of each stage
+    stage_ends_array: np.ndarray
+    stages_by_name: Mapping[str, CropGrowthStage]
+    companions: FrozenSet[str]
+
+    def stage_index(self, days_since_planting: float) -> Optional[int]:
+        """Stage containing the day; a boundary day belongs to the earlier stage"""
+        if days_since_planting < 0:
+            return None
+        index = bisect_left(self.stage_ends, days_since_planting)
+        return index if index < len(self.stage_ends) else None
+
+    def stage_start(self, index: int) -> int:
+        return self.stage_ends[index - 1] if index else 0
+
+
+class CropProfileTable:
+    """All compiled profiles; built once by crop_profile_table()"""
+    __slots__ = (
+        'by_crop', 'compiled', 'by_name', 'compatibility', '_by_variety',
+        'conditions', 'stage_counts', 'stage_ends', 'optimal_min', 'optimal_max', 'water_needs'
+    )
+
+    def __init__(self, profiles: Dict[str, Dict[str, CropProfile]]):
+        self.by_crop = MappingProxyType({crop: _read_only(varieties) for crop, varieties in profiles.items()})
+        compiled: List[CompiledProfile] = []
+        self._by_variety: Dict[Tuple[str, str], CompiledProfile] = {}
+        for crop, varieties in profiles.items():
+            for variety, profile in varieties.items():
+                stage_ends = tuple(np.cumsum([stage.duration_days[1] for stage in profile.growth_stages]).tolist())
+                stage_ends_array = np.array(stage_ends, dtype=np.int64)
+                stage_ends_array.flags.writeable = False
+                stages_by_name = {}
+                for stage in profile.growth_stages:
+                    stages_by_name.setdefault(stage.name, stage)
+                entry = CompiledProfile(
+                    index=len(compiled),
+                    crop=crop,
+                    profile=profile,
+                    stage_ends=stage_ends,
+                    stage_ends_array=stage_ends_array,
+                    stages_by_name=MappingProxyType(stages_by_name),
+                    companions=frozenset(profile.companion_plants)
+                )
+                compiled.append(entry)
+                self._by_variety[(crop, variety)] = entry
+        self.compiled = tuple(compiled)
+
+        by_name = {}
+        for entry in compiled:
+            by_name.setdefault(entry.profile.name.lower(), entry)
+        self.by_name = MappingProxyType(by_name)
+
+        self.compatibility = np.array([
+            [base_compatibility(main.profile, companion.profile) for companion in compiled]
+            for main in compiled
+        ], dtype=np.float64)
+        self.compatibility.flags.writeable = False
+        self._build_stage_arrays()
+
+    def _build_stage_arrays(self):
+        conditions = []
+        for entry in self.compiled:
+            for stage in entry.profile.growth_stages:
+                conditions.extend(c for c in stage.optimal_conditions if c not in conditions)
+        self.conditions = tuple(conditions)
+
+        profiles = len(self.compiled)
+        stages = max(len(entry.stage_ends) for entry in self.compiled)
+        self.stage_counts = np.array([len(entry.stage_ends) for entry in self.compiled], dtype=np.int64)
+        self.stage_ends = np.full((profiles, stages), STAGE_END_PADDING, dtype=np.int64)
+        self.optimal_min = np.full((profiles, stages, len(conditions)), np.nan)
+        self.optimal_max = np.full((profiles, stages, len(conditions)), np.nan)
+        self.water_needs = np.full((profiles, stages), np.nan)
+        for entry in self.compiled:
+            self.stage_ends[entry.index, :len(entry.stage_ends)] = entry.stage_ends
+            for i, stage in enumerate(entry.profile.growth_stages):
+                self.water_needs[entry.index, i] = stage.water_needs
+                for condition, (low, high) in stage.optimal_conditions.items():
+                    self.optimal_min[entry.index, i, conditions.index(condition)] = low
+                    self.optimal_max[entry.index, i, conditions.index(condition)] = high
+        for array in (self.stage_counts, self.stage_ends, self.optimal_min, self.optimal_max, self.water_needs):
+            array.flags.writeable = False
+
+    def profile_indices(self, crops, varieties) -> np.ndarray:
+        """Compiled profile index per zone; -1 for unknown crops or varieties"""
+        crops = np.asarray(crops)
+        varieties = np.asarray(varieties)
+        indices = np.full(crops.shape, -1, dtype=np.int64)
+        # One vectorized comparison per profile; there are only a handful
+        for (crop, variety), entry in self._by_variety.items():
+            indices[(crops == crop) & (varieties == variety)] = entry.index
+        return indices
+
+    def get(self, crop_name: str, variety: str) -> CompiledProfile:
+        """Compiled profile; KeyError for unknown crops or varieties, like crop_profiles"""
+        try:
+            return self._by_variety[(crop_name, variety)]
+        except KeyError:
+            raise KeyError(variety if crop_name in self.by_crop else crop_name) from None
+
+
+@lru_cache(maxsize=None)
+def crop_profile_table() -> CropProfileTable:
+    """Process-wide compiled profiles"""
+    return CropProfileTable(_define_crop_profiles())
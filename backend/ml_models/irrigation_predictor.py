@@ -1,34 +1,53 @@
 import numpy as np
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-import joblib
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import cached_property
+from typing import Dict, Hashable, List, Mapping, Optional, Tuple
+from backend.core.lazy_imports import lazy_import
+from backend.ml_models.irrigation_schedule import (
+    IrrigationPlan, plan_irrigation, time_of_day_efficiency, wind_efficiency
+)
+
+# Frameworks are imported on first use, not when this module is imported
+joblib = lazy_import('joblib')
+sklearn_ensemble = lazy_import('sklearn.ensemble')
+sklearn_preprocessing = lazy_import('sklearn.preprocessing')
+
+# Model input columns, in order
+IRRIGATION_FEATURES = (
+    'temperature',
+    'humidity',
+    'soil_moisture',
+    'precipitation_forecast',
+    'solar_radiation',
+    'wind_speed',
+    'evapotranspiration',
+    'crop_stage_normalized'
+)
 
 class IrrigationPredictor:
     def __init__(self):
-        self.model = GradientBoostingRegressor(
+        self.feature_importance: Dict[str, float] = {}
+
+    @cached_property
+    def model(self):
+        return sklearn_ensemble.GradientBoostingRegressor(
             n_estimators=100,
             learning_rate=0.1,
             max_depth=4
         )
-        self.scaler = StandardScaler()
-        self.feature_importance: Dict[str, float] = {}
+
+    @cached_property
+    def scaler(self):
+        return sklearn_preprocessing.StandardScaler()
         
     def prepare_features(self, data: Dict) -> np.ndarray:
         """Prepare features for prediction"""
-        features = np.array([
-            data['temperature'],
-            data['humidity'],
-            data['soil_moisture'],
-            data['precipitation_forecast'],
-            data['solar_radiation'],
-            data['wind_speed'],
-            data['evapotranspiration'],
-            data['crop_stage_normalized']
-        ]).reshape(1, -1)
-        
-        return self.scaler.transform(features)
+        return self.scaler.transform(self._feature_matrix([data]))
+
+    @staticmethod
+    def _feature_matrix(rows: List[Dict]) -> np.ndarray:
+        """One row per zone, columns in IRRIGATION_FEATURES order"""
+        return np.array([[row[name] for name in IRRIGATION_FEATURES] for row in rows], dtype=float)
         
     def predict_irrigation_needs(
         self,
@@ -38,50 +57,83 @@ class IrrigationPredictor:
         crop_data: Dict
     ) -> Dict:
         """Predict irrigation requirements based on conditions"""
-        # Prepare current features
-        features = self.prepare_features({
-            **current_conditions,
-            **weather_forecast[0],
-            **soil_data,
-            'crop_stage_normalized': crop_data['growth_stage'] / 5.0
-        })
-        
-        # Get base prediction
-        base_water_needs = self.model.predict(features)[0]
+        return self.predict_many([{
+            'current_conditions': current_conditions,
+            'weather_forecast': weather_forecast,
+            'soil_data': soil_data,
+            'crop_data': crop_data
+        }])[0]
+
+    def predict_many(
+        self,
+        zones: List[Dict],
+        pump_capacity: Optional[Mapping[Hashable, float]] = None
+    ) -> List[Dict]:
+        """predict_irrigation_needs for many zones with one model call.
+
+        Each zone is a dict with the ``current_conditions``,
+        ``weather_forecast``, ``soil_data`` and ``crop_data`` arguments,
+        and optionally the ``pump`` it draws from. Schedules come from one
+        optimize_schedule call, so zones on the same pump share
+        ``pump_capacity[pump]`` per hour.
+        """
+        if not zones:
+            return []
+        features = self._feature_matrix([{
+            **zone['current_conditions'],
+            **zone['weather_forecast'][0],
+            **zone['soil_data'],
+            'crop_stage_normalized': zone['crop_data']['growth_stage'] / 5.0
+        } for zone in zones])
+        
+        # Get base predictions
+        base_needs = self.model.predict(self.scaler.transform(features))
         
         # Adjust for weather forecast
-        adjusted_needs = self._adjust_for_forecast(
-            base_water_needs,
-            weather_forecast,
-            soil_data['soil_type']
-        )
-        
-        # Calculate efficiency factors
-        efficiency_factors = self._calculate_efficiency_factors(
-            current_conditions,
-            soil_data,
-            crop_data
-        )
-        
-        # Generate schedule
-        schedule = self._generate_irrigation_schedule(
-            adjusted_needs,
-            efficiency_factors,
-            weather_forecast
-        )
-        
-        return {
-            'base_water_needs': base_water_needs,
-            'adjusted_needs': adjusted_needs,
-            'efficiency_factors': efficiency_factors,
-            'schedule': schedule,
-            'recommendations': self._generate_recommendations(
-                adjusted_needs,
-                efficiency_factors,
-                weather_forecast
+        adjusted_needs = [
+            self._adjust_for_forecast(base, zone['weather_forecast'], zone['soil_data']['soil_type'])
+            for base, zone in zip(base_needs, zones)
+        ]
+        plan = self.optimize_schedule(zones, adjusted_needs, pump_capacity)
+        
+        results = []
+        for i, zone in enumerate(zones):
+            efficiency_factors = self._calculate_efficiency_factors(
+                zone['current_conditions'],
+                zone['soil_data'],
+                zone['crop_data']
             )
-        }
-        
+            results.append({
+                'base_water_needs': base_needs[i],
+                'adjusted_needs': adjusted_needs[i],
+                'efficiency_factors': efficiency_factors,
+                'schedule': plan.schedule(i),
+                'recommendations': self._generate_recommendations(
+                    adjusted_needs[i],
+                    efficiency_factors,
+                    zone['weather_forecast']
+                )
+            })
+        return results
+
+    def optimize_schedule(
+        self,
+        zones: List[Dict],
+        water_needs: List[float],
+        pump_capacity: Optional[Mapping[Hashable, float]] = None,
+        start: Optional[datetime] = None
+    ) -> IrrigationPlan:
+        """Allocate every zone's water needs over the next 24 hours in one solve"""
+        return plan_irrigation(
+            water_needs,
+            [zone['weather_forecast'] for zone in zones],
+            [zone['current_conditions'] for zone in zones],
+            [self._calculate_growth_stage_factor(zone['crop_data']['growth_stage']) for zone in zones],
+            pumps=[zone.get('pump') for zone in zones],
+            pump_capacity=pump_capacity,
+            start=start
+        )
+
     def _adjust_for_forecast(
         self,
         base_needs: float,
@@ -132,80 +184,6 @@ class IrrigationPredictor:
             )
         }
         
-    def _generate_irrigation_schedule(
-        self,
-        water_needs: float,
-        efficiency_factors: Dict[str, float],
-        forecast: List[Dict]
-    ) -> List[Dict]:
-        """Generate optimal irrigation schedule"""
-        schedule = []
-        remaining_water = water_needs
-        
-        # Get optimal times based on efficiency factors
-        optimal_times = self._find_optimal_irrigation_times(
-            efficiency_factors,
-            forecast
-        )
-        
-        for time_slot in optimal_times:
-            if remaining_water <= 0:
-                break
-                
-            water_amount = min(
-                remaining_water,
-                time_slot['max_capacity'] * efficiency_factors['time_of_day_efficiency']
-            )
-            
-            schedule.append({
-                'time': time_slot['time'],
-                'duration_minutes': self._calculate_duration(water_amount),
-                'water_amount': water_amount,
-                'efficiency_score': time_slot['efficiency_score']
-            })
-            
-            remaining_water -= water_amount
-            
-        return schedule
-        
-    def _find_optimal_irrigation_times(
-        self,
-        efficiency_factors: Dict[str, float],
-        forecast: List[Dict]
-    ) -> List[Dict]:
-        """Find optimal irrigation times based on conditions"""
-        optimal_times = []
-        current_time = datetime.now()
-        
-        for hour in range(24):
-            time_slot = current_time + timedelta(hours=hour)
-            
-            # Skip times with high probability of rain
-            if any(f['precipitation_forecast'] > 0.5 for f in forecast if
-                  f['time'].hour == time_slot.hour):
-                continue
-                
-            efficiency_score = (
-                efficiency_factors['time_of_day_efficiency'] *
-                efficiency_factors['wind_efficiency'] *
-                efficiency_factors['growth_stage_factor']
-            )
-            
-            if efficiency_score > 0.7:  # Only consider efficient times
-                optimal_times.append({
-                    'time': time_slot,
-                    'efficiency_score': efficiency_score,
-                    'max_capacity': 10.0  # Maximum water amount per hour
-                })
-                
-        return sorted(optimal_times, key=lambda x: x['efficiency_score'], reverse=True)
-        
-    def _calculate_duration(self, water_amount: float) -> int:
-        """Calculate irrigation duration in minutes"""
-        # Assume flow rate of 2 units per minute
-        flow_rate = 2.0
-        return int(water_amount / flow_rate)
-        
     def _generate_recommendations(
         self,
         water_needs: float,
@@ -246,17 +224,12 @@ class IrrigationPredictor:
         temperature: float
     ) -> float:
         """Calculate time of day efficiency"""
-        # Normalize values
-        norm_radiation = min(1.0, solar_radiation / 1000.0)
-        norm_temp = min(1.0, max(0.0, (temperature - 15) / 25))
-        
-        return 1.0 - (norm_radiation * 0.6 + norm_temp * 0.4)
+        return float(time_of_day_efficiency(solar_radiation, temperature))
         
     @staticmethod
     def _calculate_wind_efficiency(wind_speed: float) -> float:
         """Calculate wind efficiency factor"""
-        # Assume optimal wind speed < 10 km/h
-        return max(0.0, 1.0 - (wind_speed / 10.0))
+        return float(wind_efficiency(wind_speed))
         
     @staticmethod
     def _calculate_growth_stage_factor(growth_stage: int) -> float:
@@ -276,7 +249,7 @@ class IrrigationPredictor:
         joblib.dump(self.model, f'{path}/irrigation_model.joblib')
         joblib.dump(self.scaler, f'{path}/irrigation_scaler.joblib')
         
-    def load_model(self, path: str):
-        """Load a trained model"""
-        self.model = joblib.load(f'{path}/irrigation_model.joblib')
-        self.scaler = joblib.load(f'{path}/irrigation_scaler.joblib')
+    def load_model(self, path: str, mmap_mode: Optional[str] = None):
+        """Load a trained model; mmap_mode='r' maps its arrays instead of copying them"""
+        self.model = joblib.load(f'{path}/irrigation_model.joblib', mmap_mode=mmap_mode)
+        self.scaler = joblib.load(f'{path}/irrigation_scaler.joblib', mmap_mode=mmap_mode)
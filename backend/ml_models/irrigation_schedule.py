@@ -0,0 +1,189 @@
+"""Farm-wide irrigation scheduling over the next day's hours.
+
+Every zone's forecast is turned into (zones, HOURS) arrays, slot 0 being
+the current hour: rain probability, solar radiation, temperature and
+wind speed. Slots without a forecast reading use the zone's current
+conditions. Efficiency of every (zone, hour) is then computed at once:
+
+    time_of_day(radiation, temperature) * wind(wind_speed) * growth stage
+
+Hours where rain is likely (> RAIN_SKIP_PROBABILITY) or efficiency is at
+most MIN_EFFICIENCY are not used. Each usable hour can deliver
+HOURLY_CAPACITY scaled by its time-of-day efficiency.
+
+Water is allocated greedily. In each round every zone with water left
+asks for its next most efficient hour, and zones on the same pump share
+that pump's hourly capacity, most efficient request first. There are at
+most HOURS rounds, each vectorized over all zones, so a whole farm is
+scheduled in one call.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+HOURS = 24
+RAIN_SKIP_PROBABILITY = 0.5
+MIN_EFFICIENCY = 0.7
+HOURLY_CAPACITY = 10.0  # Maximum water amount per hour
+FLOW_RATE = 2.0  # Water units per minute
+
+# Forecast fields that override current conditions for their hour
+FORECAST_CONDITIONS = ('solar_radiation', 'temperature', 'wind_speed')
+
+# Needs below this are treated as met
+NEGLIGIBLE_WATER = 1e-9
+
+
+def time_of_day_efficiency(solar_radiation, temperature):
+    """Lower with strong sun and heat, which evaporate more water"""
+    norm_radiation = np.minimum(1.0, np.asarray(solar_radiation, dtype=float) / 1000.0)
+    norm_temp = np.clip((np.asarray(temperature, dtype=float) - 15) / 25, 0.0, 1.0)
+    return 1.0 - (norm_radiation * 0.6 + norm_temp * 0.4)
+
+
+def wind_efficiency(wind_speed):
+    """Assumes optimal wind speed < 10 km/h"""
+    return np.maximum(0.0, 1.0 - np.asarray(wind_speed, dtype=float) / 10.0)
+
+
+def hourly_conditions(
+    forecasts: Sequence[List[Dict]],
+    current_conditions: Sequence[Dict],
+    start: datetime
+) -> Dict[str, np.ndarray]:
+    """(zones, HOURS) arrays of rain probability and FORECAST_CONDITIONS.
+
+    A forecast entry applies to the slot with the same hour of day. Rain
+    probability is the highest of its entries; other conditions are
+    averaged, falling back to the current conditions.
+    """
+    zones = len(forecasts)
+    entries = [(zone, entry) for zone, forecast in enumerate(forecasts) for entry in forecast]
+    zone_index = np.fromiter((zone for zone, _ in entries), dtype=np.int64, count=len(entries))
+    slot = (np.fromiter((entry['time'].hour for _, entry in entries), dtype=np.int64, count=len(entries)) - start.hour) % HOURS
+
+    rain = np.zeros((zones, HOURS))
+    precipitation = np.fromiter((entry['precipitation_forecast'] for _, entry in entries), dtype=float, count=len(entries))
+    np.maximum.at(rain, (zone_index, slot), precipitation)
+    arrays = {'precipitation_forecast': rain}
+
+    for name in FORECAST_CONDITIONS:
+        values = np.fromiter((entry.get(name, np.nan) for _, entry in entries), dtype=float, count=len(entries))
+        known = ~np.isnan(values)
+        total = np.zeros((zones, HOURS))
+        count = np.zeros((zones, HOURS))
+        np.add.at(total, (zone_index[known], slot[known]), values[known])
+        np.add.at(count, (zone_index[known], slot[known]), 1)
+        current = np.array([conditions[name] for conditions in current_conditions], dtype=float)
+        arrays[name] = np.where(count > 0, total / np.maximum(count, 1), current[:, None])
+    return arrays
+
+
+def hourly_efficiency(conditions: Dict[str, np.ndarray], growth_stage_factor) -> Tuple[np.ndarray, np.ndarray]:
+    """Efficiency and deliverable water per (zone, hour); both 0 where the hour is not usable"""
+    time_of_day = time_of_day_efficiency(conditions['solar_radiation'], conditions['temperature'])
+    efficiency = time_of_day * wind_efficiency(conditions['wind_speed'])
+    efficiency *= np.asarray(growth_stage_factor, dtype=float).reshape(-1, 1)
+    usable = (conditions['precipitation_forecast'] <= RAIN_SKIP_PROBABILITY) & (efficiency > MIN_EFFICIENCY)
+    return np.where(usable, efficiency, 0.0), np.where(usable, HOURLY_CAPACITY * time_of_day, 0.0)
+
+
+def allocate_water(
+    water_needs,
+    efficiency: np.ndarray,
+    capacity: np.ndarray,
+    pumps: Optional[Sequence[Hashable]] = None,
+    pump_capacity: Optional[Mapping[Hashable, float]] = None
+) -> np.ndarray:
+    """Greedy (zones, HOURS) allocation of each zone's needs.
+
+    Zones with the same entry in ``pumps`` draw at most
+    ``pump_capacity[pump]`` per hour between them; pumps missing from
+    ``pump_capacity`` (or no ``pumps`` at all) are unlimited.
+    """
+    remaining = np.array(water_needs, dtype=float)
+    zones, hours = efficiency.shape
+    allocation = np.zeros((zones, hours))
+    usable = capacity > 0
+    # Each zone's hours, most efficient first; ties stay in time order
+    order = np.argsort(np.where(usable, -efficiency, np.inf), axis=1, kind='stable')
+    ranked_usable = np.take_along_axis(usable, order, axis=1)
+
+    shared = pumps is not None and bool(pump_capacity)
+    if shared:
+        pump_ids, pump_index = np.unique(np.asarray(pumps, dtype=object).astype(str), return_inverse=True)
+        names = {str(pump): limit for pump, limit in pump_capacity.items()}
+        limits = np.array([names.get(pump, np.inf) for pump in pump_ids], dtype=float)
+        pump_left = np.repeat(limits[:, None], hours, axis=1)
+
+    for rank in range(hours):
+        # Unusable hours sort last, so a zone without one here is done
+        active = np.flatnonzero((remaining > NEGLIGIBLE_WATER) & ranked_usable[:, rank])
+        if not active.size:
+            break
+        hour = order[active, rank]
+        request = np.minimum(remaining[active], capacity[active, hour])
+
+        if shared:
+            pump = pump_index[active]
+            # Within each (pump, hour), the most efficient request is served first
+            queue = np.lexsort((-efficiency[active, hour], hour, pump))
+            active, hour, request, pump = active[queue], hour[queue], request[queue], pump[queue]
+            group = pump * hours + hour
+            requested = np.cumsum(request)
+            first = np.r_[True, group[1:] != group[:-1]]
+            ahead = requested - request - (requested - request)[first][np.cumsum(first) - 1]
+            granted = np.clip(pump_left[pump, hour] - ahead, 0.0, request)
+            np.subtract.at(pump_left, (pump, hour), granted)
+        else:
+            granted = request
+
+        allocation[active, hour] = granted
+        remaining[active] -= granted
+    return allocation
+
+
+@dataclass
+class IrrigationPlan:
+    """Hourly water allocation of many zones, from ``start`` on"""
+    start: datetime
+    water_needs: np.ndarray
+    efficiency: np.ndarray
+    allocation: np.ndarray
+
+    @property
+    def unmet(self) -> np.ndarray:
+        """Water each zone still needs after the plan"""
+        return np.maximum(self.water_needs - self.allocation.sum(axis=1), 0.0)
+
+    def schedule(self, zone: int) -> List[Dict]:
+        """Irrigation slots of one zone, most efficient first"""
+        hours = np.flatnonzero(self.allocation[zone] > 0)
+        hours = hours[np.argsort(-self.efficiency[zone, hours], kind='stable')]
+        return [
+            {
+                'time': self.start + timedelta(hours=int(hour)),
+                'duration_minutes': int(self.allocation[zone, hour] / FLOW_RATE),
+                'water_amount': float(self.allocation[zone, hour]),
+                'efficiency_score': float(self.efficiency[zone, hour])
+            }
+            for hour in hours
+        ]
+
+
+def plan_irrigation(
+    water_needs,
+    forecasts: Sequence[List[Dict]],
+    current_conditions: Sequence[Dict],
+    growth_stage_factors,
+    pumps: Optional[Sequence[Hashable]] = None,
+    pump_capacity: Optional[Mapping[Hashable, float]] = None,
+    start: Optional[datetime] = None
+) -> IrrigationPlan:
+    """Schedule every zone over the next HOURS hours in one solve"""
+    start = start or datetime.now()
+    conditions = hourly_conditions(forecasts, current_conditions, start)
+    efficiency, capacity = hourly_efficiency(conditions, growth_stage_factors)
+    allocation = allocate_water(water_needs, efficiency, capacity, pumps, pump_capacity)
+    return IrrigationPlan(start, np.asarray(water_needs, dtype=float), efficiency, allocation)
@@ -0,0 +1,204 @@
+"""Versioned model artifacts with one shared, memory-mapped instance per version.
+
+Layout under the registry root:
+
+    <kind>/<version>/            artifacts written by the model's save method
+    <kind>/<version>/metadata.json
+    <kind>/CURRENT               version that get(kind) serves
+
+A version directory is written under a temporary name and renamed into
+place, so readers never see half-written artifacts. scikit-learn models
+are loaded with ``joblib.load(mmap_mode='r')``: their arrays are mapped
+from the file instead of copied, so every worker process on a host
+shares the same pages.
+
+Each process keeps one instance per (kind, version). ``activate`` loads
+the new version, then atomically replaces CURRENT; other workers notice
+the changed file on their next ``get`` and swap without a restart.
+Callers still holding the old instance finish with it undisturbed.
+"""
+import importlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from backend.core.lazy_imports import registry as lazy_registry
+
+logger = logging.getLogger(__name__)
+
+# kind -> (class path, save method, load method)
+MODEL_TYPES = {
+    'irrigation_predictor': ('backend.ml_models.irrigation_predictor.IrrigationPredictor', 'save_model', 'load_model'),
+    'crop_health_analyzer': ('backend.ml_models.crop_analyzer.CropHealthAnalyzer', 'save_models', 'load_models'),
+}
+
+CURRENT_FILE = 'CURRENT'
+METADATA_FILE = 'metadata.json'
+
+
+class ModelNotFoundError(LookupError):
+    """No artifacts for the requested kind or version"""
+
+
+class ModelRegistry:
+    """Stores, versions and serves model artifacts for one root directory"""
+
+    def __init__(self, root: str, mmap_mode: Optional[str] = 'r'):
+        self.root = Path(root)
+        self.mmap_mode = mmap_mode
+        self._instances: Dict[Tuple[str, str], Any] = {}
+        self._active: Dict[str, Tuple[Tuple[int, int], str]] = {}  # kind -> (CURRENT inode/mtime, version)
+        self._served: Dict[str, str] = {}  # kind -> version get() last served
+        self._lock = threading.RLock()
+
+    def _kind_dir(self, kind: str) -> Path:
+        if kind not in MODEL_TYPES:
+            raise ValueError(f"Unknown model kind {kind}")
+        return self.root / kind
+
+    def save(self, kind: str, model: Any, metadata: Optional[Dict] = None, activate: bool = False) -> str:
+        """Write a new version of ``model``; returns the version"""
+        kind_dir = self._kind_dir(kind)
+        kind_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.utcnow()
+        version = created.strftime('%Y%m%dT%H%M%S%fZ')
+
+        staging = Path(tempfile.mkdtemp(prefix=f'.{version}-', dir=kind_dir))
+        try:
+            getattr(model, MODEL_TYPES[kind][1])(str(staging))
+            files = sorted(p.name for p in staging.iterdir())
+            (staging / METADATA_FILE).write_text(json.dumps({
+                'kind': kind,
+                'version': version,
+                'created_at': created.isoformat(),
+                'files': {name: (staging / name).stat().st_size for name in files},
+                'metadata': metadata or {},
+            }, indent=2))
+            os.rename(staging, kind_dir / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info(f"Saved {kind} version {version}")
+
+        if activate:
+            self.activate(kind, version)
+        return version
+
+    def versions(self, kind: str) -> List[str]:
+        """Stored versions, oldest first"""
+        kind_dir = self._kind_dir(kind)
+        if not kind_dir.is_dir():
+            return []
+        return sorted(
+            p.name for p in kind_dir.iterdir()
+            if not p.name.startswith('.') and (p / METADATA_FILE).is_file()
+        )
+
+    def metadata(self, kind: str, version: str) -> Dict:
+        path = self._kind_dir(kind) / version / METADATA_FILE
+        if not path.is_file():
+            raise ModelNotFoundError(f"{kind} version {version} not found")
+        return json.loads(path.read_text())
+
+    def current_version(self, kind: str) -> Optional[str]:
+        """Version in CURRENT; the file is re-read only when it changes"""
+        path = self._kind_dir(kind) / CURRENT_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        # activate() replaces the file, so a swap always changes the inode
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        cached = self._active.get(kind)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        version = path.read_text().strip()
+        self._active[kind] = (stamp, version)
+        return version
+
+    def activate(self, kind: str, version: str) -> Any:
+        """Serve ``version`` from now on; loads it first so the swap is instant"""
+        instance = self.load(kind, version)
+        kind_dir = self._kind_dir(kind)
+        fd, staging = tempfile.mkstemp(prefix=f'.{CURRENT_FILE}-', dir=kind_dir)
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(staging, kind_dir / CURRENT_FILE)
+        logger.info(f"Activated {kind} version {version}")
+        self._swap(kind, version)
+        return instance
+
+    def load(self, kind: str, version: str) -> Any:
+        """Shared instance of one version, loaded on first request"""
+        key = (kind, version)
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if key not in self._instances:
+                self.metadata(kind, version)  # Raises if missing
+                class_path, _, load_method = MODEL_TYPES[kind]
+                module_name, class_name = class_path.rsplit('.', 1)
+                instance = getattr(importlib.import_module(module_name), class_name)()
+                getattr(instance, load_method)(str(self._kind_dir(kind) / version), mmap_mode=self.mmap_mode)
+                self._instances[key] = instance
+                logger.info(f"Loaded {kind} version {version}")
+            return self._instances[key]
+
+    def get(self, kind: str, version: Optional[str] = None) -> Any:
+        """Instance of ``version``, or of the active version"""
+        if version is None:
+            version = self.current_version(kind)
+            if version is None:
+                raise ModelNotFoundError(f"No active {kind} version")
+            if self._served.get(kind) != version:
+                self._swap(kind, version)
+        return self.load(kind, version)
+
+    def warm(self, kinds: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Load the active version of each kind that has one; returns the versions"""
+        loaded = {}
+        for kind in kinds or list(MODEL_TYPES):
+            version = self.current_version(kind)
+            if version is not None:
+                self.load(kind, version)
+            loaded[kind] = version
+        return loaded
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            kind: {
+                'versions': self.versions(kind),
+                'active': self.current_version(kind),
+                'loaded': sorted(version for loaded_kind, version in self._instances if loaded_kind == kind),
+            }
+            for kind in MODEL_TYPES
+        }
+
+    def _swap(self, kind: str, version: str):
+        """Drop instances of superseded versions; holders keep their reference"""
+        with self._lock:
+            for key in [key for key in self._instances if key[0] == kind and key[1] != version]:
+                del self._instances[key]
+            self._served[kind] = version
+
+
+_default_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry at settings.MODEL_REGISTRY_PATH"""
+    global _default_registry
+    if _default_registry is None:
+        from backend.core.config import settings
+        _default_registry = ModelRegistry(settings.MODEL_REGISTRY_PATH)
+    return _default_registry
+
+
+# Lets LAZY_WARMUP include "models" to load active versions at startup
+lazy_registry.register('models', lambda: get_model_registry().warm())
@@ -0,0 +1,230 @@
+"""Tiled NDVI statistics for rasters too large to load at once.
+
+The raster is split into square tiles. Each tile's NIR and red bands are
+read on their own, from a memory-mapped ``.npy`` array or with windowed
+reads through rasterio for GeoTIFFs. NDVI is computed in float32 in two
+tile-sized buffers, and the tile is reduced to an NDVIStats: count, sum,
+min, max, histogram and stressed pixels. Partial stats merge in any
+order, so tiles run in a process pool and only the small stats come
+back, never pixels.
+
+Other formats fall back to ``cv2.imread`` of the whole image, as before,
+but are still reduced tile by tile.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+from backend.core.lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+rasterio = lazy_import('rasterio')
+rasterio_windows = lazy_import('rasterio.windows')
+
+# Channel order of cv2.imread (BGR) images as produced by our NIR cameras
+NIR_BAND = 0
+RED_BAND = 2
+
+TILE_SIZE = 2048
+HISTOGRAM_BINS = 200
+STRESS_THRESHOLD = 0.2
+
+Window = Tuple[int, int, int, int]  # row, col, height, width
+
+
+@dataclass
+class NDVIStats:
+    """Mergeable NDVI summary of any number of pixels"""
+    bins: int = HISTOGRAM_BINS
+    count: int = 0
+    total: float = 0.0
+    minimum: float = np.inf
+    maximum: float = -np.inf
+    stressed: int = 0
+    tiles: int = 0
+    histogram: np.ndarray = field(default=None)
+
+    def __post_init__(self):
+        if self.histogram is None:
+            self.histogram = np.zeros(self.bins, dtype=np.int64)
+
+    def add(self, ndvi: np.ndarray, stress_threshold: float = STRESS_THRESHOLD):
+        if ndvi.size == 0:
+            return
+        self.count += ndvi.size
+        self.total += float(ndvi.sum(dtype=np.float64))
+        self.minimum = min(self.minimum, float(ndvi.min()))
+        self.maximum = max(self.maximum, float(ndvi.max()))
+        self.stressed += int(np.count_nonzero(ndvi < stress_threshold))
+        self.histogram += np.histogram(ndvi, bins=self.bins, range=(-1.0, 1.0))[0]
+        self.tiles += 1
+
+    def merge(self, other: 'NDVIStats') -> 'NDVIStats':
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.stressed += other.stressed
+        self.histogram += other.histogram
+        self.tiles += other.tiles
+        return self
+
+    def summary(self) -> Dict:
+        """Keys of CropHealthAnalyzer.analyze_ndvi_image plus the histogram"""
+        if not self.count:
+            raise ValueError("No pixels analyzed")
+        return {
+            'mean_ndvi': self.total / self.count,
+            'min_ndvi': self.minimum,
+            'max_ndvi': self.maximum,
+            'stress_areas': self.stressed / self.count * 100,
+            'histogram': {
+                'edges': np.linspace(-1.0, 1.0, self.bins + 1).tolist(),
+                'counts': self.histogram.tolist(),
+            },
+            'pixels': self.count,
+            'tiles': self.tiles,
+        }
+
+
+def ndvi_float32(nir: np.ndarray, red: np.ndarray) -> np.ndarray:
+    """(nir - red) / (nir + red) in float32 using two band-sized buffers"""
+    ndvi = nir.astype(np.float32)
+    np.subtract(ndvi, red, out=ndvi)                 # nir - red
+    denominator = red.astype(np.float32)
+    np.multiply(denominator, 2, out=denominator)
+    np.add(denominator, ndvi, out=denominator)       # nir + red
+    denominator[denominator == 0] = 0.01             # Avoid division by zero
+    np.divide(ndvi, denominator, out=ndvi)
+    return ndvi
+
+
+def rasterio_band(channel: int, band_count: int) -> int:
+    """1-based file band that cv2.imread returns as ``channel``.
+
+    cv2 reverses the first three bands (RGB to BGR, RGBA to BGRA); any
+    further bands keep their file order.
+    """
+    if band_count >= 3 and channel < 3:
+        return 3 - channel
+    return channel + 1
+
+
+def _check_bands(path: str, shape: Tuple[int, ...], nir_band: int, red_band: int):
+    # A 2-D array would index image columns instead of bands
+    if len(shape) != 3 or max(nir_band, red_band) >= shape[2]:
+        raise ValueError(
+            f"{path} has shape {shape}; NDVI needs bands {nir_band} and {red_band} on the last axis"
+        )
+
+
+def tile_windows(height: int, width: int, tile_size: int = TILE_SIZE) -> Iterator[Window]:
+    for row in range(0, height, tile_size):
+        for col in range(0, width, tile_size):
+            yield row, col, min(tile_size, height - row), min(tile_size, width - col)
+
+
+@dataclass
+class RasterSource:
+    """Where tiles are read from; cheap to pickle except for in-memory images"""
+    path: str
+    kind: str  # 'npy', 'rasterio' or 'memory'
+    height: int
+    width: int
+    nir_band: int = NIR_BAND
+    red_band: int = RED_BAND
+    image: Optional[np.ndarray] = None
+    origin: Tuple[int, int] = (0, 0)  # Position of ``image`` in the raster
+
+    @classmethod
+    def open(cls, path: str, nir_band: int = NIR_BAND, red_band: int = RED_BAND) -> 'RasterSource':
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.npy':
+            shape = np.load(path, mmap_mode='r').shape
+            _check_bands(path, shape, nir_band, red_band)
+            return cls(path, 'npy', shape[0], shape[1], nir_band, red_band)
+        if extension in ('.tif', '.tiff'):
+            try:
+                with rasterio.open(path) as dataset:
+                    return cls(path, 'rasterio', dataset.height, dataset.width, nir_band, red_band)
+            except ImportError:
+                pass  # rasterio is optional; read the whole file below
+        # Always 8-bit BGR, whatever the file holds, as before tiling
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Could not read image {path}")
+        _check_bands(path, image.shape, nir_band, red_band)
+        return cls(path, 'memory', image.shape[0], image.shape[1], nir_band, red_band, image)
+
+    def read(self, window: Window) -> Tuple[np.ndarray, np.ndarray]:
+        """NIR and red bands of one tile"""
+        row, col, height, width = window
+        if self.kind == 'rasterio':
+            with rasterio.open(self.path) as dataset:
+                # Band indices are cv2 channels, so both readers see the same bands
+                bands = dataset.read(
+                    indexes=[rasterio_band(self.nir_band, dataset.count), rasterio_band(self.red_band, dataset.count)],
+                    window=rasterio_windows.Window(col, row, width, height)
+                )
+            return bands[0], bands[1]
+        if self.kind == 'npy':
+            image = np.load(self.path, mmap_mode='r')
+        else:
+            image = self.image
+            row, col = row - self.origin[0], col - self.origin[1]
+        tile = image[row:row + height, col:col + width]
+        return tile[..., self.nir_band], tile[..., self.red_band]
+
+    def for_window(self, window: Window) -> 'RasterSource':
+        """Copy to send to a worker; in-memory images carry only their tile"""
+        if self.kind != 'memory':
+            return self
+        row, col, height, width = window
+        tile = self.image[row:row + height, col:col + width]
+        return RasterSource(self.path, self.kind, self.height, self.width, self.nir_band, self.red_band, tile, (row, col))
+
+
+def analyze_tile(
+    source: RasterSource,
+    window: Window,
+    bins: int = HISTOGRAM_BINS,
+    stress_threshold: float = STRESS_THRESHOLD
+) -> NDVIStats:
+    stats = NDVIStats(bins)
+    stats.add(ndvi_float32(*source.read(window)), stress_threshold)
+    return stats
+
+
+def analyze_ndvi_raster(
+    path: str,
+    tile_size: int = TILE_SIZE,
+    workers: Optional[int] = None,
+    nir_band: int = NIR_BAND,
+    red_band: int = RED_BAND,
+    bins: int = HISTOGRAM_BINS,
+    stress_threshold: float = STRESS_THRESHOLD
+) -> NDVIStats:
+    """NDVI statistics of a raster, tile by tile.
+
+    ``workers`` defaults to one process per core; 0 or 1 (or a single
+    tile) runs in this process.
+    """
+    source = RasterSource.open(path, nir_band, red_band)
+    windows = list(tile_windows(source.height, source.width, tile_size))
+    workers = os.cpu_count() if workers is None else workers
+    stats = NDVIStats(bins)
+
+    if workers <= 1 or len(windows) == 1:
+        for window in windows:
+            stats.merge(analyze_tile(source, window, bins, stress_threshold))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(windows))) as pool:
+        futures = [
+            pool.submit(analyze_tile, source.for_window(window), window, bins, stress_threshold)
+            for window in windows
+        ]
+        for future in as_completed(futures):
+            stats.merge(future.result())
+    return stats
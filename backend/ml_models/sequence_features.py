@@ -0,0 +1,96 @@
+"""Sequence features for the growth-stage LSTM.
+
+The model reads the last SEQUENCE_LENGTH days of GROWTH_FEATURES per
+zone. ``latest_windows`` takes those windows from a zone's history as a
+strided view (``sliding_window_view``) without copying every overlapping
+window, and only the windows the caller asks for are ever materialized.
+
+``ZoneSequenceWindow`` keeps the current window for one zone so new
+daily data is an O(features) update instead of rebuilding from history.
+Rows are written twice into a buffer of twice the window length, so the
+latest window is always one contiguous slice.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SEQUENCE_LENGTH = 30
+
+# LSTM input columns, in order
+GROWTH_FEATURES = (
+    'temperature',
+    'humidity',
+    'soil_moisture',
+    'soil_ph',
+    'nitrogen',
+    'phosphorus',
+    'potassium',
+    'solar_radiation'
+)
+
+# Days of plant height used for the growth rate
+GROWTH_RATE_DAYS = 7
+
+
+def sequence_matrix(history: Union[np.ndarray, Sequence[Dict]]) -> np.ndarray:
+    """(days, features) float32 array from daily dicts or an existing array"""
+    if isinstance(history, np.ndarray):
+        return history.astype(np.float32, copy=False)
+    return np.array([[day[name] for name in GROWTH_FEATURES] for day in history], dtype=np.float32)
+
+
+def latest_windows(
+    data: np.ndarray,
+    sequence_length: int = SEQUENCE_LENGTH,
+    count: int = 1
+) -> Optional[np.ndarray]:
+    """Last ``count`` overlapping windows as a (count, length, features) view"""
+    if len(data) < sequence_length:
+        return None
+    windows = sliding_window_view(data, sequence_length, axis=0)  # (n, features, length)
+    return windows[-count:].transpose(0, 2, 1)
+
+
+def growth_rate(heights: Sequence[float]) -> Optional[float]:
+    """Mean daily height change, or None with fewer than two measurements"""
+    if len(heights) < 2:
+        return None
+    return float(np.diff(heights).mean())
+
+
+class ZoneSequenceWindow:
+    """Rolling window of one zone's daily features"""
+
+    def __init__(self, sequence_length: int = SEQUENCE_LENGTH, features: int = len(GROWTH_FEATURES)):
+        self.sequence_length = sequence_length
+        self._buffer = np.zeros((2 * sequence_length, features), dtype=np.float32)
+        self._next = 0
+        self.days = 0
+        self.heights = deque(maxlen=GROWTH_RATE_DAYS)
+
+    @property
+    def ready(self) -> bool:
+        return self.days >= self.sequence_length
+
+    def append(self, row: np.ndarray, height: Optional[float] = None):
+        """Add one day; the oldest day drops out once the window is full"""
+        self._buffer[self._next] = row
+        self._buffer[self._next + self.sequence_length] = row
+        self._next = (self._next + 1) % self.sequence_length
+        self.days += 1
+        if height is not None:
+            self.heights.append(height)
+
+    def window(self) -> np.ndarray:
+        """Current (length, features) window, oldest day first; a view into the buffer"""
+        return self._buffer[self._next:self._next + self.sequence_length]
+
+    def extend(self, history: Union[np.ndarray, List[Dict]]):
+        """Seed from history; only the days that stay in the window are written"""
+        data = sequence_matrix(history)
+        self.days += max(0, len(data) - self.sequence_length)
+        for row in data[-self.sequence_length:]:
+            self.append(row)
+        if not isinstance(history, np.ndarray):
+            self.heights.extend(day['height'] for day in history[-GROWTH_RATE_DAYS:] if 'height' in day)
@@ -0,0 +1,133 @@
+"""Batch stress detection over many field images.
+
+    summary = run_stress_pipeline(iter_image_paths('/data/field-2024-06'),
+                                  'tomato', 'determinate', 'Vegetative',
+                                  output='stress.ndjson')
+
+The crop profile is resolved once in the calling process, so workers
+only receive image paths and the indicator names to measure. Each worker
+decodes its image and runs detect_indicators, which computes every
+colorspace conversion once and skips Canny and contours when no shape
+indicator is requested.
+
+Results are written as NDJSON, one line per image, as they complete
+(not in input order). The number of images in flight is bounded, so a
+stream of paths of any length is read only as fast as workers finish.
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Union
+import numpy as np
+from backend.ml_models.crop_patterns import IMAGE_STRESS_DETECTORS, CropPatternAnalyzer, cv2, detect_indicators
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.npy')
+
+# Images queued per worker beyond the one it is processing
+IN_FLIGHT_PER_WORKER = 4
+
+
+def iter_image_paths(directory: str, extensions=IMAGE_EXTENSIONS) -> Iterator[str]:
+    """Image files under ``directory``, in sorted order, recursively"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def load_image(path: str) -> np.ndarray:
+    """BGR image from disk; .npy arrays are used as-is"""
+    if path.lower().endswith('.npy'):
+        return np.load(path)
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Could not decode {path}")
+    return image
+
+
+def analyze_image_file(path: str, indicators: List[str]) -> Dict:
+    """Decode and analyze one image; errors are reported, not raised"""
+    started = time.perf_counter()
+    try:
+        result = {'image': path, 'indicators': detect_indicators(load_image(path), indicators)}
+    except Exception as e:
+        result = {'image': path, 'error': str(e)}
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def run_stress_pipeline(
+    images: Union[str, os.PathLike, Iterable[str]],
+    crop_name: str,
+    variety: str,
+    growth_stage: str,
+    output: Union[str, os.PathLike, IO[str], None] = None,
+    workers: Optional[int] = None,
+    analyzer: Optional[CropPatternAnalyzer] = None
+) -> Dict:
+    """Analyze every image and write results incrementally; returns a throughput summary.
+
+    ``images`` is an iterable of image paths or a directory to search
+    with iter_image_paths. ``workers`` defaults to one process per core;
+    0 or 1 runs in this process. ``output`` is a path or text file for
+    NDJSON results.
+    """
+    if isinstance(images, (str, os.PathLike)):
+        # A lone path string would otherwise be iterated character by character
+        if not os.path.isdir(images):
+            raise ValueError(f"Not a directory: {os.fspath(images)}; pass a directory or an iterable of image paths")
+        images = iter_image_paths(os.fspath(images))
+
+    indicators = (analyzer or CropPatternAnalyzer()).stage_stress_indicators(crop_name, variety, growth_stage)
+    if indicators is None:
+        raise ValueError(f"Unknown growth stage {growth_stage} for {crop_name} {variety}")
+    indicators = [name for name in indicators if name in IMAGE_STRESS_DETECTORS]
+
+    owns_sink = isinstance(output, (str, os.PathLike))
+    sink = open(output, 'w') if owns_sink else output
+    summary = {'images': 0, 'failed': 0}
+
+    def record(result: Dict):
+        summary['images'] += 1
+        summary['failed'] += 'error' in result
+        if sink is not None:
+            sink.write(json.dumps(result, default=_to_json) + '\n')
+            sink.flush()
+
+    workers = os.cpu_count() if workers is None else workers
+    started = time.perf_counter()
+    try:
+        if workers <= 1:
+            for path in images:
+                record(analyze_image_file(path, indicators))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Set[Future] = set()
+                for path in images:
+                    if len(pending) >= workers * (1 + IN_FLIGHT_PER_WORKER):
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(future.result())
+                    pending.add(pool.submit(analyze_image_file, path, indicators))
+                for future in wait(pending).done:
+                    record(future.result())
+    finally:
+        if owns_sink:
+            sink.close()
+
+    elapsed = time.perf_counter() - started
+    summary.update(
+        indicators=indicators,
+        workers=max(workers, 1),
+        seconds=round(elapsed, 3),
+        images_per_second=round(summary['images'] / elapsed, 2) if elapsed else 0.0
+    )
+    return summary
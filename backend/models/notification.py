@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from backend.models.base import Base
 from datetime import datetime
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Alerts are listed newest first, optionally for one severity
+    __table_args__ = (
+        Index("idx_notifications_timestamp", "timestamp"),
+        Index("idx_notifications_severity_time", "severity", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from backend.models.base import Base
 from datetime import datetime
 
 class SatelliteData(Base):
     __tablename__ = "satellite_data"
+    __table_args__ = (
+        Index("idx_satellite_data_zone_time", "zone_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     zone_id = Column(String(50), ForeignKey("zones.zone_id"), nullable=False)
@@ -1,14 +1,19 @@
-from sqlalchemy import Column, Integer, Float, DateTime, String, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, DateTime, String, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from backend.models.base import Base
 
 class SensorData(Base):
     __tablename__ = "sensor_data"
+    # Every read is a time range for one zone or one device
+    __table_args__ = (
+        Index("idx_sensor_data_zone_time", "zone_id", "timestamp"),
+        Index("idx_sensor_data_device_time", "device_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     zone_id = Column(String(50), ForeignKey("zones.zone_id"))
-    device_id = Column(String(50), index=True)
+    device_id = Column(String(50))
     timestamp = Column(DateTime, default=datetime.utcnow)
     soil_moisture = Column(Float)
     soil_temp = Column(Float)
@@ -29,8 +34,44 @@ class SensorData(Base):
     # Relationships
     zone = relationship("Zone", back_populates="sensor_data")
 
+class SensorDataRollup(Base):
+    """Hourly aggregate of sensor_data kept after the raw rows expire.
+
+    Sensor columns hold the hourly mean (``is_raining`` becomes the fraction
+    of readings that saw rain); ``total_water`` holds the hourly maximum
+    of the running counter.
+    """
+    __tablename__ = "sensor_data_rollups"
+    __table_args__ = (
+        Index("idx_sensor_rollups_zone_bucket", "zone_id", "bucket", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    zone_id = Column(String(50), nullable=False)
+    bucket = Column(DateTime, nullable=False)  # start of the hour
+    samples = Column(Integer, nullable=False)
+    soil_moisture = Column(Float)
+    soil_temp = Column(Float)
+    soil_ph = Column(Float)
+    soil_ec = Column(Float)
+    soil_n = Column(Float)
+    soil_p = Column(Float)
+    soil_k = Column(Float)
+    air_temp = Column(Float)
+    air_humidity = Column(Float)
+    light_level = Column(Float)
+    pressure = Column(Float)
+    wind_speed = Column(Float)
+    is_raining = Column(Float)
+    flow_rate = Column(Float)
+    total_water = Column(Float)
+
 class ArduinoStatus(Base):
     __tablename__ = "arduino_status"
+    # Zone fan-out resolves controllers by zone
+    __table_args__ = (
+        Index("idx_arduino_status_zone", "zone_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     device_id = Column(String(50), unique=True, index=True)
@@ -49,9 +90,13 @@ class ArduinoStatus(Base):
 
 class Command(Base):
     __tablename__ = "commands"
+    # Controllers poll for their own pending commands
+    __table_args__ = (
+        Index("idx_commands_device_status", "device_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    device_id = Column(String(50), index=True)
+    device_id = Column(String(50))
     command_type = Column(String(50))
     parameters = Column(JSON)
     status = Column(String(20), default='pending')
@@ -77,6 +122,10 @@ class Command(Base):
 
 class IrrigationLog(Base):
     __tablename__ = "irrigation_logs"
+    # Exports and active-run lookups are per zone
+    __table_args__ = (
+        Index("idx_irrigation_logs_zone_time", "zone_id", "start_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     zone_id = Column(String(50), ForeignKey("zones.zone_id"))
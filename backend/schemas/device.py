@@ -75,3 +75,18 @@ class CommandResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class CommandStatusUpdate(BaseModel):
+    status: str
+    error_message: Optional[str] = None
+
+class ZoneIrrigationStart(BaseModel):
+    zone_id: str
+    duration: int = Field(..., ge=1, le=86400)  # seconds
+
+class BulkIrrigationStart(BaseModel):
+    zones: List[ZoneIrrigationStart]
+    type: str = "manual"
+
+class BulkIrrigationStop(BaseModel):
+    zone_ids: List[str]
@@ -1,211 +1,444 @@
 import logging
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from backend.models.sensor_data import SensorData, ArduinoStatus, ArduinoCommand, IrrigationLog
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models.sensor_data import SensorData, ArduinoStatus, Command, IrrigationLog
+from backend.services.command_channel import CommandChannel, command_channel
+from backend.services.telemetry_protocol import JSON_SENSOR_FIELDS, decode_telemetry
 from typing import Optional, Dict, List
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, insert, select, update, bindparam
+import time
 
 logger = logging.getLogger(__name__)
 
 class ArduinoService:
-    def __init__(self):
+    def __init__(self, channel: Optional[CommandChannel] = None):
         self.command_timeout = timedelta(minutes=5)  # Commands expire after 5 minutes
+        self.channel = channel or command_channel
+        self.status_flush_size = 100  # Buffered status updates per bulk write
+        self.status_flush_interval = 5.0  # seconds
+        self._last_status_flush = time.monotonic()
 
-    async def process_sensor_data(self, device_id: str, data: Dict, db: Session) -> bool:
+    async def process_sensor_data(self, device_id: str, data: Dict, db: AsyncSession) -> bool:
         """Process incoming sensor data from Arduino"""
         try:
-            # Update device status
-            status = db.query(ArduinoStatus)\
-                .filter(ArduinoStatus.device_id == device_id)\
-                .first()
-                
-            if not status:
-                status = ArduinoStatus(device_id=device_id)
-                db.add(status)
-            
-            status.last_seen = datetime.utcnow()
-            status.battery_level = data.get("battery_level")
-            status.is_online = True
-            status.firmware_version = data.get("firmware_version")
-            status.signal_strength = data.get("signal_strength")
+            await self._touch_device_status(
+                device_id,
+                db,
+                battery_level=data.get("battery_level"),
+                firmware_version=data.get("firmware_version"),
+                signal_strength=data.get("signal_strength")
+            )
             
             # Save sensor readings
             if "zone_id" in data and data.get("sensor_data"):
+                readings = data["sensor_data"]
                 sensor_data = SensorData(
                     zone_id=data["zone_id"],
                     device_id=device_id,
-                    soil_moisture=data["sensor_data"].get("moisture"),
-                    temperature=data["sensor_data"].get("temperature"),
-                    humidity=data["sensor_data"].get("humidity"),
-                    light_level=data["sensor_data"].get("light"),
-                    battery_level=data["sensor_data"].get("battery")
+                    **{column: readings.get(key) for key, column in JSON_SENSOR_FIELDS.items()}
                 )
                 db.add(sensor_data)
             
-            db.commit()
+            await db.commit()
             return True
         except Exception as e:
+            await db.rollback()
             logger.error(f"Error processing sensor data: {e}")
             return False
 
-    async def get_pending_commands(self, device_id: str, db: Session) -> List[Dict]:
-        """Get pending commands for Arduino"""
+    async def ingest_telemetry(self, device_id: str, payload: bytes, db: AsyncSession) -> int:
+        """Store a binary telemetry batch; returns the number of readings saved.
+
+        Raises ValueError for a malformed payload.
+        """
+        batch = decode_telemetry(payload)
         try:
-            # Get commands that are pending and not expired
-            expiry_time = datetime.utcnow() - self.command_timeout
-            commands = db.query(ArduinoCommand)\
-                .filter(
-                    and_(
-                        ArduinoCommand.device_id == device_id,
-                        ArduinoCommand.status == "pending",
-                        ArduinoCommand.created_at > expiry_time
-                    )
-                )\
-                .all()
+            status = await self._touch_device_status(
+                device_id,
+                db,
+                battery_level=batch.battery_level,
+                firmware_version=batch.firmware_version,
+                signal_strength=batch.signal_strength
+            )
+            zone_id = batch.zone_id or status.zone_id
+            rows = batch.to_rows(device_id, zone_id, datetime.utcnow()) if len(batch) else []
+            if rows:
+                await db.execute(insert(SensorData.__table__), rows)
+            await db.commit()
+            return len(rows)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error ingesting telemetry: {e}")
+            raise
+
+    async def _touch_device_status(
+        self,
+        device_id: str,
+        db: AsyncSession,
+        battery_level=None,
+        firmware_version=None,
+        signal_strength=None
+    ) -> ArduinoStatus:
+        result = await db.execute(
+            select(ArduinoStatus).where(ArduinoStatus.device_id == device_id).limit(1)
+        )
+        status = result.scalars().first()
             
-            return [
-                {
-                    "command_id": cmd.id,
-                    "type": cmd.command_type,
-                    "parameters": cmd.parameters
-                }
-                for cmd in commands
-            ]
+        if not status:
+            status = ArduinoStatus(device_id=device_id)
+            db.add(status)
+        
+        status.last_seen = datetime.utcnow()
+        status.battery_level = battery_level
+        status.is_online = True
+        status.firmware_version = firmware_version
+        status.signal_strength = signal_strength
+        return status
+
+    async def get_pending_commands(self, device_id: str, db: AsyncSession, wait: float = 0) -> List[Dict]:
+        """Get pending commands for Arduino.
+
+        Commands are served from the in-memory channel; with ``wait`` > 0 the
+        call long-polls until a command is queued or the wait runs out. The
+        database is only read to (re)sync the channel.
+        """
+        try:
+            if self.channel.needs_sync(device_id):
+                # Persist buffered statuses first so the reload does not
+                # resurrect commands that were already acknowledged or dropped
+                await self.flush_status_updates(db)
+                self.channel.sync(device_id, await self._load_pending_commands(device_id, db))
+                # Release the connection before holding the request open
+                await db.rollback()
+            return await self.channel.wait_for_commands(device_id, wait)
         except Exception as e:
             logger.error(f"Error getting pending commands: {e}")
             return []
 
+    async def _load_pending_commands(self, device_id: str, db: AsyncSession) -> List:
+        """Read pending, unexpired commands for a device from the database"""
+        result = await db.execute(self._pending_commands_query(device_id, datetime.utcnow()))
+        commands = result.scalars().all()
+        return [
+            (self._command_payload(cmd), cmd.created_at, cmd.priority, cmd.expiry_time)
+            for cmd in commands
+        ]
+
+    def _pending_commands_query(self, device_id: str, now: datetime):
+        return select(Command).where(
+            and_(
+                Command.device_id == device_id,
+                Command.status == "pending",
+                or_(
+                    Command.expiry_time > now,
+                    and_(
+                        Command.expiry_time.is_(None),
+                        Command.created_at > now - self.command_timeout
+                    )
+                )
+            )
+        )
+
+    def _command_payload(self, command: Command) -> Dict:
+        return {
+            "command_id": command.id,
+            "type": command.command_type,
+            "parameters": command.parameters
+        }
+
     async def update_command_status(
         self, 
         device_id: str, 
         command_id: int, 
         status: str, 
         error_message: Optional[str],
-        db: Session
+        db: AsyncSession
     ) -> bool:
-        """Update command execution status"""
+        """Update command execution status.
+
+        Statuses for commands delivered through the channel are buffered and
+        written in bulk; anything else is looked up and written directly.
+        """
         try:
-            command = db.query(ArduinoCommand)\
-                .filter(
+            if self.channel.acknowledge(device_id, command_id, status, error_message):
+                await self.maybe_flush_status_updates(db)
+                return True
+
+            result = await db.execute(
+                select(Command)
+                .where(
                     and_(
-                        ArduinoCommand.id == command_id,
-                        ArduinoCommand.device_id == device_id
+                        Command.id == command_id,
+                        Command.device_id == device_id
                     )
-                )\
-                .first()
+                )
+                .limit(1)
+            )
+            command = result.scalars().first()
                 
             if command:
                 command.status = status
                 command.executed_at = datetime.utcnow()
                 command.error_message = error_message
-                db.commit()
+                await db.commit()
                 return True
             return False
         except Exception as e:
             logger.error(f"Error updating command status: {e}")
             return False
 
+    async def maybe_flush_status_updates(self, db: AsyncSession) -> int:
+        """Flush buffered statuses once enough have accumulated or enough time passed"""
+        if (self.channel.pending_status_updates >= self.status_flush_size or
+                time.monotonic() - self._last_status_flush >= self.status_flush_interval):
+            return await self.flush_status_updates(db)
+        return 0
+
+    async def flush_status_updates(self, db: AsyncSession) -> int:
+        """Write all buffered command statuses in one executemany UPDATE"""
+        self._last_status_flush = time.monotonic()
+        updates = self.channel.pop_status_updates()
+        if not updates:
+            return 0
+        table = Command.__table__
+        statement = update(table)\
+            .where(
+                and_(
+                    table.c.id == bindparam('b_id'),
+                    table.c.device_id == bindparam('b_device_id')
+                )
+            )\
+            .values(
+                status=bindparam('status'),
+                error_message=bindparam('error_message'),
+                executed_at=bindparam('executed_at')
+            )
+        try:
+            await db.execute(statement, updates)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error flushing command statuses: {e}")
+            self.channel.restore_status_updates(updates)
+            return 0
+        return len(updates)
+
     async def queue_command(
         self, 
         device_id: str, 
         command_type: str, 
         parameters: Dict,
-        db: Session
+        db: AsyncSession,
+        priority: int = 1,
+        expires_in: Optional[timedelta] = None
     ) -> bool:
-        """Queue a new command for Arduino"""
+        """Queue a new command for Arduino; higher priority is delivered first"""
         try:
-            command = ArduinoCommand(
+            now = datetime.utcnow()
+            command = Command(
                 device_id=device_id,
                 command_type=command_type,
                 parameters=parameters,
-                status="pending"
+                status="pending",
+                priority=priority,
+                created_at=now,
+                expiry_time=now + (expires_in or self.command_timeout)
             )
             db.add(command)
-            db.commit()
+            await db.flush()
+            # Channel entry built before the commit; published only if it succeeds
+            entry = (self._command_payload(command), command.created_at, command.priority, command.expiry_time)
+            await db.commit()
+            # Persisted first, then pushed to any waiting long-poll
+            self.channel.publish(device_id, *entry)
             return True
         except Exception as e:
+            await db.rollback()
             logger.error(f"Error queueing command: {e}")
             return False
 
-    async def start_irrigation(self, zone_id: str, duration: int, db: Session) -> bool:
+    async def start_irrigation(self, zone_id: str, duration: int, db: AsyncSession) -> bool:
         """Queue irrigation start command"""
+        outcome = await self.start_irrigation_many({zone_id: duration}, db)
+        return outcome[zone_id]['status'] == 'queued'
+
+    async def stop_irrigation(self, zone_id: str, db: AsyncSession) -> bool:
+        """Queue irrigation stop command"""
+        outcome = await self.stop_irrigation_many([zone_id], db)
+        return outcome[zone_id]['status'] == 'queued'
+
+    async def start_irrigation_many(
+        self,
+        durations: Dict[str, int],
+        db: AsyncSession,
+        irrigation_type: str = "manual"
+    ) -> Dict[str, Dict]:
+        """Queue start commands for many zones in one transaction.
+
+        ``durations`` maps zone_id to seconds. Returns an outcome per zone:
+        ``queued`` (with device_id and command_id), ``no_device``,
+        ``offline`` or ``failed``.
+        """
+        zone_ids = list(durations)
+        outcomes = {}
         try:
-            # Get Arduino device for zone
-            device = db.query(ArduinoStatus)\
-                .filter(ArduinoStatus.zone_id == zone_id)\
-                .first()
-                
-            if not device or not device.is_online:
-                raise Exception("No online device found for zone")
-                
-            # Create irrigation log
-            log = IrrigationLog(
-                zone_id=zone_id,
-                device_id=device.device_id,
-                start_time=datetime.utcnow(),
-                duration=duration,
-                type="manual",
-                status="pending"
-            )
-            db.add(log)
-            
-            # Queue command
-            success = await self.queue_command(
-                device.device_id,
-                "start_irrigation",
-                {"zone_id": zone_id, "duration": duration},
-                db
+            devices = await self._devices_for_zones(zone_ids, db)
+            now = datetime.utcnow()
+            targets = []
+            for zone_id in zone_ids:
+                device = devices.get(zone_id)
+                if device is None:
+                    outcomes[zone_id] = {'status': 'no_device'}
+                    continue
+                if not device.is_online:
+                    outcomes[zone_id] = {'status': 'offline', 'device_id': device.device_id}
+                    continue
+                targets.append((zone_id, device.device_id))
+
+            if targets:
+                # Log ids are not needed, so one executemany INSERT suffices
+                await db.execute(insert(IrrigationLog.__table__), [
+                    {
+                        'zone_id': zone_id,
+                        'device_id': device_id,
+                        'start_time': now,
+                        'duration': durations[zone_id],
+                        'type': irrigation_type,
+                        'status': "pending"
+                    }
+                    for zone_id, device_id in targets
+                ])
+            queued = await self._queue_commands(
+                [
+                    (device_id, "start_irrigation", {"zone_id": zone_id, "duration": durations[zone_id]})
+                    for zone_id, device_id in targets
+                ],
+                db,
+                now=now
             )
-            
-            if not success:
-                log.status = "failed"
-                log.error_message = "Failed to queue command"
-                db.commit()
-                return False
-                
-            return True
+            await db.commit()
         except Exception as e:
+            await db.rollback()
             logger.error(f"Error starting irrigation: {e}")
-            return False
+            return self._failed_outcomes(zone_ids, outcomes, str(e))
 
-    async def stop_irrigation(self, zone_id: str, db: Session) -> bool:
-        """Queue irrigation stop command"""
+        return self._publish_queued(outcomes, targets, queued)
+
+    async def stop_irrigation_many(self, zone_ids: List[str], db: AsyncSession) -> Dict[str, Dict]:
+        """Queue stop commands for every zone with an active irrigation.
+
+        Outcomes are ``queued``, ``no_device``, ``not_irrigating`` or ``failed``.
+        """
+        zone_ids = list(dict.fromkeys(zone_ids))
+        outcomes = {}
         try:
-            # Get Arduino device for zone
-            device = db.query(ArduinoStatus)\
-                .filter(ArduinoStatus.zone_id == zone_id)\
-                .first()
-                
-            if not device:
-                raise Exception("No device found for zone")
-                
-            # Find active irrigation log
-            log = db.query(IrrigationLog)\
-                .filter(
-                    and_(
-                        IrrigationLog.zone_id == zone_id,
-                        IrrigationLog.status.in_(["pending", "in_progress"])
-                    )
-                )\
-                .first()
-                
-            if log:
-                # Queue stop command
-                success = await self.queue_command(
-                    device.device_id,
-                    "stop_irrigation",
-                    {"zone_id": zone_id},
-                    db
-                )
-                
-                if not success:
-                    log.status = "failed"
-                    log.error_message = "Failed to queue stop command"
-                    db.commit()
-                    return False
-                    
-                return True
-            return False
+            devices = await self._devices_for_zones(zone_ids, db)
+            result = await db.execute(self._active_irrigations_query(zone_ids))
+            active = set(result.scalars())
+            targets = []
+            for zone_id in zone_ids:
+                device = devices.get(zone_id)
+                if device is None:
+                    outcomes[zone_id] = {'status': 'no_device'}
+                    continue
+                if zone_id not in active:
+                    outcomes[zone_id] = {'status': 'not_irrigating', 'device_id': device.device_id}
+                    continue
+                targets.append((zone_id, device.device_id))
+
+            queued = await self._queue_commands(
+                [(device_id, "stop_irrigation", {"zone_id": zone_id}) for zone_id, device_id in targets],
+                db,
+                priority=2  # Stops jump ahead of routine commands
+            )
+            await db.commit()
         except Exception as e:
+            await db.rollback()
             logger.error(f"Error stopping irrigation: {e}")
-            return False
+            return self._failed_outcomes(zone_ids, outcomes, str(e))
+
+        return self._publish_queued(outcomes, targets, queued)
+
+    async def _devices_for_zones(self, zone_ids: List[str], db: AsyncSession) -> Dict[str, ArduinoStatus]:
+        """Resolve the controller for each zone with a single query"""
+        devices = {}
+        result = await db.execute(self._devices_for_zones_query(zone_ids))
+        for device in result.scalars():
+            # Same choice as the old per-zone .first()
+            devices.setdefault(device.zone_id, device)
+        return devices
+
+    def _devices_for_zones_query(self, zone_ids: List[str]):
+        return select(ArduinoStatus).where(ArduinoStatus.zone_id.in_(zone_ids)).order_by(ArduinoStatus.id)
+
+    def _active_irrigations_query(self, zone_ids: List[str]):
+        return select(IrrigationLog.zone_id).where(
+            and_(
+                IrrigationLog.zone_id.in_(zone_ids),
+                IrrigationLog.status.in_(["pending", "in_progress"])
+            )
+        ).distinct()
+
+    async def _queue_commands(
+        self,
+        specs: List[tuple],
+        db: AsyncSession,
+        priority: int = 1,
+        now: Optional[datetime] = None
+    ) -> List[tuple]:
+        """Insert (device_id, command_type, parameters) commands in bulk.
+
+        Each device appears at most once per batch, so ids handed back by
+        RETURNING are matched on device_id. Backends without executemany
+        RETURNING (MySQL) fall back to a single ORM flush. Returns the
+        channel entries in ``specs`` order.
+        """
+        if not specs:
+            return []
+        now = now or datetime.utcnow()
+        rows = [
+            {
+                'device_id': device_id,
+                'command_type': command_type,
+                'parameters': parameters,
+                'status': "pending",
+                'priority': priority,
+                'created_at': now,
+                'expiry_time': now + self.command_timeout
+            }
+            for device_id, command_type, parameters in specs
+        ]
+
+        table = Command.__table__
+        if db.get_bind().dialect.insert_executemany_returning:
+            result = await db.execute(insert(table).returning(table.c.id, table.c.device_id), rows)
+            ids = {device_id: command_id for command_id, device_id in result}
+        else:
+            commands = [Command(**row) for row in rows]
+            db.add_all(commands)
+            await db.flush()
+            ids = {command.device_id: command.id for command in commands}
+
+        return [
+            (
+                {"command_id": ids[row['device_id']], "type": row['command_type'], "parameters": row['parameters']},
+                now,
+                priority,
+                row['expiry_time']
+            )
+            for row in rows
+        ]
+
+    def _publish_queued(self, outcomes: Dict[str, Dict], targets: List[tuple], queued: List[tuple]) -> Dict[str, Dict]:
+        # Only after the commit, so a controller never sees an uncommitted command
+        for (zone_id, device_id), (payload, created_at, priority, expiry_time) in zip(targets, queued):
+            self.channel.publish(device_id, payload, created_at, priority, expiry_time)
+            outcomes[zone_id] = {'status': 'queued', 'device_id': device_id, 'command_id': payload['command_id']}
+        return outcomes
+
+    def _failed_outcomes(self, zone_ids: List[str], outcomes: Dict[str, Dict], error: str) -> Dict[str, Dict]:
+        # The batch was rolled back; zones already ruled out keep their reason
+        return {
+            zone_id: outcomes.get(zone_id) or {'status': 'failed', 'error': error}
+            for zone_id in zone_ids
+        }
@@ -0,0 +1,260 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Pending commands of these types targeting the same zone collapse into one
+COALESCED_COMMANDS = ('start_irrigation', 'stop_irrigation')
+
+
+class _QueuedCommand:
+    __slots__ = ('payload', 'priority', 'deadline', 'cancelled')
+
+    def __init__(self, payload: Dict, priority: int, deadline: datetime):
+        self.payload = payload
+        self.priority = priority
+        self.deadline = deadline
+        self.cancelled = False
+
+
+class CommandChannel:
+    """In-memory per-device command scheduler with long-poll delivery.
+
+    Each device has a heap ordered by priority (higher first), then deadline,
+    then arrival. Expired and superseded entries are dropped lazily when the
+    heap is drained rather than searched for on every insert. Redundant
+    commands are coalesced before delivery: a newer start or stop for a zone
+    replaces an undelivered start for that zone, and a repeated stop
+    replaces the earlier one.
+
+    Final statuses (acknowledged, expired, cancelled) are buffered rather
+    than written one by one; the caller drains them with
+    ``pop_status_updates`` and persists them in a single bulk write.
+
+    ``publish`` wakes any request currently waiting in ``wait_for_commands``
+    for that device. The database stays the source of truth: each device is
+    re-synced from the ``commands`` table on first contact and then every
+    ``resync_interval`` seconds, which also picks up commands queued by other
+    worker processes.
+
+    Delivered commands stay in flight until acknowledged. One not
+    acknowledged within ``ack_timeout`` seconds (lost response, controller
+    reboot) is queued again, until its own deadline passes.
+    """
+
+    def __init__(
+        self,
+        command_timeout: timedelta = timedelta(minutes=5),
+        resync_interval: float = 300.0,
+        ack_timeout: float = 60.0
+    ):
+        self.command_timeout = command_timeout
+        self.resync_interval = resync_interval
+        self.ack_timeout = ack_timeout
+        self._heaps: Dict[str, List[Tuple]] = {}
+        # (zone_id, command_type) -> queued entry, per device
+        self._by_zone: Dict[str, Dict[Tuple, _QueuedCommand]] = {}
+        # command_id -> (entry, monotonic delivery time), for commands handed out but not yet acknowledged
+        self._in_flight: Dict[str, Dict[int, Tuple[_QueuedCommand, float]]] = {}
+        self._queued_ids: Dict[str, set] = {}
+        # command_id -> status row waiting to be written
+        self._status_updates: Dict[int, Dict] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._last_sync: Dict[str, float] = {}
+        self._sequence = itertools.count()
+
+    def needs_sync(self, device_id: str) -> bool:
+        last = self._last_sync.get(device_id)
+        return last is None or time.monotonic() - last >= self.resync_interval
+
+    def sync(self, device_id: str, pending: List[Tuple]):
+        """Merge (payload, created_at[, priority, expiry_time]) rows loaded from the database"""
+        self._requeue_unacknowledged(device_id)
+        known = set(self._queued_ids.get(device_id, ()))
+        known.update(self._in_flight.get(device_id, {}))
+        for entry in pending:
+            payload, created_at = entry[0], entry[1]
+            if payload['command_id'] not in known:
+                self._enqueue(device_id, payload, created_at, *entry[2:])
+        self._last_sync[device_id] = time.monotonic()
+
+    def publish(
+        self,
+        device_id: str,
+        payload: Dict,
+        created_at: Optional[datetime] = None,
+        priority: int = 1,
+        expiry_time: Optional[datetime] = None
+    ):
+        """Queue a command and wake any waiting long-poll for the device"""
+        self._enqueue(device_id, payload, created_at or datetime.utcnow(), priority, expiry_time)
+
+    def acknowledge(
+        self,
+        device_id: str,
+        command_id: int,
+        status: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """Forget a delivered command, buffering its reported status.
+
+        Returns False if the command was not delivered through this channel.
+        """
+        if self._in_flight.get(device_id, {}).pop(command_id, None) is None:
+            # A late acknowledgement for a command already queued again
+            if command_id not in self._queued_ids.get(device_id, ()):
+                return False
+            for _, _, _, entry in self._heaps.get(device_id, ()):
+                if entry.payload['command_id'] == command_id:
+                    entry.cancelled = True
+            self._queued_ids[device_id].discard(command_id)
+        if status:
+            self._record_status(device_id, command_id, status, error_message, datetime.utcnow())
+        return True
+
+    def pop_status_updates(self) -> List[Dict]:
+        """Return and clear the buffered status rows"""
+        updates = list(self._status_updates.values())
+        self._status_updates = {}
+        return updates
+
+    def restore_status_updates(self, updates: List[Dict]):
+        """Put back rows whose write failed, unless a newer status replaced them"""
+        for row in updates:
+            self._status_updates.setdefault(row['b_id'], row)
+
+    @property
+    def pending_status_updates(self) -> int:
+        return len(self._status_updates)
+
+    async def wait_for_commands(self, device_id: str, timeout: float = 0) -> List[Dict]:
+        """Return queued commands, waiting up to ``timeout`` seconds for one"""
+        commands = self._drain(device_id)
+        if commands or timeout <= 0:
+            return commands
+
+        event = self._event(device_id)
+        event.clear()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self._drain(device_id)
+
+    def _enqueue(
+        self,
+        device_id: str,
+        payload: Dict,
+        created_at: datetime,
+        priority: Optional[int] = None,
+        expiry_time: Optional[datetime] = None
+    ):
+        priority = priority if priority is not None else 1
+        deadline = expiry_time or created_at + self.command_timeout
+        entry = _QueuedCommand(payload, priority, deadline)
+        self._coalesce(device_id, entry)
+        self._push(device_id, entry)
+
+    def _push(self, device_id: str, entry: _QueuedCommand):
+        heapq.heappush(
+            self._heaps.setdefault(device_id, []),
+            (-entry.priority, entry.deadline, next(self._sequence), entry)
+        )
+        self._queued_ids.setdefault(device_id, set()).add(entry.payload['command_id'])
+
+        event = self._events.get(device_id)
+        if event is not None:
+            event.set()
+
+    def _coalesce(self, device_id: str, entry: _QueuedCommand):
+        command_type = entry.payload.get('type')
+        zone_id = (entry.payload.get('parameters') or {}).get('zone_id')
+        if command_type not in COALESCED_COMMANDS or zone_id is None:
+            return
+
+        by_zone = self._by_zone.setdefault(device_id, {})
+        # Any newer start/stop makes an undelivered start obsolete; a stop
+        # also replaces an earlier stop. A start never cancels a pending
+        # stop, since that stop may be turning off an earlier delivered run.
+        superseded = [(zone_id, 'start_irrigation')]
+        if command_type == 'stop_irrigation':
+            superseded.append((zone_id, 'stop_irrigation'))
+        for key in superseded:
+            previous = by_zone.pop(key, None)
+            if previous is not None and not previous.cancelled:
+                previous.cancelled = True
+                self._forget(device_id, previous, 'cancelled')
+        by_zone[(zone_id, command_type)] = entry
+
+    def _requeue_unacknowledged(self, device_id: str):
+        """Queue again commands delivered more than ack_timeout seconds ago"""
+        in_flight = self._in_flight.get(device_id)
+        if not in_flight:
+            return
+        cutoff = time.monotonic() - self.ack_timeout
+        for command_id, (entry, delivered_at) in list(in_flight.items()):
+            if delivered_at <= cutoff:
+                del in_flight[command_id]
+                # Not coalesced: it was delivered before anything queued since,
+                # so it keeps its place ahead of newer commands for the zone
+                self._push(device_id, entry)
+
+    def _drain(self, device_id: str) -> List[Dict]:
+        self._requeue_unacknowledged(device_id)
+        heap = self._heaps.get(device_id)
+        if not heap:
+            return []
+        now = datetime.utcnow()
+        in_flight = self._in_flight.setdefault(device_id, {})
+        commands = []
+        while heap:
+            _, deadline, _, entry = heapq.heappop(heap)
+            if entry.cancelled:
+                continue
+            self._release_zone_slot(device_id, entry)
+            if deadline <= now:
+                self._forget(device_id, entry, 'expired')
+                continue
+            self._queued_ids[device_id].discard(entry.payload['command_id'])
+            in_flight[entry.payload['command_id']] = (entry, time.monotonic())
+            commands.append(entry.payload)
+        return commands
+
+    def _release_zone_slot(self, device_id: str, entry: _QueuedCommand):
+        zone_id = (entry.payload.get('parameters') or {}).get('zone_id')
+        key = (zone_id, entry.payload.get('type'))
+        by_zone = self._by_zone.get(device_id, {})
+        if by_zone.get(key) is entry:
+            del by_zone[key]
+
+    def _forget(self, device_id: str, entry: _QueuedCommand, status: str):
+        self._queued_ids.get(device_id, set()).discard(entry.payload['command_id'])
+        self._record_status(device_id, entry.payload['command_id'], status, None, None)
+
+    def _record_status(
+        self,
+        device_id: str,
+        command_id: int,
+        status: str,
+        error_message: Optional[str],
+        executed_at: Optional[datetime]
+    ):
+        self._status_updates[command_id] = {
+            'b_id': command_id,
+            'b_device_id': device_id,
+            'status': status,
+            'error_message': error_message,
+            'executed_at': executed_at
+        }
+
+    def _event(self, device_id: str) -> asyncio.Event:
+        event = self._events.get(device_id)
+        if event is None:
+            event = self._events[device_id] = asyncio.Event()
+        return event
+
+
+# Shared by every ArduinoService in this process
+command_channel = CommandChannel()
@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import select, and_
+from sqlalchemy.orm import Session
+from backend.models.sensor_data import SensorData, IrrigationLog
+from backend.models.satellite_data import SatelliteData
+
+logger = logging.getLogger(__name__)
+
+# dataset name -> (model, time column name)
+EXPORT_DATASETS = {
+    'sensor_data': (SensorData, 'timestamp'),
+    'irrigation_logs': (IrrigationLog, 'start_time'),
+    'satellite_data': (SatelliteData, 'timestamp'),
+}
+
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks.
+
+    ``tell()`` reports the total bytes written so far, which is what the
+    Parquet writer uses for its footer offsets, even though the buffer
+    itself is drained after every row group.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Stream zone history out of the database in constant memory.
+
+    Rows are read with a server-side cursor (``yield_per``) one page at a
+    time and encoded page by page, so neither the result set nor the
+    encoded file is ever held in memory as a whole.
+    """
+
+    def __init__(self, page_size: int = 5000):
+        self.page_size = page_size
+
+    def stream(
+        self,
+        db: Session,
+        dataset: str,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        format: str = 'csv'
+    ) -> Iterator[bytes]:
+        """Return an iterator of encoded chunks for ``StreamingResponse``"""
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        if format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {format}")
+
+        model, time_column = EXPORT_DATASETS[dataset]
+        columns = [column.name for column in model.__table__.columns]
+        pages = self._iter_pages(db, model, time_column, zone_id, start_date, end_date)
+
+        if format == 'csv':
+            return self._encode_csv(columns, pages)
+        if format == 'ndjson':
+            return self._encode_ndjson(columns, pages)
+
+        # Checked up front so a missing dependency fails before streaming starts
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow to be installed")
+        return self._encode_parquet(pa, pq, model, columns, pages)
+
+    def _iter_pages(
+        self,
+        db: Session,
+        model,
+        time_column: str,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Iterator[List[tuple]]:
+        query = self._query(model, time_column, zone_id, start_date, end_date)
+        result = db.execute(query)
+        try:
+            for page in result.partitions():
+                yield page
+        finally:
+            result.close()
+
+    def _query(self, model, time_column: str, zone_id: str, start_date: datetime, end_date: datetime):
+        table = model.__table__
+        timestamp = table.c[time_column]
+        return (
+            select(table)
+            .where(
+                and_(
+                    table.c.zone_id == zone_id,
+                    timestamp >= start_date,
+                    timestamp <= end_date
+                )
+            )
+            .order_by(timestamp, table.c.id)
+            .execution_options(yield_per=self.page_size)
+        )
+
+    def _encode_csv(self, columns: List[str], pages: Iterator[List[tuple]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for page in pages:
+            writer.writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                for row in page
+            )
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _encode_ndjson(self, columns: List[str], pages: Iterator[List[tuple]]) -> Iterator[bytes]:
+        for page in pages:
+            lines = [json.dumps(dict(zip(columns, row)), default=_json_default) for row in page]
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def _encode_parquet(self, pa, pq, model, columns: List[str], pages: Iterator[List[tuple]]) -> Iterator[bytes]:
+        schema = pa.schema([
+            (column.name, _arrow_type(pa, column.type)) for column in model.__table__.columns
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+        try:
+            for page in pages:
+                # Each page becomes one row group
+                arrays = [
+                    pa.array([_parquet_value(row[i]) for row in page], type=schema.field(i).type)
+                    for i in range(len(columns))
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _parquet_value(value):
+    # JSON columns are stored as text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _arrow_type(pa, column_type):
+    python_type: Optional[type]
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        python_type = None
+
+    types: Dict[type, object] = {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp('us'),
+    }
+    return types.get(python_type, pa.string())
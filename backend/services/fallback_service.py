@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.sensor_data import ArduinoStatus, SensorData, IrrigationLog
 from backend.services.weather_service import WeatherService
 from backend.services.satellite_service import SatelliteService
@@ -18,11 +19,9 @@ class FallbackService:
         self.arduino_offline_threshold = timedelta(minutes=15)
         self.connection_retry_limit = 3
         
-    async def check_arduino_status(self, device_id: str, db: Session) -> Dict:
+    async def check_arduino_status(self, device_id: str, db: AsyncSession) -> Dict:
         """Check Arduino connectivity status and handle offline scenarios"""
-        arduino_status = db.query(ArduinoStatus).filter(
-            ArduinoStatus.device_id == device_id
-        ).first()
+        arduino_status = await self._get_arduino_status(device_id, db)
         
         if not arduino_status:
             await self.handle_arduino_failure(device_id, "Device not registered in system", db)
@@ -40,15 +39,16 @@ class FallbackService:
             reason = f"Connection lost for {time_since_last_seen.total_seconds() / 60:.1f} minutes"
             
             # Update retry count
-            arduino_status.error_count += 1
-            db.commit()
+            error_count = arduino_status.error_count + 1
+            arduino_status.error_count = error_count
+            await db.commit()
             
             # Different messages based on retry count
-            if arduino_status.error_count >= self.connection_retry_limit:
-                reason += f" after {arduino_status.error_count} retry attempts"
+            if error_count >= self.connection_retry_limit:
+                reason += f" after {error_count} retry attempts"
                 severity = "high"
             else:
-                reason += f" (Attempt {arduino_status.error_count} of {self.connection_retry_limit})"
+                reason += f" (Attempt {error_count} of {self.connection_retry_limit})"
                 severity = "medium"
             
             await self.handle_arduino_failure(device_id, reason, db, severity)
@@ -57,27 +57,29 @@ class FallbackService:
                 "status": "offline",
                 "reason": reason,
                 "last_seen": arduino_status.last_seen,
-                "retry_count": arduino_status.error_count,
+                "retry_count": error_count,
                 "signal_strength": arduino_status.signal_strength
             }
             
+        online = {
+            "status": "online",
+            "last_seen": arduino_status.last_seen,
+            "signal_strength": arduino_status.signal_strength,
+            "battery_level": arduino_status.battery_level
+        }
+
         # Device is online but check signal strength
-        if arduino_status.signal_strength and arduino_status.signal_strength < -80:  # Weak WiFi signal
+        if online["signal_strength"] and online["signal_strength"] < -80:  # Weak WiFi signal
             await self.notification_service.send_alert(
                 title="Weak Arduino Connection",
-                message=f"Arduino {device_id} has weak signal strength ({arduino_status.signal_strength} dBm). Connection may be unstable.",
+                message=f"Arduino {device_id} has weak signal strength ({online['signal_strength']} dBm). Connection may be unstable.",
                 severity="low",
                 db=db
             )
             
-        return {
-            "status": "online",
-            "last_seen": arduino_status.last_seen,
-            "signal_strength": arduino_status.signal_strength,
-            "battery_level": arduino_status.battery_level
-        }
+        return online
     
-    async def handle_arduino_failure(self, device_id: str, reason: str, db: Session, severity: str = "high"):
+    async def handle_arduino_failure(self, device_id: str, reason: str, db: AsyncSession, severity: str = "high"):
         """Handle Arduino connection failure"""
         # Send notification with connection-specific details
         message = f"""
@@ -108,14 +110,18 @@ class FallbackService:
         )
         
         # Update Arduino status in database
-        arduino_status = db.query(ArduinoStatus).filter(
-            ArduinoStatus.device_id == device_id
-        ).first()
+        arduino_status = await self._get_arduino_status(device_id, db)
         
         if arduino_status:
             arduino_status.is_online = False
             arduino_status.last_offline = datetime.utcnow()
-            db.commit()
+            await db.commit()
             
         # Log the connection failure
         logger.error(f"Arduino connection failure for device {device_id}: {reason}")
+
+    async def _get_arduino_status(self, device_id: str, db: AsyncSession) -> Optional[ArduinoStatus]:
+        result = await db.execute(
+            select(ArduinoStatus).where(ArduinoStatus.device_id == device_id).limit(1)
+        )
+        return result.scalars().first()
@@ -0,0 +1,112 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+def to_seconds(value: datetime) -> float:
+    """Seconds since 1970-01-01 on the wall clock (timezone is dropped)"""
+    return (value.replace(tzinfo=None) - _EPOCH).total_seconds()
+
+
+class _ZoneSeries:
+    __slots__ = ('timestamps', 'amounts', 'total', 'version')
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.amounts = array('d')
+        self.total = 0.0
+        self.version = 0
+
+    def add(self, ts: float, amount: float):
+        self.total += amount
+        self.version += 1
+        # Events normally arrive in time order; fall back to an ordered insert
+        if not self.timestamps or ts >= self.timestamps[-1]:
+            self.timestamps.append(ts)
+            self.amounts.append(amount)
+        else:
+            i = bisect_right(self.timestamps, ts)
+            self.timestamps.insert(i, ts)
+            self.amounts.insert(i, amount)
+
+
+class IrrigationHistoryIndex:
+    """Per-zone sorted timestamp/amount arrays for fast date-range queries.
+
+    Timestamps are parsed once when an event is indexed, so range queries
+    never touch the ISO strings kept in ``zone.irrigation_history``.
+    """
+
+    def __init__(self):
+        self._series: Dict[str, _ZoneSeries] = {}
+        # Survives rebuild/remove so a replaced zone never reuses a version
+        self._versions: Dict[str, int] = {}
+
+    def add(self, zone_id: str, event: Dict):
+        """Index a single irrigation event"""
+        ts = to_seconds(datetime.fromisoformat(event['timestamp']))
+        series = self._series.get(zone_id)
+        if series is None:
+            series = self._series[zone_id] = _ZoneSeries()
+            series.version = self._versions.get(zone_id, 0)
+        series.add(ts, float(event.get('amount', 0) or 0))
+
+    def rebuild(self, zone_id: str, events: Iterable[Dict]):
+        """Re-index a zone's whole history in one sort"""
+        parsed = sorted(
+            (to_seconds(datetime.fromisoformat(e['timestamp'])), float(e.get('amount', 0) or 0))
+            for e in events
+        )
+        series = _ZoneSeries()
+        series.timestamps = array('d', (ts for ts, _ in parsed))
+        series.amounts = array('d', (amount for _, amount in parsed))
+        series.total = float(sum(series.amounts))
+        series.version = self.version(zone_id) + 1
+        self._series[zone_id] = series
+
+    def remove(self, zone_id: str):
+        series = self._series.pop(zone_id, None)
+        if series is not None:
+            self._versions[zone_id] = series.version + 1
+
+    def version(self, zone_id: str) -> int:
+        """Counter bumped on every change to the zone's history"""
+        series = self._series.get(zone_id)
+        return series.version if series is not None else self._versions.get(zone_id, 0)
+
+    def aggregates(self, zone_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (total amount, event count) columns for the given zones"""
+        totals = np.zeros(len(zone_ids))
+        counts = np.zeros(len(zone_ids), dtype=np.int64)
+        for i, zone_id in enumerate(zone_ids):
+            series = self._series.get(zone_id)
+            if series is not None:
+                totals[i] = series.total
+                counts[i] = len(series.timestamps)
+        return totals, counts
+
+    def range(self, zone_id: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps, amounts) with start <= timestamp <= end"""
+        series = self._series.get(zone_id)
+        if series is None:
+            return np.empty(0), np.empty(0)
+        lo = bisect_left(series.timestamps, to_seconds(start))
+        hi = bisect_right(series.timestamps, to_seconds(end))
+        # Copy only the selected slice; a view over the live array would
+        # block later appends while the caller still holds it
+        timestamps = np.frombuffer(series.timestamps[lo:hi], dtype=np.float64)
+        amounts = np.frombuffer(series.amounts[lo:hi], dtype=np.float64)
+        return timestamps, amounts
+
+    def daily_totals(self, zone_id: str, start: datetime, end: datetime, days: int) -> np.ndarray:
+        """Sum irrigation amounts per calendar day, starting at start.date()"""
+        timestamps, amounts = self.range(zone_id, start, end)
+        first_day = int(to_seconds(start) // SECONDS_PER_DAY)
+        day_index = (timestamps // SECONDS_PER_DAY).astype(np.int64) - first_day
+        keep = day_index < days
+        return np.bincount(day_index[keep], weights=amounts[keep], minlength=days)[:days]
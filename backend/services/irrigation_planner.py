@@ -0,0 +1,212 @@
+"""Conflict-free irrigation schedule for a whole farm.
+
+Zones draw from shared water sources (a well, pump or main line) whose
+flow is limited. Each zone asks for an amount of water, has its own
+valve flow limit and may only be watered inside its time windows.
+Planning each zone alone puts them all at the same early-morning slot
+and overloads the source; here every source is planned as one event
+sweep:
+
+    running   heap of watering zones by end time; ends free capacity
+    waiting   heap of zones whose window is open, earliest window end
+              first (then priority), started as soon as their flow fits
+
+A zone that cannot finish before its window closes runs until the close
+and carries the rest over to its next window; what is left after its
+last window is reported as unmet. When the first waiting zone does not
+fit, up to BACKFILL_DEPTH later ones are tried so small zones use the
+spare capacity. Every step is a heap operation, so a farm of n zones is
+planned in O(n log n).
+
+Flows are in water units per minute, amounts in water units.
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_SOURCE = 'main'
+HORIZON_HOURS = 24
+# Waiting zones tried after the first one does not fit
+BACKFILL_DEPTH = 8
+# Amounts and times below this are treated as zero
+EPSILON = 1e-9
+
+Window = Tuple[datetime, datetime]
+
+
+@dataclass
+class ZoneDemand:
+    """Water one zone needs, and when and how fast it can take it"""
+    zone_id: str
+    amount: float
+    max_flow: float
+    source: Hashable = DEFAULT_SOURCE
+    windows: Sequence[Window] = ()  # empty: any time in the planning horizon
+    priority: float = 0.0  # higher goes first among zones with the same window end
+
+
+@dataclass(frozen=True)
+class IrrigationRun:
+    zone_id: str
+    source: Hashable
+    start: datetime
+    end: datetime
+    flow: float
+    amount: float
+
+    def to_dict(self) -> Dict:
+        return {
+            'zone_id': self.zone_id,
+            'source': self.source,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'duration_minutes': (self.end - self.start).total_seconds() / 60,
+            'flow': self.flow,
+            'amount': self.amount,
+        }
+
+
+@dataclass
+class FarmSchedule:
+    start: datetime
+    runs: List[IrrigationRun] = field(default_factory=list)
+    unmet: Dict[str, float] = field(default_factory=dict)  # zone -> water not scheduled
+
+    def zone_runs(self, zone_id: str) -> List[IrrigationRun]:
+        return [run for run in self.runs if run.zone_id == zone_id]
+
+    def peak_flow(self, source: Hashable = DEFAULT_SOURCE) -> float:
+        """Highest combined flow drawn from ``source`` at any instant"""
+        # Ends sort before starts at the same instant: back-to-back runs do not overlap
+        events = sorted(
+            [(run.start, 1, run.flow) for run in self.runs if run.source == source] +
+            [(run.end, 0, -run.flow) for run in self.runs if run.source == source]
+        )
+        peak = current = 0.0
+        for _, _, flow in events:
+            current += flow
+            peak = max(peak, current)
+        return peak
+
+
+class _Zone:
+    """Planning state of one demand; times are minutes after the plan start"""
+    __slots__ = ('demand', 'flow', 'remaining', 'windows', 'window')
+
+    def __init__(self, demand: ZoneDemand, flow: float, windows: List[Tuple[float, float]]):
+        self.demand = demand
+        self.flow = flow
+        self.remaining = float(demand.amount)
+        self.windows = windows
+        self.window = 0
+
+
+def _minute_windows(windows: Iterable[Window], start: datetime, horizon: float) -> List[Tuple[float, float]]:
+    """Windows as sorted, merged minute ranges clipped to the horizon"""
+    ranges = sorted(
+        (max(0.0, (begin - start).total_seconds() / 60), min(horizon, (end - start).total_seconds() / 60))
+        for begin, end in windows
+    )
+    merged: List[Tuple[float, float]] = []
+    for begin, end in ranges:
+        if end - begin <= EPSILON:
+            continue
+        if merged and begin <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((begin, end))
+    return merged
+
+
+def _plan_source(zones: List[_Zone], capacity: float, start: datetime, schedule: FarmSchedule):
+    sequence = 0
+    releases = []  # (window start, seq, zone)
+    for zone in zones:
+        releases.append((zone.windows[zone.window][0], sequence, zone))
+        sequence += 1
+    heapq.heapify(releases)
+    waiting = []  # (window end, -priority, seq, zone)
+    running = []  # (end, flow)
+    free = capacity
+    now = 0.0
+
+    def carry_over(zone: _Zone):
+        """Move the zone to its next window, or record what is left as unmet"""
+        nonlocal sequence
+        zone.window += 1
+        if zone.window < len(zone.windows):
+            heapq.heappush(releases, (zone.windows[zone.window][0], sequence, zone))
+            sequence += 1
+        else:
+            schedule.unmet[zone.demand.zone_id] = zone.remaining
+
+    while releases or waiting:
+        while running and running[0][0] <= now + EPSILON:
+            free += heapq.heappop(running)[1]
+        while releases and releases[0][0] <= now + EPSILON:
+            _, _, zone = heapq.heappop(releases)
+            heapq.heappush(waiting, (zone.windows[zone.window][1], -zone.demand.priority, sequence, zone))
+            sequence += 1
+
+        skipped = []
+        while waiting and len(skipped) < BACKFILL_DEPTH:
+            entry = heapq.heappop(waiting)
+            window_end, zone = entry[0], entry[3]
+            if window_end - now <= EPSILON:
+                carry_over(zone)
+            elif zone.flow > free + EPSILON:
+                skipped.append(entry)
+            else:
+                minutes = min(zone.remaining / zone.flow, window_end - now)
+                amount = zone.flow * minutes
+                schedule.runs.append(IrrigationRun(
+                    zone.demand.zone_id, zone.demand.source,
+                    start + timedelta(minutes=now), start + timedelta(minutes=now + minutes),
+                    zone.flow, amount
+                ))
+                free -= zone.flow
+                heapq.heappush(running, (now + minutes, zone.flow))
+                zone.remaining -= amount
+                if zone.remaining > EPSILON:
+                    carry_over(zone)
+        for entry in skipped:
+            heapq.heappush(waiting, entry)
+
+        # Next instant anything can change: a run ends, a window opens or one closes
+        upcoming = [queue[0][0] for queue in (running, releases, waiting) if queue]
+        if not upcoming:
+            break
+        now = max(now, min(upcoming))
+
+
+def plan_farm_irrigation(
+    demands: Iterable[ZoneDemand],
+    source_capacity: Mapping[Hashable, float],
+    start: Optional[datetime] = None,
+    horizon_hours: float = HORIZON_HOURS
+) -> FarmSchedule:
+    """Schedule every zone so no source ever exceeds its capacity.
+
+    Sources missing from ``source_capacity`` are unlimited; their zones
+    are bound only by their own flow limits and windows.
+    """
+    start = start or datetime.now()
+    horizon = horizon_hours * 60
+    schedule = FarmSchedule(start)
+    by_source: Dict[Hashable, List[_Zone]] = {}
+    for demand in demands:
+        if demand.amount <= EPSILON:
+            continue
+        capacity = source_capacity.get(demand.source, float('inf'))
+        flow = min(demand.max_flow, capacity)
+        windows = _minute_windows(demand.windows or [(start, start + timedelta(minutes=horizon))], start, horizon)
+        if flow <= EPSILON or not windows:
+            schedule.unmet[demand.zone_id] = float(demand.amount)
+            continue
+        by_source.setdefault(demand.source, []).append(_Zone(demand, flow, windows))
+
+    for source, zones in by_source.items():
+        _plan_source(zones, source_capacity.get(source, float('inf')), start, schedule)
+    schedule.runs.sort(key=lambda run: (run.start, run.zone_id))
+    return schedule
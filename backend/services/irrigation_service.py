@@ -1,9 +1,16 @@
-from typing import Dict, Optional
+import asyncio
+from typing import Dict, List, Mapping, Optional
 from datetime import datetime, timedelta
+from backend.services.irrigation_planner import DEFAULT_SOURCE, ZoneDemand, plan_farm_irrigation
 from backend.services.weather_service import WeatherService
 from backend.services.satellite_service import SatelliteService
 from backend.services.zone_service import ZoneService
 
+# Morning window used by the farm plan, hours after midnight
+IRRIGATION_WINDOW = (5, 9)
+# Valve flow of zones without a "max_flow_rate", units per minute
+DEFAULT_ZONE_FLOW = 2.0
+
 class IrrigationService:
     def __init__(self, weather_service: WeatherService, satellite_service: SatelliteService, zone_service: ZoneService):
         self.weather_service = weather_service
@@ -16,7 +23,9 @@ class IrrigationService:
         zone_data = await self.zone_service.get_zone_data(zone_id, force_refresh=True)
         if not zone_data:
             return {"status": "error", "message": "Zone not found"}
+        return self._recommendation(zone_id, zone_data)
 
+    def _recommendation(self, zone_id: str, zone_data: Dict) -> Dict:
         zone = zone_data["zone"]
         weather = zone_data["weather"]
         satellite = zone_data["satellite"]
@@ -84,6 +93,59 @@ class IrrigationService:
             )
         }
 
+    async def plan_farm_irrigation(
+        self,
+        zone_ids: List[str],
+        source_capacity: Mapping[str, float],
+        date: Optional[datetime] = None
+    ) -> Dict:
+        """Schedule every zone that should irrigate without overloading shared water sources.
+
+        Zones draw from their "water_source" (capacity per source in
+        ``source_capacity``) at up to their "max_flow_rate", inside the
+        IRRIGATION_WINDOW of ``date`` (tomorrow by default).
+        """
+        zone_data = await asyncio.gather(
+            *(self.zone_service.get_zone_data(zone_id, force_refresh=True) for zone_id in zone_ids)
+        )
+        day = (date or datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        window = (day + timedelta(hours=IRRIGATION_WINDOW[0]), day + timedelta(hours=IRRIGATION_WINDOW[1]))
+
+        recommendations = {}
+        demands = []
+        for zone_id, data in zip(zone_ids, zone_data):
+            if not data:
+                recommendations[zone_id] = {"status": "error", "message": "Zone not found"}
+                continue
+            recommendation = recommendations[zone_id] = self._recommendation(zone_id, data)
+            recommendation["schedule"] = []
+            if recommendation["should_irrigate"]:
+                zone = data["zone"]
+                demands.append(ZoneDemand(
+                    zone_id=zone_id,
+                    amount=recommendation["irrigation_need"],
+                    max_flow=zone.get("max_flow_rate") or DEFAULT_ZONE_FLOW,
+                    source=zone.get("water_source") or DEFAULT_SOURCE,
+                    windows=[window]
+                ))
+
+        plan = plan_farm_irrigation(demands, source_capacity, start=window[0])
+        for run in plan.runs:
+            recommendations[run.zone_id]["schedule"].append({
+                "date": run.start.date().isoformat(),
+                "time": run.start.strftime("%H:%M"),
+                "duration_minutes": (run.end - run.start).total_seconds() / 60,
+                "source": run.source,
+                "amount": run.amount
+            })
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "window": {"start": window[0].isoformat(), "end": window[1].isoformat()},
+            "zones": recommendations,
+            "unmet": plan.unmet,
+            "peak_flow": {source: plan.peak_flow(source) for source in source_capacity}
+        }
+
     async def apply_irrigation(self, zone_id: str, amount: float) -> Dict:
         """Apply irrigation to a zone"""
         # Record the irrigation event
@@ -1,11 +1,13 @@
 from typing import Optional, List
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 from datetime import datetime
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.notification import Notification
 
 logger = logging.getLogger(__name__)
@@ -24,7 +26,7 @@ class NotificationService:
         title: str,
         message: str,
         severity: str = "medium",
-        db: Optional[Session] = None
+        db: Optional[AsyncSession] = None
     ):
         """Send alert via email and store in database"""
         try:
@@ -37,7 +39,7 @@ class NotificationService:
                     timestamp=datetime.utcnow()
                 )
                 db.add(notification)
-                db.commit()
+                await db.commit()
             
             # Send email
             if self.smtp_username and self.smtp_password:
@@ -59,10 +61,8 @@ class NotificationService:
                 
                 msg.attach(MIMEText(body, 'plain'))
                 
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.starttls()
-                    server.login(self.smtp_username, self.smtp_password)
-                    server.send_message(msg)
+                # smtplib blocks; keep it off the event loop
+                await asyncio.to_thread(self._send_email, msg)
                     
                 logger.info(f"Alert sent: {title}")
             else:
@@ -70,26 +70,36 @@ class NotificationService:
                 
         except Exception as e:
             logger.error(f"Failed to send alert: {str(e)}")
+
+    def _send_email(self, msg: MIMEMultipart):
+        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+            server.send_message(msg)
     
     async def get_recent_alerts(
         self,
-        db: Session,
+        db: AsyncSession,
         limit: int = 10,
         severity: Optional[str] = None
     ) -> List[Notification]:
         """Get recent alerts from database"""
-        query = db.query(Notification).order_by(Notification.timestamp.desc())
+        result = await db.execute(self._recent_alerts_query(limit, severity))
+        return list(result.scalars())
+
+    def _recent_alerts_query(self, limit: int, severity: Optional[str] = None):
+        query = select(Notification).order_by(Notification.timestamp.desc())
         
         if severity:
-            query = query.filter(Notification.severity == severity)
+            query = query.where(Notification.severity == severity)
             
-        return query.limit(limit).all()
+        return query.limit(limit)
     
-    async def mark_alert_as_read(self, alert_id: int, db: Session):
+    async def mark_alert_as_read(self, alert_id: int, db: AsyncSession):
         """Mark an alert as read"""
-        notification = db.query(Notification).filter_by(id=alert_id).first()
+        notification = await db.get(Notification, alert_id)
         if notification:
             notification.read = True
-            db.commit()
+            await db.commit()
             return True
         return False
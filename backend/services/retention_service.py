@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import MetaData, Table, and_, delete, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from backend.models.sensor_data import SensorData, SensorDataRollup
+
+logger = logging.getLogger(__name__)
+
+# Columns aggregated into hourly rollups, and how
+ROLLUP_AVERAGED = [
+    'soil_moisture', 'soil_temp', 'soil_ph', 'soil_ec', 'soil_n', 'soil_p', 'soil_k',
+    'air_temp', 'air_humidity', 'light_level', 'pressure', 'wind_speed', 'is_raining', 'flow_rate'
+]
+ROLLUP_MAXIMUM = ['total_water']
+
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: str
+    keep_days: int
+    time_column: str = 'timestamp'
+    rollup: bool = False  # Aggregate into sensor_data_rollups before removal
+
+
+def default_policies() -> List[RetentionPolicy]:
+    """Policies from application settings"""
+    from backend.core.config import settings
+    return [
+        RetentionPolicy('sensor_data', settings.SENSOR_DATA_RETENTION_DAYS, rollup=True),
+        RetentionPolicy('system_logs', settings.SYSTEM_LOG_RETENTION_DAYS),
+        RetentionPolicy('notifications', settings.NOTIFICATION_RETENTION_DAYS),
+        RetentionPolicy('weather_data', settings.WEATHER_DATA_RETENTION_DAYS),
+    ]
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    value = month_start(value)
+    return value.replace(year=value.year + 1, month=1) if value.month == 12 else value.replace(month=value.month + 1)
+
+
+def hour_start(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def partition_name(month: datetime) -> str:
+    return f"p{month:%Y%m}"
+
+
+class RetentionService:
+    """Keeps telemetry tables bounded, one policy per table.
+
+    On MySQL, tables created from ``schema.sql`` are RANGE-partitioned by
+    month. Each run keeps ``months_ahead`` empty partitions split off the
+    ``pmax`` catch-all, and drops whole partitions once every row in them
+    is past retention. Queries with a time range only scan the partitions
+    they overlap. Sensor rows are rolled up hourly before their partition
+    goes.
+
+    Unpartitioned tables (SQLite, or MySQL tables that predate
+    partitioning) fall back to rolling up and deleting expired rows in
+    batches of ``delete_batch`` primary keys, one short transaction each.
+
+    ``metrics`` describes the current or last run and is safe to serve
+    while a run is in progress.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        policies: List[RetentionPolicy],
+        months_ahead: int = 2,
+        delete_batch: int = 5000
+    ):
+        self.engine = engine
+        self.policies = policies
+        self.months_ahead = months_ahead
+        self.delete_batch = delete_batch
+        self.metrics: Dict = {
+            'state': 'idle',
+            'runs': 0,
+            'last_started': None,
+            'last_finished': None,
+            'last_duration_s': None,
+            'last_error': None,
+            'tables': {}
+        }
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """Apply every policy; returns the metrics"""
+        now = now or datetime.utcnow()
+        started = time.monotonic()
+        self.metrics.update(state='running', last_started=now.isoformat(), last_error=None)
+        try:
+            for policy in self.policies:
+                self._apply(policy, now)
+        except Exception as e:
+            self.metrics['last_error'] = str(e)
+            logger.error(f"Retention run failed: {e}")
+            raise
+        finally:
+            self.metrics.update(
+                state='idle',
+                runs=self.metrics['runs'] + 1,
+                last_finished=datetime.utcnow().isoformat(),
+                last_duration_s=round(time.monotonic() - started, 3)
+            )
+        return self.metrics
+
+    async def run_forever(self, interval: float):
+        """Background loop; each run happens in a worker thread"""
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                pass  # Already logged and recorded in metrics
+            await asyncio.sleep(interval)
+
+    def _apply(self, policy: RetentionPolicy, now: datetime):
+        table_metrics = self.metrics['tables'].setdefault(policy.table, {
+            'partitioned': False,
+            'rows_rolled_up': 0,
+            'rows_deleted': 0,
+            'partitions_created': 0,
+            'partitions_dropped': 0,
+        })
+        table_metrics.update(cutoff=None, progress=0.0)
+
+        with self.engine.connect() as conn:
+            if not inspect(conn).has_table(policy.table):
+                table_metrics['progress'] = 1.0
+                return
+            partitions = self._partitions(conn, policy.table)
+
+        cutoff = now - timedelta(days=policy.keep_days)
+        table_metrics['cutoff'] = cutoff.isoformat()
+        table_metrics['partitioned'] = bool(partitions)
+        if partitions:
+            self._maintain_partitions(policy, partitions, now, cutoff, table_metrics)
+        else:
+            self._delete_expired(policy, cutoff, table_metrics)
+        table_metrics['progress'] = 1.0
+
+    # -- Partitioned tables (MySQL) --------------------------------------
+
+    def _partitions(self, conn: Connection, table: str) -> List[str]:
+        if conn.dialect.name != 'mysql':
+            return []
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {'table': table})
+        return [row[0] for row in rows]
+
+    def _maintain_partitions(self, policy, partitions, now, cutoff, table_metrics):
+        monthly = sorted(p for p in partitions if p != 'pmax')
+
+        # Split future months off pmax so new rows never land in the catch-all
+        wanted = []
+        month = month_start(now)
+        for _ in range(self.months_ahead + 1):
+            if partition_name(month) not in partitions:
+                wanted.append(month)
+            month = next_month(month)
+        if wanted and 'pmax' in partitions:
+            bound = self._partition_bound(policy)
+            definitions = ', '.join(
+                f"PARTITION {partition_name(m)} VALUES LESS THAN ({bound.format(next_month(m).isoformat(sep=' '))})"
+                for m in wanted
+            )
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {policy.table} REORGANIZE PARTITION pmax INTO "
+                    f"({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+                ))
+            table_metrics['partitions_created'] += len(wanted)
+            logger.info(f"Created partitions {[partition_name(m) for m in wanted]} on {policy.table}")
+
+        # A partition holds rows before its name's next month; drop it once
+        # that whole range is past the cutoff
+        expired = [p for p in monthly if next_month(datetime.strptime(p[1:], '%Y%m')) <= cutoff]
+        oldest = self._oldest(policy) if policy.rollup and expired else None
+        for i, name in enumerate(expired):
+            first = datetime.strptime(name[1:], '%Y%m')
+            if oldest is not None:
+                # The oldest partition also holds anything older than its month
+                start = hour_start(oldest) if name == monthly[0] else first
+                table_metrics['rows_rolled_up'] += self._rollup(start, next_month(first))
+            with self.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {policy.table} DROP PARTITION {name}"))
+            table_metrics['partitions_dropped'] += 1
+            table_metrics['progress'] = (i + 1) / len(expired)
+            logger.info(f"Dropped partition {name} of {policy.table}")
+
+    def _oldest(self, policy: RetentionPolicy) -> Optional[datetime]:
+        table = self._table(policy)
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.min(table.c[policy.time_column]))).scalar()
+
+    def _partition_bound(self, policy: RetentionPolicy) -> str:
+        """Partition boundary expression matching the table's partitioning function"""
+        with self.engine.connect() as conn:
+            column_type = conn.execute(text(
+                "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column"
+            ), {'table': policy.table, 'column': policy.time_column}).scalar()
+        # MySQL only allows UNIX_TIMESTAMP() for TIMESTAMP partition keys
+        return "UNIX_TIMESTAMP('{}')" if column_type == 'timestamp' else "TO_DAYS('{}')"
+
+    # -- Unpartitioned tables ------------------------------------------------
+
+    def _delete_expired(self, policy: RetentionPolicy, cutoff: datetime, table_metrics: Dict):
+        table = self._table(policy)
+        timestamp = table.c[policy.time_column]
+        if policy.rollup:
+            # Whole hours only, so no bucket is rolled up from partial data
+            cutoff = hour_start(cutoff)
+
+        with self.engine.connect() as conn:
+            oldest, expired = conn.execute(
+                select(func.min(timestamp), func.count()).where(timestamp < cutoff)
+            ).one()
+        if not expired:
+            return
+
+        if policy.rollup:
+            # Buckets before the oldest raw row were rolled up by earlier runs
+            window_start = hour_start(oldest)
+            window_end = min(next_month(oldest), cutoff)
+            while window_start < cutoff:
+                table_metrics['rows_rolled_up'] += self._rollup(window_start, window_end)
+                window_start, window_end = window_end, min(next_month(window_end), cutoff)
+
+        deleted = 0
+        while True:
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(table.c.id).where(timestamp < cutoff).order_by(table.c.id).limit(self.delete_batch)
+                ).scalars().all()
+                if not ids:
+                    break
+                conn.execute(delete(table).where(table.c.id.in_(ids)))
+            deleted += len(ids)
+            table_metrics['rows_deleted'] += len(ids)
+            table_metrics['progress'] = min(1.0, deleted / expired)
+        logger.info(f"Deleted {deleted} rows from {policy.table} older than {cutoff.isoformat()}")
+
+    def _table(self, policy: RetentionPolicy):
+        if policy.table == 'sensor_data':
+            return SensorData.__table__
+        # Reflect just the columns retention needs; keeps the ORM registry out of it
+        return Table(policy.table, MetaData(), autoload_with=self.engine)
+
+    # -- Rollups ---------------------------------------------------------------
+
+    def _rollup(self, start: datetime, end: datetime) -> int:
+        """Replace hourly rollups for start <= timestamp < end from raw rows.
+
+        ``start`` must not precede the oldest raw row, or buckets whose raw
+        rows are already gone would be replaced by nothing.
+        """
+        raw = SensorData.__table__
+        rollups = SensorDataRollup.__table__
+        with self.engine.begin() as conn:
+            bucket = _hour_bucket(conn, raw.c.timestamp)
+            window = and_(raw.c.timestamp >= start, raw.c.timestamp < end)
+            source = select(
+                raw.c.zone_id,
+                bucket.label('bucket'),
+                func.count().label('samples'),
+                *[func.avg(raw.c[c]).label(c) for c in ROLLUP_AVERAGED],
+                *[func.max(raw.c[c]).label(c) for c in ROLLUP_MAXIMUM]
+            ).where(and_(window, raw.c.zone_id.isnot(None))).group_by(raw.c.zone_id, bucket)
+
+            # Re-running a window replaces its buckets instead of duplicating them
+            conn.execute(delete(rollups).where(and_(rollups.c.bucket >= start, rollups.c.bucket < end)))
+            result = conn.execute(rollups.insert().from_select(
+                ['zone_id', 'bucket', 'samples', *ROLLUP_AVERAGED, *ROLLUP_MAXIMUM], source
+            ))
+            return max(result.rowcount, 0)
+
+
+def _hour_bucket(conn: Connection, column):
+    """Start of the hour containing ``column``, as a DATETIME-compatible value"""
+    if conn.dialect.name == 'sqlite':
+        return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+    if conn.dialect.name == 'postgresql':
+        return func.date_trunc('hour', column)
+    return func.str_to_date(func.date_format(column, '%Y-%m-%d %H:00:00'), '%Y-%m-%d %H:%i:%s')
@@ -1,42 +1,56 @@
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-import ee
 import json
 from backend.config import GEE_SERVICE_ACCOUNT, GEE_PRIVATE_KEY
+from backend.core.lazy_imports import lazy_import, registry
 import random
 import os
 
+# Imported and initialized on first use (or warm-up), not when the API loads
+ee = lazy_import('ee')
+
+def _initialize_ee() -> bool:
+    """Initialize Earth Engine with service account.
+
+    Raises on failure, so the registry keeps it unloaded and the next
+    use tries again.
+    """
+    print(f"Service Account: {GEE_SERVICE_ACCOUNT}")
+    print(f"Private Key Length: {len(GEE_PRIVATE_KEY) if GEE_PRIVATE_KEY else 0}")
+
+    if not (GEE_SERVICE_ACCOUNT and GEE_PRIVATE_KEY):
+        raise RuntimeError("Missing Earth Engine credentials")
+    credentials = ee.ServiceAccountCredentials(
+        email=GEE_SERVICE_ACCOUNT,
+        key_data=GEE_PRIVATE_KEY
+    )
+    ee.Initialize(credentials)
+    print("Earth Engine initialized successfully!")
+    return True
+
+# One successful initialization per process, shared by every SatelliteService
+registry.register('earth_engine', _initialize_ee)
+
 class SatelliteService:
     def __init__(self):
         self.cached_data = {}
         self.last_generated = {}
-        self._initialize_ee()
 
-    def _initialize_ee(self):
-        """Initialize Earth Engine with service account"""
-        try:
-            print(f"Service Account: {GEE_SERVICE_ACCOUNT}")
-            print(f"Private Key Length: {len(GEE_PRIVATE_KEY) if GEE_PRIVATE_KEY else 0}")
-            
-            if GEE_SERVICE_ACCOUNT and GEE_PRIVATE_KEY:
-                credentials = ee.ServiceAccountCredentials(
-                    email=GEE_SERVICE_ACCOUNT,
-                    key_data=GEE_PRIVATE_KEY
-                )
-                ee.Initialize(credentials)
-                self.ee_initialized = True
-                print("Earth Engine initialized successfully!")
-            else:
-                print("Missing Earth Engine credentials")
-                self.ee_initialized = False
-        except Exception as e:
-            print(f"Failed to initialize Earth Engine: {str(e)}")
-            self.ee_initialized = False
+    @property
+    def ee_initialized(self) -> bool:
+        return registry.is_loaded('earth_engine')
+
+    async def _ensure_ee(self) -> bool:
+        """Initialize Earth Engine in a worker thread unless already done"""
+        if self.ee_initialized:
+            return True
+        errors = await registry.warm_up(['earth_engine'])
+        return errors['earth_engine'] is None
 
     async def get_zone_data(self, zone_id: str, geometry: Dict[str, Any]) -> Dict[str, Any]:
         """Get satellite data from Earth Engine with fallback"""
         try:
-            if self.ee_initialized:
+            if await self._ensure_ee():
                 data = await self._get_ee_data(geometry)
                 if data:
                     self.cached_data[zone_id] = {
@@ -138,7 +152,7 @@ class SatelliteService:
             print(f"Error getting Earth Engine data: {str(e)}")
             return None
 
-    def _calculate_indices(self, image: ee.Image, geometry: ee.Geometry) -> Dict[str, Dict[str, float]]:
+    def _calculate_indices(self, image: 'ee.Image', geometry: 'ee.Geometry') -> Dict[str, Dict[str, float]]:
         """Calculate various vegetation and water indices"""
         # NDVI (Normalized Difference Vegetation Index)
         ndvi = image.normalizedDifference(['B8', 'B4'])
@@ -192,7 +206,7 @@ class SatelliteService:
             }
         }
 
-    def _calculate_evapotranspiration(self, s2: ee.Image, lst: ee.Image, sm: ee.Image, geometry: ee.Geometry) -> Dict[str, float]:
+    def _calculate_evapotranspiration(self, s2: 'ee.Image', lst: 'ee.Image', sm: 'ee.Image', geometry: 'ee.Geometry') -> Dict[str, float]:
         """Calculate actual evapotranspiration and water stress index"""
         try:
             # Calculate potential ET using simplified Penman-Monteith
@@ -242,7 +256,7 @@ class SatelliteService:
         else:
             return "Severe"
 
-    def _geojson_to_ee_geometry(self, geometry: Dict[str, Any]) -> ee.Geometry:
+    def _geojson_to_ee_geometry(self, geometry: Dict[str, Any]) -> 'ee.Geometry':
         """Convert GeoJSON geometry to Earth Engine geometry"""
         try:
             if geometry['type'].lower() == 'polygon':
@@ -0,0 +1,303 @@
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, and_, or_
+from sqlalchemy.orm import Session
+from backend.models.sensor_data import SensorData, SensorDataRollup
+from backend.services.sensor_storage import SensorStorage, sensor_storage
+
+logger = logging.getLogger(__name__)
+
+# Columns a client may project; everything else is internal
+SENSOR_COLUMNS = [
+    'soil_moisture', 'soil_temp', 'soil_ph', 'soil_ec', 'soil_n', 'soil_p', 'soil_k',
+    'air_temp', 'air_humidity', 'light_level', 'pressure', 'wind_speed', 'is_raining',
+    'flow_rate', 'total_water'
+]
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets; returns the indices of the kept samples"""
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Keep the minimum and maximum sample of each equal-time bucket"""
+    n = len(x)
+    buckets = max(1, points // 2)
+    if points >= n:
+        return np.arange(n)
+
+    edges = np.searchsorted(x, np.linspace(x[0], x[-1], buckets + 1)[1:-1])
+    selected = []
+    for chunk_start, chunk_end in zip(np.r_[0, edges], np.r_[edges, n]):
+        if chunk_end <= chunk_start:
+            continue
+        chunk = y[chunk_start:chunk_end]
+        lo = chunk_start + int(np.argmin(chunk))
+        hi = chunk_start + int(np.argmax(chunk))
+        selected.extend(sorted({lo, hi}))
+    return np.asarray(selected, dtype=np.int64)
+
+
+class SensorQueryService:
+    """Paged and downsampled reads of a zone's sensor readings.
+
+    Raw reads use keyset pagination on (timestamp, id) so every page is an
+    index range scan regardless of depth. Downsampled reads fetch only the
+    projected columns and reduce each series to about ``points`` samples
+    before anything is serialized.
+
+    While the EAV migration is in progress, downsampled reads also include
+    readings that only exist in the legacy table. Where retention has
+    already removed raw rows, they fall back to the hourly rollups for the
+    part of the range before the first raw reading. Raw pages cover the
+    wide table only.
+    """
+
+    def __init__(self, page_size: int = 5000, storage: Optional[SensorStorage] = None):
+        self.page_size = page_size
+        self.storage = storage or sensor_storage
+
+    def get_page(
+        self,
+        db: Session,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """Return one page of raw readings plus the cursor for the next page"""
+        columns = self._validate_columns(columns)
+        # One extra row tells us whether another page exists
+        rows = db.execute(self._page_query(zone_id, start_date, end_date, columns, limit + 1, cursor)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+
+        return {
+            'zone_id': zone_id,
+            'columns': columns,
+            'data': [
+                {
+                    'id': row.id,
+                    'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+                    **{c: row._mapping[c] for c in columns}
+                }
+                for row in rows
+            ],
+            'next_cursor': next_cursor
+        }
+
+    def _page_query(
+        self,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: List[str],
+        limit: int,
+        cursor: Optional[str] = None
+    ):
+        table = SensorData.__table__
+        query = select(table.c.id, table.c.timestamp, *[table.c[c] for c in columns]).where(
+            self._range_filter(zone_id, start_date, end_date)
+        )
+        if cursor:
+            after_ts, after_id = decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    table.c.timestamp > after_ts,
+                    and_(table.c.timestamp == after_ts, table.c.id > after_id)
+                )
+            )
+        return query.order_by(table.c.timestamp, table.c.id).limit(limit)
+
+    def get_downsampled(
+        self,
+        db: Session,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        points: int,
+        columns: Optional[List[str]] = None,
+        method: str = 'lttb'
+    ) -> Dict:
+        """Reduce every projected series to roughly ``points`` samples"""
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"method must be one of {list(DOWNSAMPLE_METHODS)}")
+        columns = self._validate_columns(columns)
+        timestamps, values = self._load_columns(db, zone_id, start_date, end_date, columns)
+        reduce = lttb if method == 'lttb' else minmax
+
+        series = {}
+        for column in columns:
+            y = values[column]
+            valid = ~np.isnan(y)
+            x, y = timestamps[valid], y[valid]
+            if len(x) == 0:
+                series[column] = {'timestamp': [], 'value': []}
+                continue
+            keep = reduce(x, y, points)
+            series[column] = {
+                'timestamp': [(_EPOCH + timedelta(seconds=t)).isoformat() for t in x[keep].tolist()],
+                'value': y[keep].tolist()
+            }
+
+        return {
+            'zone_id': zone_id,
+            'columns': columns,
+            'downsample': {
+                'method': method,
+                'points': points,
+                'source_rows': int(len(timestamps))
+            },
+            'series': series
+        }
+
+    def _load_columns(
+        self,
+        db: Session,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: List[str]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        table = SensorData.__table__
+        query = (
+            select(table.c.timestamp, *[table.c[c] for c in columns])
+            .where(self._range_filter(zone_id, start_date, end_date))
+            .order_by(table.c.timestamp, table.c.id)
+            .execution_options(yield_per=self.page_size)
+        )
+        timestamps = []
+        values = {c: [] for c in columns}
+        result = db.execute(query)
+        for page in result.partitions():
+            for row in page:
+                timestamps.append(_epoch(row[0]))
+                for i, column in enumerate(columns, start=1):
+                    values[column].append(row[i])
+
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = {c: np.asarray(v, dtype=np.float64) for c, v in values.items()}
+
+        legacy = self.storage.legacy_range(db, zone_id, start_date, end_date, columns)
+        if legacy:
+            timestamps, values = self._merge_legacy(timestamps, values, legacy, columns)
+
+        # Buckets only exist for hours whose raw rows were removed
+        rollup_end = (_EPOCH + timedelta(seconds=float(timestamps[0]))) if len(timestamps) else end_date
+        rollups = self._load_rollups(db, zone_id, start_date, min(rollup_end, end_date), columns)
+        if rollups:
+            rollup_ts = np.asarray([_epoch(row[0]) for row in rollups], dtype=np.float64)
+            timestamps = np.concatenate([rollup_ts, timestamps])
+            values = {
+                c: np.concatenate([np.asarray([row[i] for row in rollups], dtype=np.float64), values[c]])
+                for i, c in enumerate(columns, start=1)
+            }
+        return timestamps, values
+
+    def _load_rollups(
+        self,
+        db: Session,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: List[str]
+    ) -> List[tuple]:
+        """Hourly rollups overlapping start_date..end_date as (bucket, *columns)"""
+        if start_date >= end_date:
+            return []
+        # Include the bucket the range starts in
+        start_date = start_date.replace(minute=0, second=0, microsecond=0)
+        table = SensorDataRollup.__table__
+        query = select(table.c.bucket, *[table.c[c] for c in columns]).where(
+            and_(table.c.zone_id == zone_id, table.c.bucket >= start_date, table.c.bucket < end_date)
+        ).order_by(table.c.bucket)
+        return [tuple(row) for row in db.execute(query)]
+
+    def _merge_legacy(
+        self,
+        timestamps: np.ndarray,
+        values: Dict[str, np.ndarray],
+        legacy: List[tuple],
+        columns: List[str]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Add legacy readings at instants the wide table does not cover"""
+        legacy_ts = np.asarray([_epoch(row[0]) for row in legacy], dtype=np.float64)
+        keep = ~np.isin(legacy_ts, timestamps)
+        if not keep.any():
+            return timestamps, values
+        merged_ts = np.concatenate([timestamps, legacy_ts[keep]])
+        order = np.argsort(merged_ts, kind='stable')
+        merged = {}
+        for i, column in enumerate(columns, start=1):
+            legacy_values = np.asarray([row[i] for row in legacy], dtype=np.float64)[keep]
+            merged[column] = np.concatenate([values[column], legacy_values])[order]
+        return merged_ts[order], merged
+
+    def _range_filter(self, zone_id: str, start_date: datetime, end_date: datetime):
+        table = SensorData.__table__
+        return and_(
+            table.c.zone_id == zone_id,
+            table.c.timestamp >= start_date,
+            table.c.timestamp <= end_date
+        )
+
+    def _validate_columns(self, columns: Optional[List[str]]) -> List[str]:
+        if not columns:
+            return list(SENSOR_COLUMNS)
+        unknown = [c for c in columns if c not in SENSOR_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown sensor columns: {unknown}")
+        return columns
+
+
+def _epoch(value: datetime) -> float:
+    return (value.replace(tzinfo=None) - _EPOCH).total_seconds()
@@ -0,0 +1,120 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, and_, case, func, inspect, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Name the old one-row-per-value table is moved to by the migration
+LEGACY_SENSOR_TABLE = 'sensor_data_eav'
+
+# EAV sensor_type -> wide SensorData column. Covers the names written by
+# ArduinoSimulator and the SensorType enum used by the API schemas.
+EAV_SENSOR_TYPES = {
+    'soil_moisture': 'soil_moisture',
+    'soil_temperature': 'soil_temp',
+    'soil_temp': 'soil_temp',
+    'soil_ph': 'soil_ph',
+    'ph': 'soil_ph',
+    'soil_ec': 'soil_ec',
+    'ec': 'soil_ec',
+    'nitrogen': 'soil_n',
+    'phosphorus': 'soil_p',
+    'potassium': 'soil_k',
+    'air_temperature': 'air_temp',
+    'temperature': 'air_temp',
+    'air_humidity': 'air_humidity',
+    'humidity': 'air_humidity',
+    'light_level': 'light_level',
+    'light': 'light_level',
+    'pressure': 'pressure',
+    'wind': 'wind_speed',
+    'rain': 'is_raining',
+    'flow': 'flow_rate',
+}
+
+legacy_metadata = MetaData()
+
+legacy_sensor_data = Table(
+    LEGACY_SENSOR_TABLE,
+    legacy_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('zone_id', String(255), nullable=False),
+    Column('sensor_type', String(50), nullable=False),
+    Column('value', Float, nullable=False),
+    Column('timestamp', DateTime),
+)
+
+
+def pivot_legacy_rows(columns: List[str], where=None):
+    """SELECT that folds EAV rows into one wide row per (zone_id, timestamp).
+
+    Returns zone_id, timestamp and the requested wide columns; a column with
+    no matching sensor_type at that instant comes back NULL.
+    """
+    legacy = legacy_sensor_data.c
+    selected = []
+    for column in columns:
+        types = [t for t, target in EAV_SENSOR_TYPES.items() if target == column]
+        if types:
+            value = func.max(case((legacy.sensor_type.in_(types), legacy.value)))
+        else:
+            value = func.max(None)
+        selected.append(value.label(column))
+
+    query = select(legacy.zone_id, legacy.timestamp, *selected)
+    if where is not None:
+        query = query.where(where)
+    return query.group_by(legacy.zone_id, legacy.timestamp)
+
+
+class SensorStorage:
+    """Reads that stay correct while EAV rows are being migrated.
+
+    Until the migration drops ``sensor_data_eav``, range reads merge the
+    wide ``sensor_data`` rows with pivoted legacy rows. A legacy row is used
+    only where the wide table has nothing at that (zone, timestamp), so
+    windows that were already copied are not counted twice. Whether the
+    legacy table exists is checked at most every ``recheck_interval``
+    seconds.
+    """
+
+    def __init__(self, recheck_interval: float = 60.0):
+        self.recheck_interval = recheck_interval
+        self._legacy_present: Optional[bool] = None
+        self._checked_at = 0.0
+
+    def has_legacy(self, db: Session) -> bool:
+        now = time.monotonic()
+        if self._legacy_present is None or now - self._checked_at >= self.recheck_interval:
+            self._legacy_present = inspect(db.get_bind()).has_table(LEGACY_SENSOR_TABLE)
+            self._checked_at = now
+        return self._legacy_present
+
+    def legacy_range(
+        self,
+        db: Session,
+        zone_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: List[str]
+    ) -> List[tuple]:
+        """Pivoted legacy rows for a zone as (timestamp, *columns), oldest first"""
+        if not self.has_legacy(db):
+            return []
+        legacy = legacy_sensor_data.c
+        query = pivot_legacy_rows(
+            columns,
+            and_(legacy.zone_id == zone_id, legacy.timestamp >= start_date, legacy.timestamp <= end_date)
+        ).order_by(legacy.timestamp)
+        return [tuple(row[1:]) for row in db.execute(query)]
+
+    def forget(self):
+        """Re-check for the legacy table on the next read"""
+        self._legacy_present = None
+
+
+# Shared so the table check is cached process-wide
+sensor_storage = SensorStorage()
@@ -0,0 +1,153 @@
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+
+# Firmware JSON report key -> SensorData column
+JSON_SENSOR_FIELDS = {
+    "moisture": "soil_moisture",
+    "soil_temp": "soil_temp",
+    "soil_ph": "soil_ph",
+    "soil_ec": "soil_ec",
+    "soil_n": "soil_n",
+    "soil_p": "soil_p",
+    "soil_k": "soil_k",
+    "air_temp": "air_temp",
+    "air_humidity": "air_humidity",
+    "light": "light_level",
+    "pressure": "pressure",
+    "wind_speed": "wind_speed",
+    "is_raining": "is_raining",
+    "flow_rate": "flow_rate",
+    "total_water": "total_water",
+}
+
+# Binary telemetry upload, all fields little-endian:
+#
+#   header   32 bytes   TELEMETRY_HEADER below
+#   records  count * record size of the header's schema version
+#
+# Records carry the reading's age in seconds at upload time instead of a
+# wall-clock timestamp, since the controllers have no real-time clock.
+# Float fields are IEEE 754 single precision; NaN means "not measured".
+#
+# A new layout gets a new version number and entry in TELEMETRY_SCHEMAS;
+# existing versions are never changed so older firmware keeps working.
+
+TELEMETRY_MAGIC = b'ST'
+TELEMETRY_CONTENT_TYPE = 'application/vnd.sisri.telemetry'
+
+# magic, version, flags, record count, zone_id, signal dBm, battery %, firmware
+TELEMETRY_HEADER = struct.Struct('<2sBBH16sbB8s')
+
+TELEMETRY_SCHEMAS: Dict[int, np.dtype] = {
+    1: np.dtype([
+        ('age', '<u4'),
+        ('soil_moisture', '<f4'),
+        ('soil_temp', '<f4'),
+        ('soil_ph', '<f4'),
+        ('soil_ec', '<f4'),
+        ('soil_n', '<f4'),
+        ('soil_p', '<f4'),
+        ('soil_k', '<f4'),
+        ('air_temp', '<f4'),
+        ('air_humidity', '<f4'),
+        ('light_level', '<f4'),
+        ('pressure', '<f4'),
+        ('wind_speed', '<f4'),
+        ('flow_rate', '<f4'),
+        ('total_water', '<f4'),
+        ('is_raining', 'u1'),
+    ]),
+}
+
+CURRENT_TELEMETRY_VERSION = max(TELEMETRY_SCHEMAS)
+
+
+class TelemetryBatch:
+    """A decoded upload; ``records`` is a structured array viewing the payload"""
+
+    __slots__ = ('version', 'zone_id', 'signal_strength', 'battery_level', 'firmware_version', 'records')
+
+    def __init__(self, version, zone_id, signal_strength, battery_level, firmware_version, records):
+        self.version = version
+        self.zone_id = zone_id
+        self.signal_strength = signal_strength
+        self.battery_level = battery_level
+        self.firmware_version = firmware_version
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def to_rows(self, device_id: str, zone_id: Optional[str], received_at: datetime) -> List[Dict]:
+        """Build SensorData insert rows, one column at a time"""
+        records = self.records
+        timestamps = [received_at - timedelta(seconds=age) for age in records['age'].tolist()]
+        columns = {'timestamp': timestamps}
+        for name in records.dtype.names:
+            if name == 'age':
+                continue
+            values = records[name]
+            if name == 'is_raining':
+                columns[name] = values.astype(bool).tolist()
+            else:
+                # float32 -> float64 first so values round-trip to their shortest repr
+                as_float = values.astype(np.float64)
+                column = as_float.tolist()
+                for i in np.flatnonzero(np.isnan(as_float)).tolist():
+                    column[i] = None
+                columns[name] = column
+
+        names = list(columns)
+        return [
+            dict(zip(names, values), zone_id=zone_id, device_id=device_id)
+            for values in zip(*columns.values())
+        ]
+
+
+def decode_telemetry(payload: bytes) -> TelemetryBatch:
+    """Parse an upload without copying the record block; raises ValueError if malformed"""
+    if len(payload) < TELEMETRY_HEADER.size:
+        raise ValueError("Telemetry payload is shorter than its header")
+    magic, version, _flags, count, zone_id, signal, battery, firmware = TELEMETRY_HEADER.unpack_from(payload)
+    if magic != TELEMETRY_MAGIC:
+        raise ValueError("Not a telemetry payload")
+    dtype = TELEMETRY_SCHEMAS.get(version)
+    if dtype is None:
+        raise ValueError(f"Unsupported telemetry version: {version}")
+    expected = TELEMETRY_HEADER.size + count * dtype.itemsize
+    if len(payload) != expected:
+        raise ValueError(f"Telemetry payload is {len(payload)} bytes, expected {expected}")
+
+    records = np.frombuffer(payload, dtype=dtype, count=count, offset=TELEMETRY_HEADER.size)
+    return TelemetryBatch(
+        version=version,
+        zone_id=_text(zone_id),
+        signal_strength=signal,
+        battery_level=battery,
+        firmware_version=_text(firmware),
+        records=records
+    )
+
+
+def encode_telemetry(
+    records: np.ndarray,
+    zone_id: str = '',
+    signal_strength: int = 0,
+    battery_level: int = 100,
+    firmware_version: str = '',
+    version: int = CURRENT_TELEMETRY_VERSION
+) -> bytes:
+    """Build an upload the way the firmware does; used by the simulator and tests"""
+    dtype = TELEMETRY_SCHEMAS[version]
+    records = np.ascontiguousarray(records, dtype=dtype)
+    header = TELEMETRY_HEADER.pack(
+        TELEMETRY_MAGIC, version, 0, len(records),
+        zone_id.encode('ascii'), signal_strength, battery_level, firmware_version.encode('ascii')
+    )
+    return header + records.tobytes()
+
+
+def _text(raw: bytes) -> str:
+    return raw.split(b'\0', 1)[0].decode('ascii', errors='replace')
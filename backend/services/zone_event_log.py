@@ -0,0 +1,178 @@
+import json
+import os
+import time
+import atexit
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ZoneEventLog:
+    """Append-only JSON-lines journal for zone mutations and irrigation events.
+
+    The log sits next to a snapshot file. Every mutation is appended as one
+    line; fsync is batched by count and by age so a burst of irrigation events
+    does not pay one disk flush each. Once the log grows past ``compact_every``
+    events, the caller's full state is written to the snapshot (atomically,
+    via a temp file and ``os.replace``) and the log is truncated.
+
+    Every logged event carries a sequence number and the snapshot records
+    the last one it covers, so after a crash between writing the snapshot
+    and truncating the log, replay skips the events already in it.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        snapshot_path: Path,
+        fsync_batch: int = 32,
+        fsync_interval: float = 1.0,
+        compact_every: int = 5000
+    ):
+        self.log_path = Path(log_path)
+        self.snapshot_path = Path(snapshot_path)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._events_since_snapshot = 0
+        self._seq: Optional[int] = None  # last sequence number logged or replayed
+        self._snapshot_seq: Optional[int] = None  # last sequence number in the snapshot
+        atexit.register(self.close)
+
+    def load_snapshot(self) -> List[Dict]:
+        """Read the last compacted snapshot (list of zone dicts)"""
+        self._snapshot_seq = 0
+        if not self.snapshot_path.exists():
+            return []
+        with open(self.snapshot_path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and 'seq' in data and 'zones' in data:
+            self._snapshot_seq = data['seq']
+            return data['zones']
+        # Older snapshots were a plain list, or keyed by zone_id
+        if isinstance(data, dict):
+            return list(data.values())
+        return data
+
+    def replay(self) -> Iterator[Dict]:
+        """Yield every event recorded after the last snapshot.
+
+        Events the snapshot already covers are skipped. A torn trailing
+        line (crash mid-write) is cut off the log once replay reaches it,
+        so later appends start on a clean line; everything before it has
+        already been applied.
+        """
+        if self._snapshot_seq is None:
+            self.load_snapshot()
+        covered = self._snapshot_seq
+        self._seq = covered
+        self._events_since_snapshot = 0
+        if not self.log_path.exists():
+            return
+        good_offset = 0
+        torn = False
+        with open(self.log_path, 'rb') as f:
+            for raw in f:
+                line = raw.strip()
+                if line:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        torn = True
+                        break
+                    # Events logged before sequence numbers have none and are always applied
+                    seq = event.pop('seq', None)
+                    if seq is not None:
+                        self._seq = max(self._seq, seq)
+                    if seq is None or seq > covered:
+                        self._events_since_snapshot += 1
+                        yield event
+                good_offset += len(raw)
+            ends_with_newline = raw.endswith(b'\n') if good_offset else True
+        if torn:
+            logger.warning(f"Truncating corrupt zone log entry at byte {good_offset} of {self.log_path}")
+            self._repair(good_offset)
+        elif not ends_with_newline:
+            self._repair(good_offset, terminate=True)
+
+    def _repair(self, offset: int, terminate: bool = False):
+        """Cut the log at ``offset``; ``terminate`` finishes an unterminated last line"""
+        self.close()
+        with open(self.log_path, 'r+b') as f:
+            f.truncate(offset)
+            if terminate:
+                f.seek(offset)
+                f.write(b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, event: Dict):
+        """Append a single event to the log"""
+        seq = self._last_seq() + 1
+        f = self._open()
+        f.write(json.dumps({**event, 'seq': seq}, separators=(',', ':')) + '\n')
+        self._seq = seq
+        f.flush()
+        self._unsynced += 1
+        self._events_since_snapshot += 1
+
+        now = time.monotonic()
+        if self._unsynced >= self.fsync_batch or now - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force pending log writes to disk"""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def needs_compaction(self) -> bool:
+        return self._events_since_snapshot >= self.compact_every
+
+    def compact(self, state: Callable[[], List[Dict]]):
+        """Write a fresh snapshot from ``state()`` and truncate the log.
+
+        ``state()`` must include every event appended so far.
+        """
+        seq = self._last_seq()
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(self.snapshot_path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'seq': seq, 'zones': state()}, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._snapshot_seq = seq
+
+        # The snapshot now covers every logged event
+        self.close()
+        with open(self.log_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._events_since_snapshot = 0
+
+    def _last_seq(self) -> int:
+        if self._seq is None:
+            # Continue numbering after what is already on disk
+            for _ in self.replay():
+                pass
+        return self._seq
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.log_path, 'a')
+        return self._file
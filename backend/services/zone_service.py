@@ -1,21 +1,34 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+from itertools import islice
 from backend.models.zone import Zone
+from backend.services.zone_event_log import ZoneEventLog
+from backend.services.irrigation_history_index import IrrigationHistoryIndex
+import csv
+import io
 import json
 from pathlib import Path
 import os
+import numpy as np
 
 class ZoneService:
-    def __init__(self):
+    def __init__(self, data_dir: str = "data"):
         """Initialize zone service"""
         self.zones: Dict[str, Zone] = {}
+        self.history_index = IrrigationHistoryIndex()
+        self._export_cache: Dict[str, Tuple] = {}
+        self.event_log = ZoneEventLog(
+            log_path=Path(data_dir) / "zones.log",
+            snapshot_path=Path(data_dir) / "zones.json"
+        )
         self._load_zones()
 
     def create_zone(self, zone: Zone) -> bool:
         """Create a new zone"""
         try:
             self.zones[zone.zone_id] = zone
-            self._save_zones()
+            self.history_index.rebuild(zone.zone_id, zone.irrigation_history)
+            self._append_event({'op': 'zone', 'zone': self._serialize_zone(zone)})
             return True
         except Exception as e:
             print(f"Error creating zone: {e}")
@@ -43,7 +56,8 @@ class ZoneService:
                 'type': irrigation_type
             }
             zone.irrigation_history.append(event)
-            self._save_zones()
+            self.history_index.add(zone_id, event)
+            self._append_event({'op': 'irrigation', 'zone_id': zone_id, 'event': event})
             return True
         except Exception as e:
             print(f"Error recording irrigation: {e}")
@@ -62,46 +76,36 @@ class ZoneService:
         except ValueError:
             return None
             
-        # Filter irrigation history
-        irrigation_history = []
-        for event in zone.irrigation_history:
-            event_date = datetime.fromisoformat(event['timestamp'])
-            if start <= event_date <= end:
-                irrigation_history.append(event)
-                
-        # Calculate daily aggregates
-        daily_data = {}
-        current_date = start
-        while current_date <= end:
-            date_str = current_date.date().isoformat()
-            
-            # Get irrigation events for this day
-            day_irrigation = sum(
-                event.get('amount', 0)
-                for event in irrigation_history
-                if datetime.fromisoformat(event['timestamp']).date().isoformat() == date_str
-            )
-            
-            # Add to daily data
-            daily_data[date_str] = {
-                'date': date_str,
-                'irrigation_amount': day_irrigation,
-                'soil_moisture': zone.cached_satellite.get('soil_moisture', {}).get('mean', 0) if zone.cached_satellite else 0,
-                'ndvi': zone.cached_satellite.get('ndvi', {}).get('mean', 0) if zone.cached_satellite else 0,
-                'evi': zone.cached_satellite.get('evi', {}).get('mean', 0) if zone.cached_satellite else 0,
-                'water_stress': zone.cached_satellite.get('water_stress', {}).get('index', 0) if zone.cached_satellite else 0
+        # Calendar days covered by the range, as in a day-by-day walk from start
+        days = (end - start).days + 1 if end >= start else 0
+        if days == 0:
+            return None
+        daily_irrigation = self.history_index.daily_totals(zone_id, start, end, days)
+
+        soil_moisture, ndvi, evi, water_stress = self._satellite_means(zone)
+
+        first_date = start.date()
+        daily_data = [
+            {
+                'date': (first_date + timedelta(days=i)).isoformat(),
+                'irrigation_amount': float(amount),
+                'soil_moisture': soil_moisture,
+                'ndvi': ndvi,
+                'evi': evi,
+                'water_stress': water_stress
             }
-            
-            current_date += timedelta(days=1)
-            
+            for i, amount in enumerate(daily_irrigation)
+        ]
+
+        # Satellite values are the zone's cached means, identical for every day
         return {
-            'daily_data': list(daily_data.values()),
+            'daily_data': daily_data,
             'summary': {
-                'total_irrigation': sum(day['irrigation_amount'] for day in daily_data.values()),
-                'avg_soil_moisture': sum(day['soil_moisture'] for day in daily_data.values()) / len(daily_data),
-                'avg_ndvi': sum(day['ndvi'] for day in daily_data.values()) / len(daily_data),
-                'avg_evi': sum(day['evi'] for day in daily_data.values()) / len(daily_data),
-                'avg_water_stress': sum(day['water_stress'] for day in daily_data.values()) / len(daily_data)
+                'total_irrigation': float(daily_irrigation.sum()),
+                'avg_soil_moisture': soil_moisture,
+                'avg_ndvi': ndvi,
+                'avg_evi': evi,
+                'avg_water_stress': water_stress
             }
         }
 
@@ -117,29 +121,21 @@ class ZoneService:
                 'water_stress_levels': {}
             }
         }
-        
-        for zone_id in zone_ids:
-            zone = self.get_zone(zone_id)
-            if not zone:
-                continue
-                
-            # Calculate zone statistics
-            total_water = sum(event.get('amount', 0) for event in zone.irrigation_history)
-            avg_soil_moisture = (
-                zone.cached_satellite.get('soil_moisture', {}).get('mean', 0)
-                if zone.cached_satellite else 0
-            )
-            avg_ndvi = (
-                zone.cached_satellite.get('ndvi', {}).get('mean', 0)
-                if zone.cached_satellite else 0
-            )
-            water_stress = (
-                zone.cached_satellite.get('water_stress', {}).get('index', 0)
-                if zone.cached_satellite else 0
-            )
-            
+
+        zones = [self.get_zone(zone_id) for zone_id in zone_ids]
+        zones = [zone for zone in zones if zone]
+        if not zones:
+            return comparison
+
+        # One pass over the running per-zone aggregates; no history is rescanned
+        totals, counts = self.history_index.aggregates([zone.zone_id for zone in zones])
+        averages = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+
+        for zone, total_water, count, average in zip(zones, totals.tolist(), counts.tolist(), averages.tolist()):
+            avg_soil_moisture, avg_ndvi, _, water_stress = self._satellite_means(zone)
+
             # Add to comparison
-            comparison['zones'][zone_id] = {
+            comparison['zones'][zone.zone_id] = {
                 'name': zone.name,
                 'crop_type': zone.crop_type,
                 'area_hectares': zone.area_hectares,
@@ -148,91 +144,213 @@ class ZoneService:
                     'avg_soil_moisture': avg_soil_moisture,
                     'avg_ndvi': avg_ndvi,
                     'water_stress': water_stress,
-                    'irrigation_count': len(zone.irrigation_history)
+                    'irrigation_count': count,
+                    'avg_irrigation_amount': average
                 }
             }
-            
+
             # Add to summary
-            comparison['summary']['total_water_used'][zone_id] = total_water
-            comparison['summary']['avg_soil_moisture'][zone_id] = avg_soil_moisture
-            comparison['summary']['avg_ndvi'][zone_id] = avg_ndvi
-            comparison['summary']['irrigation_frequency'][zone_id] = len(zone.irrigation_history)
-            comparison['summary']['water_stress_levels'][zone_id] = water_stress
-            
+            comparison['summary']['total_water_used'][zone.zone_id] = total_water
+            comparison['summary']['avg_soil_moisture'][zone.zone_id] = avg_soil_moisture
+            comparison['summary']['avg_ndvi'][zone.zone_id] = avg_ndvi
+            comparison['summary']['irrigation_frequency'][zone.zone_id] = count
+            comparison['summary']['water_stress_levels'][zone.zone_id] = water_stress
+
         return comparison
 
-    def export_zone_data(self, zone_id: str, format: str = 'json') -> Optional[Dict]:
-        """Export zone data"""
+    def export_zone_data(self, zone_id: str, format: str = 'json') -> Optional[Union[Dict, Iterator[str]]]:
+        """Export zone data.
+
+        'json' returns a single dict. 'ndjson' and 'csv' return an iterator of
+        text chunks (see stream_zone_export) so large histories are never
+        materialized at once.
+        """
+        if format in ('ndjson', 'csv'):
+            return self.stream_zone_export(zone_id, format)
+
         zone = self.get_zone(zone_id)
         if not zone:
             return None
-            
-        # Get all relevant data
-        historical = self.get_historical_data(zone_id)
-        
-        # Calculate statistics
-        total_water = sum(event.get('amount', 0) for event in zone.irrigation_history)
-        avg_soil_moisture = (
-            zone.cached_satellite.get('soil_moisture', {}).get('mean', 0)
-            if zone.cached_satellite else 0
-        )
-        
-        statistics = {
-            'total_water_used': total_water,
-            'irrigation_count': len(zone.irrigation_history),
+
+        return {
+            'zone_info': zone.to_dict(),
+            'statistics': self._zone_statistics(zone),
+            'historical_data': self._export_history(zone),
+            'export_date': datetime.now().isoformat(),
+            'metadata': self._export_metadata()
+        }
+
+    def stream_zone_export(self, zone_id: str, format: str = 'ndjson') -> Optional[Iterator[str]]:
+        """Stream a zone export as NDJSON records or CSV irrigation rows"""
+        zone = self.get_zone(zone_id)
+        if not zone:
+            return None
+        if format == 'csv':
+            return self._iter_csv_export(zone)
+        if format == 'ndjson':
+            return self._iter_ndjson_export(zone)
+        raise ValueError(f"Unsupported export format: {format}")
+
+    def _iter_ndjson_export(self, zone: Zone) -> Iterator[str]:
+        # Irrigation events follow as their own records
+        zone_info = {k: v for k, v in zone.to_dict().items() if k != 'irrigation_history'}
+        header = {
+            'record': 'zone',
+            'zone_info': zone_info,
+            'statistics': self._zone_statistics(zone),
+            'export_date': datetime.now().isoformat(),
+            'metadata': self._export_metadata()
+        }
+        yield json.dumps(header, default=str) + '\n'
+
+        historical = self._export_history(zone)
+        if historical:
+            yield json.dumps({'record': 'summary', **historical['summary']}) + '\n'
+            for day in historical['daily_data']:
+                yield json.dumps({'record': 'daily', **day}) + '\n'
+
+        for event in self._history_snapshot(zone):
+            yield json.dumps({'record': 'irrigation', **event}, default=str) + '\n'
+
+    def _iter_csv_export(self, zone: Zone, chunk_rows: int = 1000) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['zone_id', 'timestamp', 'amount', 'duration', 'type'])
+
+        for i, event in enumerate(self._history_snapshot(zone), start=1):
+            writer.writerow([
+                zone.zone_id,
+                event.get('timestamp'),
+                event.get('amount', 0),
+                event.get('duration'),
+                event.get('type')
+            ])
+            if i % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def _history_snapshot(self, zone: Zone) -> Iterator[Dict]:
+        # Events recorded while the export streams are left for the next export
+        return islice(zone.irrigation_history, len(zone.irrigation_history))
+
+    def _export_history(self, zone: Zone) -> Optional[Dict]:
+        """Last 30 whole days of history, cached per history version"""
+        today = datetime.now().date()
+        key = (self.history_index.version(zone.zone_id), today, self._satellite_means(zone))
+        cached = self._export_cache.get(zone.zone_id)
+        if not cached or cached[0] != key:
+            start = datetime.combine(today - timedelta(days=30), datetime.min.time())
+            end = datetime.combine(today, datetime.max.time())
+            historical = self.get_historical_data(zone.zone_id, start.isoformat(), end.isoformat())
+            cached = self._export_cache[zone.zone_id] = (key, historical)
+
+        # Callers get their own copy; edits must not leak into later exports
+        historical = cached[1]
+        if historical is None:
+            return None
+        return {
+            'daily_data': [dict(day) for day in historical['daily_data']],
+            'summary': dict(historical['summary'])
+        }
+
+    def _zone_statistics(self, zone: Zone) -> Dict:
+        totals, counts = self.history_index.aggregates([zone.zone_id])
+        soil_moisture, ndvi, evi, water_stress = self._satellite_means(zone)
+        return {
+            'total_water_used': float(totals[0]),
+            'irrigation_count': int(counts[0]),
             'soil_health': {
-                'moisture': avg_soil_moisture,
-                'water_stress': zone.cached_satellite.get('water_stress', {}).get('index', 0) if zone.cached_satellite else 0
+                'moisture': soil_moisture,
+                'water_stress': water_stress
             },
             'current_indices': {
-                'ndvi': zone.cached_satellite.get('ndvi', {}).get('mean', 0) if zone.cached_satellite else 0,
-                'evi': zone.cached_satellite.get('evi', {}).get('mean', 0) if zone.cached_satellite else 0
+                'ndvi': ndvi,
+                'evi': evi
             }
         }
-        
-        export_data = {
-            'zone_info': zone.to_dict(),
-            'statistics': statistics,
-            'historical_data': historical,
-            'export_date': datetime.now().isoformat(),
-            'metadata': {
-                'system_version': '1.0.0',
-                'data_sources': ['satellite', 'weather', 'irrigation_records']
-            }
+
+    def _export_metadata(self) -> Dict:
+        return {
+            'system_version': '1.0.0',
+            'data_sources': ['satellite', 'weather', 'irrigation_records']
         }
-        
-        return export_data
+
+    def _satellite_means(self, zone: Zone) -> Tuple:
+        """(soil_moisture, ndvi, evi, water_stress) from the zone's cached satellite data"""
+        satellite = zone.cached_satellite or {}
+        return (
+            satellite.get('soil_moisture', {}).get('mean', 0),
+            satellite.get('ndvi', {}).get('mean', 0),
+            satellite.get('evi', {}).get('mean', 0),
+            satellite.get('water_stress', {}).get('index', 0)
+        )
 
     def _load_zones(self):
-        """Load zones from file"""
+        """Load the zone snapshot and replay the event log on top of it"""
         try:
-            zones_file = Path("data/zones.json")
-            if zones_file.exists():
-                with open(zones_file, 'r') as f:
-                    zones_data = json.load(f)
-                    for zone_data in zones_data:
-                        zone = Zone(
-                            zone_id=zone_data['zone_id'],
-                            name=zone_data['name'],
-                            geometry=zone_data['geometry'],
-                            crop_type=zone_data['crop_type'],
-                            irrigation_type=zone_data['irrigation_type']
-                        )
-                        zone.soil_type = zone_data.get('soil_type')
-                        zone.planting_date = zone_data.get('planting_date')
-                        zone.expected_harvest_date = zone_data.get('expected_harvest_date')
-                        zone.cached_satellite = zone_data.get('cached_satellite')
-                        zone.irrigation_history = zone_data.get('irrigation_history', [])
-                        self.zones[zone.zone_id] = zone
+            for zone_data in self.event_log.load_snapshot():
+                zone = self._zone_from_dict(zone_data)
+                self.zones[zone.zone_id] = zone
         except Exception as e:
             print(f"Error loading zones: {e}")
 
+        try:
+            for entry in self.event_log.replay():
+                self._apply_event(entry)
+        except Exception as e:
+            print(f"Error replaying zone log: {e}")
+
+        for zone in self.zones.values():
+            try:
+                self.history_index.rebuild(zone.zone_id, zone.irrigation_history)
+            except (KeyError, ValueError) as e:
+                print(f"Error indexing irrigation history for {zone.zone_id}: {e}")
+
+    def _apply_event(self, entry: Dict):
+        """Apply one logged mutation to the in-memory zones"""
+        if entry['op'] == 'zone':
+            zone = self._zone_from_dict(entry['zone'])
+            self.zones[zone.zone_id] = zone
+        elif entry['op'] == 'irrigation':
+            zone = self.zones.get(entry['zone_id'])
+            if zone:
+                zone.irrigation_history.append(entry['event'])
+
+    def _append_event(self, entry: Dict):
+        """Journal a mutation, compacting into a snapshot when the log grows"""
+        self.event_log.append(entry)
+        if self.event_log.needs_compaction():
+            self._save_zones()
+
+    def _zone_from_dict(self, zone_data: Dict) -> Zone:
+        zone = Zone(
+            zone_id=zone_data['zone_id'],
+            name=zone_data['name'],
+            geometry=zone_data['geometry'],
+            crop_type=zone_data['crop_type'],
+            irrigation_type=zone_data['irrigation_type']
+        )
+        zone.soil_type = zone_data.get('soil_type')
+        zone.planting_date = zone_data.get('planting_date')
+        zone.expected_harvest_date = zone_data.get('expected_harvest_date')
+        zone.cached_satellite = zone_data.get('cached_satellite')
+        zone.irrigation_history = zone_data.get('irrigation_history', [])
+        return zone
+
+    def _serialize_zone(self, zone: Zone) -> Dict:
+        data = zone.to_dict()
+        data.setdefault('irrigation_history', getattr(zone, 'irrigation_history', []))
+        return data
+
     def _save_zones(self):
-        """Save zones to file"""
+        """Compact the event log into a fresh zones snapshot"""
         try:
-            zones_file = Path("data/zones.json")
-            zones_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(zones_file, 'w') as f:
-                json.dump([zone.to_dict() for zone in self.zones.values()], f, indent=2)
+            self.event_log.compact(
+                lambda: [self._serialize_zone(zone) for zone in self.zones.values()]
+            )
         except Exception as e:
             print(f"Error saving zones: {e}")
@@ -0,0 +1,54 @@
+"""In-memory aiosqlite database for tests of AsyncSession services.
+
+backend.models.zone.Zone and backend.models.user.User are declared on
+other declarative bases, so the "Zone" and "User" relationships of the
+models cannot be configured from the package alone. Tests map a minimal
+Zone and User on the models' Base instead.
+"""
+from sqlalchemy import Column, Integer, String, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import relationship
+from backend.models.base import Base
+from backend.models.notification import Notification
+from backend.models.satellite_data import SatelliteData
+from backend.models.sensor_data import ArduinoStatus, Command, IrrigationLog, SensorData
+from backend.models.weather_data import WeatherData
+
+if 'Zone' not in Base.registry._class_registry:
+    class Zone(Base):
+        __tablename__ = 'zones'
+
+        id = Column(Integer, primary_key=True)
+        zone_id = Column(String(50), unique=True)
+        sensor_data = relationship('SensorData', back_populates='zone')
+        arduino_statuses = relationship('ArduinoStatus', back_populates='zone')
+        irrigation_logs = relationship('IrrigationLog', back_populates='zone')
+        satellite_data = relationship('SatelliteData', back_populates='zone')
+        weather_data = relationship('WeatherData', back_populates='zone')
+
+if 'User' not in Base.registry._class_registry:
+    class User(Base):
+        __tablename__ = 'users'
+
+        id = Column(Integer, primary_key=True)
+        notifications = relationship('Notification', back_populates='user')
+
+TABLES = [
+    Base.metadata.tables[name]
+    for name in ('zones', 'users', 'sensor_data', 'arduino_status', 'commands', 'irrigation_logs', 'notifications')
+]
+
+
+async def create_database():
+    """Engine and session factory for a fresh in-memory database"""
+    engine = create_async_engine('sqlite+aiosqlite://')
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+    return engine, async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+def count_statements(engine) -> list:
+    """List that collects every SQL statement the engine executes"""
+    statements = []
+    event.listen(engine.sync_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
@@ -0,0 +1,117 @@
+import unittest
+from unittest import mock
+from sqlalchemy import select
+from backend.models.sensor_data import ArduinoStatus, Command, IrrigationLog
+from backend.services.arduino_service import ArduinoService
+from backend.services.command_channel import CommandChannel
+from backend.tests.async_db import count_statements, create_database
+
+class TestIrrigationFanOut(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Three zones with controllers, one of them offline"""
+        self.engine, self.Session = await create_database()
+        self.channel = CommandChannel()
+        self.service = ArduinoService(channel=self.channel)
+        async with self.Session() as db:
+            db.add_all([
+                ArduinoStatus(device_id='ARD_1', zone_id='ZONE1', is_online=True),
+                ArduinoStatus(device_id='ARD_2', zone_id='ZONE2', is_online=True),
+                ArduinoStatus(device_id='ARD_3', zone_id='ZONE3', is_online=False),
+            ])
+            await db.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def commands(self):
+        async with self.Session() as db:
+            return (await db.execute(select(Command).order_by(Command.id))).scalars().all()
+
+    async def test_start_many_uses_three_statements(self):
+        """Test the device lookup, log insert and command insert each run once for the batch"""
+        statements = count_statements(self.engine)
+        async with self.Session() as db:
+            outcomes = await self.service.start_irrigation_many({'ZONE1': 600, 'ZONE2': 300}, db)
+        self.assertEqual([o['status'] for o in outcomes.values()], ['queued', 'queued'])
+        self.assertEqual(len(statements), 3)
+
+    async def test_start_many_skips_unknown_and_offline_zones(self):
+        """Test zones without an online controller are reported and get no command"""
+        async with self.Session() as db:
+            outcomes = await self.service.start_irrigation_many({'ZONE1': 600, 'ZONE3': 600, 'ZONE9': 600}, db)
+        self.assertEqual(outcomes['ZONE3'], {'status': 'offline', 'device_id': 'ARD_3'})
+        self.assertEqual(outcomes['ZONE9'], {'status': 'no_device'})
+        commands = await self.commands()
+        self.assertEqual([(c.device_id, c.parameters) for c in commands], [('ARD_1', {'zone_id': 'ZONE1', 'duration': 600})])
+        self.assertEqual(outcomes['ZONE1']['command_id'], commands[0].id)
+
+    async def test_flush_fallback_matches_returning(self):
+        """Test backends without executemany RETURNING hand back the same command ids"""
+        # What a MySQL dialect reports
+        without_returning = {
+            'insert_executemany_returning': False,
+            'insert_executemany_returning_sort_by_parameter_order': False,
+            'use_insertmanyvalues': False,
+        }
+        for flags in ({'insert_executemany_returning': True}, without_returning):
+            with self.subTest(returning=flags['insert_executemany_returning']):
+                async with self.Session() as db:
+                    dialect = db.get_bind().dialect
+                    with mock.patch.multiple(dialect, **flags):
+                        outcomes = await self.service.start_irrigation_many({'ZONE1': 60, 'ZONE2': 120}, db)
+                by_device = {c.device_id: c.id for c in (await self.commands())[-2:]}
+                self.assertEqual(
+                    {o['device_id']: o['command_id'] for o in outcomes.values()},
+                    by_device
+                )
+
+    async def test_queued_commands_are_published(self):
+        """Test committed commands reach each controller's channel queue"""
+        async with self.Session() as db:
+            outcomes = await self.service.start_irrigation_many({'ZONE1': 600, 'ZONE2': 300}, db)
+        for zone_id, device_id in (('ZONE1', 'ARD_1'), ('ZONE2', 'ARD_2')):
+            delivered = await self.channel.wait_for_commands(device_id)
+            self.assertEqual([c['command_id'] for c in delivered], [outcomes[zone_id]['command_id']])
+            self.assertEqual(delivered[0]['type'], 'start_irrigation')
+
+    async def test_failed_batch_is_rolled_back_and_not_published(self):
+        """Test a failing insert leaves no logs and publishes nothing"""
+        async with self.Session() as db:
+            with mock.patch.object(self.service, '_queue_commands', side_effect=RuntimeError('disk full')):
+                outcomes = await self.service.start_irrigation_many({'ZONE1': 600, 'ZONE9': 600}, db)
+        self.assertEqual(outcomes['ZONE1'], {'status': 'failed', 'error': 'disk full'})
+        self.assertEqual(outcomes['ZONE9'], {'status': 'no_device'})
+        async with self.Session() as db:
+            self.assertEqual((await db.execute(select(IrrigationLog))).scalars().all(), [])
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+
+    async def test_stop_many_only_stops_active_zones(self):
+        """Test stops go to irrigating zones with priority and skip the rest"""
+        async with self.Session() as db:
+            await self.service.start_irrigation_many({'ZONE1': 600}, db)
+        await self.channel.wait_for_commands('ARD_1')
+
+        statements = count_statements(self.engine)
+        async with self.Session() as db:
+            outcomes = await self.service.stop_irrigation_many(['ZONE1', 'ZONE2', 'ZONE9', 'ZONE1'], db)
+        self.assertEqual(sorted(outcomes), ['ZONE1', 'ZONE2', 'ZONE9'])
+        self.assertEqual(outcomes['ZONE1']['status'], 'queued')
+        self.assertEqual(outcomes['ZONE2'], {'status': 'not_irrigating', 'device_id': 'ARD_2'})
+        self.assertEqual(outcomes['ZONE9'], {'status': 'no_device'})
+        self.assertEqual(len(statements), 3)
+
+        stop = (await self.commands())[-1]
+        self.assertEqual((stop.command_type, stop.priority), ('stop_irrigation', 2))
+        delivered = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual([c['command_id'] for c in delivered], [stop.id])
+
+    async def test_single_zone_wrappers(self):
+        """Test start_irrigation and stop_irrigation report success per zone"""
+        async with self.Session() as db:
+            self.assertTrue(await self.service.start_irrigation('ZONE2', 120, db))
+            self.assertFalse(await self.service.start_irrigation('ZONE3', 120, db))
+            self.assertTrue(await self.service.stop_irrigation('ZONE2', db))
+            self.assertFalse(await self.service.stop_irrigation('ZONE1', db))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from backend.arduino_simulator import ArduinoSimulator
+
+class TestSimulatorDatabase(unittest.TestCase):
+    def setUp(self):
+        """A simulator database still in the one-row-per-sensor layout"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "simulator.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE sensor_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    zone_id VARCHAR(255) NOT NULL,
+                    sensor_type VARCHAR(50) NOT NULL,
+                    value FLOAT NOT NULL,
+                    timestamp TIMESTAMP
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO sensor_data (zone_id, sensor_type, value, timestamp) VALUES (?, ?, ?, ?)",
+                [
+                    ('ZONE1', 'soil_moisture', 41.0, '2024-05-01 06:00:00.000000'),
+                    ('ZONE1', 'air_temperature', 22.5, '2024-05-01 06:00:00.000000'),
+                    ('ZONE1', 'soil_moisture', 39.0, '2024-05-01 07:00:00.000000'),
+                ]
+            )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _columns(self, conn, table):
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def test_old_layout_is_migrated(self):
+        """Test an EAV sensor_data is migrated and every simulator table is created"""
+        simulator = ArduinoSimulator(db_path=self.db_path)
+        simulator.stop()
+        self.assertEqual(sorted(simulator.zones), ['ZONE1', 'ZONE2', 'ZONE3'])
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertIn('soil_moisture', self._columns(conn, 'sensor_data'))
+            self.assertNotIn('sensor_type', self._columns(conn, 'sensor_data'))
+            rows = conn.execute("SELECT timestamp, soil_moisture, air_temp FROM sensor_data ORDER BY timestamp").fetchall()
+            self.assertEqual([row[1:] for row in rows], [(41.0, 22.5), (39.0, None)])
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM arduino_status").fetchone()[0], 3)
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(sensor_data)")}
+            self.assertTrue({'idx_sensor_data_zone_time', 'idx_sensor_data_device_time'} <= indexes)
+
+        # A second start finds the wide table and leaves it alone
+        ArduinoSimulator(db_path=self.db_path).stop()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sensor_data").fetchone()[0], 2)
+
+if __name__ == '__main__':
+    unittest.main()
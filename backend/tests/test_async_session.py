@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import select
+from backend.database import async_session
+from backend.database.async_session import async_database_url
+from backend.models.notification import Notification
+from backend.models.sensor_data import ArduinoStatus, Command, SensorData
+from backend.services.arduino_service import ArduinoService
+from backend.services.command_channel import CommandChannel
+from backend.services.fallback_service import FallbackService
+from backend.tests.async_db import create_database
+
+class TestAsyncDatabaseUrl(unittest.TestCase):
+    def test_sqlite_uses_aiosqlite(self):
+        """Test SQLite URLs keep their path and switch driver"""
+        self.assertEqual(async_database_url('sqlite:///./smart_irrigation.db'), 'sqlite+aiosqlite:///./smart_irrigation.db')
+
+    def test_mysql_drivers_map_to_aiomysql(self):
+        """Test any sync MySQL driver maps to aiomysql with credentials intact"""
+        for url in ('mysql://u:p@db:3306/irrigation', 'mysql+pymysql://u:p@db:3306/irrigation'):
+            self.assertEqual(async_database_url(url), 'mysql+aiomysql://u:p@db:3306/irrigation')
+
+    def test_unknown_backend(self):
+        """Test backends without a configured driver are rejected"""
+        with self.assertRaises(ValueError):
+            async_database_url('oracle://u:p@db/irrigation')
+
+class TestLazyAsyncEngine(unittest.IsolatedAsyncioTestCase):
+    async def test_engine_built_on_first_session(self):
+        """Test the engine is created once, when the first session is opened"""
+        from backend.core.config import settings
+        with mock.patch.object(async_session, '_async_engine', None), \
+                mock.patch.object(async_session, '_async_sessionmaker', None), \
+                mock.patch.object(settings, 'DATABASE_URL', 'sqlite://'), \
+                mock.patch.object(async_session, 'create_async_engine', wraps=async_session.create_async_engine) as create:
+            self.assertFalse(create.called)
+            async with async_session.AsyncSessionLocal() as first, async_session.AsyncSessionLocal() as second:
+                self.assertIs(first.bind, second.bind)
+                self.assertFalse(first.sync_session.expire_on_commit)
+            create.assert_called_once_with('sqlite+aiosqlite://')
+            await async_session.get_async_engine().dispose()
+
+class TestAsyncServices(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine, self.Session = await create_database()
+        self.channel = CommandChannel()
+        self.service = ArduinoService(channel=self.channel)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def all(self, model):
+        async with self.Session() as db:
+            return (await db.execute(select(model).order_by(model.id))).scalars().all()
+
+    async def test_process_sensor_data(self):
+        """Test a report registers the device and stores its mapped readings"""
+        data = {
+            'zone_id': 'ZONE1', 'battery_level': 87.5, 'signal_strength': -60, 'firmware_version': '1.2.0',
+            'sensor_data': {'moisture': 31.5, 'air_temp': 22.0, 'light': 800}
+        }
+        async with self.Session() as db:
+            self.assertTrue(await self.service.process_sensor_data('ARD_1', data, db))
+            self.assertTrue(await self.service.process_sensor_data('ARD_1', {'battery_level': 80.0}, db))
+
+        [status] = await self.all(ArduinoStatus)
+        self.assertEqual((status.device_id, status.is_online, status.battery_level), ('ARD_1', True, 80.0))
+        [reading] = await self.all(SensorData)
+        self.assertEqual(
+            (reading.zone_id, reading.device_id, reading.soil_moisture, reading.air_temp, reading.light_level, reading.soil_ph),
+            ('ZONE1', 'ARD_1', 31.5, 22.0, 800, None)
+        )
+
+    async def test_process_sensor_data_rolls_back(self):
+        """Test a failed commit stores nothing and reports failure"""
+        async with self.Session() as db:
+            with mock.patch.object(db, 'commit', side_effect=RuntimeError('disk full')):
+                data = {'zone_id': 'ZONE1', 'sensor_data': {'moisture': 31.5}}
+                self.assertFalse(await self.service.process_sensor_data('ARD_1', data, db))
+        self.assertEqual(await self.all(ArduinoStatus), [])
+        self.assertEqual(await self.all(SensorData), [])
+
+    async def test_queue_command(self):
+        """Test a queued command is committed with its expiry and published"""
+        async with self.Session() as db:
+            self.assertTrue(await self.service.queue_command(
+                'ARD_1', 'start_irrigation', {'duration': 60}, db, priority=2, expires_in=timedelta(minutes=1)
+            ))
+            self.assertTrue(await self.service.queue_command('ARD_1', 'read_sensors', {}, db))
+
+        urgent, default = await self.all(Command)
+        self.assertEqual((urgent.status, urgent.priority, urgent.parameters), ('pending', 2, {'duration': 60}))
+        self.assertEqual(urgent.expiry_time - urgent.created_at, timedelta(minutes=1))
+        self.assertEqual(default.expiry_time - default.created_at, self.service.command_timeout)
+        delivered = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual([c['command_id'] for c in delivered], [urgent.id, default.id])
+
+    async def test_queue_command_failure_is_not_published(self):
+        """Test a command whose commit fails is neither stored nor published"""
+        async with self.Session() as db:
+            with mock.patch.object(db, 'commit', side_effect=RuntimeError('disk full')):
+                self.assertFalse(await self.service.queue_command('ARD_1', 'start_irrigation', {}, db))
+        self.assertEqual(await self.all(Command), [])
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+
+class TestFallbackRetries(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """One controller silent for 20 minutes and one reporting a weak signal"""
+        self.engine, self.Session = await create_database()
+        self.service = FallbackService()
+        now = datetime.utcnow()
+        async with self.Session() as db:
+            db.add_all([
+                ArduinoStatus(device_id='ARD_1', is_online=True, last_seen=now - timedelta(minutes=20), signal_strength=-70),
+                ArduinoStatus(device_id='ARD_2', is_online=True, last_seen=now, signal_strength=-90, battery_level=50.0),
+            ])
+            await db.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def alerts(self):
+        async with self.Session() as db:
+            return (await db.execute(select(Notification).order_by(Notification.id))).scalars().all()
+
+    async def test_retries_escalate(self):
+        """Test each check of a silent device counts a retry and escalates at the limit"""
+        results = []
+        for _ in range(self.service.connection_retry_limit):
+            async with self.Session() as db:
+                results.append(await self.service.check_arduino_status('ARD_1', db))
+
+        self.assertEqual([r['retry_count'] for r in results], [1, 2, 3])
+        self.assertTrue(results[0]['reason'].endswith('(Attempt 1 of 3)'))
+        self.assertTrue(results[-1]['reason'].endswith('after 3 retry attempts'))
+        self.assertEqual(results[0]['signal_strength'], -70)
+        self.assertEqual([a.severity for a in await self.alerts()], ['medium', 'medium', 'high'])
+
+        async with self.Session() as db:
+            status = (await db.execute(select(ArduinoStatus).where(ArduinoStatus.device_id == 'ARD_1'))).scalar_one()
+        self.assertEqual(status.error_count, 3)
+        self.assertFalse(status.is_online)
+        self.assertIsNotNone(status.last_offline)
+
+    async def test_unregistered_device(self):
+        """Test an unknown device is reported offline with a high alert"""
+        async with self.Session() as db:
+            result = await self.service.check_arduino_status('ARD_9', db)
+        self.assertEqual((result['status'], result['retry_count']), ('offline', 0))
+        self.assertEqual([a.severity for a in await self.alerts()], ['high'])
+
+    async def test_weak_signal_online(self):
+        """Test an online device with a weak signal stays online and raises a low alert"""
+        async with self.Session() as db:
+            result = await self.service.check_arduino_status('ARD_2', db)
+        self.assertEqual((result['status'], result['battery_level']), ('online', 50.0))
+        self.assertEqual([a.severity for a in await self.alerts()], ['low'])
+
+if __name__ == '__main__':
+    unittest.main()
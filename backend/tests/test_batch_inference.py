@@ -0,0 +1,168 @@
+import asyncio
+import time
+import unittest
+import unittest.mock
+from datetime import datetime, timedelta
+import numpy as np
+from backend.ml_models.batch_inference import BatchInferenceServer
+from backend.ml_models.crop_analyzer import CropHealthAnalyzer
+from backend.ml_models.irrigation_predictor import IrrigationPredictor
+
+class IdentityScaler:
+    def transform(self, features):
+        return features
+
+class LinearModel:
+    """Fitted-model stand-in that counts calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features):
+        self.calls.append(len(features))
+        return features.sum(axis=1)
+
+    def predict_proba(self, features):
+        self.calls.append(len(features))
+        positive = np.clip(features[:, 1] / 100, 0, 1)
+        return np.column_stack([1 - positive, positive])
+
+def irrigation_zone(temperature):
+    now = datetime.now()
+    return {
+        'current_conditions': {
+            'temperature': temperature, 'humidity': 50, 'soil_moisture': 20,
+            'solar_radiation': 100, 'wind_speed': 2, 'evapotranspiration': 4
+        },
+        'weather_forecast': [{'precipitation_forecast': 0.1, 'time': now + timedelta(days=day)} for day in range(3)],
+        'soil_data': {'soil_type': 'loamy', 'current_moisture': 20, 'field_capacity': 60},
+        'crop_data': {'growth_stage': 2}
+    }
+
+class TestPredictMany(unittest.TestCase):
+    def test_irrigation_predict_many_matches_single(self):
+        """Test one batched model call gives the per-zone predictions"""
+        predictor = IrrigationPredictor()
+        predictor.scaler, predictor.model = IdentityScaler(), LinearModel()
+        zones = [irrigation_zone(t) for t in (15, 25, 35)]
+        batched = predictor.predict_many(zones)
+        self.assertEqual(predictor.model.calls, [3])
+        for zone, result in zip(zones, batched):
+            single = predictor.predict_irrigation_needs(**zone)
+            self.assertAlmostEqual(result['base_water_needs'], single['base_water_needs'])
+            self.assertAlmostEqual(result['adjusted_needs'], single['adjusted_needs'])
+        self.assertEqual(predictor.predict_many([]), [])
+
+    def test_disease_probability_many(self):
+        """Test batched disease probabilities keep per-zone risk levels"""
+        analyzer = CropHealthAnalyzer()
+        analyzer.scaler, analyzer.disease_classifier = IdentityScaler(), LinearModel()
+        base = {'temperature': 20, 'soil_moisture': 50, 'soil_ph': 6.5, 'nitrogen': 30, 'phosphorus': 30, 'potassium': 30}
+        results = analyzer.predict_disease_probability_many([{**base, 'humidity': h} for h in (10, 50, 90)])
+        self.assertEqual(analyzer.disease_classifier.calls, [3])
+        self.assertEqual([r['risk_level'] for r in results], ['Low', 'Medium', 'High'])
+        self.assertEqual(analyzer.predict_disease_probability({**base, 'humidity': 90})['risk_level'], 'High')
+
+class TestBatchInferenceServer(unittest.TestCase):
+    def test_concurrent_requests_share_batches(self):
+        """Test concurrent predictions are answered from few model calls"""
+        calls = []
+
+        def predict_many(items):
+            calls.append(len(items))
+            return [item * 2 for item in items]
+
+        async def run():
+            server = BatchInferenceServer(predict_many, max_batch=32, max_wait_ms=20)
+            results = await server.predict_many(range(100))
+            await server.stop()
+            return results, server.stats()
+
+        results, stats = asyncio.run(run())
+        self.assertEqual(results, [item * 2 for item in range(100)])
+        self.assertEqual(calls, [32, 32, 32, 4])
+        self.assertEqual((stats['requests'], stats['batches'], stats['largest_batch']), (100, 4, 32))
+
+    def test_bad_row_fails_alone(self):
+        """Test a failing batch is retried per row so only the bad request errors"""
+        def predict_many(items):
+            return [1 / item for item in items]
+
+        async def run():
+            server = BatchInferenceServer(predict_many, max_wait_ms=20)
+            results = await asyncio.gather(*(server.predict(item) for item in (1, 0, 4)), return_exceptions=True)
+            await server.stop()
+            return results, server.stats()
+
+        results, stats = asyncio.run(run())
+        self.assertEqual(results[0], 1.0)
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertEqual(results[2], 0.25)
+        self.assertEqual(stats['failed_batches'], 1)
+
+    def test_short_results_fail_batch_not_worker(self):
+        """Test a predict_many that drops rows fails those requests and keeps serving"""
+        def predict_many(items):
+            if items[0] == 'short':
+                return items[:-1]
+            return [item.upper() for item in items]
+
+        async def run():
+            server = BatchInferenceServer(predict_many, max_wait_ms=20)
+            failed = await asyncio.gather(server.predict('short'), server.predict('b'), return_exceptions=True)
+            later = await asyncio.wait_for(server.predict('c'), timeout=1)
+            alive = not server._worker.done()
+            await server.stop()
+            return failed, later, alive
+
+        failed, later, alive = asyncio.run(run())
+        self.assertIsInstance(failed[0], ValueError)
+        self.assertEqual(failed[1], 'B')
+        self.assertEqual(later, 'C')
+        self.assertTrue(alive)
+
+    def test_unexpected_batch_error_keeps_worker(self):
+        """Test an error outside predict_many fails that batch only"""
+        async def run():
+            server = BatchInferenceServer(lambda items: items, max_wait_ms=1)
+            with unittest.mock.patch.object(server, '_run_batch', side_effect=RuntimeError('boom')):
+                failed = await asyncio.gather(server.predict(1), return_exceptions=True)
+            later = await asyncio.wait_for(server.predict(2), timeout=1)
+            await server.stop()
+            return failed, later
+
+        failed, later = asyncio.run(run())
+        self.assertIsInstance(failed[0], RuntimeError)
+        self.assertEqual(later, 2)
+
+    def test_dead_worker_is_restarted(self):
+        """Test a request after the worker task ended starts a new one"""
+        async def run():
+            server = BatchInferenceServer(lambda items: items, max_wait_ms=1)
+            self.assertEqual(await server.predict(1), 1)
+            server._worker.cancel()
+            await asyncio.sleep(0)
+            result = await asyncio.wait_for(server.predict(2), timeout=1)
+            await server.stop()
+            return result
+
+        self.assertEqual(asyncio.run(run()), 2)
+
+    def test_stop_fails_running_batch(self):
+        """Test stopping during a slow batch cancels its callers instead of leaving them waiting"""
+        def predict_many(items):
+            time.sleep(0.2)
+            return items
+
+        async def run():
+            server = BatchInferenceServer(predict_many, max_wait_ms=1)
+            request = asyncio.ensure_future(server.predict(1))
+            await asyncio.sleep(0.05)  # The batch is now running
+            await server.stop()
+            return await asyncio.wait_for(asyncio.gather(request, return_exceptions=True), timeout=1)
+
+        results = asyncio.run(run())
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+
+if __name__ == '__main__':
+    unittest.main()
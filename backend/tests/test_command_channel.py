@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from backend.services.command_channel import CommandChannel
+
+class TestCommandChannel(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Create an empty channel"""
+        self.channel = CommandChannel()
+
+    async def test_publish_wakes_waiting_poll(self):
+        """Test a long-poll returns as soon as a command is published"""
+        waiter = asyncio.create_task(self.channel.wait_for_commands('ARD_1', timeout=5))
+        await asyncio.sleep(0.01)
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'start_irrigation', 'parameters': {}})
+
+        commands = await asyncio.wait_for(waiter, timeout=1)
+        self.assertEqual([c['command_id'] for c in commands], [1])
+
+    async def test_poll_times_out_empty(self):
+        """Test an idle long-poll returns an empty list"""
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1', timeout=0.01), [])
+
+    async def test_sync_skips_known_and_expired_commands(self):
+        """Test database sync does not redeliver or deliver stale commands"""
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'stop_irrigation', 'parameters': {}})
+        delivered = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual(len(delivered), 1)
+
+        stale = datetime.utcnow() - timedelta(minutes=10)
+        self.channel.sync('ARD_1', [
+            ({'command_id': 1, 'type': 'stop_irrigation', 'parameters': {}}, datetime.utcnow()),
+            ({'command_id': 2, 'type': 'start_irrigation', 'parameters': {}}, stale),
+            ({'command_id': 3, 'type': 'start_irrigation', 'parameters': {}}, datetime.utcnow()),
+        ])
+        self.assertFalse(self.channel.needs_sync('ARD_1'))
+        commands = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual([c['command_id'] for c in commands], [3])
+
+    async def test_higher_priority_delivered_first(self):
+        """Test priority beats arrival order, then earlier deadline wins"""
+        now = datetime.utcnow()
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'read_sensors', 'parameters': {}},
+                             now, priority=1, expiry_time=now + timedelta(minutes=5))
+        self.channel.publish('ARD_1', {'command_id': 2, 'type': 'read_sensors', 'parameters': {}},
+                             now, priority=1, expiry_time=now + timedelta(minutes=1))
+        self.channel.publish('ARD_1', {'command_id': 3, 'type': 'stop_irrigation', 'parameters': {}},
+                             now, priority=2)
+
+        commands = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual([c['command_id'] for c in commands], [3, 2, 1])
+
+    async def test_stop_cancels_pending_start(self):
+        """Test a stop supersedes an undelivered start for the same zone"""
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'start_irrigation', 'parameters': {'zone_id': 'z1'}})
+        self.channel.publish('ARD_1', {'command_id': 2, 'type': 'start_irrigation', 'parameters': {'zone_id': 'z2'}})
+        self.channel.publish('ARD_1', {'command_id': 3, 'type': 'stop_irrigation', 'parameters': {'zone_id': 'z1'}})
+
+        commands = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual(sorted(c['command_id'] for c in commands), [2, 3])
+        updates = self.channel.pop_status_updates()
+        self.assertEqual([(u['b_id'], u['status']) for u in updates], [(1, 'cancelled')])
+
+    async def test_expired_commands_are_recorded(self):
+        """Test commands past their deadline are dropped and marked expired"""
+        past = datetime.utcnow() - timedelta(seconds=1)
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'read_sensors', 'parameters': {}},
+                             expiry_time=past)
+
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+        self.assertEqual(self.channel.pop_status_updates()[0]['status'], 'expired')
+
+    async def test_acknowledge_buffers_status(self):
+        """Test reported statuses are buffered until popped"""
+        self.channel.publish('ARD_1', {'command_id': 7, 'type': 'read_sensors', 'parameters': {}})
+        await self.channel.wait_for_commands('ARD_1')
+
+        self.assertTrue(self.channel.acknowledge('ARD_1', 7, 'completed'))
+        self.assertFalse(self.channel.acknowledge('ARD_1', 7, 'completed'))
+        self.assertEqual(self.channel.pending_status_updates, 1)
+        self.assertEqual(self.channel.pop_status_updates()[0]['status'], 'completed')
+        self.assertEqual(self.channel.pending_status_updates, 0)
+
+    async def test_unacknowledged_command_is_redelivered(self):
+        """Test a command whose acknowledgement was lost is sent again"""
+        self.channel = CommandChannel(ack_timeout=0.05)
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'start_irrigation', 'parameters': {'zone_id': 'z1'}})
+        self.assertEqual(len(await self.channel.wait_for_commands('ARD_1')), 1)
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+
+        await asyncio.sleep(0.06)
+        commands = await self.channel.wait_for_commands('ARD_1')
+        self.assertEqual([c['command_id'] for c in commands], [1])
+        self.assertTrue(self.channel.acknowledge('ARD_1', 1, 'completed'))
+        await asyncio.sleep(0.06)
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+
+    async def test_late_acknowledgement_cancels_redelivery(self):
+        """Test an acknowledgement arriving after the command was requeued still counts"""
+        self.channel = CommandChannel(ack_timeout=0)
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'read_sensors', 'parameters': {}})
+        await self.channel.wait_for_commands('ARD_1')
+        self.channel.sync('ARD_1', [])  # Requeues the unacknowledged command
+
+        self.assertTrue(self.channel.acknowledge('ARD_1', 1, 'completed'))
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+        self.assertEqual(self.channel.pop_status_updates()[0]['status'], 'completed')
+
+    async def test_redelivery_stops_at_deadline(self):
+        """Test an unacknowledged command expires instead of being resent forever"""
+        self.channel = CommandChannel(ack_timeout=0)
+        soon = datetime.utcnow() + timedelta(milliseconds=50)
+        self.channel.publish('ARD_1', {'command_id': 1, 'type': 'read_sensors', 'parameters': {}}, expiry_time=soon)
+        self.assertEqual(len(await self.channel.wait_for_commands('ARD_1')), 1)
+
+        await asyncio.sleep(0.06)
+        self.assertEqual(await self.channel.wait_for_commands('ARD_1'), [])
+        self.assertEqual(self.channel.pop_status_updates()[0]['status'], 'expired')
+        self.assertFalse(self.channel.acknowledge('ARD_1', 1))
+
+if __name__ == '__main__':
+    unittest.main()
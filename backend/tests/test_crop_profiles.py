@@ -0,0 +1,109 @@
+import dataclasses
+import unittest
+import numpy as np
+from backend.ml_models.crop_patterns import CropPatternAnalyzer
+from backend.ml_models.crop_profiles import base_compatibility, crop_profile_table
+
+class TestCropProfileTable(unittest.TestCase):
+    def setUp(self):
+        self.table = crop_profile_table()
+
+    def test_compiled_once_and_immutable(self):
+        """Test analyzers share one read-only table"""
+        self.assertIs(CropPatternAnalyzer().profile_table, CropPatternAnalyzer().profile_table)
+        profile = self.table.get('tomato', 'determinate').profile
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            profile.name = 'Potato'
+        with self.assertRaises(TypeError):
+            profile.climate_preferences['temperature'] = (0, 50)
+        with self.assertRaises(ValueError):
+            self.table.compatibility[0, 0] = 0
+        self.assertFalse(hasattr(profile, '__dict__'))
+
+    def test_stage_lookup_boundaries(self):
+        """Test bisect lookup puts boundary days in the earlier stage"""
+        tomato = self.table.get('tomato', 'determinate')
+        self.assertEqual(tomato.stage_ends, (21, 51, 81, 121))
+        cases = {-1: None, 0: 0, 21: 0, 22: 1, 51: 1, 121: 3, 122: None}
+        for days, expected in cases.items():
+            self.assertEqual(tomato.stage_index(days), expected, days)
+        self.assertEqual(tomato.stage_start(2), 51)
+
+    def test_compatibility_matrix(self):
+        """Test matrix entries equal the pairwise overlap scores"""
+        for main in self.table.compiled:
+            for companion in self.table.compiled:
+                self.assertEqual(
+                    self.table.compatibility[main.index, companion.index],
+                    base_compatibility(main.profile, companion.profile)
+                )
+
+    def test_unknown_profiles(self):
+        """Test unknown crops and varieties raise KeyError as before"""
+        with self.assertRaises(KeyError):
+            self.table.get('potato', 'russet')
+        with self.assertRaises(KeyError):
+            CropPatternAnalyzer().analyze_growth_stage('tomato', 'cherry', 10, {})
+
+class TestGrowthStageAnalysis(unittest.TestCase):
+    def test_analyze_growth_stage(self):
+        """Test stage, days in stage and condition analysis"""
+        result = CropPatternAnalyzer().analyze_growth_stage('lettuce', 'butterhead', 40, {'temperature': 25, 'humidity': 65})
+        self.assertEqual(result['current_stage'], 'Head Formation')
+        self.assertEqual((result['days_in_stage'], result['days_remaining']), (3, 18))
+        self.assertEqual(result['condition_analysis']['temperature']['adjustment_needed'], 5)
+        self.assertEqual(result['condition_analysis']['humidity']['status'], 'optimal')
+        self.assertEqual(result['stress_indicators'], ['bolting', 'loose_heads'])
+
+    def test_analyze_growth_stages_matches_single_zone(self):
+        """Test the bulk call agrees with analyze_growth_stage zone by zone"""
+        analyzer = CropPatternAnalyzer()
+        rng = np.random.default_rng(0)
+        zones = 500
+        crops = rng.choice(['tomato', 'lettuce'], zones)
+        varieties = np.where(crops == 'tomato', 'determinate', 'butterhead')
+        days = rng.integers(-2, 130, zones)
+        temperature = rng.uniform(5, 40, zones)
+        humidity = rng.uniform(30, 95, zones)
+        humidity[::7] = np.nan
+        batch = analyzer.analyze_growth_stages(crops, varieties, days, temperature, humidity)
+        names = batch.stage_names()
+
+        for i in range(zones):
+            conditions = {'temperature': temperature[i]}
+            if not np.isnan(humidity[i]):
+                conditions['humidity'] = humidity[i]
+            single = analyzer.analyze_growth_stage(crops[i], varieties[i], days[i], conditions)
+            if 'error' in single:
+                self.assertEqual(batch.stage_index[i], -1)
+                self.assertIsNone(names[i])
+                continue
+            self.assertEqual(names[i], single['current_stage'])
+            self.assertEqual(batch.days_in_stage[i], single['days_in_stage'])
+            self.assertEqual(batch.days_remaining[i], single['days_remaining'])
+            self.assertEqual(batch.water_needs[i], single['water_needs'])
+            for condition in batch.deviation:
+                if condition in single['condition_analysis']:
+                    self.assertAlmostEqual(
+                        abs(batch.deviation[condition][i]),
+                        single['condition_analysis'][condition]['adjustment_needed']
+                    )
+                else:
+                    self.assertTrue(np.isnan(batch.deviation[condition][i]))
+
+    def test_analyze_growth_stages_flags_invalid_zones(self):
+        """Test unknown crops and finished plants are marked instead of raising"""
+        batch = CropPatternAnalyzer().analyze_growth_stages(
+            ['lettuce', 'potato', 'tomato', 'lettuce'],
+            ['butterhead', 'russet', 'determinate', 'butterhead'],
+            [40, 10, 200, -1],
+            temperature=[25, 20, 20, 20]
+        )
+        self.assertEqual(batch.stage_index.tolist(), [2, -1, -1, -1])
+        self.assertEqual(batch.valid.tolist(), [True, False, False, False])
+        self.assertEqual(batch.deviation['temperature'][0], 5)
+        self.assertTrue(np.isnan(batch.days_remaining[1:]).all())
+        self.assertTrue(np.isnan(batch.deviation['soil_moisture']).all())
+
+if __name__ == '__main__':
+    unittest.main()
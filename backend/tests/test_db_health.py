@@ -0,0 +1,110 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout
+from backend.database.health import MonitoredQueuePool, PoolMonitor, QueryProfiler, pool_options
+
+class TestPoolOptions(unittest.TestCase):
+    def test_file_and_server_databases_are_monitored(self):
+        """Test file SQLite and MySQL URLs get the timing pool"""
+        for url in ('sqlite:///./smart_irrigation.db', 'mysql://u:p@db:3306/irrigation'):
+            self.assertIs(pool_options(url)['poolclass'], MonitoredQueuePool)
+
+    def test_memory_sqlite_keeps_default_pool(self):
+        """Test in-memory SQLite keeps its single shared connection"""
+        self.assertEqual(pool_options('sqlite://'), {})
+        self.assertEqual(pool_options('sqlite:///:memory:'), {})
+
+class TestPoolMonitor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.tmp.name, 'health.db')}"
+        self.engine = create_engine(url, pool_size=1, max_overflow=0, pool_timeout=0.05, **pool_options(url))
+        self.monitor = PoolMonitor(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_check_and_pool_stats(self):
+        """Test a successful check is reported with checkout counts"""
+        self.assertTrue(self.monitor.check())
+        with self.engine.connect():
+            stats = self.monitor.stats()
+            self.assertEqual(stats['checked_out'], 1)
+        stats = self.monitor.stats()
+        self.assertTrue(stats['healthy'])
+        self.assertEqual(stats['pool'], 'MonitoredQueuePool')
+        self.assertEqual((stats['checked_out'], stats['checked_in'], stats['overflow']), (0, 1, 0))
+        self.assertEqual(stats['checkouts'], 2)
+
+    def test_wait_and_timeout_are_recorded(self):
+        """Test checkouts that wait for an exhausted pool are timed"""
+        held = self.engine.connect()
+        with self.assertRaises(PoolTimeout):
+            self.engine.connect()
+        release = threading.Timer(0.02, held.close)
+        release.start()
+        with self.engine.connect():
+            pass
+        release.join()
+        stats = self.monitor.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertGreaterEqual(stats['max_wait_ms'], 20)
+
+    def test_failed_check_disposes_pool(self):
+        """Test a failing check marks the engine unhealthy and keeps stats across dispose"""
+        self.monitor.check()
+        pool = self.engine.pool
+        with patch.object(self.engine, 'connect', side_effect=OSError("server gone")):
+            self.assertFalse(self.monitor.check())
+        self.assertIsNot(self.engine.pool, pool)
+        stats = self.monitor.stats()
+        self.assertFalse(stats['healthy'])
+        self.assertEqual((stats['failures'], stats['last_error']), (1, "server gone"))
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertTrue(self.monitor.check())
+
+class TestQueryProfiler(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+
+    def test_slow_queries_are_captured(self):
+        """Test statements over the threshold are kept for stats"""
+        profiler = QueryProfiler(self.engine, slow_ms=0)
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+        stats = profiler.stats()
+        self.assertEqual((stats['statements'], stats['slow']), (1, 1))
+        self.assertEqual(stats['recent_slow'][0]['statement'], "SELECT 1")
+
+    def test_fast_queries_are_sampled(self):
+        """Test fast statements are only logged for the sampled share"""
+        profiler = QueryProfiler(self.engine, slow_ms=10_000, sample_rate=0.25, rng=random.Random(0))
+        with self.assertLogs('backend.database.health', level='INFO') as logs, self.engine.connect() as conn:
+            for _ in range(200):
+                conn.exec_driver_sql("SELECT 1")
+        stats = profiler.stats()
+        self.assertEqual((stats['statements'], stats['slow']), (200, 0))
+        self.assertEqual(len(logs.output), stats['sampled'])
+        self.assertTrue(30 < stats['sampled'] < 70)
+
+    def test_failed_statements_are_not_timed(self):
+        """Test a failing statement leaves no start time behind on its connection"""
+        profiler = QueryProfiler(self.engine, slow_ms=0)
+        with self.engine.connect() as conn:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    conn.exec_driver_sql("SELECT * FROM missing")
+            conn.exec_driver_sql("SELECT 1")
+            self.assertNotIn('query_started', conn.info)
+        stats = profiler.stats()
+        self.assertEqual((stats['statements'], stats['slow']), (1, 1))
+        self.assertEqual(stats['recent_slow'][0]['statement'], "SELECT 1")
+
+if __name__ == '__main__':
+    unittest.main()
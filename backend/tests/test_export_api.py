@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from backend.models.sensor_data import SensorData
+
+try:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.api import exports
+    from backend.database.session import get_db
+except ImportError:
+    TestClient = None
+
+START = datetime(2024, 6, 1)
+
+@unittest.skipIf(TestClient is None, "fastapi and httpx are required")
+class TestExportEndpoint(unittest.TestCase):
+    def setUp(self):
+        """One zone with three readings, served by the export router alone"""
+        self.engine = create_engine(
+            'sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool
+        )
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE zones (id INTEGER PRIMARY KEY, zone_id VARCHAR(255) UNIQUE)"))
+            conn.execute(text("INSERT INTO zones (zone_id) VALUES ('ZONE1'), ('ZONE2')"))
+            metadata = MetaData()
+            Table('zones', metadata, autoload_with=conn)
+            SensorData.__table__.to_metadata(metadata).create(conn)
+            conn.execute(SensorData.__table__.insert(), [
+                {'zone_id': 'ZONE1', 'device_id': 'ARD_1', 'timestamp': START + timedelta(hours=hour), 'soil_moisture': float(hour)}
+                for hour in range(3)
+            ])
+
+        def session():
+            db = Session(self.engine)
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(exports.router, prefix="/api")
+        app.dependency_overrides[get_db] = session
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def export(self, zone_id, **params):
+        params.setdefault('start_date', START.isoformat())
+        params.setdefault('end_date', (START + timedelta(days=1)).isoformat())
+        return self.client.get(f"/api/zones/{zone_id}/export", params=params)
+
+    def test_csv_export(self):
+        """Test a known zone streams its readings as a CSV attachment"""
+        response = self.export('ZONE1')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('text/csv'))
+        self.assertEqual(response.headers['content-disposition'], 'attachment; filename="ZONE1_sensor_data.csv"')
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual([float(row['soil_moisture']) for row in rows], [0.0, 1.0, 2.0])
+
+    def test_ndjson_export_of_zone_without_rows(self):
+        """Test a known zone with nothing in range returns an empty stream"""
+        response = self.export('ZONE2', format='ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, '')
+
+        records = [json.loads(line) for line in self.export('ZONE1', format='ndjson').text.splitlines()]
+        self.assertEqual([record['timestamp'] for record in records], [(START + timedelta(hours=h)).isoformat() for h in range(3)])
+
+    def test_unknown_zone(self):
+        """Test a zone that does not exist is a 404"""
+        self.assertEqual(self.export('ZONE9').status_code, 404)
+
+    def test_unknown_dataset_and_format(self):
+        """Test unknown datasets and formats are a 400"""
+        self.assertEqual(self.export('ZONE1', dataset='weather').status_code, 400)
+        self.assertEqual(self.export('ZONE1', format='xlsx').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, create_engine, event, text
+from sqlalchemy.orm import Session
+from backend.models.satellite_data import SatelliteData
+from backend.models.sensor_data import SensorData
+from backend.services.export_service import ExportService, _ChunkSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+START = datetime(2024, 6, 1)
+END = START + timedelta(days=1)
+
+class TestExportService(unittest.TestCase):
+    def setUp(self):
+        """Seven readings and three satellite passes for ZONE1, one reading for ZONE2"""
+        self.engine = create_engine('sqlite://')
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE zones (id INTEGER PRIMARY KEY, zone_id VARCHAR(255) UNIQUE)"))
+            metadata = MetaData()
+            Table('zones', metadata, autoload_with=conn)
+            SensorData.__table__.to_metadata(metadata).create(conn)
+            SatelliteData.__table__.to_metadata(metadata).create(conn)
+
+            readings = [
+                {'zone_id': 'ZONE1', 'device_id': 'ARD_1', 'timestamp': START + timedelta(hours=hour),
+                 'soil_moisture': float(hour), 'is_raining': hour % 2 == 0}
+                for hour in range(7)
+            ]
+            readings.append({'zone_id': 'ZONE2', 'device_id': 'ARD_2', 'timestamp': START, 'soil_moisture': 1.0, 'is_raining': False})
+            readings.append({'zone_id': 'ZONE1', 'device_id': 'ARD_1', 'timestamp': END + timedelta(hours=1), 'soil_moisture': 9.0, 'is_raining': False})
+            conn.execute(SensorData.__table__.insert(), readings)
+            conn.execute(SatelliteData.__table__.insert(), [
+                {'zone_id': 'ZONE1', 'timestamp': START + timedelta(days=day) / 2, 'ndvi': 0.5,
+                 'raw_data': {'bands': [day, day + 1], 'cloud': day == 1}}
+                for day in range(3)
+            ])
+        self.db = Session(self.engine)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def export(self, dataset, format, page_size=5000):
+        return list(ExportService(page_size).stream(self.db, dataset, 'ZONE1', START, END, format))
+
+    def test_csv_header_and_rows(self):
+        """Test the CSV has the column header and one row per reading in range"""
+        chunks = self.export('sensor_data', 'csv')
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(rows[0], [column.name for column in SensorData.__table__.columns])
+        self.assertEqual(len(rows), 8)
+        timestamps = [row[rows[0].index('timestamp')] for row in rows[1:]]
+        self.assertEqual(timestamps, [(START + timedelta(hours=hour)).isoformat() for hour in range(7)])
+
+    def test_pages_become_chunks(self):
+        """Test each yield_per page is encoded into its own chunk"""
+        fetches = []
+        event.listen(self.engine, 'before_cursor_execute', lambda *args: fetches.append(args[2]))
+        chunks = self.export('sensor_data', 'csv', page_size=3)
+        # Header with the first page, then pages of 3, 3 and 1 rows
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [4, 3, 1])
+        self.assertEqual(len(fetches), 1)
+
+        ndjson = self.export('sensor_data', 'ndjson', page_size=3)
+        self.assertEqual([chunk.count(b'\n') for chunk in ndjson], [3, 3, 1])
+
+    def test_ndjson_encodes_json_columns(self):
+        """Test NDJSON keeps JSON columns as objects and dates as ISO strings"""
+        chunks = self.export('satellite_data', 'ndjson')
+        records = [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1]['raw_data'], {'bands': [1, 2], 'cloud': True})
+        self.assertEqual(records[1]['timestamp'], (START + timedelta(hours=12)).isoformat())
+
+    def test_empty_range(self):
+        """Test an empty range still yields a CSV header and no NDJSON lines"""
+        service = ExportService()
+        chunks = service.stream(self.db, 'sensor_data', 'ZONE9', START, END, 'csv')
+        self.assertEqual(b''.join(chunks).decode('utf-8').splitlines(), [','.join(c.name for c in SensorData.__table__.columns)])
+        self.assertEqual(list(service.stream(self.db, 'sensor_data', 'ZONE9', START, END, 'ndjson')), [])
+
+    def test_unknown_dataset_and_format(self):
+        """Test unknown datasets and formats are rejected before streaming"""
+        with self.assertRaises(ValueError):
+            ExportService().stream(self.db, 'weather', 'ZONE1', START, END)
+        with self.assertRaises(ValueError):
+            ExportService().stream(self.db, 'sensor_data', 'ZONE1', START, END, 'xlsx')
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet_types_and_row_groups(self):
+        """Test Parquet column types, one row group per page and JSON columns as text"""
+        data = b''.join(self.export('sensor_data', 'parquet', page_size=3))
+        parquet = pq.ParquetFile(pa.BufferReader(data))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        schema = parquet.schema_arrow
+        self.assertEqual(schema.field('id').type, pa.int64())
+        self.assertEqual(schema.field('soil_moisture').type, pa.float64())
+        self.assertEqual(schema.field('is_raining').type, pa.bool_())
+        self.assertEqual(schema.field('timestamp').type, pa.timestamp('us'))
+        self.assertEqual(schema.field('device_id').type, pa.string())
+        table = parquet.read()
+        self.assertEqual(table.num_rows, 7)
+        self.assertEqual(table.column('soil_moisture').to_pylist(), [float(hour) for hour in range(7)])
+
+        satellite = pq.read_table(pa.BufferReader(b''.join(self.export('satellite_data', 'parquet'))))
+        self.assertEqual(satellite.schema.field('raw_data').type, pa.string())
+        self.assertEqual(json.loads(satellite.column('raw_data')[0].as_py()), {'bands': [0, 1], 'cloud': False})
+
+class TestChunkSink(unittest.TestCase):
+    def test_tell_counts_drained_bytes(self):
+        """Test tell keeps counting after the buffer is drained"""
+        sink = _ChunkSink()
+        sink.write(b'abc')
+        sink.write(memoryview(b'de'))
+        self.assertEqual(sink.drain(), b'abcde')
+        self.assertEqual(sink.drain(), b'')
+        sink.write(b'f')
+        self.assertEqual(sink.tell(), 6)
+        self.assertEqual(sink.drain(), b'f')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from backend.fleet_simulator import DatabaseTarget, FleetSimulator, HttpTarget, LoadStats, make_target
+
+SENSOR_TABLE = """
+    CREATE TABLE sensor_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        zone_id VARCHAR(50), device_id VARCHAR(50), timestamp DATETIME,
+        soil_moisture FLOAT, soil_temp FLOAT, soil_ph FLOAT, soil_ec FLOAT,
+        soil_n FLOAT, soil_p FLOAT, soil_k FLOAT, air_temp FLOAT, air_humidity FLOAT,
+        light_level FLOAT, pressure FLOAT, wind_speed FLOAT, is_raining BOOLEAN,
+        flow_rate FLOAT, total_water FLOAT
+    )
+"""
+
+class TestFleetSimulator(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch SQLite database with the wide sensor table"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "fleet.db"
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(SENSOR_TABLE)
+
+    def _run(self, **kwargs):
+        simulator = FleetSimulator(
+            DatabaseTarget(f"sqlite:///{self.db_path}", workers=2),
+            devices=20, interval=0.05, duration=0.4, **kwargs
+        )
+        return asyncio.run(simulator.run())
+
+    def _stored(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*), COUNT(DISTINCT device_id) FROM sensor_data").fetchone()
+
+    def test_json_devices_write_rows(self):
+        """Test every virtual device reports and each report is stored"""
+        summary = self._run(shape='json')
+        self.assertEqual(summary['errors'], 0)
+        self.assertGreater(summary['readings'], 20)
+        self.assertEqual(self._stored(), (summary['readings'], 20))
+
+    def test_binary_batches(self):
+        """Test binary uploads store a full batch per request"""
+        summary = self._run(shape='binary', batch=4)
+        self.assertEqual(summary['readings'], summary['requests'] * 4)
+        self.assertEqual(self._stored()[0], summary['readings'])
+
+    def test_percentiles(self):
+        """Test latency percentiles are reported in milliseconds"""
+        stats = LoadStats()
+        for i in range(1, 101):
+            stats.record(i / 1000.0, 1, 10)
+        summary = stats.summary(elapsed=2.0)
+        self.assertAlmostEqual(summary['p50_ms'], 50.5, places=1)
+        self.assertAlmostEqual(summary['p99_ms'], 99.01, places=1)
+        self.assertEqual(summary['readings_per_s'], 50.0)
+
+    def test_http_targets(self):
+        """Test https:// targets connect over TLS on 443 and http:// stays plain"""
+        secure = make_target('https://farm.example/api-root/')
+        self.assertIsInstance(secure, HttpTarget)
+        self.assertIsNotNone(secure.ssl)
+        self.assertEqual((secure.host, secure.port, secure.prefix), ('farm.example', 443, '/api-root/api/arduino'))
+
+        plain = make_target('http://localhost:8000')
+        self.assertIsNone(plain.ssl)
+        self.assertEqual(plain.port, 8000)
+        with self.assertRaises(ValueError):
+            HttpTarget('ftp://farm.example')
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.tmp.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
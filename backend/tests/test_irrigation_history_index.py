@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime, timedelta
+from backend.services.irrigation_history_index import IrrigationHistoryIndex
+
+class TestIrrigationHistoryIndex(unittest.TestCase):
+    def setUp(self):
+        """Index a few days of irrigation events"""
+        self.index = IrrigationHistoryIndex()
+        self.base = datetime(2024, 12, 1, 6, 0)
+        self.events = [
+            {'timestamp': (self.base + timedelta(hours=h)).isoformat(), 'amount': 2.5}
+            for h in range(0, 96, 6)
+        ]
+        for event in self.events:
+            self.index.add('zone_001', event)
+
+    def test_range_is_inclusive(self):
+        """Test both range bounds are included"""
+        timestamps, amounts = self.index.range(
+            'zone_001', self.base, self.base + timedelta(hours=12)
+        )
+        self.assertEqual(len(timestamps), 3)
+        self.assertEqual(amounts.sum(), 7.5)
+
+    def test_daily_totals_match_linear_scan(self):
+        """Test bucketing agrees with a day-by-day scan"""
+        start = self.base - timedelta(days=1)
+        end = self.base + timedelta(days=5)
+        days = (end - start).days + 1
+        totals = self.index.daily_totals('zone_001', start, end, days)
+
+        for i in range(days):
+            day = (start + timedelta(days=i)).date()
+            expected = sum(
+                e['amount'] for e in self.events
+                if datetime.fromisoformat(e['timestamp']).date() == day
+            )
+            self.assertAlmostEqual(totals[i], expected)
+
+    def test_out_of_order_events_stay_sorted(self):
+        """Test late events are inserted in timestamp order"""
+        self.index.add('zone_001', {'timestamp': (self.base - timedelta(days=2)).isoformat(), 'amount': 4.0})
+        timestamps, amounts = self.index.range('zone_001', self.base - timedelta(days=3), self.base)
+        self.assertEqual(list(amounts), [4.0, 2.5])
+        self.assertTrue((timestamps[:-1] <= timestamps[1:]).all())
+
+    def test_aggregates_and_versions(self):
+        """Test running totals and version bumps"""
+        version = self.index.version('zone_001')
+        totals, counts = self.index.aggregates(['zone_001', 'missing'])
+        self.assertEqual(totals.tolist(), [40.0, 0.0])
+        self.assertEqual(counts.tolist(), [16, 0])
+
+        self.index.add('zone_001', {'timestamp': self.base.isoformat(), 'amount': 1.0})
+        self.assertGreater(self.index.version('zone_001'), version)
+
+        version = self.index.version('zone_001')
+        self.index.rebuild('zone_001', [])
+        self.assertGreater(self.index.version('zone_001'), version)
+        self.assertEqual(self.index.aggregates(['zone_001'])[0].tolist(), [0.0])
+
+    def test_unknown_zone(self):
+        """Test an unindexed zone yields empty results"""
+        totals = self.index.daily_totals('missing', self.base, self.base, 1)
+        self.assertEqual(totals.tolist(), [0.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+from backend.services.irrigation_planner import ZoneDemand, plan_farm_irrigation
+
+START = datetime(2024, 6, 1)
+
+def hours(begin, end):
+    return (START + timedelta(hours=begin), START + timedelta(hours=end))
+
+class TestFarmIrrigationPlanner(unittest.TestCase):
+    def test_zones_share_source_without_overlap(self):
+        """Test zones on a full source are run one after another"""
+        demands = [ZoneDemand(f'zone_{i}', amount=60, max_flow=2, windows=[hours(6, 12)]) for i in range(3)]
+        plan = plan_farm_irrigation(demands, {'main': 2}, START)
+        self.assertEqual([run.start for run in plan.runs], [START + timedelta(hours=6, minutes=30 * i) for i in range(3)])
+        self.assertEqual(plan.peak_flow('main'), 2)
+        self.assertEqual(plan.unmet, {})
+
+    def test_earliest_window_end_goes_first(self):
+        """Test a zone whose window closes sooner is watered first"""
+        demands = [
+            ZoneDemand('late', amount=60, max_flow=2, windows=[hours(6, 12)]),
+            ZoneDemand('early', amount=60, max_flow=2, windows=[hours(6, 7)])
+        ]
+        plan = plan_farm_irrigation(demands, {'main': 2}, START)
+        self.assertEqual([run.zone_id for run in plan.runs], ['early', 'late'])
+        self.assertEqual(plan.unmet, {})
+
+    def test_backfill_uses_spare_capacity(self):
+        """Test a small zone runs beside a large one that leaves capacity free"""
+        demands = [
+            ZoneDemand('large', amount=60, max_flow=6, windows=[hours(6, 8)]),
+            ZoneDemand('larger', amount=80, max_flow=8, windows=[hours(6, 8)]),
+            ZoneDemand('small', amount=20, max_flow=2, windows=[hours(6, 9)])
+        ]
+        plan = plan_farm_irrigation(demands, {'main': 8}, START)
+        runs = {run.zone_id: run for run in plan.runs}
+        self.assertEqual(runs['small'].start, runs['large'].start)
+        self.assertLessEqual(plan.peak_flow('main'), 8)
+
+    def test_carry_over_and_unmet(self):
+        """Test water that does not fit a window moves to the next and the rest is unmet"""
+        demand = ZoneDemand('zone_1', amount=300, max_flow=2, windows=[hours(18, 19), hours(5, 6)])
+        plan = plan_farm_irrigation([demand], {'main': 10}, START)
+        self.assertEqual([run.start for run in plan.runs], [hours(5, 6)[0], hours(18, 19)[0]])
+        self.assertEqual(sum(run.amount for run in plan.runs), 240)
+        self.assertAlmostEqual(plan.unmet['zone_1'], 60)
+
+    def test_random_farm_is_conflict_free(self):
+        """Test capacity, windows and amounts hold for a random farm"""
+        rng = random.Random(0)
+        sources = {f'well_{i}': rng.uniform(10, 30) for i in range(4)}
+        windows = [hours(4, 9), hours(18, 21)]
+        demands = [
+            ZoneDemand(f'zone_{i}', rng.uniform(5, 120), rng.uniform(1, 12), rng.choice(list(sources)), windows, rng.random())
+            for i in range(500)
+        ]
+        plan = plan_farm_irrigation(demands, sources, START)
+        for source, capacity in sources.items():
+            self.assertLessEqual(plan.peak_flow(source), capacity + 1e-6)
+        delivered = {}
+        for run in plan.runs:
+            delivered[run.zone_id] = delivered.get(run.zone_id, 0) + run.amount
+            self.assertTrue(any(begin <= run.start and run.end <= end + timedelta(milliseconds=1) for begin, end in windows))
+        for demand in demands:
+            self.assertAlmostEqual(delivered.get(demand.zone_id, 0) + plan.unmet.get(demand.zone_id, 0), demand.amount)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from backend.ml_models.irrigation_predictor import IrrigationPredictor
+from backend.ml_models.irrigation_schedule import (
+    HOURLY_CAPACITY, HOURS, allocate_water, hourly_conditions, hourly_efficiency, plan_irrigation
+)
+
+START = datetime(2024, 6, 1, 6)
+CALM = {'temperature': 15, 'solar_radiation': 0, 'wind_speed': 0}
+
+def forecast(hours, **fields):
+    return [{'precipitation_forecast': 0.0, 'time': START + timedelta(hours=hour), **fields} for hour in hours]
+
+class TestHourlyConditions(unittest.TestCase):
+    def test_forecast_fills_slots_by_hour_of_day(self):
+        """Test entries land in the slot with their hour and others use current conditions"""
+        entries = forecast([2], temperature=40) + [
+            {'precipitation_forecast': 0.9, 'time': START + timedelta(days=2, hours=5)}
+        ]
+        conditions = hourly_conditions([entries], [CALM], START)
+        self.assertEqual(conditions['temperature'].shape, (1, HOURS))
+        self.assertEqual(conditions['temperature'][0, 2], 40)
+        self.assertEqual(conditions['temperature'][0, 3], 15)
+        self.assertEqual(conditions['precipitation_forecast'][0, 5], 0.9)
+        self.assertEqual(np.count_nonzero(conditions['precipitation_forecast']), 1)
+
+    def test_efficiency_varies_by_hour(self):
+        """Test sunny, windy and rainy hours are scored per hour"""
+        entries = forecast([1], solar_radiation=1000) + forecast([2], wind_speed=5) + forecast([3])
+        entries[-1]['precipitation_forecast'] = 0.6
+        efficiency, capacity = hourly_efficiency(hourly_conditions([entries], [CALM], START), [1.0])
+        self.assertEqual(efficiency[0, 0], 1.0)
+        self.assertEqual(capacity[0, 0], HOURLY_CAPACITY)
+        self.assertEqual((efficiency[0, 1], efficiency[0, 2], efficiency[0, 3]), (0, 0, 0))
+
+class TestAllocateWater(unittest.TestCase):
+    def test_single_zone_fills_most_efficient_hours(self):
+        """Test water goes to the best hours first, in time order on ties"""
+        efficiency = np.array([[0.8, 0.9, 0.0, 0.9]])
+        capacity = np.array([[10.0, 10.0, 0.0, 10.0]])
+        allocation = allocate_water([25], efficiency, capacity)
+        self.assertEqual(allocation.tolist(), [[5.0, 10.0, 0.0, 10.0]])
+
+    def test_shared_pump_capacity(self):
+        """Test zones on one pump never exceed its hourly capacity"""
+        efficiency = np.array([[0.9, 0.8], [0.95, 0.8], [0.9, 0.8]])
+        capacity = np.full((3, 2), 10.0)
+        allocation = allocate_water(
+            [10, 10, 10], efficiency, capacity,
+            pumps=['a', 'a', 'b'], pump_capacity={'a': 12}
+        )
+        # Zone 1 is more efficient in hour 0 and is served first
+        self.assertEqual(allocation.tolist(), [[2.0, 8.0], [10.0, 0.0], [10.0, 0.0]])
+        self.assertTrue((allocation[:2].sum(axis=0) <= 12).all())
+
+    def test_unmet_needs(self):
+        """Test needs beyond pump capacity are reported as unmet"""
+        zones = 50
+        plan = plan_irrigation(
+            np.full(zones, 100.0),
+            [forecast([])] * zones,
+            [CALM] * zones,
+            np.ones(zones),
+            pumps=['main'] * zones,
+            pump_capacity={'main': 30},
+            start=START
+        )
+        self.assertTrue(np.allclose(plan.allocation.sum(axis=0), 30))
+        self.assertAlmostEqual(plan.unmet.sum(), zones * 100 - 30 * HOURS)
+        schedule = plan.schedule(0)
+        self.assertEqual(schedule[0]['time'], START)
+        self.assertEqual(schedule[0]['duration_minutes'], int(schedule[0]['water_amount'] / 2))
+
+class TestPredictorSchedule(unittest.TestCase):
+    def test_predict_many_shares_pump(self):
+        """Test zones on one pump are scheduled in one solve"""
+        predictor = IrrigationPredictor()
+        zone = {
+            'current_conditions': {**CALM, 'humidity': 50, 'soil_moisture': 20, 'evapotranspiration': 4},
+            'weather_forecast': forecast([0, 24, 48]),
+            'soil_data': {'soil_type': 'loamy', 'current_moisture': 20, 'field_capacity': 60},
+            'crop_data': {'growth_stage': 2},
+            'pump': 'north'
+        }
+        zones = [zone, zone]
+        plan = predictor.optimize_schedule(zones, [30, 30], pump_capacity={'north': 10}, start=START)
+        self.assertTrue((plan.allocation.sum(axis=0) <= 10).all())
+        self.assertEqual(plan.unmet.tolist(), [0, 0])
+        first_hours = {slot['time'] for slot in plan.schedule(0)}
+        self.assertFalse(first_hours & {slot['time'] for slot in plan.schedule(1)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from backend.core.lazy_imports import LazyRegistry
+
+class TestLazyRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, 'lazy_heavy_module.py'), 'w') as f:
+            f.write("VALUE = 42\n")
+        sys.path.insert(0, self.tmp.name)
+        self.registry = LazyRegistry()
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop('lazy_heavy_module', None)
+        self.tmp.cleanup()
+
+    def test_module_imports_on_first_attribute(self):
+        """Test the proxy imports only when an attribute is read"""
+        proxy = self.registry.module('lazy_heavy_module')
+        self.assertNotIn('lazy_heavy_module', sys.modules)
+        self.assertEqual(proxy.VALUE, 42)
+        self.assertIn('lazy_heavy_module', sys.modules)
+        report = self.registry.report()['lazy_heavy_module']
+        self.assertTrue(report['loaded'])
+        self.assertEqual(report['trigger'], 'first use: VALUE')
+
+    def test_factory_built_once(self):
+        """Test a registered factory runs once and is shared"""
+        calls = []
+        self.registry.register('backend', lambda: calls.append(1) or object())
+        first = self.registry.get('backend')
+        self.assertIs(self.registry.get('backend'), first)
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+    def test_warm_up_reports_failures(self):
+        """Test warm-up loads in a worker thread and records failures without raising"""
+        errors = asyncio.run(self.registry.warm_up(['lazy_heavy_module', 'lazy_missing_module']))
+        self.assertIsNone(errors['lazy_heavy_module'])
+        self.assertIn('lazy_missing_module', errors['lazy_missing_module'])
+        report = self.registry.report()
+        self.assertEqual(report['lazy_heavy_module']['trigger'], 'warm-up')
+        self.assertFalse(report['lazy_missing_module']['loaded'])
+
+    def test_ml_modules_defer_frameworks(self):
+        """Test importing the ML modules loads no heavy framework"""
+        script = (
+            "import sys\n"
+            "import backend.ml_models.crop_analyzer, backend.ml_models.crop_patterns, backend.ml_models.irrigation_predictor\n"
+            "print(','.join(m for m in ('tensorflow', 'cv2', 'sklearn', 'joblib', 'pandas') if m in sys.modules))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        proc = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=root)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip(), '')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from backend.ml_models import model_registry
+from backend.ml_models.model_registry import ModelNotFoundError, ModelRegistry
+
+class ArrayModel:
+    """Model whose state is one array, saved like a joblib artifact"""
+
+    def __init__(self, weights=None):
+        self.weights = weights
+        self.mmap_mode = None
+
+    def save(self, path):
+        np.save(os.path.join(path, 'weights.npy'), self.weights)
+
+    def load(self, path, mmap_mode=None):
+        self.mmap_mode = mmap_mode
+        self.weights = np.load(os.path.join(path, 'weights.npy'), mmap_mode=mmap_mode)
+
+MODEL_TYPES = {'array': (f'{__name__}.ArrayModel', 'save', 'load')}
+
+@patch.dict(model_registry.MODEL_TYPES, MODEL_TYPES, clear=True)
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_and_load_shared_mapped_instance(self):
+        """Test versions are stored with metadata and loaded once, memory-mapped"""
+        version = self.registry.save('array', ArrayModel(np.arange(5.0)), {'rmse': 1.5}, activate=True)
+        self.assertEqual(self.registry.versions('array'), [version])
+        metadata = self.registry.metadata('array', version)
+        self.assertEqual(metadata['metadata'], {'rmse': 1.5})
+        self.assertIn('weights.npy', metadata['files'])
+        model = self.registry.get('array')
+        self.assertIs(self.registry.get('array'), model)
+        self.assertEqual(model.mmap_mode, 'r')
+        self.assertIsInstance(model.weights, np.memmap)
+        np.testing.assert_array_equal(model.weights, np.arange(5.0))
+
+    def test_activate_hot_swaps_other_processes(self):
+        """Test a registry sharing the root picks up a new active version"""
+        first = self.registry.save('array', ArrayModel(np.zeros(3)), activate=True)
+        worker = ModelRegistry(self.tmp.name)
+        old = worker.get('array')
+        time.sleep(0.01)
+        second = self.registry.save('array', ArrayModel(np.ones(3)))
+        self.assertIs(worker.get('array'), old)
+        self.registry.activate('array', second)
+        swapped = worker.get('array')
+        self.assertIsNot(swapped, old)
+        np.testing.assert_array_equal(swapped.weights, np.ones(3))
+        np.testing.assert_array_equal(old.weights, np.zeros(3))
+        self.assertEqual(worker.status()['array']['loaded'], [second])
+        self.assertEqual(worker.status()['array']['versions'], [first, second])
+
+    def test_missing_versions(self):
+        """Test unknown kinds and versions are reported"""
+        with self.assertRaises(ModelNotFoundError):
+            self.registry.get('array')
+        with self.assertRaises(ModelNotFoundError):
+            self.registry.activate('array', 'nope')
+        with self.assertRaises(ValueError):
+            self.registry.versions('other')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from backend.ml_models.ndvi_tiles import (
+    RasterSource, analyze_ndvi_raster, analyze_tile, ndvi_float32, rasterio_band, tile_windows
+)
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import rasterio
+    HAS_RASTERIO = cv2 is not None
+except ImportError:
+    HAS_RASTERIO = False
+
+def reference_ndvi(image):
+    """Whole-image float64 computation the tiled engine replaces"""
+    nir = image[:, :, 0].astype(float)
+    red = image[:, :, 2].astype(float)
+    denominator = nir + red
+    denominator[denominator == 0] = 0.01
+    return (nir - red) / denominator
+
+class TestNDVITiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, (300, 500, 3), dtype=np.uint8)
+        self.image[:10, :10] = 0  # Zero denominators
+        self.path = os.path.join(self.tmp.name, 'field.npy')
+        np.save(self.path, self.image)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_matches_reference(self, summary):
+        ndvi = reference_ndvi(self.image)
+        self.assertAlmostEqual(summary['mean_ndvi'], ndvi.mean(), places=5)
+        self.assertAlmostEqual(summary['min_ndvi'], ndvi.min(), places=5)
+        self.assertAlmostEqual(summary['max_ndvi'], ndvi.max(), places=5)
+        self.assertAlmostEqual(summary['stress_areas'], np.sum(ndvi < 0.2) / ndvi.size * 100)
+        self.assertEqual(sum(summary['histogram']['counts']), ndvi.size)
+
+    def test_ndvi_float32(self):
+        """Test in-place float32 NDVI matches the float64 formula"""
+        result = ndvi_float32(self.image[:, :, 0], self.image[:, :, 2])
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, reference_ndvi(self.image), atol=1e-6)
+
+    def test_tiles_cover_raster(self):
+        """Test tiles cover every pixel exactly once, including edge tiles"""
+        windows = list(tile_windows(300, 500, 128))
+        self.assertEqual(len(windows), 3 * 4)
+        self.assertEqual(sum(h * w for _, _, h, w in windows), 300 * 500)
+        self.assertEqual(windows[-1], (256, 384, 44, 116))
+
+    def test_serial_and_process_pool_match_reference(self):
+        """Test tiled statistics equal the whole-image computation"""
+        for workers in (0, 2):
+            with self.subTest(workers=workers):
+                stats = analyze_ndvi_raster(self.path, tile_size=128, workers=workers)
+                self.assertEqual(stats.tiles, 12)
+                self.assert_matches_reference(stats.summary())
+
+    def test_in_memory_tiles_sent_to_workers(self):
+        """Test an in-memory image cut per tile reads the same pixels"""
+        source = RasterSource('field.png', 'memory', 300, 500, image=self.image)
+        window = (256, 384, 44, 116)
+        worker_copy = source.for_window(window)
+        self.assertEqual(worker_copy.image.shape[:2], (44, 116))
+        np.testing.assert_array_equal(worker_copy.read(window)[0], source.read(window)[0])
+        self.assertEqual(analyze_tile(worker_copy, window).count, 44 * 116)
+
+    def test_rasterio_band_numbers(self):
+        """Test cv2 BGR channels map to the reversed file bands"""
+        self.assertEqual([rasterio_band(c, 3) for c in range(3)], [3, 2, 1])
+        self.assertEqual([rasterio_band(c, 4) for c in range(4)], [3, 2, 1, 4])
+        self.assertEqual(rasterio_band(0, 1), 1)
+
+    @unittest.skipUnless(HAS_RASTERIO, "rasterio and OpenCV are required")
+    def test_rasterio_and_cv2_paths_agree(self):
+        """Test a TIFF gives the same NDVI with windowed rasterio reads and cv2"""
+        path = os.path.join(self.tmp.name, 'field.tif')
+        cv2.imwrite(path, self.image)  # Stored as RGB file bands
+        windowed = RasterSource.open(path)
+        self.assertEqual(windowed.kind, 'rasterio')
+        in_memory = RasterSource(path, 'memory', 300, 500, image=cv2.imread(path, cv2.IMREAD_COLOR))
+
+        window = (0, 0, 300, 500)
+        for expected, actual in zip(in_memory.read(window), windowed.read(window)):
+            np.testing.assert_array_equal(actual, expected)
+        self.assert_matches_reference(analyze_ndvi_raster(path, tile_size=128, workers=0).summary())
+
+    def test_arrays_without_bands_are_rejected(self):
+        """Test single-band arrays and missing bands raise instead of reading columns"""
+        path = os.path.join(self.tmp.name, 'gray.npy')
+        np.save(path, self.image[:, :, 0])
+        with self.assertRaises(ValueError):
+            RasterSource.open(path)
+        with self.assertRaises(ValueError):
+            RasterSource.open(self.path, nir_band=3)
+
+    @unittest.skipUnless(cv2 is not None, "OpenCV is required")
+    def test_cv2_fallback_reads_color(self):
+        """Test grayscale, 16-bit and alpha images are read as 8-bit BGR"""
+        images = {
+            'gray.png': self.image[:, :, 0],
+            'deep.png': self.image.astype(np.uint16) * 257,
+            'alpha.png': np.dstack([self.image, np.full((300, 500), 255, np.uint8)]),
+        }
+        for name, image in images.items():
+            with self.subTest(image=name):
+                path = os.path.join(self.tmp.name, name)
+                cv2.imwrite(path, image)
+                source = RasterSource.open(path)
+                self.assertEqual((source.kind, source.image.shape, source.image.dtype), ('memory', (300, 500, 3), np.uint8))
+        source = RasterSource.open(os.path.join(self.tmp.name, 'alpha.png'))
+        np.testing.assert_array_equal(source.read((0, 0, 300, 500))[0], self.image[:, :, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from sqlalchemy import create_engine
+from backend.database.query_plans import HOT_QUERIES, check, explain, seed, suggest_index
+
+class TestQueryPlans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Seed one database from the models for all plan checks"""
+        cls.engine = create_engine('sqlite://')
+        seed(cls.engine)
+
+    def test_hot_queries_use_indexes(self):
+        """Test no hot query reads a whole table or sorts what an index could order"""
+        with self.engine.connect() as conn:
+            for query in HOT_QUERIES:
+                with self.subTest(query=query.name):
+                    plan = explain(conn, query.build())
+                    self.assertTrue(plan.steps, plan.raw)
+                    self.assertEqual(check(query, plan), [], plan.raw)
+
+    def test_missing_index_is_reported(self):
+        """Test dropping an index turns its query into a full-scan failure"""
+        query = next(q for q in HOT_QUERIES if q.name == 'pending_commands')
+        engine = create_engine('sqlite://')
+        seed(engine, zones=50, days=1)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX idx_commands_device_status")
+            conn.exec_driver_sql("ANALYZE")
+            plan = explain(conn, query.build())
+
+        self.assertEqual(plan.full_scans, ['commands'])
+        self.assertEqual(check(query, plan), ['full scan of commands'])
+
+    def test_suggested_index_puts_equality_first(self):
+        """Test suggestions order equality, then range, then ORDER BY columns"""
+        statement = next(q for q in HOT_QUERIES if q.name == 'irrigation_export').build()
+        self.assertEqual(suggest_index(statement, 'irrigation_logs'), ['zone_id', 'start_time', 'id'])
+
+        statement = next(q for q in HOT_QUERIES if q.name == 'recent_alerts_by_severity').build()
+        self.assertEqual(suggest_index(statement, 'notifications'), ['severity', 'timestamp'])
+
+        statement = next(q for q in HOT_QUERIES if q.name == 'pending_commands').build()
+        self.assertEqual(suggest_index(statement, 'commands')[:2], ['device_id', 'status'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, create_engine, text
+from sqlalchemy.orm import Session
+from backend.models.sensor_data import SensorData, SensorDataRollup
+from backend.services.retention_service import RetentionPolicy, RetentionService
+from backend.services.sensor_query_service import SensorQueryService
+from backend.services.sensor_storage import SensorStorage
+
+class TestRetentionService(unittest.TestCase):
+    def setUp(self):
+        """Create 40 days of readings every 15 minutes and a week of logs"""
+        self.engine = create_engine('sqlite://')
+        self.now = datetime(2024, 6, 10, 12, 30)
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE zones (id INTEGER PRIMARY KEY, zone_id VARCHAR(255) UNIQUE)"))
+            conn.execute(text(
+                "CREATE TABLE system_logs (id INTEGER PRIMARY KEY, timestamp TIMESTAMP, message TEXT)"
+            ))
+            metadata = MetaData()
+            Table('zones', metadata, autoload_with=conn)
+            SensorData.__table__.to_metadata(metadata).create(conn)
+            SensorDataRollup.__table__.create(conn)
+
+            self.first = self.now - timedelta(days=40)
+            readings = []
+            for step in range(40 * 24 * 4):
+                timestamp = self.first + timedelta(minutes=15 * step)
+                readings.append({
+                    'zone_id': 'ZONE1', 'device_id': 'ARD_1', 'timestamp': timestamp,
+                    'soil_moisture': float(step % 4), 'is_raining': step % 4 == 0, 'total_water': float(step)
+                })
+            conn.execute(SensorData.__table__.insert(), readings)
+            conn.execute(
+                text("INSERT INTO system_logs (timestamp, message) VALUES (:ts, 'x')"),
+                [{'ts': (self.now - timedelta(days=d)).isoformat(sep=' ', timespec='microseconds')} for d in range(7)]
+            )
+
+        self.service = RetentionService(self.engine, [
+            RetentionPolicy('sensor_data', keep_days=30, rollup=True),
+            RetentionPolicy('system_logs', keep_days=3),
+            RetentionPolicy('notifications', keep_days=3),
+        ], delete_batch=100)
+
+    def _count(self, sql):
+        with self.engine.connect() as conn:
+            return conn.execute(text(sql)).scalar()
+
+    def test_rolls_up_before_deleting(self):
+        """Test expired readings become hourly rollups and raw rows are removed"""
+        metrics = self.service.run_once(now=self.now)
+
+        # Cutoff is aligned down to 12:00, 30 days back
+        cutoff = datetime(2024, 5, 11, 12, 0)
+        expired = int((cutoff - self.first) / timedelta(minutes=15))
+        sensor = metrics['tables']['sensor_data']
+        self.assertEqual(sensor['rows_deleted'], expired)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM sensor_data WHERE timestamp < '2024-05-11 12:00:00'"), 0)
+        self.assertEqual(self._count("SELECT MIN(timestamp) FROM sensor_data"), '2024-05-11 12:00:00.000000')
+
+        # 12:30 on the first day starts a partial hour; the rest are full
+        self.assertEqual(sensor['rows_rolled_up'], self._count("SELECT COUNT(*) FROM sensor_data_rollups"))
+        self.assertEqual(self._count("SELECT SUM(samples) FROM sensor_data_rollups"), expired)
+        with self.engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT samples, soil_moisture, is_raining, total_water FROM sensor_data_rollups "
+                "WHERE bucket = '2024-05-01 14:00:00.000000'"
+            )).one()
+        self.assertEqual(row.samples, 4)
+        self.assertAlmostEqual(row.soil_moisture, 1.5)
+        self.assertAlmostEqual(row.is_raining, 0.25)
+        self.assertEqual(row.total_water, 9.0)
+
+    def test_deletes_other_tables_and_skips_missing(self):
+        """Test plain policies delete in batches and missing tables are ignored"""
+        metrics = self.service.run_once(now=self.now)
+
+        self.assertEqual(metrics['tables']['system_logs']['rows_deleted'], 3)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM system_logs"), 4)
+        self.assertEqual(metrics['tables']['notifications']['rows_deleted'], 0)
+        self.assertEqual(metrics['state'], 'idle')
+        self.assertEqual(metrics['runs'], 1)
+        self.assertTrue(all(table['progress'] == 1.0 for table in metrics['tables'].values()))
+
+    def test_rerun_is_idempotent(self):
+        """Test a second run with nothing expired leaves rollups untouched"""
+        self.service.run_once(now=self.now)
+        rollups = self._count("SELECT COUNT(*) FROM sensor_data_rollups")
+        self.service.run_once(now=self.now)
+
+        self.assertEqual(self._count("SELECT COUNT(*) FROM sensor_data_rollups"), rollups)
+        self.assertEqual(self.service.metrics['runs'], 2)
+
+    def test_later_run_keeps_earlier_rollups(self):
+        """Test rollups whose raw rows are gone survive the next run"""
+        self.service.run_once(now=self.now)
+        self.service.run_once(now=self.now + timedelta(days=2))
+
+        deleted = self.service.metrics['tables']['sensor_data']['rows_deleted']
+        self.assertEqual(self._count("SELECT SUM(samples) FROM sensor_data_rollups"), deleted)
+        self.assertEqual(self._count("SELECT MIN(bucket) FROM sensor_data_rollups"), '2024-05-01 12:00:00.000000')
+
+    def test_downsampled_reads_fall_back_to_rollups(self):
+        """Test expired ranges are served from rollups in downsampled reads"""
+        self.service.run_once(now=self.now)
+        with Session(self.engine) as db:
+            result = SensorQueryService(storage=SensorStorage()).get_downsampled(
+                db, 'ZONE1', self.first, self.now, points=100000, columns=['soil_moisture']
+            )
+        raw = self._count("SELECT COUNT(*) FROM sensor_data")
+        rollups = self._count("SELECT COUNT(*) FROM sensor_data_rollups")
+        self.assertEqual(result['downsample']['source_rows'], raw + rollups)
+        timestamps = result['series']['soil_moisture']['timestamp']
+        self.assertEqual(timestamps, sorted(timestamps))
+
+if __name__ == '__main__':
+    unittest.main()
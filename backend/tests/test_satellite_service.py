@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from backend.core.lazy_imports import LazyRegistry
+from backend.services import satellite_service
+from backend.services.satellite_service import SatelliteService
+
+GEOMETRY = {'type': 'Polygon', 'coordinates': [[[0, 0], [0, 1], [1, 1], [0, 0]]]}
+
+class TestEarthEngineInitialization(unittest.TestCase):
+    def setUp(self):
+        """A fresh registry whose Earth Engine factory fails once, then succeeds"""
+        self.attempts = []
+
+        def initialize():
+            self.attempts.append(threading.current_thread() is threading.main_thread())
+            if len(self.attempts) == 1:
+                raise RuntimeError("transient credential error")
+            return True
+
+        self.registry = LazyRegistry()
+        self.registry.register('earth_engine', initialize)
+        patcher = mock.patch.object(satellite_service, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failure_is_retried_and_success_cached(self):
+        """Test a failed initialization is retried by the next request and success is kept"""
+        service = SatelliteService()
+        ee_data = {'source': 'earth_engine'}
+        with mock.patch.object(SatelliteService, '_get_ee_data', mock.AsyncMock(return_value=ee_data)) as fetch:
+            first = asyncio.run(service.get_zone_data('zone_001', GEOMETRY))
+            self.assertNotEqual(first, ee_data)
+            self.assertFalse(fetch.called)
+
+            self.assertEqual(asyncio.run(SatelliteService().get_zone_data('zone_001', GEOMETRY)), ee_data)
+            self.assertEqual(asyncio.run(service.get_zone_data('zone_001', GEOMETRY)), ee_data)
+        self.assertEqual(len(self.attempts), 2)
+        self.assertTrue(service.ee_initialized)
+
+    def test_initialization_runs_off_the_event_loop(self):
+        """Test the first initialization happens in a worker thread"""
+        with mock.patch.object(SatelliteService, '_get_ee_data', mock.AsyncMock(return_value=None)):
+            for _ in range(2):
+                asyncio.run(SatelliteService().get_zone_data('zone_001', GEOMETRY))
+        self.assertEqual(self.attempts, [False, False])
+
+    def test_missing_credentials_raise(self):
+        """Test missing credentials are an error rather than a cached False"""
+        with mock.patch.object(satellite_service, 'GEE_SERVICE_ACCOUNT', None):
+            with self.assertRaises(RuntimeError):
+                satellite_service._initialize_ee()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from datetime import datetime
+import numpy as np
+from backend.services.sensor_query_service import lttb, minmax, encode_cursor, decode_cursor
+
+class TestSensorDownsampling(unittest.TestCase):
+    def setUp(self):
+        """Build a noisy series with a single spike"""
+        self.x = np.arange(10000, dtype=np.float64) * 5
+        self.y = np.sin(self.x / 2000.0)
+        self.y[4321] = 10.0
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        """Test LTTB returns the requested count and keeps extremes"""
+        keep = lttb(self.x, self.y, 500)
+        self.assertEqual(len(keep), 500)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(self.x) - 1)
+        self.assertIn(4321, keep)
+        self.assertTrue((np.diff(keep) > 0).all())
+
+    def test_minmax_keeps_spike(self):
+        """Test min/max buckets keep the global extremes in order"""
+        keep = minmax(self.x, self.y, 500)
+        self.assertLessEqual(len(keep), 500)
+        self.assertIn(4321, keep)
+        self.assertTrue((np.diff(keep) > 0).all())
+
+    def test_short_series_is_untouched(self):
+        """Test series shorter than the target are returned whole"""
+        self.assertEqual(len(lttb(self.x[:10], self.y[:10], 100)), 10)
+        self.assertEqual(len(minmax(self.x[:10], self.y[:10], 100)), 10)
+
+    def test_cursor_round_trip(self):
+        """Test keyset cursors decode to what was encoded"""
+        ts = datetime(2024, 12, 27, 14, 48, 42, 210135)
+        self.assertEqual(decode_cursor(encode_cursor(ts, 42)), (ts, 42))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from backend.database.migrate_sensor_data import migrate
+from backend.services.sensor_query_service import SensorQueryService
+from backend.services.sensor_storage import LEGACY_SENSOR_TABLE, SensorStorage
+
+EAV_TYPES = ['soil_moisture', 'soil_temperature', 'soil_ph', 'air_temperature', 'light_level']
+
+class TestSensorMigration(unittest.TestCase):
+    def setUp(self):
+        """Create a database in the old one-row-per-sensor layout"""
+        self.engine = create_engine('sqlite://')
+        self.start = datetime(2024, 5, 1, 6, 0, 0)
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE zones (id INTEGER PRIMARY KEY, zone_id VARCHAR(255) UNIQUE)"))
+            conn.execute(text("CREATE TABLE arduino_status (id INTEGER PRIMARY KEY, device_id VARCHAR(50), zone_id VARCHAR(255))"))
+            conn.execute(text("""
+                CREATE TABLE sensor_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    zone_id VARCHAR(255) NOT NULL,
+                    sensor_type VARCHAR(50) NOT NULL,
+                    value FLOAT NOT NULL,
+                    timestamp TIMESTAMP
+                )
+            """))
+            conn.execute(text("INSERT INTO arduino_status (device_id, zone_id) VALUES ('ARD_ZONE1', 'ZONE1')"))
+            self._insert_eav(conn, [self.start + timedelta(hours=h) for h in range(48)])
+
+    def _insert_eav(self, conn, timestamps):
+        conn.execute(
+            text("INSERT INTO {} (zone_id, sensor_type, value, timestamp) VALUES (:z, :t, :v, :ts)".format(
+                'sensor_data' if not inspect(conn).has_table(LEGACY_SENSOR_TABLE) else LEGACY_SENSOR_TABLE
+            )),
+            [
+                {'z': 'ZONE1', 't': t, 'v': float(i), 'ts': ts.isoformat(sep=' ', timespec='microseconds')}
+                for ts in timestamps for i, t in enumerate(EAV_TYPES)
+            ]
+        )
+
+    def test_pivots_into_wide_rows_with_indexes(self):
+        """Test every report becomes one wide row and indexes are created"""
+        stats = migrate(self.engine, window=timedelta(hours=12))
+
+        self.assertEqual(stats['legacy_rows'], 48 * len(EAV_TYPES))
+        self.assertEqual(stats['rows_copied'], 48)
+        with self.engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT device_id, soil_moisture, soil_temp, soil_ph, air_temp, light_level, soil_n "
+                "FROM sensor_data ORDER BY timestamp LIMIT 1"
+            )).one()
+            indexes = {index['name'] for index in inspect(conn).get_indexes('sensor_data')}
+        self.assertEqual(tuple(row), ('ARD_ZONE1', 0.0, 1.0, 2.0, 3.0, 4.0, None))
+        self.assertIn('idx_sensor_data_zone_time', indexes)
+        self.assertIn('idx_sensor_data_device_time', indexes)
+
+    def test_rerun_copies_only_new_rows_then_drops(self):
+        """Test the migration is resumable and can drop the legacy table"""
+        migrate(self.engine, window=timedelta(hours=12))
+        with self.engine.begin() as conn:
+            self._insert_eav(conn, [self.start + timedelta(days=5)])
+
+        stats = migrate(self.engine, window=timedelta(hours=12), drop_legacy=True)
+        self.assertEqual(stats['rows_copied'], 1)
+        self.assertFalse(inspect(self.engine).has_table(LEGACY_SENSOR_TABLE))
+
+    def test_dual_read_merges_unmigrated_rows(self):
+        """Test downsampled reads see legacy rows not yet copied"""
+        migrate(self.engine, window=timedelta(hours=12))
+        with self.engine.begin() as conn:
+            self._insert_eav(conn, [self.start + timedelta(days=3)])
+
+        service = SensorQueryService(storage=SensorStorage())
+        with Session(self.engine) as db:
+            result = service.get_downsampled(
+                db, 'ZONE1', self.start, self.start + timedelta(days=4),
+                points=1000, columns=['soil_moisture', 'light_level']
+            )
+        self.assertEqual(result['downsample']['source_rows'], 49)
+        self.assertEqual(len(result['series']['light_level']['value']), 49)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, create_engine, text
+from sqlalchemy.orm import Session
+from backend.models.sensor_data import SensorData, SensorDataRollup
+from backend.services.sensor_query_service import SensorQueryService, encode_cursor
+from backend.services.sensor_storage import SensorStorage, legacy_metadata, legacy_sensor_data
+
+START = datetime(2024, 6, 1)
+END = START + timedelta(days=1)
+
+def at(hours):
+    return (START + timedelta(hours=hours)).isoformat()
+
+class TestSensorQueryService(unittest.TestCase):
+    def setUp(self):
+        """Wide readings from 02:00 (three at 04:00), legacy rows and rollups for the hours before"""
+        self.engine = create_engine('sqlite://')
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE zones (id INTEGER PRIMARY KEY, zone_id VARCHAR(255) UNIQUE)"))
+            metadata = MetaData()
+            Table('zones', metadata, autoload_with=conn)
+            SensorData.__table__.to_metadata(metadata).create(conn)
+            SensorDataRollup.__table__.to_metadata(metadata).create(conn)
+            legacy_metadata.create_all(conn)
+
+            readings = [
+                {'zone_id': 'ZONE1', 'device_id': 'ARD_1', 'timestamp': START + timedelta(hours=hour),
+                 'soil_moisture': float(hour), 'air_temp': 20.0 + hour}
+                for hour in (2, 3, 4, 4, 4, 5, 6)
+            ]
+            readings.append({'zone_id': 'ZONE2', 'device_id': 'ARD_2', 'timestamp': START + timedelta(hours=3),
+                             'soil_moisture': 1.0, 'air_temp': 1.0})
+            conn.execute(SensorData.__table__.insert(), readings)
+            conn.execute(legacy_sensor_data.insert(), [
+                # 03:00 is already in the wide table; 02:30 only exists here
+                {'zone_id': 'ZONE1', 'sensor_type': 'soil_moisture', 'value': 50.0, 'timestamp': START + timedelta(hours=3)},
+                {'zone_id': 'ZONE1', 'sensor_type': 'soil_moisture', 'value': 2.5, 'timestamp': START + timedelta(hours=2.5)},
+            ])
+            conn.execute(SensorDataRollup.__table__.insert(), [
+                {'zone_id': 'ZONE1', 'bucket': START + timedelta(hours=hour), 'samples': 12,
+                 'soil_moisture': hour + 0.5, 'air_temp': 10.0 + hour}
+                for hour in (0, 1, 3)
+            ])
+        self.db = Session(self.engine)
+        self.service = SensorQueryService(page_size=2, storage=SensorStorage())
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def series(self, column='soil_moisture', **kwargs):
+        kwargs.setdefault('points', 100)
+        result = self.service.get_downsampled(self.db, 'ZONE1', kwargs.pop('start', START), END, **kwargs)
+        return result, list(zip(result['series'][column]['timestamp'], result['series'][column]['value']))
+
+    def test_cursor_pages_cover_range_once(self):
+        """Test keyset pages split equal timestamps without skipping or repeating rows"""
+        pages, cursor = [], None
+        while True:
+            page = self.service.get_page(self.db, 'ZONE1', START, END, limit=2, cursor=cursor)
+            pages.append([(row['timestamp'], row['soil_moisture']) for row in page['data']])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        rows = [row for page in pages for row in page]
+        self.assertEqual(rows, [(at(hour), float(hour)) for hour in (2, 3, 4, 4, 4, 5, 6)])
+        # The second page ends inside the 04:00 group
+        self.assertEqual(pages[1][-1][0], pages[2][0][0])
+
+    def test_cursor_resumes_after_row(self):
+        """Test a cursor returns only rows after its (timestamp, id)"""
+        first = self.service.get_page(self.db, 'ZONE1', START, END, limit=3)
+        last = first['data'][-1]
+        cursor = encode_cursor(datetime.fromisoformat(last['timestamp']), last['id'])
+        self.assertEqual(first['next_cursor'], cursor)
+        rest = self.service.get_page(self.db, 'ZONE1', START, END, limit=100, cursor=cursor)
+        self.assertEqual([row['id'] for row in rest['data']], list(range(last['id'] + 1, 8)))
+        self.assertIsNone(rest['next_cursor'])
+
+    def test_column_projection(self):
+        """Test pages carry only id, timestamp and the requested columns"""
+        page = self.service.get_page(self.db, 'ZONE2', START, END, columns=['air_temp'])
+        self.assertEqual(page['columns'], ['air_temp'])
+        self.assertEqual(page['data'], [{'id': 8, 'timestamp': at(3), 'air_temp': 1.0}])
+
+        result, _ = self.series('air_temp', columns=['air_temp'])
+        self.assertEqual(list(result['series']), ['air_temp'])
+
+    def test_invalid_cursor_column_and_method(self):
+        """Test bad cursors, unknown columns and unknown methods raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.service.get_page(self.db, 'ZONE1', START, END, cursor='not-a-cursor')
+        with self.assertRaises(ValueError):
+            self.service.get_page(self.db, 'ZONE1', START, END, columns=['device_id'])
+        with self.assertRaises(ValueError):
+            self.service.get_downsampled(self.db, 'ZONE1', START, END, 10, columns=['zone_id; DROP TABLE'])
+        with self.assertRaises(ValueError):
+            self.service.get_downsampled(self.db, 'ZONE1', START, END, 10, method='mean')
+
+    def test_downsampled_merges_legacy_and_rollups(self):
+        """Test rollups fill the hours before the first raw row and legacy rows fill gaps"""
+        result, points = self.series(columns=['soil_moisture', 'air_temp'])
+        self.assertEqual(points, [
+            (at(0), 0.5), (at(1), 1.5), (at(2), 2.0), (at(2.5), 2.5), (at(3), 3.0),
+            (at(4), 4.0), (at(4), 4.0), (at(4), 4.0), (at(5), 5.0), (at(6), 6.0)
+        ])
+        self.assertEqual(result['downsample']['source_rows'], 10)
+
+        # Legacy rows carry no air temperature, so that series skips 02:30
+        _, air = self.series('air_temp', columns=['soil_moisture', 'air_temp'])
+        self.assertEqual([timestamp for timestamp, _ in air], [at(h) for h in (0, 1, 2, 3, 4, 4, 4, 5, 6)])
+
+    def test_downsampled_reduces_merged_series(self):
+        """Test downsampling keeps both ends of the merged series"""
+        for method in ('lttb', 'minmax'):
+            with self.subTest(method=method):
+                result, points = self.series(points=4, method=method)
+                self.assertLessEqual(len(points), 4)
+                self.assertEqual(points[0], (at(0), 0.5))
+                self.assertEqual(points[-1], (at(6), 6.0))
+                self.assertEqual(result['downsample']['source_rows'], 10)
+
+    def test_rollups_only_range(self):
+        """Test a range without raw rows falls back to rollups, including the bucket it starts in"""
+        _, points = self.series(start=START + timedelta(minutes=30))
+        self.assertEqual(points[:2], [(at(0), 0.5), (at(1), 1.5)])
+
+        result = self.service.get_downsampled(self.db, 'ZONE1', START, START + timedelta(hours=1, minutes=30), 100)
+        series = result['series']['soil_moisture']
+        self.assertEqual(list(zip(series['timestamp'], series['value'])), [(at(0), 0.5), (at(1), 1.5)])
+        self.assertEqual(result['series']['soil_ph'], {'timestamp': [], 'value': []})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from backend.ml_models.crop_analyzer import CropHealthAnalyzer
+from backend.ml_models.sequence_features import (
+    GROWTH_FEATURES,
+    SEQUENCE_LENGTH,
+    ZoneSequenceWindow,
+    latest_windows,
+    sequence_matrix
+)
+
+def daily_history(days, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {**{name: float(value) for name, value in zip(GROWTH_FEATURES, rng.uniform(0, 1, len(GROWTH_FEATURES)))}, 'height': 10.0 + day}
+        for day in range(days)
+    ]
+
+class MeanModel:
+    """LSTM stand-in: progress is the mean of each window"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch, training=False):
+        self.batches.append(batch.shape)
+        return batch.mean(axis=(1, 2))[:, np.newaxis]
+
+class TestSequenceFeatures(unittest.TestCase):
+    def test_latest_windows_are_views(self):
+        """Test windows match slicing and share the history's memory"""
+        data = np.arange(50 * 8, dtype=np.float32).reshape(50, 8)
+        windows = latest_windows(data, SEQUENCE_LENGTH, count=3)
+        self.assertEqual(windows.shape, (3, SEQUENCE_LENGTH, 8))
+        for i, start in enumerate(range(18, 21)):
+            np.testing.assert_array_equal(windows[i], data[start:start + SEQUENCE_LENGTH])
+        self.assertTrue(np.shares_memory(windows, data))
+        self.assertIsNone(latest_windows(data[:10]))
+
+    def test_zone_window_tracks_latest_days(self):
+        """Test the rolling window equals the last days of the history"""
+        data = sequence_matrix(daily_history(75))
+        window = ZoneSequenceWindow()
+        for day, row in enumerate(data):
+            window.append(row)
+            self.assertEqual(window.ready, day + 1 >= SEQUENCE_LENGTH)
+        np.testing.assert_array_equal(window.window(), data[-SEQUENCE_LENGTH:])
+        seeded = ZoneSequenceWindow()
+        seeded.extend(data[:60])
+        seeded.append(data[60])
+        np.testing.assert_array_equal(seeded.window(), data[31:61])
+
+class TestGrowthStage(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = CropHealthAnalyzer()
+        self.analyzer.growth_predictor = MeanModel()
+
+    def test_predicts_from_latest_window_only(self):
+        """Test only the most recent window is sent to the model"""
+        history = daily_history(90)
+        result = self.analyzer.predict_growth_stage(history)
+        self.assertEqual(self.analyzer.growth_predictor.batches, [(1, SEQUENCE_LENGTH, len(GROWTH_FEATURES))])
+        progress = sequence_matrix(history)[-SEQUENCE_LENGTH:].mean()
+        self.assertEqual(result['current_stage'], self.analyzer._map_growth_stage(progress))
+        self.assertAlmostEqual(result['growth_rate'], 1.0)
+        self.assertIsNone(self.analyzer.predict_growth_stage(history[:10]))
+
+    def test_incremental_matches_full_history(self):
+        """Test daily updates give the same result as predicting from the full history"""
+        history = daily_history(45, seed=1)
+        self.analyzer.seed_growth_window('Z1', history[:40])
+        for day in range(40, 45):
+            incremental = self.analyzer.update_growth_stage('Z1', history[day])
+            self.assertEqual(incremental, self.analyzer.predict_growth_stage(history[:day + 1]))
+        self.assertIsNone(self.analyzer.update_growth_stage('Z2', history[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import importlib.util
+import io
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+from backend.ml_models.crop_patterns import CropPatternAnalyzer, detect_indicators
+from backend.ml_models.stress_pipeline import iter_image_paths, run_stress_pipeline
+
+HAS_CV2 = importlib.util.find_spec('cv2') is not None
+
+class TestStressPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'block-b'))
+        self.paths = []
+        for name in ('a.npy', 'block-b/c.npy', 'b.npy'):
+            path = os.path.join(self.tmp.name, name)
+            np.save(path, np.full((32, 32, 3), (40, 140, 50), dtype=np.uint8))
+            self.paths.append(path)
+        with open(os.path.join(self.tmp.name, 'notes.txt'), 'w') as f:
+            f.write("not an image")
+        with open(os.path.join(self.tmp.name, 'broken.npy'), 'w') as f:
+            f.write("not an array")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_image_paths(self):
+        """Test images are found recursively in a stable order"""
+        names = [os.path.relpath(p, self.tmp.name) for p in iter_image_paths(self.tmp.name)]
+        self.assertEqual(names, ['a.npy', 'b.npy', 'broken.npy', os.path.join('block-b', 'c.npy')])
+
+    def test_results_written_per_image(self):
+        """Test every image gets one NDJSON line and failures are reported, in and out of process"""
+        for workers in (0, 2):
+            with self.subTest(workers=workers):
+                output = io.StringIO()
+                # Flowering tomato indicators need field checks, not image detectors
+                summary = run_stress_pipeline(
+                    iter_image_paths(self.tmp.name), 'tomato', 'determinate', 'Flowering',
+                    output=output, workers=workers
+                )
+                lines = [json.loads(line) for line in output.getvalue().splitlines()]
+                self.assertEqual((summary['images'], summary['failed']), (4, 1))
+                self.assertEqual(sorted(line['image'] for line in lines), sorted(iter_image_paths(self.tmp.name)))
+                self.assertEqual([line['image'] for line in lines if 'error' in line], [os.path.join(self.tmp.name, 'broken.npy')])
+                self.assertGreater(summary['images_per_second'], 0)
+
+    def test_directory_argument(self):
+        """Test a directory given as str or Path is searched for images"""
+        for directory in (self.tmp.name, pathlib.Path(self.tmp.name)):
+            with self.subTest(directory=type(directory).__name__):
+                output = io.StringIO()
+                summary = run_stress_pipeline(directory, 'tomato', 'determinate', 'Flowering', output=output, workers=0)
+                lines = [json.loads(line) for line in output.getvalue().splitlines()]
+                self.assertEqual((summary['images'], summary['failed']), (4, 1))
+                self.assertEqual([line['image'] for line in lines], list(iter_image_paths(self.tmp.name)))
+
+    def test_path_output_is_written_and_closed(self):
+        """Test a Path output is opened, written and closed by the pipeline"""
+        output = pathlib.Path(self.tmp.name) / 'results.ndjson'
+        opened = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        with unittest.mock.patch('builtins.open', tracking_open):
+            run_stress_pipeline(self.paths, 'tomato', 'determinate', 'Flowering', output=output, workers=0)
+        self.assertEqual(len(output.read_text().splitlines()), 3)
+        self.assertTrue(all(f.closed for f in opened))
+
+    def test_path_that_is_not_a_directory(self):
+        """Test a single path string that is not a directory is rejected"""
+        with self.assertRaises(ValueError):
+            run_stress_pipeline(self.paths[0], 'tomato', 'determinate', 'Flowering', workers=0)
+
+    def test_unknown_stage(self):
+        """Test an unknown growth stage fails before any image is read"""
+        with self.assertRaises(ValueError):
+            run_stress_pipeline(self.paths, 'tomato', 'determinate', 'Dormant', workers=0)
+
+    @unittest.skipUnless(HAS_CV2, "OpenCV not installed")
+    def test_detection_matches_analyzer(self):
+        """Test the pipeline measures what detect_stress_indicators reports"""
+        image = np.load(self.paths[0])
+        image[:16] = (40, 200, 220)  # Yellow half
+        np.save(self.paths[0], image)
+        output = io.StringIO()
+        run_stress_pipeline(self.paths[:1], 'tomato', 'determinate', 'Seedling', output=output, workers=0)
+        result = json.loads(output.getvalue())
+        expected = CropPatternAnalyzer().detect_stress_indicators(image, 'tomato', 'determinate', 'Seedling')
+        self.assertEqual(result['indicators'], {k: float(v) for k, v in expected.items()})
+        self.assertEqual(detect_indicators(image, ['stunted_growth']), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import struct
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from backend.services.telemetry_protocol import (
+    TELEMETRY_HEADER, TELEMETRY_SCHEMAS, decode_telemetry, encode_telemetry
+)
+
+class TestTelemetryProtocol(unittest.TestCase):
+    def setUp(self):
+        """Build a three-reading batch"""
+        self.records = np.zeros(3, dtype=TELEMETRY_SCHEMAS[1])
+        self.records['age'] = [10, 5, 0]
+        self.records['soil_moisture'] = [41.5, 42.0, 42.5]
+        self.records['light_level'] = np.nan
+        self.records['is_raining'] = [0, 1, 0]
+
+    def test_layout_is_fixed(self):
+        """Test the v1 wire sizes the firmware structs are packed to"""
+        self.assertEqual(TELEMETRY_HEADER.size, 32)
+        self.assertEqual(TELEMETRY_SCHEMAS[1].itemsize, 61)
+
+    def test_round_trip(self):
+        """Test a batch decodes to the values that were encoded"""
+        payload = encode_telemetry(self.records, zone_id='zone_001', signal_strength=-67,
+                                   battery_level=88, firmware_version='1.1.0')
+        batch = decode_telemetry(payload)
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.zone_id, 'zone_001')
+        self.assertEqual(batch.signal_strength, -67)
+        self.assertEqual(batch.firmware_version, '1.1.0')
+        np.testing.assert_array_equal(batch.records['soil_moisture'], self.records['soil_moisture'])
+
+    def test_rows_use_age_and_nulls(self):
+        """Test rows get timestamps from the age field and NaN becomes NULL"""
+        received = datetime(2024, 5, 1, 12, 0, 0)
+        rows = decode_telemetry(encode_telemetry(self.records)).to_rows('ARD_1', 'zone_001', received)
+
+        self.assertEqual(rows[0]['timestamp'], received - timedelta(seconds=10))
+        self.assertEqual(rows[0]['soil_moisture'], 41.5)
+        self.assertIsNone(rows[0]['light_level'])
+        self.assertIs(rows[1]['is_raining'], True)
+        self.assertEqual(rows[2]['device_id'], 'ARD_1')
+
+    def test_rejects_malformed_payloads(self):
+        """Test truncated, foreign and unknown-version payloads raise ValueError"""
+        payload = encode_telemetry(self.records)
+        with self.assertRaises(ValueError):
+            decode_telemetry(payload[:-1])
+        with self.assertRaises(ValueError):
+            decode_telemetry(b'{"device_id": "ARD_1"}' + bytes(32))
+        with self.assertRaises(ValueError):
+            decode_telemetry(payload[:2] + struct.pack('B', 99) + payload[3:])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from backend.services.zone_event_log import ZoneEventLog
+
+class TestZoneEventLog(unittest.TestCase):
+    def setUp(self):
+        """Create a log in a scratch directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name)
+        self.log = self._open_log()
+
+    def _open_log(self, **kwargs):
+        return ZoneEventLog(
+            log_path=self.data_dir / "zones.log",
+            snapshot_path=self.data_dir / "zones.json",
+            **kwargs
+        )
+
+    def test_replay_returns_appended_events(self):
+        """Test events survive a reopen"""
+        self.log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 25.0}})
+        self.log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 10.0}})
+        self.log.close()
+
+        events = list(self._open_log().replay())
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[1]['event']['amount'], 10.0)
+
+    def test_torn_tail_is_ignored(self):
+        """Test a partially written last line does not break replay"""
+        self.log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 5.0}})
+        self.log.close()
+        with open(self.data_dir / "zones.log", 'a') as f:
+            f.write('{"op": "irrig')
+
+        events = list(self._open_log().replay())
+        self.assertEqual(len(events), 1)
+
+    def test_appends_after_torn_tail_survive(self):
+        """Test events appended after a torn tail replay on the next restart"""
+        self.log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 5.0}})
+        self.log.close()
+        with open(self.data_dir / "zones.log", 'a') as f:
+            f.write('{"op": "irrig')
+
+        log = self._open_log()
+        self.assertEqual(len(list(log.replay())), 1)
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 7.0}})
+        log.append({'op': 'irrigation', 'zone_id': 'zone_002', 'event': {'amount': 8.0}})
+        log.close()
+
+        events = list(self._open_log().replay())
+        self.assertEqual([e['event']['amount'] for e in events], [5.0, 7.0, 8.0])
+
+    def test_unterminated_last_line_is_kept(self):
+        """Test a complete last event without a newline is not merged with the next"""
+        with open(self.data_dir / "zones.log", 'w') as f:
+            f.write('{"op":"irrigation","zone_id":"zone_001","event":{"amount":1.0}}')
+
+        log = self._open_log()
+        self.assertEqual(len(list(log.replay())), 1)
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 2.0}})
+        log.close()
+
+        events = list(self._open_log().replay())
+        self.assertEqual([e['event']['amount'] for e in events], [1.0, 2.0])
+
+    def test_compaction_writes_snapshot_and_truncates_log(self):
+        """Test compaction replaces the log with a snapshot"""
+        log = self._open_log(compact_every=2)
+        log.append({'op': 'zone', 'zone': {'zone_id': 'zone_001'}})
+        self.assertFalse(log.needs_compaction())
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 1.0}})
+        self.assertTrue(log.needs_compaction())
+
+        log.compact(lambda: [{'zone_id': 'zone_001', 'irrigation_history': [{'amount': 1.0}]}])
+
+        self.assertEqual(list(self._open_log().replay()), [])
+        snapshot = self._open_log().load_snapshot()
+        self.assertEqual(snapshot[0]['zone_id'], 'zone_001')
+
+    def test_crash_before_log_truncation(self):
+        """Test events in the snapshot are not replayed when the log was not truncated"""
+        log = self._open_log(compact_every=3)
+        log.append({'op': 'zone', 'zone': {'zone_id': 'zone_001'}})
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 1.0}})
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 2.0}})
+        log.sync()
+        logged = (self.data_dir / "zones.log").read_bytes()
+
+        log.compact(lambda: [{'zone_id': 'zone_001', 'irrigation_history': [{'amount': 1.0}, {'amount': 2.0}]}])
+        log.close()
+        # Crash after the snapshot replaced the old one, before the log was emptied
+        (self.data_dir / "zones.log").write_bytes(logged)
+
+        log = self._open_log()
+        self.assertEqual(log.load_snapshot()[0]['irrigation_history'], [{'amount': 1.0}, {'amount': 2.0}])
+        self.assertEqual(list(log.replay()), [])
+        self.assertFalse(log.needs_compaction())
+        log.append({'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 3.0}})
+        log.close()
+
+        events = list(self._open_log().replay())
+        self.assertEqual(events, [{'op': 'irrigation', 'zone_id': 'zone_001', 'event': {'amount': 3.0}}])
+
+    def test_legacy_keyed_snapshot(self):
+        """Test snapshots keyed by zone_id are still readable"""
+        with open(self.data_dir / "zones.json", 'w') as f:
+            json.dump({'zone_001': {'zone_id': 'zone_001'}}, f)
+        self.assertEqual(self.log.load_snapshot(), [{'zone_id': 'zone_001'}])
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.log.close()
+        self.tmp.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
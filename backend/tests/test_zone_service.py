@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+from backend.services.zone_service import ZoneService
+
+class FieldZone:
+    """The zone attributes ZoneService reads"""
+
+    def __init__(self, zone_id, name, crop_type, area_hectares, cached_satellite=None):
+        self.zone_id = zone_id
+        self.name = name
+        self.crop_type = crop_type
+        self.area_hectares = area_hectares
+        self.cached_satellite = cached_satellite
+        self.irrigation_history = []
+
+    def to_dict(self):
+        return {
+            'zone_id': self.zone_id,
+            'name': self.name,
+            'crop_type': self.crop_type,
+            'area_hectares': self.area_hectares,
+            'irrigation_history': self.irrigation_history
+        }
+
+class TestZoneService(unittest.TestCase):
+    def setUp(self):
+        """Two zones with irrigation recorded and one without"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = ZoneService(data_dir=self.tmp.name)
+        satellite = {'soil_moisture': {'mean': 0.3}, 'ndvi': {'mean': 0.6}, 'water_stress': {'index': 0.2}}
+        self.service.create_zone(FieldZone('zone_001', 'Corn Field Alpha', 'corn', 25.5, satellite))
+        self.service.create_zone(FieldZone('zone_002', 'Cotton Field Beta', 'cotton', 30.0))
+        self.service.create_zone(FieldZone('zone_003', 'Alfalfa Field Gamma', 'alfalfa', 15.75))
+        for amount, duration, kind in ((25.5, 120, 'sprinkler'), (20.0, 90, 'drip'), (30.0, 150, 'sprinkler')):
+            self.service.record_irrigation('zone_001', amount, duration, kind)
+        self.service.record_irrigation('zone_002', 10.0, 60, 'drip')
+
+    def tearDown(self):
+        self.service.event_log.close()
+        self.tmp.cleanup()
+
+    def test_compare_zones(self):
+        """Test totals, counts, averages and satellite means per zone"""
+        comparison = self.service.compare_zones(['zone_001', 'zone_002', 'zone_003', 'zone_999'])
+        self.assertEqual(sorted(comparison['zones']), ['zone_001', 'zone_002', 'zone_003'])
+
+        corn = comparison['zones']['zone_001']
+        self.assertEqual((corn['name'], corn['crop_type'], corn['area_hectares']), ('Corn Field Alpha', 'corn', 25.5))
+        self.assertAlmostEqual(corn['statistics']['total_water_used'], 75.5)
+        self.assertEqual(corn['statistics']['irrigation_count'], 3)
+        self.assertAlmostEqual(corn['statistics']['avg_irrigation_amount'], 75.5 / 3)
+        self.assertEqual((corn['statistics']['avg_ndvi'], corn['statistics']['water_stress']), (0.6, 0.2))
+
+        summary = comparison['summary']
+        self.assertEqual(summary['irrigation_frequency'], {'zone_001': 3, 'zone_002': 1, 'zone_003': 0})
+        self.assertEqual(summary['total_water_used']['zone_002'], 10.0)
+        self.assertEqual(comparison['zones']['zone_003']['statistics']['avg_irrigation_amount'], 0)
+        self.assertEqual(summary['avg_soil_moisture'], {'zone_001': 0.3, 'zone_002': 0, 'zone_003': 0})
+
+    def test_compare_unknown_zones(self):
+        """Test unknown zones give an empty comparison"""
+        comparison = self.service.compare_zones(['zone_999'])
+        self.assertEqual(comparison['zones'], {})
+        self.assertEqual(comparison['summary']['total_water_used'], {})
+
+    def test_export_history_is_not_shared(self):
+        """Test edits to one export's history do not reach the cache"""
+        with mock.patch.object(self.service, 'get_historical_data', wraps=self.service.get_historical_data) as compute:
+            first = self.service.export_zone_data('zone_001')['historical_data']
+            first['daily_data'][-1]['irrigation_amount'] = -1.0
+            first['daily_data'].clear()
+            first['summary']['total_irrigation'] = -1.0
+            second = self.service.export_zone_data('zone_001')['historical_data']
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(len(second['daily_data']), 31)
+        self.assertAlmostEqual(second['daily_data'][-1]['irrigation_amount'], 75.5)
+        self.assertAlmostEqual(second['summary']['total_irrigation'], 75.5)
+
+    def test_export_cache_follows_new_irrigation(self):
+        """Test a new irrigation event invalidates the cached history"""
+        self.service.export_zone_data('zone_002')
+        self.service.record_irrigation('zone_002', 5.0, 30, 'drip')
+        historical = self.service.export_zone_data('zone_002')['historical_data']
+        self.assertAlmostEqual(historical['summary']['total_irrigation'], 15.0)
+
+    def test_stream_ndjson_export(self):
+        """Test NDJSON records: zone header, summary, 31 days, then each irrigation"""
+        records = [json.loads(line) for line in self.service.stream_zone_export('zone_001', 'ndjson')]
+        kinds = [record['record'] for record in records]
+        self.assertEqual(kinds, ['zone', 'summary'] + ['daily'] * 31 + ['irrigation'] * 3)
+        self.assertNotIn('irrigation_history', records[0]['zone_info'])
+        self.assertEqual(records[0]['statistics']['irrigation_count'], 3)
+        self.assertAlmostEqual(records[1]['total_irrigation'], 75.5)
+        self.assertEqual([record['amount'] for record in records[-3:]], [25.5, 20.0, 30.0])
+
+    def test_stream_csv_export(self):
+        """Test the CSV export has a header and one row per irrigation event"""
+        chunks = list(self.service.stream_zone_export('zone_001', 'csv'))
+        rows = list(csv.reader(io.StringIO(''.join(chunks))))
+        self.assertEqual(rows[0], ['zone_id', 'timestamp', 'amount', 'duration', 'type'])
+        self.assertEqual([(row[0], row[2], row[4]) for row in rows[1:]], [
+            ('zone_001', '25.5', 'sprinkler'), ('zone_001', '20.0', 'drip'), ('zone_001', '30.0', 'sprinkler')
+        ])
+
+    def test_stream_unknown_zone_and_format(self):
+        """Test unknown zones return None and unknown formats are rejected"""
+        self.assertIsNone(self.service.stream_zone_export('zone_999'))
+        with self.assertRaises(ValueError):
+            self.service.stream_zone_export('zone_001', 'xml')
+
+if __name__ == '__main__':
+    unittest.main()